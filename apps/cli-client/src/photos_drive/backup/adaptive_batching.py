@@ -0,0 +1,293 @@
+import logging
+import os
+import sys
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# The fraction of the host's memory that batches can grow into by default
+DEFAULT_MAX_MEMORY_FRACTION = 0.75
+
+# The max. number of items that a model can see at a time with adaptive batches
+MAX_ADAPTIVE_BATCH_SIZE = 256
+
+# The min. relative gain in throughput for a bigger batch to be worth it
+DEFAULT_PLATEAU_THRESHOLD = 0.05
+
+# The fraction of the memory ceiling that memory must grow by, after shrinking the
+# batches, for the batches to be shrunk again
+MEMORY_GROWTH_TOLERANCE_FRACTION = 0.01
+
+
+def get_resident_memory_in_bytes() -> int:
+    '''
+    Returns the resident memory of this process and of its child processes, like
+    the embedding and image decoding workers.
+
+    Returns:
+        int: The resident memory, in bytes. It is the peak resident memory of this
+            process alone on hosts without a /proc file system, and 0 if it is
+            unknown.
+    '''
+    try:
+        memory_in_bytes = _get_resident_memory_of_pid_in_bytes('self')
+    except (OSError, ValueError, IndexError):
+        return _get_peak_resident_memory_in_bytes()
+
+    for pid in _get_descendant_pids(os.getpid()):
+        try:
+            memory_in_bytes += _get_resident_memory_of_pid_in_bytes(str(pid))
+        except (OSError, ValueError, IndexError):
+            # The process exited after it was listed
+            pass
+
+    return memory_in_bytes
+
+
+def _get_resident_memory_of_pid_in_bytes(pid: str) -> int:
+    with open(f'/proc/{pid}/statm', 'r') as file:
+        return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def _get_descendant_pids(root_pid: int) -> list[int]:
+    children_by_pid: dict[int, list[int]] = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as file:
+                # The command name is in parentheses and can contain spaces
+                parent_pid = int(file.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children_by_pid.setdefault(parent_pid, []).append(int(entry))
+
+    descendant_pids: list[int] = []
+    pids_to_visit = list(children_by_pid.get(root_pid, []))
+    while pids_to_visit:
+        pid = pids_to_visit.pop()
+        descendant_pids.append(pid)
+        pids_to_visit.extend(children_by_pid.get(pid, []))
+
+    return descendant_pids
+
+
+def _get_peak_resident_memory_in_bytes() -> int:
+    try:
+        import resource
+    except ImportError:
+        return 0
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, and in kilobytes elsewhere
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def get_total_memory_in_bytes() -> Optional[int]:
+    '''
+    Returns the physical memory of the host.
+
+    Returns:
+        Optional[int]: The physical memory in bytes, or None if it is unknown.
+    '''
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+class AdaptiveBatchSizer:
+    '''
+    Picks the size of the next batch of a model from how the previous batches went.
+
+    It doubles the batch size while the throughput keeps improving, and settles
+    on the best size once it plateaus. Whenever the resident memory of the process
+    and its workers goes over the memory ceiling, or would go over it with a bigger
+    batch, it halves the batch size or stops growing.
+
+    Resident memory rarely falls after the batches shrink, since allocators keep
+    freed memory, and the peak resident memory used on some hosts never falls. So
+    while memory stays over the ceiling, the batches are only shrunk again if
+    memory keeps growing.
+    '''
+
+    def __init__(
+        self,
+        name: str,
+        initial_batch_size: int = 16,
+        min_batch_size: int = 1,
+        max_batch_size: int = MAX_ADAPTIVE_BATCH_SIZE,
+        max_memory_in_bytes: Optional[int] = None,
+        plateau_threshold: float = DEFAULT_PLATEAU_THRESHOLD,
+        num_warmup_batches: int = 1,
+    ):
+        '''
+        Constructs an instance of {@code AdaptiveBatchSizer}
+
+        Args:
+            - name (str): The name of the stage, for logging.
+            - initial_batch_size (int): The size of the first batches.
+            - min_batch_size (int): The min. batch size.
+            - max_batch_size (int): The max. batch size.
+            - max_memory_in_bytes (Optional[int]):
+                The memory ceiling of the process. Defaults to 75% of the host's
+                memory.
+            - plateau_threshold (float):
+                The min. relative gain in throughput to keep growing the batches.
+            - num_warmup_batches (int):
+                The number of first batches to ignore, since they include the time
+                to load the model.
+        '''
+        if not 1 <= min_batch_size <= initial_batch_size <= max_batch_size:
+            raise ValueError(
+                "Batch sizes must satisfy 1 <= min_batch_size <= "
+                + "initial_batch_size <= max_batch_size"
+            )
+
+        if max_memory_in_bytes is None:
+            total_memory = get_total_memory_in_bytes()
+            if total_memory is not None:
+                max_memory_in_bytes = int(total_memory * DEFAULT_MAX_MEMORY_FRACTION)
+
+        self.__name = name
+        self.__min_batch_size = min_batch_size
+        self.__max_batch_size = max_batch_size
+        self.__max_memory_in_bytes = max_memory_in_bytes
+        self.__plateau_threshold = plateau_threshold
+        self.__num_warmup_batches_left = num_warmup_batches
+
+        self.__lock = threading.Lock()
+        self.__batch_size = initial_batch_size
+        self.__is_growing = True
+        self.__best_batch_size = initial_batch_size
+        self.__best_throughput: Optional[float] = None
+        self.__last_memory_sample: Optional[tuple[int, int]] = None
+        self.__memory_at_last_shrink: Optional[int] = None
+
+    def get_batch_size(self) -> int:
+        '''
+        Returns the size of the next batch.
+
+        Returns:
+            int: The batch size.
+        '''
+        with self.__lock:
+            return self.__batch_size
+
+    def record_batch(
+        self,
+        num_items: int,
+        elapsed_time: float,
+        memory_in_bytes: Optional[int] = None,
+    ):
+        '''
+        Records how long a batch took, and adjusts the size of the next batches.
+
+        Args:
+            - num_items (int): The number of items in the batch.
+            - elapsed_time (float): The time taken to process the batch, in seconds.
+            - memory_in_bytes (Optional[int]):
+                The resident memory after processing the batch. Defaults to the
+                current resident memory of this process and its child processes.
+        '''
+        if memory_in_bytes is None:
+            memory_in_bytes = get_resident_memory_in_bytes()
+
+        with self.__lock:
+            # Partial batches, like the last batch, say little about the batch size
+            if num_items != self.__batch_size:
+                return
+            if self.__num_warmup_batches_left > 0:
+                self.__num_warmup_batches_left -= 1
+                return
+
+            if self.__is_over_memory_ceiling(memory_in_bytes):
+                self.__is_growing = False
+                if not self.__has_memory_grown_since_last_shrink(memory_in_bytes):
+                    return
+
+                self.__memory_at_last_shrink = memory_in_bytes
+                self.__best_batch_size = max(
+                    self.__min_batch_size, self.__batch_size // 2
+                )
+                self.__set_batch_size(
+                    self.__best_batch_size,
+                    f"memory {memory_in_bytes} is over {self.__max_memory_in_bytes}",
+                )
+                return
+
+            self.__memory_at_last_shrink = None
+            if not self.__is_growing:
+                return
+
+            throughput = num_items / max(elapsed_time, 1e-9)
+            if self.__best_throughput is not None and throughput <= (
+                self.__best_throughput * (1 + self.__plateau_threshold)
+            ):
+                self.__is_growing = False
+                self.__set_batch_size(
+                    self.__best_batch_size,
+                    f"throughput plateaued at {self.__best_throughput:.2f} items/s",
+                )
+                return
+
+            self.__best_throughput = throughput
+            self.__best_batch_size = self.__batch_size
+
+            next_batch_size = min(self.__max_batch_size, self.__batch_size * 2)
+            predicted_memory = self.__predict_memory(memory_in_bytes, next_batch_size)
+            self.__last_memory_sample = (self.__batch_size, memory_in_bytes)
+
+            if next_batch_size == self.__batch_size or self.__is_over_memory_ceiling(
+                predicted_memory
+            ):
+                self.__is_growing = False
+                logger.info(
+                    f"Settled on a {self.__name} batch size of {self.__batch_size}"
+                )
+                return
+
+            self.__set_batch_size(
+                next_batch_size, f"throughput improved to {throughput:.2f} items/s"
+            )
+
+    def __predict_memory(self, memory_in_bytes: int, next_batch_size: int) -> int:
+        if self.__last_memory_sample is None:
+            return memory_in_bytes
+
+        last_batch_size, last_memory_in_bytes = self.__last_memory_sample
+        if last_batch_size >= self.__batch_size:
+            return memory_in_bytes
+
+        memory_per_item = max(0, memory_in_bytes - last_memory_in_bytes) / (
+            self.__batch_size - last_batch_size
+        )
+        return int(
+            memory_in_bytes + memory_per_item * (next_batch_size - self.__batch_size)
+        )
+
+    def __has_memory_grown_since_last_shrink(self, memory_in_bytes: int) -> bool:
+        if self.__memory_at_last_shrink is None or self.__max_memory_in_bytes is None:
+            return True
+
+        tolerance = self.__max_memory_in_bytes * MEMORY_GROWTH_TOLERANCE_FRACTION
+        return memory_in_bytes > self.__memory_at_last_shrink + tolerance
+
+    def __is_over_memory_ceiling(self, memory_in_bytes: int) -> bool:
+        return (
+            self.__max_memory_in_bytes is not None
+            and memory_in_bytes > self.__max_memory_in_bytes
+        )
+
+    def __set_batch_size(self, batch_size: int, reason: str):
+        if batch_size != self.__batch_size:
+            logger.info(
+                f"Changed the {self.__name} batch size from {self.__batch_size} "
+                + f"to {batch_size}: {reason}"
+            )
+        else:
+            logger.info(
+                f"Settled on a {self.__name} batch size of {batch_size}: {reason}"
+            )
+        self.__batch_size = batch_size
@@ -0,0 +1,330 @@
+from dataclasses import dataclass
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from bson.objectid import ObjectId
+
+from photos_drive.shared.core.media_items.media_item_id import (
+    MediaItemId,
+    media_item_id_to_string,
+    parse_string_to_media_item_id,
+)
+from photos_drive.shared.features.llm.vector_stores.base_vector_store import (
+    MediaItemEmbeddingId,
+    embedding_id_to_string,
+    parse_string_to_embedding_id,
+)
+
+logger = logging.getLogger(__name__)
+
+BACKUP_JOURNAL_FILE_NAME = 'photos_drive_backup_journal.sqlite3'
+
+# Google Photos accepts upload tokens for up to a day after the bytes are uploaded
+UPLOAD_TOKEN_TTL_IN_SECONDS = 23 * 60 * 60
+
+# SQLite limits the number of variables in a single query
+MAX_KEYS_PER_QUERY = 250
+
+
+@dataclass(frozen=True)
+class BackupJournalKey:
+    """
+    Identifies a version of a file that is being backed up.
+
+    Attributes:
+        file_path (str): The absolute file path.
+        file_hash (bytes): The file hash, in bytes.
+    """
+
+    file_path: str
+    file_hash: bytes
+
+
+@dataclass(frozen=True)
+class BackupJournalEntry:
+    """
+    Stores the progress of backing up a file.
+
+    Attributes:
+        gphotos_client_id (ObjectId): The ID of the Google Photos account that the
+            file is uploaded to.
+        upload_token (Optional[str]): The upload token of the file, if its bytes
+            were uploaded and the token has not expired; else None.
+        gphotos_media_item_id (Optional[str]): The ID of the media item in Google
+            Photos, if it was created; else None.
+        media_item_id (Optional[MediaItemId]): The ID of the media item in the
+            database, if it was created; else None.
+        embedding_id (Optional[MediaItemEmbeddingId]): The ID of the embedding in
+            the vector store, if it was created; else None.
+    """
+
+    gphotos_client_id: ObjectId
+    upload_token: Optional[str]
+    gphotos_media_item_id: Optional[str]
+    media_item_id: Optional[MediaItemId]
+    embedding_id: Optional[MediaItemEmbeddingId]
+
+
+def get_backup_journal_key(file_path: str, file_hash: bytes) -> BackupJournalKey:
+    '''
+    Returns the journal key of a file.
+
+    Args:
+        file_path (str): The path to the file.
+        file_hash (bytes): The file hash, in bytes.
+
+    Returns:
+        BackupJournalKey: The journal key.
+    '''
+    return BackupJournalKey(file_path=os.path.abspath(file_path), file_hash=file_hash)
+
+
+class BackupJournal:
+    '''
+    A local write-ahead journal in a SQLite database that records the progress of
+    backing up each file as each step completes, so that a backup that crashed can
+    be resumed without uploading the same files to Google Photos again.
+
+    Entries are removed once the backup of their files finishes.
+    '''
+
+    def __init__(self, db_path: str):
+        '''
+        Constructs an instance of {@code BackupJournal}
+
+        Args:
+            - db_path (str): The path to the SQLite database file.
+        '''
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        self.__lock = threading.RLock()
+        self.__connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.__connection.execute(
+            '''
+            CREATE TABLE IF NOT EXISTS backup_journal (
+                file_path TEXT NOT NULL,
+                file_hash BLOB NOT NULL,
+                gphotos_client_id TEXT NOT NULL,
+                upload_token TEXT,
+                upload_token_created_at REAL,
+                gphotos_media_item_id TEXT,
+                media_item_id TEXT,
+                embedding_id TEXT,
+                PRIMARY KEY (file_path, file_hash)
+            )
+            '''
+        )
+        self.__connection.commit()
+
+    def get_entries(
+        self, keys: list[BackupJournalKey]
+    ) -> dict[BackupJournalKey, BackupJournalEntry]:
+        '''
+        Returns the journal entries of a list of files.
+
+        Args:
+            - keys (list[BackupJournalKey]): The journal keys of the files.
+
+        Returns:
+            dict[BackupJournalKey, BackupJournalEntry]: A map of journal keys to
+                their entries, for the files that are in the journal.
+        '''
+        entries: dict[BackupJournalKey, BackupJournalEntry] = {}
+        min_upload_token_created_at = time.time() - UPLOAD_TOKEN_TTL_IN_SECONDS
+
+        with self.__lock:
+            for start in range(0, len(keys), MAX_KEYS_PER_QUERY):
+                chunk = keys[start : start + MAX_KEYS_PER_QUERY]
+                rows = self.__connection.execute(
+                    '''
+                    SELECT file_path, file_hash, gphotos_client_id, upload_token,
+                        upload_token_created_at, gphotos_media_item_id,
+                        media_item_id, embedding_id
+                    FROM backup_journal
+                    WHERE {}
+                    '''.format(
+                        ' OR '.join(['(file_path = ? AND file_hash = ?)'] * len(chunk))
+                    ),
+                    [v for key in chunk for v in (key.file_path, key.file_hash)],
+                ).fetchall()
+
+                for (
+                    file_path,
+                    file_hash,
+                    gphotos_client_id,
+                    upload_token,
+                    upload_token_created_at,
+                    gphotos_media_item_id,
+                    media_item_id,
+                    embedding_id,
+                ) in rows:
+                    is_upload_token_expired = (
+                        upload_token_created_at is None
+                        or upload_token_created_at < min_upload_token_created_at
+                    )
+                    entries[BackupJournalKey(file_path, bytes(file_hash))] = (
+                        BackupJournalEntry(
+                            gphotos_client_id=ObjectId(gphotos_client_id),
+                            upload_token=(
+                                None if is_upload_token_expired else upload_token
+                            ),
+                            gphotos_media_item_id=gphotos_media_item_id,
+                            media_item_id=(
+                                parse_string_to_media_item_id(media_item_id)
+                                if media_item_id
+                                else None
+                            ),
+                            embedding_id=(
+                                parse_string_to_embedding_id(embedding_id)
+                                if embedding_id
+                                else None
+                            ),
+                        )
+                    )
+
+        return entries
+
+    def record_upload_token(
+        self, key: BackupJournalKey, gphotos_client_id: ObjectId, upload_token: str
+    ):
+        '''
+        Records that the bytes of a file were uploaded to Google Photos.
+
+        Args:
+            - key (BackupJournalKey): The journal key of the file.
+            - gphotos_client_id (ObjectId): The ID of the Google Photos account.
+            - upload_token (str): The upload token of the file.
+        '''
+        with self.__lock:
+            self.__connection.execute(
+                '''
+                INSERT INTO backup_journal (
+                    file_path, file_hash, gphotos_client_id, upload_token,
+                    upload_token_created_at
+                )
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (file_path, file_hash) DO UPDATE SET
+                    gphotos_client_id = excluded.gphotos_client_id,
+                    upload_token = excluded.upload_token,
+                    upload_token_created_at = excluded.upload_token_created_at
+                ''',
+                (
+                    key.file_path,
+                    key.file_hash,
+                    str(gphotos_client_id),
+                    upload_token,
+                    time.time(),
+                ),
+            )
+            self.__connection.commit()
+
+    def record_gphotos_media_item_id(
+        self,
+        key: BackupJournalKey,
+        gphotos_client_id: ObjectId,
+        gphotos_media_item_id: str,
+    ):
+        '''
+        Records that a file was added to Google Photos.
+
+        Args:
+            - key (BackupJournalKey): The journal key of the file.
+            - gphotos_client_id (ObjectId): The ID of the Google Photos account.
+            - gphotos_media_item_id (str): The ID of the media item in Google Photos.
+        '''
+        with self.__lock:
+            self.__connection.execute(
+                '''
+                INSERT INTO backup_journal (
+                    file_path, file_hash, gphotos_client_id, gphotos_media_item_id
+                )
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (file_path, file_hash) DO UPDATE SET
+                    gphotos_client_id = excluded.gphotos_client_id,
+                    gphotos_media_item_id = excluded.gphotos_media_item_id
+                ''',
+                (
+                    key.file_path,
+                    key.file_hash,
+                    str(gphotos_client_id),
+                    gphotos_media_item_id,
+                ),
+            )
+            self.__connection.commit()
+
+    def record_media_item_ids(
+        self, media_item_ids: list[tuple[BackupJournalKey, MediaItemId]]
+    ):
+        '''
+        Records that the media items of a list of files were added to the database.
+
+        Args:
+            - media_item_ids (list[tuple[BackupJournalKey, MediaItemId]]):
+                A list of journal keys with the IDs of their media items.
+        '''
+        with self.__lock:
+            self.__connection.executemany(
+                '''
+                UPDATE backup_journal SET media_item_id = ?
+                WHERE file_path = ? AND file_hash = ?
+                ''',
+                [
+                    (
+                        media_item_id_to_string(media_item_id),
+                        key.file_path,
+                        key.file_hash,
+                    )
+                    for key, media_item_id in media_item_ids
+                ],
+            )
+            self.__connection.commit()
+
+    def record_embedding_ids(
+        self, embedding_ids: list[tuple[BackupJournalKey, MediaItemEmbeddingId]]
+    ):
+        '''
+        Records that the embeddings of a list of files were added to the vector
+        store.
+
+        Args:
+            - embedding_ids (list[tuple[BackupJournalKey, MediaItemEmbeddingId]]):
+                A list of journal keys with the IDs of their embeddings.
+        '''
+        with self.__lock:
+            self.__connection.executemany(
+                '''
+                UPDATE backup_journal SET embedding_id = ?
+                WHERE file_path = ? AND file_hash = ?
+                ''',
+                [
+                    (embedding_id_to_string(id), key.file_path, key.file_hash)
+                    for key, id in embedding_ids
+                ],
+            )
+            self.__connection.commit()
+
+    def remove_entries(self, keys: list[BackupJournalKey]):
+        '''
+        Removes the journal entries of a list of files, once they are backed up.
+
+        Args:
+            - keys (list[BackupJournalKey]): The journal keys of the files.
+        '''
+        with self.__lock:
+            self.__connection.executemany(
+                'DELETE FROM backup_journal WHERE file_path = ? AND file_hash = ?',
+                [(key.file_path, key.file_hash) for key in keys],
+            )
+            self.__connection.commit()
+
+    def close(self):
+        '''
+        Closes the connection to the database.
+        '''
+        with self.__lock:
+            self.__connection.close()
@@ -1,11 +1,18 @@
 from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 import logging
+import threading
 import time
-from typing import Dict, Optional, cast
+from typing import Callable, Dict, Optional, cast
 
 from bson.objectid import ObjectId
 
+from photos_drive.backup.backup_journal import (
+    BackupJournal,
+    BackupJournalEntry,
+    get_backup_journal_key,
+)
 from photos_drive.backup.diffs_assignments import DiffsAssigner
 from photos_drive.backup.gphotos_uploader import (
     GPhotosMediaItemParallelUploaderImpl,
@@ -14,6 +21,7 @@ from photos_drive.backup.gphotos_uploader import (
 )
 from photos_drive.backup.processed_diffs import ProcessedDiff
 from photos_drive.shared.core.albums.album_id import AlbumId
+from photos_drive.shared.core.albums.album_path_index import AlbumPathIndex
 from photos_drive.shared.core.albums.albums import Album
 from photos_drive.shared.core.albums.albums_pruner import AlbumsPruner
 from photos_drive.shared.core.albums.repository.base import (
@@ -25,9 +33,9 @@ from photos_drive.shared.core.databases.transactions import (
     TransactionsManager,
 )
 from photos_drive.shared.core.media_items.media_item import MediaItem
+from photos_drive.shared.core.media_items.media_item_id import MediaItemId
 from photos_drive.shared.core.media_items.repository.base import (
     CreateMediaItemRequest,
-    FindMediaItemRequest,
     MediaItemsRepository,
 )
 from photos_drive.shared.core.storage.gphotos.clients_repository import (
@@ -41,6 +49,8 @@ from photos_drive.shared.features.maps.repository.base import MapCellsRepository
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_PIPELINE_BATCH_SIZE = 20
+
 
 @dataclass
 class BackupResults:
@@ -82,7 +92,33 @@ class PhotosBackup:
         gphotos_client_repo: GPhotosClientsRepository,
         transactions_manager: TransactionsManager,
         parallelize_uploads: bool = False,
+        pipeline_uploads: bool = False,
+        pipeline_batch_size: int = DEFAULT_PIPELINE_BATCH_SIZE,
+        journal: Optional[BackupJournal] = None,
+        dedup_uploads: bool = False,
     ):
+        """
+        Constructs an instance of {@code PhotosBackup}.
+
+        Args:
+            parallelize_uploads (bool): Whether to upload photos concurrently.
+            pipeline_uploads (bool): Whether to add the media items of uploaded
+                photos in batches while the other photos are still being uploaded,
+                instead of after all of the photos are uploaded.
+            pipeline_batch_size (int): The number of uploaded photos to add at a
+                time when {@code pipeline_uploads} is set.
+            journal (Optional[BackupJournal]): A journal to record the progress of
+                each file to, so that a backup that failed can be resumed without
+                uploading the same files again.
+            dedup_uploads (bool): Whether to skip uploading photos whose bytes are
+                already in Google Photos, and point their media items to the
+                existing photos instead.
+        """
+        if pipeline_batch_size < 1:
+            raise ValueError(
+                f"pipeline_batch_size must be positive, got {pipeline_batch_size}"
+            )
+
         self.__config = config
         self.__albums_repo = albums_repo
         self.__media_items_repo = media_items_repo
@@ -102,6 +138,20 @@ class PhotosBackup:
 
         self.__transactions_manager = transactions_manager
 
+        logger.debug(f"Pipelining uploads: {pipeline_uploads}")
+        self.__pipeline_uploads = pipeline_uploads
+        self.__pipeline_batch_size = pipeline_batch_size
+        self.__journal = journal
+
+        logger.debug(f"Deduplicating uploads: {dedup_uploads}")
+        self.__dedup_uploads = dedup_uploads
+
+        # Backups can run concurrently, so albums are created by one backup at a
+        # time, and are only pruned when no backup is adding media items to them
+        self.__albums_condition = threading.Condition()
+        self.__num_backups_adding_to_albums = 0
+        self.__num_backups_waiting_to_prune = 0
+
     def backup(self, diffs: list[ProcessedDiff]) -> BackupResults:
         """Backs up a list of media items based on a list of diffs.
 
@@ -117,13 +167,34 @@ class PhotosBackup:
         diff_assignments = self.__diffs_assigner.get_diffs_assignments(diffs)
         logger.debug(f"Diff assignments: {diff_assignments}")
 
-        # Step 2: Upload the photos to Google Photos
-        upload_diff_to_gphotos_media_item_id = self.__upload_diffs_to_gphotos(
-            diff_assignments
-        )
-        logger.debug(
-            f"Added diffs to Google Photos: {upload_diff_to_gphotos_media_item_id}"
-        )
+        # Step 1a: Resume the photos that were backed up partially by a previous
+        # backup in the same Google Photos account
+        journal_entries = self.__get_journal_entries(diffs)
+        for diff, journal_entry in journal_entries.items():
+            diff_assignments[diff] = journal_entry.gphotos_client_id
+        logger.debug(f"Resuming {len(journal_entries)} diffs from the journal")
+
+        # Step 1b: Find the photos with the same bytes as an existing media item or
+        # as another photo in this backup, so that they are not uploaded again
+        diff_to_duplicate_diffs: dict[ProcessedDiff, list[ProcessedDiff]] = {}
+        if self.__dedup_uploads:
+            diff_to_duplicate_diffs = self.__dedup_diffs(
+                diff_assignments, journal_entries
+            )
+
+        # Step 2: Upload the photos to Google Photos, unless they are uploaded
+        # while their media items are added in Step 6
+        upload_diff_to_gphotos_media_item_id: dict[ProcessedDiff, str] = {}
+        if not self.__pipeline_uploads:
+            self.__upload_diffs_to_gphotos(
+                diff_assignments,
+                journal_entries,
+                diff_to_duplicate_diffs,
+                upload_diff_to_gphotos_media_item_id.__setitem__,
+            )
+            logger.debug(
+                f"Added diffs to Google Photos: {upload_diff_to_gphotos_media_item_id}"
+            )
 
         # Step 3: Build a tree of albums with diffs on their edge nodes
         root_diffs_tree_node = self.__build_diffs_tree(diffs)
@@ -131,112 +202,111 @@ class PhotosBackup:
 
         # Step 4: Create the missing photo albums in Mongo DB from the diffs tree
         # and attach the albums from database to the DiffTree
-        total_num_albums_created = self.__build_missing_albums(root_diffs_tree_node)
+        with self.__albums_condition:
+            self.__albums_condition.wait_for(
+                lambda: self.__num_backups_waiting_to_prune == 0
+            )
+            total_num_albums_created = self.__build_missing_albums(root_diffs_tree_node)
+            self.__num_backups_adding_to_albums += 1
         logger.debug(f"Finished building missing albums: {total_num_albums_created}")
 
-        # Step 5: Go through the tree and modify album's media item ids list
-        add_diffs_to_media_item: Dict[ProcessedDiff, MediaItem] = {}
-        total_media_items_to_delete: list[MediaItem] = []
-        total_num_media_item_added = 0
-        total_album_ids_to_prune: list[AlbumId] = []
-        queue = deque([root_diffs_tree_node])
-        while len(queue) > 0:
-            cur_diffs_tree_node = queue.popleft()
-            cur_album = cast(Album, cur_diffs_tree_node.album)
+        try:
+            # Step 5: Go through the tree and modify album's media item ids list
+            diffs_tree_nodes = self.__get_all_diffs_tree_nodes(root_diffs_tree_node)
+            album_id_to_num_media_items = (
+                self.__media_items_repo.get_num_media_items_in_albums(
+                    [cast(Album, node.album).id for node in diffs_tree_nodes]
+                )
+            )
 
-            add_diffs = cur_diffs_tree_node.modifier_to_diffs.get("+", [])
-            delete_diffs = cur_diffs_tree_node.modifier_to_diffs.get("-", [])
-            num_media_items = self.__media_items_repo.get_num_media_items_in_album(
-                cur_album.id
+            # Step 5a: Find media items to delete in all albums at once
+            album_id_to_media_items_to_delete = (
+                self.__media_items_repo.find_media_items_by_album_and_file_names(
+                    [
+                        (cast(Album, node.album).id, diff.file_name)
+                        for node in diffs_tree_nodes
+                        for diff in node.modifier_to_diffs.get("-", [])
+                    ]
+                )
             )
 
-            # Step 5a: Find media items to delete
-            file_names_to_delete_set = set([diff.file_name for diff in delete_diffs])
-            for file_name in file_names_to_delete_set:
-                for media_item in self.__media_items_repo.find_media_items(
-                    FindMediaItemRequest(album_id=cur_album.id, file_name=file_name)
-                ):
-                    total_media_items_to_delete.append(media_item)
-                    num_media_items -= 1
-
-            # Step 5b: Find the media items to add to the album,
-            # and create them and add it to the tiles repo
-            for add_diff in add_diffs:
-                create_media_item_request = CreateMediaItemRequest(
-                    file_name=add_diff.file_name,
-                    file_hash=add_diff.file_hash,
-                    location=add_diff.location,
-                    gphotos_client_id=diff_assignments[add_diff],
-                    gphotos_media_item_id=upload_diff_to_gphotos_media_item_id[
-                        add_diff
-                    ],
-                    album_id=cur_album.id,
-                    width=add_diff.width,
-                    height=add_diff.height,
-                    date_taken=add_diff.date_taken,
-                    embedding_id=None,
-                    mime_type=add_diff.mime_type,
+            add_diff_to_album_id: Dict[ProcessedDiff, AlbumId] = {}
+            total_media_items_to_delete: list[MediaItem] = []
+            total_num_media_item_added = 0
+            total_album_ids_to_prune: list[AlbumId] = []
+            for cur_diffs_tree_node in diffs_tree_nodes:
+                cur_album = cast(Album, cur_diffs_tree_node.album)
+                add_diffs = cur_diffs_tree_node.modifier_to_diffs.get("+", [])
+                num_media_items = album_id_to_num_media_items[cur_album.id]
+
+                media_items_to_delete = album_id_to_media_items_to_delete.get(
+                    cur_album.id, []
                 )
-                media_item = self.__media_items_repo.create_media_item(
-                    create_media_item_request
+                total_media_items_to_delete.extend(media_items_to_delete)
+                num_media_items -= len(media_items_to_delete)
+
+                # Step 5b: Find the media items to add to the album
+                for add_diff in add_diffs:
+                    add_diff_to_album_id[add_diff] = cur_album.id
+                    total_num_media_item_added += 1
+                    num_media_items += 1
+
+                # Step 5c: Mark album to prune if it's empty. Albums in the middle
+                # of the diffs tree have child albums, and the pruner skips leaf
+                # albums that have child albums outside of the diffs tree
+                if num_media_items == 0 and len(cur_diffs_tree_node.child_nodes) == 0:
+                    total_album_ids_to_prune.append(cur_album.id)
+
+            # Step 6: Add the media items to the media items repo, the maps, and the
+            # vector store
+            if self.__pipeline_uploads:
+                self.__upload_and_add_media_items_in_batches(
+                    diff_assignments,
+                    add_diff_to_album_id,
+                    journal_entries,
+                    diff_to_duplicate_diffs,
                 )
+            else:
+                self.__add_media_items(
+                    list(upload_diff_to_gphotos_media_item_id.items()),
+                    diff_assignments,
+                    add_diff_to_album_id,
+                    journal_entries,
+                )
+        finally:
+            with self.__albums_condition:
+                self.__num_backups_adding_to_albums -= 1
+                self.__albums_condition.notify_all()
 
-                add_diffs_to_media_item[add_diff] = media_item
-                total_num_media_item_added += 1
-                num_media_items += 1
-
-            # Step 5c: Mark album to prune if it's empty
-            if (
-                num_media_items == 0
-                and self.__albums_repo.count_child_albums(cur_album.id) == 0
-            ):
-                total_album_ids_to_prune.append(cur_album.id)
-
-            for child_diff_tree_node in cur_diffs_tree_node.child_nodes:
-                queue.append(child_diff_tree_node)
-
-        # Step 6: Delete the media items marked for deletion
+        # Step 7: Delete the media items marked for deletion
         media_item_ids_to_delete = [
             media_item.id for media_item in total_media_items_to_delete
         ]
         self.__media_items_repo.delete_many_media_items(media_item_ids_to_delete)
 
-        # Step 7: Delete albums with no child albums and no media items
+        # Step 8: Delete albums with no child albums and no media items
         total_num_albums_deleted = 0
-        for album_id in total_album_ids_to_prune:
-            with TransactionsContext(self.__transactions_manager):
-                logger.debug(f"Pruning {album_id}")
-                total_num_albums_deleted += self.__albums_pruner.prune_album(album_id)
+        if len(total_album_ids_to_prune) > 0:
+            total_num_albums_deleted = self.__prune_albums(total_album_ids_to_prune)
 
-        # Step 8: Delete items from the maps
+        # Step 9: Delete items from the maps
         self.__map_cells_repo.remove_many_media_items(media_item_ids_to_delete)
 
-        # Step 9: Add items to the maps repo
-        for media_item in add_diffs_to_media_item.values():
-            if media_item.location:
-                self.__map_cells_repo.add_media_item(media_item)
-
         # Step 10: Delete media items from vector store
         self.__vector_store.delete_media_item_embeddings_by_media_item_ids(
             [media_item.id for media_item in total_media_items_to_delete]
         )
 
-        # Step 11: Add media items with embeddings to vector store
-        create_media_item_embedding_requests: list[CreateMediaItemEmbeddingRequest] = []
-        for add_diff, media_item in add_diffs_to_media_item.items():
-            media_item = add_diffs_to_media_item[add_diff]
-            create_media_item_embedding_requests.append(
-                CreateMediaItemEmbeddingRequest(
-                    embedding=add_diff.embedding,
-                    media_item_id=media_item.id,
-                    date_taken=add_diff.date_taken,
-                )
+        # Step 11: Remove the photos that are backed up from the journal
+        if self.__journal:
+            self.__journal.remove_entries(
+                [
+                    get_backup_journal_key(diff.file_path, diff.file_hash)
+                    for diff in diff_assignments
+                ]
             )
-        self.__vector_store.add_media_item_embeddings(
-            create_media_item_embedding_requests
-        )
 
-        # Step 8: Return the results of the backup
+        # Step 12: Return the results of the backup
         return BackupResults(
             num_media_items_added=total_num_media_item_added,
             num_media_items_deleted=len(total_media_items_to_delete),
@@ -282,6 +352,23 @@ class PhotosBackup:
 
         return root_diffs_tree_node
 
+    def __get_all_diffs_tree_nodes(
+        self, root_diffs_tree_node: DiffsTreeNode
+    ) -> list[DiffsTreeNode]:
+        """
+        Returns all of the nodes in a diff tree, in breadth-first order.
+
+        Args:
+            root_diffs_tree_node (DiffsTreeNode): The root of the diff tree.
+
+        Returns:
+            list[DiffsTreeNode]: The nodes of the diff tree.
+        """
+        diffs_tree_nodes = [root_diffs_tree_node]
+        for cur_diffs_tree_node in diffs_tree_nodes:
+            diffs_tree_nodes.extend(cur_diffs_tree_node.child_nodes)
+        return diffs_tree_nodes
+
     def __build_missing_albums(self, diff_tree: DiffsTreeNode) -> int:
         """
         Creates albums that are missing from the diff tree.
@@ -294,66 +381,450 @@ class PhotosBackup:
         """
         num_albums_created = 0
         root_album_id = self.__config.get_root_album_id()
-        root_album = self.__albums_repo.get_album_by_id(root_album_id)
+        album_path_index = AlbumPathIndex(root_album_id, self.__albums_repo)
+        root_album = album_path_index.get_album_by_id(root_album_id)
         queue = deque([(diff_tree, root_album)])
 
         while len(queue) > 0:
             cur_diffs_tree_node, cur_album = queue.popleft()
             cur_diffs_tree_node.album = cur_album
-
-            child_album_name_to_album: Dict[str, Album] = {}
-            for child_album in self.__albums_repo.find_child_albums(cur_album.id):
-                child_album_name_to_album[cast(str, child_album.name)] = child_album
+            cur_album_path = album_path_index.get_album_path(cur_album.id)
 
             with TransactionsContext(self.__transactions_manager):
                 for child_diff_node in cur_diffs_tree_node.child_nodes:
-                    if child_diff_node.album_name not in child_album_name_to_album:
-                        new_album = self.__albums_repo.create_album(
+                    child_album_path = '/'.join(
+                        [cur_album_path, child_diff_node.album_name]
+                    )
+                    child_album = album_path_index.get_album_by_path(child_album_path)
+                    if not child_album:
+                        child_album = album_path_index.create_album(
                             album_name=child_diff_node.album_name,
                             parent_album_id=cur_album.id,
                         )
                         num_albums_created += 1
-                        child_album_name_to_album[child_diff_node.album_name] = (
-                            new_album
-                        )
 
-                    child_album = child_album_name_to_album[child_diff_node.album_name]
                     queue.append((child_diff_node, child_album))
 
         return num_albums_created
 
+    def __prune_albums(self, album_ids: list[AlbumId]) -> int:
+        """
+        Prunes a list of albums once no other backup is adding media items to
+        albums, so that no album is deleted while another backup adds to it.
+
+        Args:
+            album_ids (list[AlbumId]): The IDs of the albums to prune.
+
+        Returns:
+            int: The number of albums that have been deleted.
+        """
+        with self.__albums_condition:
+            self.__num_backups_waiting_to_prune += 1
+            try:
+                self.__albums_condition.wait_for(
+                    lambda: self.__num_backups_adding_to_albums == 0
+                )
+
+                with TransactionsContext(self.__transactions_manager):
+                    logger.debug(f"Pruning {album_ids}")
+                    return self.__albums_pruner.prune_albums(album_ids)
+            finally:
+                self.__num_backups_waiting_to_prune -= 1
+                self.__albums_condition.notify_all()
+
+    def __get_journal_entries(
+        self, diffs: list[ProcessedDiff]
+    ) -> dict[ProcessedDiff, BackupJournalEntry]:
+        """
+        Returns the journal entries of the diffs to add, which were backed up
+        partially by a previous backup.
+
+        Args:
+            diffs (list[ProcessedDiff]): A list of diffs.
+
+        Returns:
+            dict[ProcessedDiff, BackupJournalEntry]: A map of diffs to their journal
+                entries, for the diffs that are in the journal.
+        """
+        if not self.__journal:
+            return {}
+
+        add_diffs = [diff for diff in diffs if diff.modifier == '+']
+        keys = [
+            get_backup_journal_key(diff.file_path, diff.file_hash) for diff in add_diffs
+        ]
+        key_to_entry = self.__journal.get_entries(keys)
+
+        return {
+            diff: key_to_entry[key]
+            for diff, key in zip(add_diffs, keys)
+            if key in key_to_entry
+        }
+
+    def __dedup_diffs(
+        self,
+        diff_assignments: Dict[ProcessedDiff, ObjectId],
+        journal_entries: dict[ProcessedDiff, BackupJournalEntry],
+    ) -> dict[ProcessedDiff, list[ProcessedDiff]]:
+        """
+        Finds the diffs to add whose bytes are already in Google Photos, or are
+        about to be uploaded by another diff, with one query for all of the diffs.
+
+        Diffs with the same file hash as an existing media item point to the same
+        photo in Google Photos, and are added to the journal entries as if a
+        previous backup had uploaded them. Diffs with the same file hash as another
+        diff are assigned to the same Google Photos account, so that only one of
+        them is uploaded.
+
+        Args:
+            diff_assignments (Dict[ProcessedDiff, ObjectId]):
+                A set of diff assignments, which is updated in place.
+            journal_entries (dict[ProcessedDiff, BackupJournalEntry]):
+                A map of diffs to their journal entries, which is updated in place.
+
+        Returns:
+            dict[ProcessedDiff, list[ProcessedDiff]]: A map of diffs to upload to the
+                other diffs with the same file hash, which share its photo in Google
+                Photos.
+        """
+        diffs = [diff for diff in diff_assignments if diff not in journal_entries]
+        file_hash_to_media_items = (
+            self.__media_items_repo.find_media_items_by_file_hashes(
+                [diff.file_hash for diff in diffs]
+            )
+        )
+
+        file_hash_to_diff: dict[bytes, ProcessedDiff] = {}
+        diff_to_duplicate_diffs: dict[ProcessedDiff, list[ProcessedDiff]] = {}
+        num_diffs_deduped = 0
+        for diff in diffs:
+            media_items = file_hash_to_media_items.get(diff.file_hash, [])
+            if len(media_items) > 0:
+                media_item = media_items[0]
+                diff_assignments[diff] = media_item.gphotos_client_id
+                journal_entries[diff] = BackupJournalEntry(
+                    gphotos_client_id=media_item.gphotos_client_id,
+                    upload_token=None,
+                    gphotos_media_item_id=media_item.gphotos_media_item_id,
+                    media_item_id=None,
+                    embedding_id=None,
+                )
+                if self.__journal:
+                    self.__journal.record_gphotos_media_item_id(
+                        get_backup_journal_key(diff.file_path, diff.file_hash),
+                        media_item.gphotos_client_id,
+                        media_item.gphotos_media_item_id,
+                    )
+                num_diffs_deduped += 1
+
+            elif diff.file_hash in file_hash_to_diff:
+                uploaded_diff = file_hash_to_diff[diff.file_hash]
+                diff_assignments[diff] = diff_assignments[uploaded_diff]
+                diff_to_duplicate_diffs.setdefault(uploaded_diff, []).append(diff)
+                num_diffs_deduped += 1
+
+            else:
+                file_hash_to_diff[diff.file_hash] = diff
+
+        logger.info(f"Skipping uploads of {num_diffs_deduped} duplicate diffs")
+        return diff_to_duplicate_diffs
+
     def __upload_diffs_to_gphotos(
-        self, diff_assignments: Dict[ProcessedDiff, ObjectId]
-    ) -> dict[ProcessedDiff, str]:
+        self,
+        diff_assignments: Dict[ProcessedDiff, ObjectId],
+        journal_entries: dict[ProcessedDiff, BackupJournalEntry],
+        diff_to_duplicate_diffs: dict[ProcessedDiff, list[ProcessedDiff]],
+        on_diff_uploaded: Callable[[ProcessedDiff, str], None],
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ):
         """
         Uploads a map of diffs with their GPhotos client ID to Google Photos.
-        It returns a map of diffs to their media item IDs on Google Photos.
+
+        Diffs that were added to Google Photos by a previous backup are not
+        uploaded again, and the upload tokens of diffs that were only uploaded
+        are reused.
 
         Args:
             diff_assignments (Dict[ProcessedDiff, ObjectId]):
                 A set of diff assignments.
-
-        Returns:
-            dict[ProcessedDiff, str]: A map of diffs to their media item IDs on
-                Google Photos.
+            journal_entries (dict[ProcessedDiff, BackupJournalEntry]):
+                A map of diffs to their journal entries.
+            diff_to_duplicate_diffs (dict[ProcessedDiff, list[ProcessedDiff]]):
+                A map of diffs to the other diffs with the same bytes, which are
+                not uploaded and share the photo of the diff in Google Photos.
+            on_diff_uploaded (Callable[[ProcessedDiff, str], None]): A callback that
+                is called with each diff and its media item ID on Google Photos, as
+                soon as it is in Google Photos.
+            is_cancelled (Optional[Callable[[], bool]]): A callback that stops the
+                rest of the diffs from being uploaded once it returns True.
         """
-        diff_assignments_items = diff_assignments.items()
+        duplicate_diffs = {
+            duplicate_diff
+            for cur_duplicate_diffs in diff_to_duplicate_diffs.values()
+            for duplicate_diff in cur_duplicate_diffs
+        }
+
+        def on_diffs_in_gphotos(diff: ProcessedDiff, gphotos_media_item_id: str):
+            for cur_diff in [diff] + diff_to_duplicate_diffs.get(diff, []):
+                journal_entry = journal_entries.get(cur_diff)
+                is_journaled = journal_entry and journal_entry.gphotos_media_item_id
+                if self.__journal and not is_journaled:
+                    self.__journal.record_gphotos_media_item_id(
+                        get_backup_journal_key(cur_diff.file_path, cur_diff.file_hash),
+                        diff_assignments[cur_diff],
+                        gphotos_media_item_id,
+                    )
+                on_diff_uploaded(cur_diff, gphotos_media_item_id)
+
+        diffs_to_upload: list[ProcessedDiff] = []
+        for diff in diff_assignments:
+            if diff in duplicate_diffs:
+                continue
+
+            journal_entry = journal_entries.get(diff)
+            if journal_entry and journal_entry.gphotos_media_item_id:
+                on_diffs_in_gphotos(diff, journal_entry.gphotos_media_item_id)
+            else:
+                diffs_to_upload.append(diff)
+
         upload_requests = [
             UploadRequest(
                 file_path=diff.file_path,
                 file_name=diff.file_name,
-                gphotos_client_id=client_id,
+                gphotos_client_id=diff_assignments[diff],
+                upload_token=(
+                    journal_entries[diff].upload_token
+                    if diff in journal_entries
+                    else None
+                ),
             )
-            for diff, client_id in diff_assignments_items
+            for diff in diffs_to_upload
         ]
-        gphotos_media_item_ids = self.__gphotos_uploader.upload_photos(upload_requests)
-        assert len(gphotos_media_item_ids) == len(upload_requests)
 
-        upload_diff_to_gphotos_media_item_id = {
-            item[0]: gphotos_media_item_id
-            for item, gphotos_media_item_id in zip(
-                diff_assignments_items, gphotos_media_item_ids
+        def on_upload_token_created(index: int, upload_token: str):
+            diff = diffs_to_upload[index]
+            cast(BackupJournal, self.__journal).record_upload_token(
+                get_backup_journal_key(diff.file_path, diff.file_hash),
+                diff_assignments[diff],
+                upload_token,
+            )
+
+        def on_photo_uploaded(index: int, gphotos_media_item_id: str):
+            on_diffs_in_gphotos(diffs_to_upload[index], gphotos_media_item_id)
+
+        self.__gphotos_uploader.upload_photos(
+            upload_requests,
+            on_photo_uploaded,
+            on_upload_token_created if self.__journal else None,
+            is_cancelled,
+        )
+
+    def __upload_and_add_media_items_in_batches(
+        self,
+        diff_assignments: Dict[ProcessedDiff, ObjectId],
+        add_diff_to_album_id: Dict[ProcessedDiff, AlbumId],
+        journal_entries: dict[ProcessedDiff, BackupJournalEntry],
+        diff_to_duplicate_diffs: dict[ProcessedDiff, list[ProcessedDiff]],
+    ):
+        """
+        Uploads a map of diffs with their GPhotos client ID to Google Photos, and
+        adds the media items of the uploaded photos in batches on a separate thread
+        while the rest of the photos are still being uploaded.
+
+        If an upload fails, the photos that were already uploaded are still added
+        before the error is raised. If a batch fails to be added, no more photos
+        are uploaded, and the error is raised once the uploads stop.
+
+        Args:
+            diff_assignments (Dict[ProcessedDiff, ObjectId]):
+                A set of diff assignments.
+            add_diff_to_album_id (Dict[ProcessedDiff, AlbumId]):
+                A map of diffs to the IDs of the albums to add them to.
+            journal_entries (dict[ProcessedDiff, BackupJournalEntry]):
+                A map of diffs to their journal entries.
+            diff_to_duplicate_diffs (dict[ProcessedDiff, list[ProcessedDiff]]):
+                A map of diffs to the other diffs with the same bytes.
+        """
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            futures: list[Future] = []
+            uploaded_diffs: list[tuple[ProcessedDiff, str]] = []
+
+            def add_uploaded_diffs():
+                futures.append(
+                    executor.submit(
+                        self.__add_media_items,
+                        list(uploaded_diffs),
+                        diff_assignments,
+                        add_diff_to_album_id,
+                        journal_entries,
+                    )
+                )
+                uploaded_diffs.clear()
+
+            def on_diff_uploaded(diff: ProcessedDiff, gphotos_media_item_id: str):
+                uploaded_diffs.append((diff, gphotos_media_item_id))
+                if len(uploaded_diffs) >= self.__pipeline_batch_size:
+                    add_uploaded_diffs()
+
+            def has_failed_to_add_diffs() -> bool:
+                # Stop uploading once a batch fails to be added. The error is not
+                # raised here, so the rest of the photos that are already in Google
+                # Photos are still reported and journaled.
+                return any(
+                    future.done() and future.exception() is not None
+                    for future in futures
+                )
+
+            try:
+                self.__upload_diffs_to_gphotos(
+                    diff_assignments,
+                    journal_entries,
+                    diff_to_duplicate_diffs,
+                    on_diff_uploaded,
+                    has_failed_to_add_diffs,
+                )
+            finally:
+                if len(uploaded_diffs) > 0:
+                    add_uploaded_diffs()
+
+        for future in futures:
+            future.result()
+
+    def __add_media_items(
+        self,
+        uploaded_diffs: list[tuple[ProcessedDiff, str]],
+        diff_assignments: Dict[ProcessedDiff, ObjectId],
+        add_diff_to_album_id: Dict[ProcessedDiff, AlbumId],
+        journal_entries: dict[ProcessedDiff, BackupJournalEntry],
+    ) -> list[MediaItem]:
+        """
+        Adds the media items of uploaded diffs to the media items repo, the maps,
+        and the vector store.
+
+        Media items that were created by a previous backup are reused, and are
+        added to the maps and the vector store again in case that backup failed
+        part way.
+
+        Args:
+            uploaded_diffs (list[tuple[ProcessedDiff, str]]):
+                A list of uploaded diffs with their media item IDs on Google Photos.
+            diff_assignments (Dict[ProcessedDiff, ObjectId]):
+                A set of diff assignments.
+            add_diff_to_album_id (Dict[ProcessedDiff, AlbumId]):
+                A map of diffs to the IDs of the albums to add them to.
+            journal_entries (dict[ProcessedDiff, BackupJournalEntry]):
+                A map of diffs to their journal entries.
+
+        Returns:
+            list[MediaItem]: The media items that were added.
+        """
+        new_diffs: list[tuple[ProcessedDiff, str]] = []
+        resumed_diffs: list[tuple[ProcessedDiff, str, MediaItemId]] = []
+        for add_diff, gphotos_media_item_id in uploaded_diffs:
+            journal_entry = journal_entries.get(add_diff)
+            if journal_entry is None or journal_entry.media_item_id is None:
+                new_diffs.append((add_diff, gphotos_media_item_id))
+            elif journal_entry.embedding_id is None:
+                resumed_diffs.append(
+                    (add_diff, gphotos_media_item_id, journal_entry.media_item_id)
+                )
+
+        if len(new_diffs) == 0 and len(resumed_diffs) == 0:
+            return []
+
+        # Load the media items from a previous backup in one batch. The ones that
+        # no longer exist are created again.
+        id_to_resumed_media_item = self.__media_items_repo.get_media_items_by_ids(
+            [media_item_id for _, _, media_item_id in resumed_diffs]
+        )
+        resumed_add_diffs: list[ProcessedDiff] = []
+        resumed_media_items: list[MediaItem] = []
+        for add_diff, gphotos_media_item_id, media_item_id in resumed_diffs:
+            resumed_media_item = id_to_resumed_media_item.get(media_item_id)
+            if resumed_media_item is None:
+                logger.warning(
+                    f"Media item {media_item_id} of {add_diff.file_path} no longer "
+                    + "exists. Creating it again."
+                )
+                new_diffs.append((add_diff, gphotos_media_item_id))
+                continue
+            resumed_add_diffs.append(add_diff)
+            resumed_media_items.append(resumed_media_item)
+
+        # Create the new media items in one batch
+        new_media_items: list[MediaItem] = []
+        if len(new_diffs) > 0:
+            new_media_items = self.__media_items_repo.create_many_media_items(
+                [
+                    CreateMediaItemRequest(
+                        file_name=add_diff.file_name,
+                        file_hash=add_diff.file_hash,
+                        location=add_diff.location,
+                        gphotos_client_id=diff_assignments[add_diff],
+                        gphotos_media_item_id=gphotos_media_item_id,
+                        album_id=add_diff_to_album_id[add_diff],
+                        width=add_diff.width,
+                        height=add_diff.height,
+                        date_taken=add_diff.date_taken,
+                        embedding_id=None,
+                        mime_type=add_diff.mime_type,
+                        captions=add_diff.captions or None,
+                    )
+                    for add_diff, gphotos_media_item_id in new_diffs
+                ]
+            )
+            if self.__journal:
+                self.__journal.record_media_item_ids(
+                    [
+                        (
+                            get_backup_journal_key(diff.file_path, diff.file_hash),
+                            media_item.id,
+                        )
+                        for (diff, _), media_item in zip(new_diffs, new_media_items)
+                    ]
+                )
+
+        # Remove the media items from a previous backup from the maps and the vector
+        # store, so that they are not added twice
+        if len(resumed_diffs) > 0:
+            resumed_media_item_ids = [
+                media_item_id for _, _, media_item_id in resumed_diffs
+            ]
+            self.__map_cells_repo.remove_many_media_items(resumed_media_item_ids)
+            self.__vector_store.delete_media_item_embeddings_by_media_item_ids(
+                resumed_media_item_ids
+            )
+
+        add_diffs = [diff for diff, _ in new_diffs] + resumed_add_diffs
+        media_items = new_media_items + resumed_media_items
+
+        # Add the media items with locations to the maps
+        self.__map_cells_repo.add_many_media_items(
+            [media_item for media_item in media_items if media_item.location]
+        )
+
+        # Add the media items with their embeddings to the vector store
+        embeddings = self.__vector_store.add_media_item_embeddings(
+            [
+                CreateMediaItemEmbeddingRequest(
+                    embedding=add_diff.embedding,
+                    media_item_id=media_item.id,
+                    date_taken=add_diff.date_taken,
+                )
+                for add_diff, media_item in zip(add_diffs, media_items)
+            ]
+        )
+        if self.__journal:
+            media_item_id_to_key = {
+                media_item.id: get_backup_journal_key(diff.file_path, diff.file_hash)
+                for diff, media_item in zip(add_diffs, media_items)
+            }
+            self.__journal.record_embedding_ids(
+                [
+                    (media_item_id_to_key[embedding.media_item_id], embedding.id)
+                    for embedding in embeddings
+                ]
             )
-        }
 
-        return upload_diff_to_gphotos_media_item_id
+        logger.debug(f"Added {len(media_items)} media items")
+        return media_items
@@ -0,0 +1,429 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+from photos_drive.shared.core.media_items.gps_location import GpsLocation
+
+logger = logging.getLogger(__name__)
+
+ENRICHMENT_CACHE_FILE_NAME = 'photos_drive_enrichment_cache.sqlite3'
+
+DEFAULT_MAX_CACHE_SIZE_IN_BYTES = 512 * 1024 * 1024
+
+# SQLite limits the number of variables in a single query
+MAX_FILE_HASHES_PER_QUERY = 500
+
+
+@dataclass(frozen=True)
+class EnrichmentCacheKey:
+    """
+    Identifies a version of a file on disk.
+    If any of these fields change, the file is considered to have changed.
+
+    Attributes:
+        file_path (str): The absolute file path.
+        file_size (int): The file size, in bytes.
+        mtime_ns (int): The last modified time, in nanoseconds.
+        inode (int): The inode number of the file.
+    """
+
+    file_path: str
+    file_size: int
+    mtime_ns: int
+    inode: int
+
+
+@dataclass(frozen=True)
+class CachedProcessedDiff:
+    """
+    Represents a processed diff stored in the cache.
+    It has the same fields as a ProcessedDiff, except for its modifier.
+
+    Attributes:
+        file_path (str): The file path.
+        album_name (str): The album name.
+        file_name (str): The file name
+        file_size (int): The file size, in the number of bytes.
+        file_hash (bytes): The file hash, in bytes.
+        location (GpsLocation | None): The GPS latitude if it exists; else None.
+        width: (int): The width of the image / video.
+        height (int): The height of the image / video.
+        date_taken (datetime): The date and time for when the image / video was taken.
+        mime_type (str): The mime type of this image / video.
+        captions (str): The captions for this image / video.
+        embedding_model_id (str): The ID of the model that produced the embedding.
+        embedding (np.ndarray): The embedding of this image / video.
+    """
+
+    file_path: str
+    album_name: str
+    file_name: str
+    file_size: int
+    file_hash: bytes
+    location: GpsLocation | None
+    width: int
+    height: int
+    date_taken: datetime
+    mime_type: str
+    captions: str
+    embedding_model_id: str
+    embedding: np.ndarray = field(compare=False, hash=False)
+
+
+@dataclass(frozen=True)
+class CachedEmbedding:
+    """
+    Represents the outputs of the models for an image, regardless of where the
+    image is stored.
+
+    Attributes:
+        captions (str): The captions for the image.
+        embedding (np.ndarray): The embedding of the image.
+    """
+
+    captions: str
+    embedding: np.ndarray = field(compare=False, hash=False)
+
+
+@dataclass(frozen=True)
+class EnrichmentCacheReport:
+    """
+    Stores the usage statistics of the cache.
+
+    Attributes:
+        num_hits (int): The number of lookups that were found in the cache.
+        num_misses (int): The number of lookups that were not found in the cache.
+        num_evictions (int): The number of entries evicted to stay under the size
+            limit.
+    """
+
+    num_hits: int
+    num_misses: int
+    num_evictions: int
+
+
+def get_enrichment_cache_key(file_path: str) -> EnrichmentCacheKey:
+    '''
+    Returns the cache key of a file on disk.
+
+    Args:
+        file_path (str): The path to the file.
+
+    Returns:
+        EnrichmentCacheKey: The cache key.
+    '''
+    stat = os.stat(file_path)
+    return EnrichmentCacheKey(
+        file_path=os.path.abspath(file_path),
+        file_size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        inode=stat.st_ino,
+    )
+
+
+class EnrichmentCache:
+    '''
+    A persistent cache of processed diffs in a SQLite database, so that files that
+    were processed in a previous run do not need to be processed again.
+
+    Entries are evicted from least to most recently used when the cache exceeds
+    its size limit.
+    '''
+
+    def __init__(
+        self,
+        db_path: str,
+        max_size_in_bytes: int = DEFAULT_MAX_CACHE_SIZE_IN_BYTES,
+    ):
+        '''
+        Constructs an instance of {@code EnrichmentCache}
+
+        Args:
+            - db_path (str): The path to the SQLite database file.
+            - max_size_in_bytes (int): The max. size of all entries in the cache.
+        '''
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        self.__max_size_in_bytes = max_size_in_bytes
+        self.__lock = threading.RLock()
+        self.__connection = sqlite3.connect(db_path, check_same_thread=False)
+
+        # Caches from older versions do not know which model produced their
+        # embeddings, and their entries can be processed again
+        columns = [
+            row[1]
+            for row in self.__connection.execute('PRAGMA table_info(processed_diffs)')
+        ]
+        if len(columns) > 0 and 'embedding_model_id' not in columns:
+            logger.info("Clearing the enrichment cache from an older version")
+            self.__connection.execute('DROP TABLE processed_diffs')
+
+        self.__connection.execute(
+            '''
+            CREATE TABLE IF NOT EXISTS processed_diffs (
+                file_path TEXT NOT NULL,
+                file_size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                album_name TEXT NOT NULL,
+                file_name TEXT NOT NULL,
+                file_hash BLOB NOT NULL,
+                latitude REAL,
+                longitude REAL,
+                width INTEGER NOT NULL,
+                height INTEGER NOT NULL,
+                date_taken TEXT NOT NULL,
+                mime_type TEXT NOT NULL,
+                captions TEXT NOT NULL,
+                embedding_model_id TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                entry_size INTEGER NOT NULL,
+                last_accessed_at REAL NOT NULL,
+                PRIMARY KEY (file_path, file_size, mtime_ns, inode)
+            )
+            '''
+        )
+        self.__connection.execute(
+            '''
+            CREATE INDEX IF NOT EXISTS processed_diffs_file_hash
+            ON processed_diffs (file_hash)
+            '''
+        )
+        self.__connection.commit()
+
+        self.__num_hits = 0
+        self.__num_misses = 0
+        self.__num_evictions = 0
+
+    def get(self, key: EnrichmentCacheKey) -> Optional[CachedProcessedDiff]:
+        '''
+        Returns the processed diff of a file, if it is in the cache.
+
+        Args:
+            - key (EnrichmentCacheKey): The cache key of the file.
+
+        Returns:
+            Optional[CachedProcessedDiff]: The processed diff if it exists; else None.
+        '''
+        with self.__lock:
+            row = self.__connection.execute(
+                '''
+                SELECT album_name, file_name, file_hash, latitude, longitude, width,
+                    height, date_taken, mime_type, captions, embedding_model_id,
+                    embedding
+                FROM processed_diffs
+                WHERE file_path = ? AND file_size = ? AND mtime_ns = ? AND inode = ?
+                ''',
+                (key.file_path, key.file_size, key.mtime_ns, key.inode),
+            ).fetchone()
+
+            if row is None:
+                self.__num_misses += 1
+                return None
+
+            self.__num_hits += 1
+            self.__connection.execute(
+                '''
+                UPDATE processed_diffs SET last_accessed_at = ?
+                WHERE file_path = ? AND file_size = ? AND mtime_ns = ? AND inode = ?
+                ''',
+                (time.time(), key.file_path, key.file_size, key.mtime_ns, key.inode),
+            )
+            self.__connection.commit()
+
+        (
+            album_name,
+            file_name,
+            file_hash,
+            latitude,
+            longitude,
+            width,
+            height,
+            date_taken,
+            mime_type,
+            captions,
+            embedding_model_id,
+            embedding,
+        ) = row
+
+        location = None
+        if latitude is not None and longitude is not None:
+            location = GpsLocation(latitude=latitude, longitude=longitude)
+
+        return CachedProcessedDiff(
+            file_path=key.file_path,
+            album_name=album_name,
+            file_name=file_name,
+            file_size=key.file_size,
+            file_hash=bytes(file_hash),
+            location=location,
+            width=width,
+            height=height,
+            date_taken=datetime.fromisoformat(date_taken),
+            mime_type=mime_type,
+            captions=captions,
+            embedding_model_id=embedding_model_id,
+            embedding=np.frombuffer(embedding, dtype=np.float32).copy(),
+        )
+
+    def get_embeddings_by_file_hashes(
+        self, file_hashes: list[bytes], embedding_model_id: str
+    ) -> dict[bytes, CachedEmbedding]:
+        '''
+        Returns the most recent captions and embeddings of images with the given
+        file hashes, regardless of their file paths.
+
+        It does not count towards the hits and misses of the cache.
+
+        Args:
+            - file_hashes (list[bytes]): A list of file hashes.
+            - embedding_model_id (str):
+                Only embeddings produced by the model with this ID are returned.
+
+        Returns:
+            dict[bytes, CachedEmbedding]: A map of file hashes to their captions and
+                embeddings, for the file hashes that are in the cache.
+        '''
+        unique_file_hashes = list(dict.fromkeys(file_hashes))
+        cached_embeddings: dict[bytes, CachedEmbedding] = {}
+
+        with self.__lock:
+            for start in range(0, len(unique_file_hashes), MAX_FILE_HASHES_PER_QUERY):
+                chunk = unique_file_hashes[start : start + MAX_FILE_HASHES_PER_QUERY]
+                rows = self.__connection.execute(
+                    '''
+                    SELECT file_hash, captions, embedding
+                    FROM processed_diffs
+                    WHERE file_hash IN ({}) AND mime_type LIKE 'image/%'
+                        AND embedding_model_id = ?
+                    ORDER BY last_accessed_at ASC
+                    '''.format(
+                        ', '.join('?' * len(chunk))
+                    ),
+                    [*chunk, embedding_model_id],
+                ).fetchall()
+
+                # Later rows are more recent, so they take precedence
+                for file_hash, captions, embedding in rows:
+                    cached_embeddings[bytes(file_hash)] = CachedEmbedding(
+                        captions=captions,
+                        embedding=np.frombuffer(embedding, dtype=np.float32).copy(),
+                    )
+
+        return cached_embeddings
+
+    def put_many(self, entries: list[tuple[EnrichmentCacheKey, CachedProcessedDiff]]):
+        '''
+        Adds or replaces a list of processed diffs in the cache, and evicts the least
+        recently used entries if the cache grows past its size limit.
+
+        Args:
+            - entries (list[tuple[EnrichmentCacheKey, CachedProcessedDiff]]):
+                A list of cache keys with their processed diffs.
+        '''
+        if len(entries) == 0:
+            return
+
+        now = time.time()
+        rows = []
+        for key, processed_diff in entries:
+            embedding = processed_diff.embedding.astype(np.float32).tobytes()
+            entry_size = (
+                len(embedding)
+                + len(processed_diff.file_hash)
+                + len(processed_diff.captions)
+                + len(key.file_path)
+            )
+            rows.append(
+                (
+                    key.file_path,
+                    key.file_size,
+                    key.mtime_ns,
+                    key.inode,
+                    processed_diff.album_name,
+                    processed_diff.file_name,
+                    processed_diff.file_hash,
+                    (
+                        processed_diff.location.latitude
+                        if processed_diff.location
+                        else None
+                    ),
+                    (
+                        processed_diff.location.longitude
+                        if processed_diff.location
+                        else None
+                    ),
+                    processed_diff.width,
+                    processed_diff.height,
+                    processed_diff.date_taken.isoformat(),
+                    processed_diff.mime_type,
+                    processed_diff.captions,
+                    processed_diff.embedding_model_id,
+                    embedding,
+                    entry_size,
+                    now,
+                )
+            )
+
+        with self.__lock:
+            self.__connection.executemany(
+                '''
+                INSERT OR REPLACE INTO processed_diffs VALUES
+                    (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''',
+                rows,
+            )
+            self.__evict_entries()
+            self.__connection.commit()
+
+    def get_report(self) -> EnrichmentCacheReport:
+        '''
+        Returns the usage statistics of the cache.
+
+        Returns:
+            EnrichmentCacheReport: The report.
+        '''
+        with self.__lock:
+            return EnrichmentCacheReport(
+                num_hits=self.__num_hits,
+                num_misses=self.__num_misses,
+                num_evictions=self.__num_evictions,
+            )
+
+    def close(self):
+        '''
+        Closes the connection to the database.
+        '''
+        with self.__lock:
+            self.__connection.close()
+
+    def __evict_entries(self):
+        total_size = self.__connection.execute(
+            'SELECT COALESCE(SUM(entry_size), 0) FROM processed_diffs'
+        ).fetchone()[0]
+        if total_size <= self.__max_size_in_bytes:
+            return
+
+        rowids_to_delete = []
+        for rowid, entry_size in self.__connection.execute(
+            'SELECT rowid, entry_size FROM processed_diffs '
+            + 'ORDER BY last_accessed_at ASC'
+        ):
+            if total_size <= self.__max_size_in_bytes:
+                break
+            rowids_to_delete.append((rowid,))
+            total_size -= entry_size
+
+        self.__connection.executemany(
+            'DELETE FROM processed_diffs WHERE rowid = ?', rowids_to_delete
+        )
+        self.__num_evictions += len(rowids_to_delete)
+        logger.debug(f"Evicted {len(rowids_to_delete)} entries from the cache")
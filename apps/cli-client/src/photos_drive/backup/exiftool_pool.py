@@ -0,0 +1,147 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import logging
+import os
+import queue
+import threading
+from typing import Any, Optional
+
+from exiftool import ExifToolHelper
+from tqdm import tqdm
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 32
+
+
+class ExifToolPool:
+    '''
+    A pool of long-running exiftool processes that reads the tags of many files
+    in parallel.
+
+    Each worker is an exiftool process started with {@code -stay_open}, so it is
+    only started once and reused across chunks. Files are split into fixed-size
+    chunks, and each chunk is sent to the next free worker.
+
+    If a worker fails on a chunk, it is replaced by a new worker and only that
+    chunk is retried.
+    '''
+
+    def __init__(
+        self,
+        num_workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        '''
+        Constructs an instance of {@code ExifToolPool}
+
+        Args:
+            - num_workers (Optional[int]):
+                The number of exiftool processes. Defaults to the number of cores.
+            - chunk_size (int): The number of files sent to a worker at a time.
+        '''
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+
+        self.__num_workers = max(1, num_workers or os.cpu_count() or 1)
+        self.__chunk_size = chunk_size
+        self.__idle_workers: queue.Queue[ExifToolHelper] = queue.Queue()
+        self.__all_workers: list[ExifToolHelper] = []
+        self.__lock = threading.Lock()
+
+    def __enter__(self) -> 'ExifToolPool':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.terminate()
+
+    def get_tags(self, file_paths: list[str], tags: list[str]) -> list[dict[str, Any]]:
+        '''
+        Returns the tags of a list of files.
+
+        Args:
+            - file_paths (list[str]): A list of file paths.
+            - tags (list[str]): The tags to read.
+
+        Returns:
+            list[dict[str, Any]]: The tags of each file, in the same order as
+                {@code file_paths}.
+        '''
+        chunks = [
+            file_paths[start : start + self.__chunk_size]
+            for start in range(0, len(file_paths), self.__chunk_size)
+        ]
+        self.__start_workers(min(self.__num_workers, len(chunks)))
+
+        chunk_results: list[list[dict[str, Any]]] = [[] for _ in chunks]
+        with ThreadPoolExecutor(max_workers=self.__num_workers) as executor:
+            futures = {
+                executor.submit(self.__get_tags_of_chunk, chunk, tags): i
+                for i, chunk in enumerate(chunks)
+            }
+            with tqdm(
+                total=len(file_paths), desc="Fetching exif metadata"
+            ) as progress_bar:
+                for future in as_completed(futures):
+                    i = futures[future]
+                    chunk_results[i] = future.result()
+                    progress_bar.update(len(chunks[i]))
+
+        return [result for results in chunk_results for result in results]
+
+    def terminate(self):
+        '''
+        Stops all of the exiftool processes in the pool.
+        '''
+        for worker in self.__all_workers:
+            try:
+                worker.terminate()
+            except Exception as e:
+                logger.warning(f"Failed to terminate exiftool worker: {e}")
+
+        self.__all_workers = []
+        self.__idle_workers = queue.Queue()
+
+    def __start_workers(self, num_workers: int):
+        while len(self.__all_workers) < num_workers:
+            self.__add_worker()
+
+    def __add_worker(self):
+        worker = ExifToolHelper()
+        with self.__lock:
+            self.__all_workers.append(worker)
+        self.__idle_workers.put(worker)
+
+    def __get_tags_of_chunk(
+        self, file_paths: list[str], tags: list[str]
+    ) -> list[dict[str, Any]]:
+        try:
+            return self.__get_tags_from_idle_worker(file_paths, tags)
+        except Exception as e:
+            logger.warning(
+                f"Exiftool worker failed on {len(file_paths)} files; retrying: {e}"
+            )
+
+        return self.__get_tags_from_idle_worker(file_paths, tags)
+
+    def __get_tags_from_idle_worker(
+        self, file_paths: list[str], tags: list[str]
+    ) -> list[dict[str, Any]]:
+        worker = self.__idle_workers.get()
+        try:
+            results = worker.get_tags(file_paths, tags)
+        except Exception:
+            self.__replace_worker(worker)
+            raise
+
+        self.__idle_workers.put(worker)
+        return results
+
+    def __replace_worker(self, worker: ExifToolHelper):
+        try:
+            worker.terminate()
+        except Exception as e:
+            logger.debug(f"Failed to terminate exiftool worker: {e}")
+
+        with self.__lock:
+            self.__all_workers.remove(worker)
+        self.__add_worker()
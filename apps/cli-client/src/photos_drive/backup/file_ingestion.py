@@ -0,0 +1,230 @@
+from dataclasses import dataclass
+import logging
+import os
+from typing import BinaryIO, Optional, cast
+
+from photos_drive.shared.utils.dimensions.cv2_video_dimensions import (
+    get_width_height_of_video,
+)
+from photos_drive.shared.utils.dimensions.header_probe import (
+    probe_media_from_buffer,
+    probe_media_from_file,
+)
+from photos_drive.shared.utils.dimensions.pillow_image_dimensions import (
+    get_width_height_of_image_from_buffer,
+    get_width_height_of_image_from_file,
+)
+from photos_drive.shared.utils.hashes.file_hasher import HashAlgorithm
+from photos_drive.shared.utils.hashes.xxhash import create_file_hasher
+from photos_drive.shared.utils.mime_type.utils import (
+    get_mime_type_from_buffer,
+    is_image,
+)
+
+logger = logging.getLogger(__name__)
+
+# Files up to this size are read entirely into memory and shared by every stage
+DEFAULT_MAX_BUFFER_SIZE = 32 * 1024 * 1024
+
+# The number of leading bytes kept for sniffing files that are too big to buffer
+HEADER_SIZE = 1024 * 1024
+
+# The size of each read when streaming a file that is too big to buffer
+CHUNK_SIZE = 4 * 1024 * 1024
+
+DEFAULT_MIME_TYPE = "application/octet-stream"
+
+
+@dataclass(frozen=True)
+class IngestedFile:
+    """
+    Represents the metadata that was extracted from a single read of a file.
+
+    Attributes:
+        file_path (str): The file path.
+        file_size (int): The file size, in the number of bytes.
+        file_hash (bytes): The file hash, in bytes.
+        mime_type (str): The mime type of the file.
+        width (int): The width of the image / video.
+        height (int): The height of the image / video.
+        bytes_read (int): The number of bytes that were read from disk to extract
+            the metadata. Files bigger than the buffer are read once for the hash,
+            and then their headers are read again to probe them. Reads by OpenCV,
+            for videos whose headers cannot be probed, are not counted.
+    """
+
+    file_path: str
+    file_size: int
+    file_hash: bytes
+    mime_type: str
+    width: int
+    height: int
+    bytes_read: int
+
+
+@dataclass(frozen=True)
+class IngestionReport:
+    """
+    Stores the I/O statistics of ingesting a set of files.
+
+    Attributes:
+        num_files (int): The number of files ingested.
+        total_file_size (int): The sum of all file sizes, in bytes.
+        total_bytes_read (int): The sum of all bytes read from disk, except for
+            the reads by OpenCV.
+    """
+
+    num_files: int
+    total_file_size: int
+    total_bytes_read: int
+
+
+class _ReadCountingFile:
+    '''
+    Wraps a file object, and counts the number of bytes read from it.
+    '''
+
+    def __init__(self, file: BinaryIO):
+        self.__file = file
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.__file.read(size)
+        self.bytes_read += len(data)
+        return data
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self.__file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self.__file.tell()
+
+
+class FileIngestor:
+    '''
+    A class responsible for reading a file once and extracting its hash, mime type,
+    and dimensions from that single read.
+
+    Files that are too big to buffer are the exception: after they are streamed
+    into the hash, their headers are read again from the same file handle.
+    '''
+
+    def __init__(
+        self,
+        max_buffer_size: int = DEFAULT_MAX_BUFFER_SIZE,
+        hash_algorithm: HashAlgorithm = HashAlgorithm.XXH64,
+    ):
+        '''
+        Constructs an instance of {@code FileIngestor}
+
+        Args:
+            - max_buffer_size (int):
+                Files up to this size are held entirely in memory. Bigger files
+                are streamed into the hash, and only their header is kept.
+            - hash_algorithm (HashAlgorithm): The algorithm of the file hashes.
+        '''
+        self.__max_buffer_size = max_buffer_size
+        self.__hash_algorithm = hash_algorithm
+
+    def ingest_file(
+        self,
+        file_path: str,
+        mime_type: Optional[str] = None,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+    ) -> IngestedFile:
+        '''
+        Reads a file once and extracts its metadata.
+
+        Args:
+            - file_path (str): The path to the file.
+            - mime_type (Optional[str]): The mime type, if it is already known.
+            - width (Optional[int]): The width, if it is already known.
+            - height (Optional[int]): The height, if it is already known.
+
+        Returns:
+            IngestedFile: The extracted metadata.
+        '''
+        file_size = os.path.getsize(file_path)
+        hash_obj = create_file_hasher(self.__hash_algorithm)
+
+        with open(file_path, 'rb') as raw_file:
+            file = _ReadCountingFile(raw_file)
+            if file_size <= self.__max_buffer_size:
+                buffer = file.read()
+                hash_obj.update(buffer)
+                header = buffer
+                is_buffered = True
+            else:
+                header = file.read(HEADER_SIZE)
+                hash_obj.update(header)
+                while chunk := file.read(CHUNK_SIZE):
+                    hash_obj.update(chunk)
+                is_buffered = False
+
+            # Most formats can be described from their headers alone. Files that
+            # are not buffered are probed from the same file handle.
+            probed_media = None
+            if not mime_type or width is None or height is None:
+                probed_media = (
+                    probe_media_from_buffer(header)
+                    if is_buffered
+                    else probe_media_from_file(cast(BinaryIO, file), file_path)
+                )
+
+            if not mime_type:
+                mime_type = (
+                    probed_media.mime_type
+                    if probed_media
+                    else self.__get_mime_type(file_path, header)
+                )
+
+            if (width is None or height is None) and probed_media:
+                width, height = probed_media.width, probed_media.height
+            elif (width is None or height is None) and is_image(mime_type):
+                width, height = (
+                    get_width_height_of_image_from_buffer(header)
+                    if is_buffered
+                    else get_width_height_of_image_from_file(cast(BinaryIO, file))
+                )
+            elif width is None or height is None:
+                # OpenCV opens the file on its own, so its reads are not counted
+                width, height = get_width_height_of_video(file_path)
+
+            bytes_read = file.bytes_read
+
+        logger.debug(f"Read {bytes_read} / {file_size} bytes from {file_path}")
+
+        return IngestedFile(
+            file_path=file_path,
+            file_size=file_size,
+            file_hash=hash_obj.digest(),
+            mime_type=mime_type,
+            width=width,
+            height=height,
+            bytes_read=bytes_read,
+        )
+
+    def __get_mime_type(self, file_path: str, header: bytes) -> str:
+        try:
+            return get_mime_type_from_buffer(header[:HEADER_SIZE]) or DEFAULT_MIME_TYPE
+        except Exception as e:
+            logger.error(f"Error reading file type of {file_path}: {e}")
+            return DEFAULT_MIME_TYPE
+
+
+def build_ingestion_report(ingested_files: list[IngestedFile]) -> IngestionReport:
+    '''
+    Summarizes the I/O statistics of a list of ingested files.
+
+    Args:
+        - ingested_files (list[IngestedFile]): A list of ingested files.
+
+    Returns:
+        IngestionReport: The report.
+    '''
+    return IngestionReport(
+        num_files=len(ingested_files),
+        total_file_size=sum(f.file_size for f in ingested_files),
+        total_bytes_read=sum(f.bytes_read for f in ingested_files),
+    )
@@ -2,6 +2,9 @@ from abc import ABC, abstractmethod
 import concurrent
 from dataclasses import dataclass
 import logging
+import threading
+import time
+from typing import Callable, Optional
 
 from bson.objectid import ObjectId
 from tqdm import tqdm
@@ -9,30 +12,74 @@ from tqdm import tqdm
 from photos_drive.shared.core.storage.gphotos.clients_repository import (
     GPhotosClientsRepository,
 )
+from photos_drive.shared.core.storage.gphotos.media_items_client import (
+    UploadedPhotosPartiallyAddedError,
+)
 
 logger = logging.getLogger(__name__)
 
+# Google Photos accepts up to 50 upload tokens in a single batchCreate call
+MAX_UPLOAD_TOKENS_PER_BATCH = 50
+
+DEFAULT_MAX_BATCH_DELAY_IN_SECONDS = 5.0
+
 
 @dataclass(frozen=True)
 class UploadRequest:
     file_path: str
     file_name: str
     gphotos_client_id: ObjectId
+    upload_token: Optional[str] = None
+    '''An upload token of the photo from a previous upload, to reuse'''
+
+
+OnPhotoUploaded = Callable[[int, str], None]
+'''
+A callback that is called with the index of an upload request and the Google Photos
+media item ID of its photo, as soon as the photo is added to Google Photos.
+'''
+
+OnUploadTokenCreated = Callable[[int, str], None]
+'''
+A callback that is called with the index of an upload request and the upload token
+of its photo, as soon as the bytes of the photo are uploaded to Google Photos.
+'''
+
+IsCancelled = Callable[[], bool]
+'''
+A callback that is called before each upload request, and returns True once the
+rest of the photos should not be uploaded.
+'''
 
 
 class GPhotosMediaItemUploader(ABC):
     '''A class responsible for uploading media content to Google Photos.'''
 
     @abstractmethod
-    def upload_photos(self, upload_requests: list[UploadRequest]) -> list[str]:
+    def upload_photos(
+        self,
+        upload_requests: list[UploadRequest],
+        on_photo_uploaded: Optional[OnPhotoUploaded] = None,
+        on_upload_token_created: Optional[OnUploadTokenCreated] = None,
+        is_cancelled: Optional[IsCancelled] = None,
+    ) -> list[str]:
         """
         Uploads a list of photos.
 
         Args:
             upload_requests (list[UploadRequest]): A list of upload requests
+            on_photo_uploaded (Optional[OnPhotoUploaded]): A callback that is
+                called as soon as each photo is added to Google Photos
+            on_upload_token_created (Optional[OnUploadTokenCreated]): A callback
+                that is called as soon as the bytes of each photo are uploaded
+            is_cancelled (Optional[IsCancelled]): A callback that stops the rest of
+                the photos from being uploaded once it returns True. The photos
+                that were already uploaded are still added to Google Photos
 
         Returns:
-            list[str]: A list of Google Photo media item ids for each uploaded photo
+            list[str]: A list of Google Photo media item ids for each uploaded photo,
+                with an empty string for each photo that was not uploaded since the
+                upload was cancelled
         """
 
 
@@ -42,36 +89,95 @@ class GPhotosMediaItemUploaderImpl:
     Google Photos in a single thread.
     '''
 
-    def __init__(self, gphotos_client_repo: GPhotosClientsRepository):
+    def __init__(
+        self,
+        gphotos_client_repo: GPhotosClientsRepository,
+        max_batch_size: int = MAX_UPLOAD_TOKENS_PER_BATCH,
+        max_batch_delay_in_seconds: float = DEFAULT_MAX_BATCH_DELAY_IN_SECONDS,
+    ):
+        """
+        Creates a GPhotosMediaItemUploaderImpl.
+
+        Args:
+            gphotos_client_repo (GPhotosClientsRepository): The repo of Google
+                Photos clients
+            max_batch_size (int): The max. number of uploaded photos of a Google
+                Photos account to add to Google Photos at once
+            max_batch_delay_in_seconds (float): The max. number of seconds that an
+                uploaded photo waits for its batch to fill up before it is added to
+                Google Photos
+        """
+        _check_max_batch_size(max_batch_size)
         self.__gphotos_client_repo = gphotos_client_repo
+        self.__max_batch_size = max_batch_size
+        self.__max_batch_delay_in_seconds = max_batch_delay_in_seconds
 
-    def upload_photos(self, upload_requests: list[UploadRequest]) -> list[str]:
+    def upload_photos(
+        self,
+        upload_requests: list[UploadRequest],
+        on_photo_uploaded: Optional[OnPhotoUploaded] = None,
+        on_upload_token_created: Optional[OnUploadTokenCreated] = None,
+        is_cancelled: Optional[IsCancelled] = None,
+    ) -> list[str]:
         """
         Uploads a list of photos.
 
         Args:
             upload_requests (list[UploadRequest]): A list of upload requests
+            on_photo_uploaded (Optional[OnPhotoUploaded]): A callback that is
+                called as soon as each photo is added to Google Photos
+            on_upload_token_created (Optional[OnUploadTokenCreated]): A callback
+                that is called as soon as the bytes of each photo are uploaded
+            is_cancelled (Optional[IsCancelled]): A callback that stops the rest of
+                the photos from being uploaded once it returns True. The photos
+                that were already uploaded are still added to Google Photos
 
         Returns:
-            list[str]: A list of Google Photo media item ids for each uploaded photo
+            list[str]: A list of Google Photo media item ids for each uploaded photo,
+                with an empty string for each photo that was not uploaded since the
+                upload was cancelled
         """
-        media_item_ids = []
+        media_item_ids = [''] * len(upload_requests)
 
         with tqdm(total=len(upload_requests), desc="Uploading photos") as pbar:
-            for request in upload_requests:
-                client = self.__gphotos_client_repo.get_client_by_id(
-                    request.gphotos_client_id
-                )
-                upload_token = client.media_items().upload_photo_in_chunks(
-                    request.file_path, request.file_name
-                )
-                upload_result = client.media_items().add_uploaded_photos_to_gphotos(
-                    [upload_token]
-                )
-                media_item_id = upload_result.newMediaItemResults[0].mediaItem.id
-                media_item_ids.append(media_item_id)
+
+            def on_photo_added(index: int, media_item_id: str):
+                media_item_ids[index] = media_item_id
+                if on_photo_uploaded:
+                    on_photo_uploaded(index, media_item_id)
                 pbar.update(1)
 
+            batcher = _UploadTokensBatcher(
+                self.__gphotos_client_repo,
+                self.__max_batch_size,
+                self.__max_batch_delay_in_seconds,
+                on_photo_added,
+            )
+            try:
+                for index, request in enumerate(upload_requests):
+                    if is_cancelled and is_cancelled():
+                        logger.info("Cancelled uploading the rest of the photos")
+                        break
+
+                    upload_token = request.upload_token
+                    if not upload_token:
+                        client = self.__gphotos_client_repo.get_client_by_id(
+                            request.gphotos_client_id
+                        )
+                        upload_token = client.media_items().upload_photo_in_chunks(
+                            request.file_path, request.file_name
+                        )
+                        if on_upload_token_created:
+                            on_upload_token_created(index, upload_token)
+
+                    batcher.add_upload_token(
+                        request.gphotos_client_id, index, upload_token
+                    )
+                    batcher.flush_expired_batches()
+            finally:
+                # Add the photos that were uploaded, even if a later upload failed
+                batcher.flush_all_batches()
+
         return media_item_ids
 
 
@@ -81,43 +187,265 @@ class GPhotosMediaItemParallelUploaderImpl:
     Google Photos concurrently thread.
     '''
 
-    def __init__(self, gphotos_client_repo: GPhotosClientsRepository):
+    def __init__(
+        self,
+        gphotos_client_repo: GPhotosClientsRepository,
+        max_batch_size: int = MAX_UPLOAD_TOKENS_PER_BATCH,
+        max_batch_delay_in_seconds: float = DEFAULT_MAX_BATCH_DELAY_IN_SECONDS,
+    ):
+        """
+        Creates a GPhotosMediaItemParallelUploaderImpl.
+
+        Args:
+            gphotos_client_repo (GPhotosClientsRepository): The repo of Google
+                Photos clients
+            max_batch_size (int): The max. number of uploaded photos of a Google
+                Photos account to add to Google Photos at once
+            max_batch_delay_in_seconds (float): The max. number of seconds that an
+                uploaded photo waits for its batch to fill up before it is added to
+                Google Photos
+        """
+        _check_max_batch_size(max_batch_size)
         self.__gphotos_client_repo = gphotos_client_repo
+        self.__max_batch_size = max_batch_size
+        self.__max_batch_delay_in_seconds = max_batch_delay_in_seconds
 
-    def upload_photos(self, upload_requests: list[UploadRequest]) -> list[str]:
+    def upload_photos(
+        self,
+        upload_requests: list[UploadRequest],
+        on_photo_uploaded: Optional[OnPhotoUploaded] = None,
+        on_upload_token_created: Optional[OnUploadTokenCreated] = None,
+        is_cancelled: Optional[IsCancelled] = None,
+    ) -> list[str]:
         """
         Uploads a list of photos concurrently.
 
         Args:
             upload_requests (list[UploadRequest]): A list of upload requests
+            on_photo_uploaded (Optional[OnPhotoUploaded]): A callback that is
+                called as soon as each photo is added to Google Photos
+            on_upload_token_created (Optional[OnUploadTokenCreated]): A callback
+                that is called as soon as the bytes of each photo are uploaded
+            is_cancelled (Optional[IsCancelled]): A callback that stops the rest of
+                the photos from being uploaded once it returns True. The photos
+                that were already uploaded are still added to Google Photos
 
         Returns:
-            list[str]: A list of Google Photo media item ids for each uploaded photo
+            list[str]: A list of Google Photo media item ids for each uploaded photo,
+                with an empty string for each photo that was not uploaded since the
+                upload was cancelled
         """
+        # Stops the rest of the uploads once an upload fails
+        has_failed = threading.Event()
+
+        def is_stopped() -> bool:
+            return has_failed.is_set() or (is_cancelled is not None and is_cancelled())
+
         with concurrent.futures.ThreadPoolExecutor() as executor:
-            future_to_request = {
-                executor.submit(self.__upload_photo, request, index): request
+            pending_futures = {
+                executor.submit(self.__upload_photo, request, index, is_stopped)
                 for index, request in enumerate(upload_requests)
             }
 
             media_item_ids = [''] * len(upload_requests)
             with tqdm(total=len(upload_requests), desc="Uploading photos") as pbar:
-                for future in concurrent.futures.as_completed(future_to_request):
-                    client_id, upload_token, index = future.result()
-                    client = self.__gphotos_client_repo.get_client_by_id(client_id)
-                    result = client.media_items().add_uploaded_photos_to_gphotos(
-                        [upload_token]
-                    )
-                    media_item_ids[index] = result.newMediaItemResults[0].mediaItem.id
+
+                def on_photo_added(index: int, media_item_id: str):
+                    media_item_ids[index] = media_item_id
+                    if on_photo_uploaded:
+                        on_photo_uploaded(index, media_item_id)
                     pbar.update(1)
 
+                batcher = _UploadTokensBatcher(
+                    self.__gphotos_client_repo,
+                    self.__max_batch_size,
+                    self.__max_batch_delay_in_seconds,
+                    on_photo_added,
+                )
+                upload_error: Optional[Exception] = None
+                try:
+                    while pending_futures:
+                        done_futures, pending_futures = concurrent.futures.wait(
+                            pending_futures,
+                            timeout=batcher.get_seconds_until_next_flush(),
+                            return_when=concurrent.futures.FIRST_COMPLETED,
+                        )
+                        for future in done_futures:
+                            try:
+                                client_id, upload_token, index = future.result()
+                            except Exception as e:
+                                # Keep the photos that are already being uploaded
+                                upload_error = upload_error or e
+                                has_failed.set()
+                                continue
+                            if upload_token is None:
+                                continue
+                            if (
+                                on_upload_token_created
+                                and not upload_requests[index].upload_token
+                            ):
+                                on_upload_token_created(index, upload_token)
+                            batcher.add_upload_token(client_id, index, upload_token)
+                        batcher.flush_expired_batches()
+                except BaseException:
+                    has_failed.set()
+                    raise
+                finally:
+                    # Add the photos that were uploaded, even if an upload failed
+                    batcher.flush_all_batches()
+
+            if upload_error is not None:
+                raise upload_error
+
             return media_item_ids
 
     def __upload_photo(
-        self, request: UploadRequest, index: int
-    ) -> tuple[ObjectId, str, int]:
+        self, request: UploadRequest, index: int, is_cancelled: Optional[IsCancelled]
+    ) -> tuple[ObjectId, Optional[str], int]:
+        if is_cancelled and is_cancelled():
+            return (request.gphotos_client_id, None, index)
+
+        if request.upload_token:
+            return (request.gphotos_client_id, request.upload_token, index)
+
         client = self.__gphotos_client_repo.get_client_by_id(request.gphotos_client_id)
         upload_token = client.media_items().upload_photo_in_chunks(
             request.file_path, request.file_name
         )
         return (request.gphotos_client_id, upload_token, index)
+
+
+class _UploadTokensBatcher:
+    '''
+    Collects the upload tokens of the uploaded photos of each Google Photos account,
+    and adds them to Google Photos in batches. A batch is added once it is full, or
+    once its oldest upload token has waited for too long.
+
+    It is not thread-safe.
+    '''
+
+    def __init__(
+        self,
+        gphotos_client_repo: GPhotosClientsRepository,
+        max_batch_size: int,
+        max_batch_delay_in_seconds: float,
+        on_photo_added: OnPhotoUploaded,
+    ):
+        self.__gphotos_client_repo = gphotos_client_repo
+        self.__max_batch_size = max_batch_size
+        self.__max_batch_delay_in_seconds = max_batch_delay_in_seconds
+        self.__on_photo_added = on_photo_added
+
+        self.__client_id_to_batch: dict[ObjectId, list[tuple[int, str]]] = {}
+        self.__client_id_to_batch_started_at: dict[ObjectId, float] = {}
+
+    def add_upload_token(self, client_id: ObjectId, index: int, upload_token: str):
+        '''
+        Adds the upload token of an uploaded photo to the batch of its Google Photos
+        account, and adds the batch to Google Photos if it is full.
+
+        Args:
+            - client_id (ObjectId): The ID of the Google Photos account.
+            - index (int): The index of the upload request of the photo.
+            - upload_token (str): The upload token of the photo.
+        '''
+        if client_id not in self.__client_id_to_batch:
+            self.__client_id_to_batch[client_id] = []
+            self.__client_id_to_batch_started_at[client_id] = time.monotonic()
+
+        batch = self.__client_id_to_batch[client_id]
+        batch.append((index, upload_token))
+        if len(batch) >= self.__max_batch_size:
+            self.__flush_batch(client_id)
+
+    def get_seconds_until_next_flush(self) -> Optional[float]:
+        '''
+        Returns the number of seconds until the oldest batch should be added to
+        Google Photos, or None if there are no batches.
+        '''
+        if len(self.__client_id_to_batch_started_at) == 0:
+            return None
+
+        oldest_batch_started_at = min(self.__client_id_to_batch_started_at.values())
+        return max(
+            0.0,
+            oldest_batch_started_at
+            + self.__max_batch_delay_in_seconds
+            - time.monotonic(),
+        )
+
+    def flush_expired_batches(self):
+        '''
+        Adds the batches whose oldest upload token has waited for too long to
+        Google Photos.
+        '''
+        now = time.monotonic()
+        for client_id, started_at in list(self.__client_id_to_batch_started_at.items()):
+            if now - started_at >= self.__max_batch_delay_in_seconds:
+                self.__flush_batch(client_id)
+
+    def flush_all_batches(self):
+        '''
+        Adds all of the batches to Google Photos. If a batch fails, the rest of the
+        batches are still added, and the first error is raised afterwards.
+        '''
+        first_error: Optional[Exception] = None
+        for client_id in list(self.__client_id_to_batch.keys()):
+            try:
+                self.__flush_batch(client_id)
+            except Exception as e:
+                logger.error(f"Failed to add uploaded photos for {client_id}: {e}")
+                first_error = first_error or e
+
+        if first_error is not None:
+            raise first_error
+
+    def __flush_batch(self, client_id: ObjectId):
+        batch = self.__client_id_to_batch.pop(client_id)
+        del self.__client_id_to_batch_started_at[client_id]
+        logger.debug(f"Adding {len(batch)} uploaded photos for client {client_id}")
+
+        client = self.__gphotos_client_repo.get_client_by_id(client_id)
+        error: Optional[UploadedPhotosPartiallyAddedError] = None
+        try:
+            result = client.media_items().add_uploaded_photos_to_gphotos(
+                [upload_token for _, upload_token in batch]
+            )
+        except UploadedPhotosPartiallyAddedError as e:
+            # Report the photos that were added, so that they are not added again
+            result, error = e.result, e
+
+        # Results are matched by upload token, since failed photos are left out
+        results = result.newMediaItemResults
+        upload_token_to_media_item_id = {}
+        for position, new_media_item_result in enumerate(results):
+            upload_token = new_media_item_result.uploadToken
+            if upload_token is None and len(results) == len(batch):
+                upload_token = batch[position][1]
+            if upload_token is not None:
+                upload_token_to_media_item_id[upload_token] = (
+                    new_media_item_result.mediaItem.id
+                )
+
+        num_photos_not_added = 0
+        for index, upload_token in batch:
+            media_item_id = upload_token_to_media_item_id.get(upload_token)
+            if media_item_id is None:
+                num_photos_not_added += 1
+                continue
+            self.__on_photo_added(index, media_item_id)
+
+        if error is not None:
+            raise error
+        if num_photos_not_added > 0:
+            raise ValueError(
+                f"{num_photos_not_added} uploaded photos were not added to "
+                + "Google Photos"
+            )
+
+
+def _check_max_batch_size(max_batch_size: int):
+    if max_batch_size < 1 or max_batch_size > MAX_UPLOAD_TOKENS_PER_BATCH:
+        raise ValueError(
+            f"Max. batch size must be between 1 and {MAX_UPLOAD_TOKENS_PER_BATCH}"
+        )
@@ -0,0 +1,138 @@
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+import logging
+import math
+from typing import Callable, Generator
+
+from PIL import Image, ImageFile
+
+from photos_drive.shared.utils.prefetch import prefetch
+
+logger = logging.getLogger(__name__)
+
+Image.MAX_IMAGE_PIXELS = None
+ImageFile.LOAD_TRUNCATED_IMAGES = True
+
+# The shortest side of the decoded images. It is at least as big as the input of
+# the captions (384px) and embedding (224px) models.
+DEFAULT_MIN_SIDE = 384
+
+
+def load_image(file_path: str, min_side: int = DEFAULT_MIN_SIDE) -> Image.Image:
+    '''
+    Decodes an image at a reduced resolution, where its shortest side is no smaller
+    than {@code min_side}.
+
+    JPEGs are decoded in draft mode, which skips the detail that would be thrown
+    away by the resize. Other formats are decoded fully and then downscaled.
+
+    Args:
+        - file_path (str): The path to the image.
+        - min_side (int): The min. length of the shortest side of the image.
+
+    Returns:
+        Image.Image: The decoded image, in RGB.
+    '''
+    with Image.open(file_path) as image:
+        width, height = image.size
+        scale = min_side / min(width, height)
+        if scale >= 1:
+            return image.convert("RGB")
+
+        new_size = (math.ceil(width * scale), math.ceil(height * scale))
+        image.draft("RGB", new_size)
+        resized_image = image.convert("RGB").resize(
+            new_size, Image.Resampling.BICUBIC, reducing_gap=2.0
+        )
+
+        logger.debug(f"Decoded {file_path} from {width}x{height} to {new_size}")
+        return resized_image
+
+
+class ImageBatchLoader:
+    '''
+    A class responsible for decoding batches of images for the models, ahead of
+    the batch that the models are currently running on.
+    '''
+
+    def __init__(
+        self,
+        num_processes: int = 0,
+        min_side: int = DEFAULT_MIN_SIDE,
+        max_prefetched_batches: int = 1,
+    ):
+        '''
+        Constructs an instance of {@code ImageBatchLoader}
+
+        Args:
+            - num_processes (int):
+                The number of processes that decode images. If it is 0, images are
+                decoded in a background thread instead.
+            - min_side (int): The min. length of the shortest side of the images.
+            - max_prefetched_batches (int):
+                The max. number of batches decoded ahead of the consumer.
+        '''
+        if num_processes < 0:
+            raise ValueError(f"num_processes must be >= 0, got {num_processes}")
+        if max_prefetched_batches < 1:
+            raise ValueError(
+                f"max_prefetched_batches must be positive, got {max_prefetched_batches}"
+            )
+
+        self.__num_processes = num_processes
+        self.__min_side = min_side
+        self.__max_prefetched_batches = max_prefetched_batches
+
+    def load_batches(
+        self, file_paths: list[str], batch_size: int | Callable[[], int]
+    ) -> Generator[list[Image.Image], None, None]:
+        '''
+        Decodes a list of images in batches.
+
+        Args:
+            - file_paths (list[str]): The paths to the images.
+            - batch_size (int | Callable[[], int]):
+                The max. number of images in each batch. If it is a function, it
+                is called before decoding each batch, so that the batch size can
+                change as the batches are consumed.
+
+        Returns:
+            Generator[list[Image.Image], None, None]: The decoded images, in the
+                same order as {@code file_paths}, in batches of {@code batch_size}.
+        '''
+        get_batch_size = batch_size if callable(batch_size) else lambda: batch_size
+        batches = self.__split_into_batches(file_paths, get_batch_size)
+
+        if self.__num_processes == 0:
+            yield from prefetch(
+                (self.__load_batch(batch) for batch in batches),
+                self.__max_prefetched_batches,
+            )
+            return
+
+        with ProcessPoolExecutor(max_workers=self.__num_processes) as executor:
+            pending_batches: deque[list[Future[Image.Image]]] = deque()
+            for batch in batches:
+                pending_batches.append(
+                    [
+                        executor.submit(load_image, file_path, self.__min_side)
+                        for file_path in batch
+                    ]
+                )
+                if len(pending_batches) > self.__max_prefetched_batches:
+                    yield [future.result() for future in pending_batches.popleft()]
+
+            while pending_batches:
+                yield [future.result() for future in pending_batches.popleft()]
+
+    def __split_into_batches(
+        self, file_paths: list[str], get_batch_size: Callable[[], int]
+    ) -> Generator[list[str], None, None]:
+        start = 0
+        while start < len(file_paths):
+            batch_size = max(get_batch_size(), 1)
+            yield file_paths[start : start + batch_size]
+            start += batch_size
+
+    def __load_batch(self, file_paths: list[str]) -> list[Image.Image]:
+        return [load_image(file_path, self.__min_side) for file_path in file_paths]
@@ -4,31 +4,43 @@ from datetime import datetime
 import logging
 import os
 from pathlib import Path
-from typing import Optional, Tuple, cast
+import time
+from typing import Generator, Optional, Tuple, cast
 
-from PIL import Image, ImageFile
-from exiftool import ExifToolHelper
 import numpy as np
 from tqdm import tqdm
 
+from photos_drive.backup.adaptive_batching import (
+    MAX_ADAPTIVE_BATCH_SIZE,
+    AdaptiveBatchSizer,
+)
 from photos_drive.backup.diffs import Diff, Modifier
+from photos_drive.backup.enrichment_cache import (
+    CachedEmbedding,
+    CachedProcessedDiff,
+    EnrichmentCache,
+    EnrichmentCacheKey,
+    get_enrichment_cache_key,
+)
+from photos_drive.backup.exiftool_pool import ExifToolPool
+from photos_drive.backup.file_ingestion import (
+    FileIngestor,
+    IngestedFile,
+    IngestionReport,
+    build_ingestion_report,
+)
+from photos_drive.backup.image_loading import ImageBatchLoader
 from photos_drive.shared.core.media_items.gps_location import GpsLocation
 from photos_drive.shared.features.llm.models.image_captions import ImageCaptions
 from photos_drive.shared.features.llm.models.image_embeddings import ImageEmbeddings
-from photos_drive.shared.utils.dimensions.cv2_video_dimensions import (
-    get_width_height_of_video,
-)
-from photos_drive.shared.utils.dimensions.pillow_image_dimensions import (
-    get_width_height_of_image,
+from photos_drive.shared.utils.hashes.file_hasher import (
+    HashAlgorithm,
+    get_hash_algorithm,
 )
-from photos_drive.shared.utils.hashes.xxhash import compute_file_hash
-from photos_drive.shared.utils.mime_type.utils import get_mime_type, is_image
+from photos_drive.shared.utils.mime_type.utils import is_image
 
 logger = logging.getLogger(__name__)
 
-Image.MAX_IMAGE_PIXELS = None
-ImageFile.LOAD_TRUNCATED_IMAGES = True
-
 DEFAULT_DATE_TIME = datetime(1970, 1, 1)
 
 EMPTY_CAPTIONS = ''
@@ -72,6 +84,27 @@ class ProcessedDiff:
     embedding: np.ndarray = field(compare=False, hash=False)
 
 
+@dataclass(frozen=True)
+class EmbeddingReuseReport:
+    """
+    Stores how many images reused the captions and embeddings of an image with the
+    same file hash instead of running the models on them.
+
+    Attributes:
+        num_images (int): The number of images that needed embeddings.
+        num_reused_from_duplicates (int): The number of images that had the same
+            file hash as another image in the same batch of diffs.
+        num_reused_from_cache (int): The number of images whose file hash was
+            found in the enrichment cache, like files that were moved or copied.
+        reuse_rate (float): The fraction of images that reused an embedding.
+    """
+
+    num_images: int
+    num_reused_from_duplicates: int
+    num_reused_from_cache: int
+    reuse_rate: float
+
+
 @dataclass(frozen=True)
 class ExtractedExifMetadata:
     location: GpsLocation | None
@@ -82,9 +115,15 @@ class DiffsProcessor:
     def __init__(
         self,
         image_embedder: ImageEmbeddings,
-        image_captions: ImageCaptions,
+        image_captions: Optional[ImageCaptions] = None,
         embedder_batch_size=16,
         captions_batch_size=16,
+        enrichment_cache: Optional[EnrichmentCache] = None,
+        exiftool_num_workers: Optional[int] = None,
+        image_loader: Optional[ImageBatchLoader] = None,
+        hash_algorithm: HashAlgorithm = HashAlgorithm.XXH64,
+        adaptive_batch_sizes: bool = False,
+        embedding_model_id: Optional[str] = None,
     ):
         '''
         Constructs an instance of {@code DiffsProcessor}
@@ -92,17 +131,60 @@ class DiffsProcessor:
         Args:
             - image_embedder (ImageEmbeddings):
                 The image embedder
-            - image_captions (ImageCaptions)
-                The image captions generator
+            - image_captions (Optional[ImageCaptions])
+                The image captions generator. If it is not set, captions are not
+                generated.
             - embedder_batch_size (int):
                 The number of images / videos to get its embeddings in parallel.
             captions_batch_size (int):
                 The number of images / videos to get its captions in parallel.
+            - enrichment_cache (Optional[EnrichmentCache]):
+                A cache of previously processed diffs, if present.
+            - exiftool_num_workers (Optional[int]):
+                The number of exiftool processes reading metadata in parallel.
+                Defaults to the number of cores.
+            - image_loader (Optional[ImageBatchLoader]):
+                Decodes the images for the models. Defaults to decoding them in a
+                background thread.
+            - hash_algorithm (HashAlgorithm):
+                The algorithm of the file hashes of new media items.
+            - adaptive_batch_sizes (bool):
+                Whether to grow or shrink the batches of each model from their
+                throughput and the memory used, starting from
+                {@code embedder_batch_size} and {@code captions_batch_size}.
+            - embedding_model_id (Optional[str]):
+                The ID of the model behind {@code image_embedder}, so that cached
+                embeddings of other models are not reused. It is required with
+                {@code enrichment_cache}.
         '''
+        if enrichment_cache is not None and not embedding_model_id:
+            raise ValueError("embedding_model_id is required with enrichment_cache")
+
         self.image_embedder = image_embedder
         self.image_captions = image_captions
         self.embedder_batch_size = embedder_batch_size
         self.captions_batch_size = captions_batch_size
+        self.enrichment_cache = enrichment_cache
+        self.exiftool_num_workers = exiftool_num_workers
+        self.image_loader = image_loader or ImageBatchLoader()
+        self.hash_algorithm = hash_algorithm
+        self.embedding_model_id = embedding_model_id
+        self.last_ingestion_report: Optional[IngestionReport] = None
+        self.last_embedding_reuse_report: Optional[EmbeddingReuseReport] = None
+        self.__embedder_batch_sizer: Optional[AdaptiveBatchSizer] = None
+        self.__captions_batch_sizer: Optional[AdaptiveBatchSizer] = None
+        if adaptive_batch_sizes:
+            self.__embedder_batch_sizer = AdaptiveBatchSizer(
+                'image embeddings',
+                initial_batch_size=embedder_batch_size,
+                max_batch_size=max(embedder_batch_size, MAX_ADAPTIVE_BATCH_SIZE),
+            )
+            self.__captions_batch_sizer = AdaptiveBatchSizer(
+                'image captions',
+                initial_batch_size=captions_batch_size,
+                max_batch_size=max(captions_batch_size, MAX_ADAPTIVE_BATCH_SIZE),
+            )
+        self.__file_ingestor = FileIngestor(hash_algorithm=hash_algorithm)
 
     def process_raw_diffs(self, diffs: list[Diff]) -> list[ProcessedDiff]:
         """
@@ -115,43 +197,196 @@ class DiffsProcessor:
             list[ProcessedDiff]: A list of processed diffs
 
         """
+        if self.enrichment_cache is None:
+            return self.__process_raw_diffs(diffs)
+
+        # Look up the diffs that were processed in a previous run
+        processed_diffs: list[Optional[ProcessedDiff]] = [None] * len(diffs)
+        uncached_diffs_and_keys: list[
+            tuple[int, Diff, Optional[EnrichmentCacheKey]]
+        ] = []
+        for i, diff in enumerate(diffs):
+            if diff.modifier != '+' or not os.path.exists(diff.file_path):
+                uncached_diffs_and_keys.append((i, diff, None))
+                continue
+
+            cache_key = get_enrichment_cache_key(diff.file_path)
+            cached_processed_diff = self.enrichment_cache.get(cache_key)
+            if (
+                cached_processed_diff is None
+                or self.__is_missing_captions(cached_processed_diff)
+                or self.__has_other_hash_algorithm(cached_processed_diff)
+                or cached_processed_diff.embedding_model_id != self.embedding_model_id
+            ):
+                uncached_diffs_and_keys.append((i, diff, cache_key))
+            else:
+                processed_diffs[i] = self.__merge_cached_processed_diff(
+                    diff, cached_processed_diff
+                )
+
+        # Process the remaining diffs and save them to the cache
+        new_processed_diffs = self.__process_raw_diffs(
+            [diff for _, diff, _ in uncached_diffs_and_keys]
+        )
+        new_cache_entries: list[tuple[EnrichmentCacheKey, CachedProcessedDiff]] = []
+        for (i, _, new_cache_key), processed_diff in zip(
+            uncached_diffs_and_keys, new_processed_diffs, strict=True
+        ):
+            processed_diffs[i] = processed_diff
+            if new_cache_key is not None:
+                new_cache_entries.append(
+                    (new_cache_key, self.__to_cached_processed_diff(processed_diff))
+                )
+        self.enrichment_cache.put_many(new_cache_entries)
+
+        report = self.enrichment_cache.get_report()
+        logger.info(
+            f"Enrichment cache: {report.num_hits} hits, {report.num_misses} misses, "
+            + f"{report.num_evictions} evictions"
+        )
+
+        return cast(list[ProcessedDiff], processed_diffs)
+
+    def process_raw_diffs_in_chunks(
+        self, diffs: list[Diff], chunk_size: int
+    ) -> Generator[list[ProcessedDiff], None, None]:
+        """
+        Processes raw diffs into processed diffs, one chunk at a time.
+
+        Unlike {@code process_raw_diffs}, it yields each chunk as soon as it is
+        processed, so callers can start backing up a chunk while the next one is
+        being processed.
+
+        Args:
+            - diffs (list[Diff]): A list of diffs
+            - chunk_size (int): The max. number of diffs in each chunk
+
+        Returns:
+            Generator[list[ProcessedDiff], None, None]: The processed diffs, in the
+                same order as {@code diffs}, in chunks of {@code chunk_size}.
+        """
+        for start in range(0, len(diffs), chunk_size):
+            yield self.process_raw_diffs(diffs[start : start + chunk_size])
+
+    def __process_raw_diffs(self, diffs: list[Diff]) -> list[ProcessedDiff]:
         processed_diffs = self.__get_basic_processed_diffs(diffs)
         processed_diffs = self.__populate_processed_diffs_with_exif_metadata(
             diffs, processed_diffs
         )
-        processed_diffs = self.__populate_processed_diffs_with_captions(
-            diffs, processed_diffs
-        )
-        processed_diffs = self.__populate_processed_diffs_with_embeddings(
-            diffs, processed_diffs
+        processed_diffs = self.__populate_processed_diffs_with_captions_and_embeddings(
+            processed_diffs
         )
 
         return processed_diffs
 
+    def __merge_cached_processed_diff(
+        self, diff: Diff, cached_processed_diff: CachedProcessedDiff
+    ) -> ProcessedDiff:
+        has_width_height = diff.width is not None and diff.height is not None
+        return ProcessedDiff(
+            modifier=diff.modifier,
+            file_path=diff.file_path,
+            album_name=self.__get_album_name(diff),
+            file_name=self.__get_file_name(diff),
+            file_size=diff.file_size or cached_processed_diff.file_size,
+            file_hash=cached_processed_diff.file_hash,
+            location=diff.location or cached_processed_diff.location,
+            width=(
+                cast(int, diff.width)
+                if has_width_height
+                else cached_processed_diff.width
+            ),
+            height=(
+                cast(int, diff.height)
+                if has_width_height
+                else cached_processed_diff.height
+            ),
+            date_taken=diff.date_taken or cached_processed_diff.date_taken,
+            mime_type=diff.mime_type or cached_processed_diff.mime_type,
+            captions=cached_processed_diff.captions,
+            embedding=cached_processed_diff.embedding,
+        )
+
+    def __is_missing_captions(self, cached_processed_diff: CachedProcessedDiff) -> bool:
+        return (
+            self.image_captions is not None
+            and cached_processed_diff.captions == EMPTY_CAPTIONS
+            and is_image(cached_processed_diff.mime_type)
+        )
+
+    def __has_other_hash_algorithm(
+        self, cached_processed_diff: CachedProcessedDiff
+    ) -> bool:
+        return (
+            get_hash_algorithm(cached_processed_diff.file_hash) != self.hash_algorithm
+        )
+
+    def __to_cached_processed_diff(
+        self, processed_diff: ProcessedDiff
+    ) -> CachedProcessedDiff:
+        return CachedProcessedDiff(
+            file_path=processed_diff.file_path,
+            album_name=processed_diff.album_name,
+            file_name=processed_diff.file_name,
+            file_size=processed_diff.file_size,
+            file_hash=processed_diff.file_hash,
+            location=processed_diff.location,
+            width=processed_diff.width,
+            height=processed_diff.height,
+            date_taken=processed_diff.date_taken,
+            mime_type=processed_diff.mime_type,
+            captions=processed_diff.captions,
+            embedding_model_id=cast(str, self.embedding_model_id),
+            embedding=processed_diff.embedding,
+        )
+
     def __get_basic_processed_diffs(self, diffs: list[Diff]) -> list[ProcessedDiff]:
         def process_diff(diff: Diff) -> ProcessedDiff:
-            if diff.modifier == "+" and not os.path.exists(diff.file_path):
+            if diff.modifier == "-":
+                return ProcessedDiff(
+                    modifier=diff.modifier,
+                    file_path=diff.file_path,
+                    file_hash=b'0',
+                    album_name=self.__get_album_name(diff),
+                    file_name=self.__get_file_name(diff),
+                    file_size=0,
+                    location=None,
+                    width=0,
+                    height=0,
+                    date_taken=DEFAULT_DATE_TIME,
+                    mime_type='none',
+                    captions=EMPTY_CAPTIONS,
+                    embedding=EMPTY_EMBEDDING,
+                )
+
+            if not os.path.exists(diff.file_path):
                 raise ValueError(f"File {diff.file_path} does not exist.")
 
-            mime_type = self.__get_mime_type(diff)
-            width, height = self.__get_width_height(diff, mime_type)
+            ingested_file = self.__file_ingestor.ingest_file(
+                diff.file_path,
+                mime_type=diff.mime_type,
+                width=diff.width,
+                height=diff.height,
+            )
+            ingested_files.append(ingested_file)
 
             return ProcessedDiff(
                 modifier=diff.modifier,
                 file_path=diff.file_path,
-                file_hash=self.__compute_file_hash(diff),
+                file_hash=ingested_file.file_hash,
                 album_name=self.__get_album_name(diff),
                 file_name=self.__get_file_name(diff),
-                file_size=self.__get_file_size_in_bytes(diff),
+                file_size=diff.file_size or ingested_file.file_size,
                 location=None,  # Placeholder; will be updated later
-                width=width,
-                height=height,
+                width=ingested_file.width,
+                height=ingested_file.height,
                 date_taken=DEFAULT_DATE_TIME,  # Placeholder; will be updated later
-                mime_type=mime_type,
+                mime_type=ingested_file.mime_type,
                 captions=EMPTY_CAPTIONS,
                 embedding=EMPTY_EMBEDDING,
             )
 
+        ingested_files: list[IngestedFile] = []
         processed_diffs: list[Optional[ProcessedDiff]] = [None] * len(diffs)
         with tqdm(
             total=len(processed_diffs), desc="Fetching simple image metadata"
@@ -166,12 +401,14 @@ class DiffsProcessor:
                     processed_diffs[idx] = future.result()
                     pbar.update(1)
 
-        return cast(list[ProcessedDiff], processed_diffs)
+        self.last_ingestion_report = build_ingestion_report(ingested_files)
+        logger.info(
+            f"Read {self.last_ingestion_report.total_bytes_read} bytes from "
+            + f"{self.last_ingestion_report.num_files} files "
+            + f"({self.last_ingestion_report.total_file_size} bytes on disk)"
+        )
 
-    def __compute_file_hash(self, diff: Diff) -> bytes:
-        if diff.modifier == "-":
-            return b'0'
-        return compute_file_hash(diff.file_path)
+        return cast(list[ProcessedDiff], processed_diffs)
 
     def __get_album_name(self, diff: Diff) -> str:
         if diff.album_name:
@@ -202,41 +439,6 @@ class DiffsProcessor:
 
         return os.path.basename(diff.file_path)
 
-    def __get_file_size_in_bytes(self, diff: Diff) -> int:
-        if diff.modifier == "-":
-            return 0
-
-        if diff.file_size:
-            return diff.file_size
-
-        return os.path.getsize(diff.file_path)
-
-    def __get_width_height(self, diff: Diff, mime_type: str) -> tuple[int, int]:
-        if diff.modifier == '-':
-            return 0, 0
-
-        if diff.width is not None and diff.height is not None:
-            return diff.width, diff.height
-
-        if is_image(mime_type):
-            return get_width_height_of_image(diff.file_path)
-        else:
-            return get_width_height_of_video(diff.file_path)
-
-    def __get_mime_type(self, diff: Diff) -> str:
-        if diff.modifier == '-':
-            return 'none'
-
-        if diff.mime_type:
-            return diff.mime_type
-
-        try:
-            mime_type = get_mime_type(diff.file_path)
-            return mime_type or "application/octet-stream"
-        except Exception as e:
-            logger.error(f"Error reading file type: {e}")
-            return "application/octet-stream"
-
     def __populate_processed_diffs_with_exif_metadata(
         self, diffs: list[Diff], processed_diffs: list[ProcessedDiff]
     ) -> list[ProcessedDiff]:
@@ -271,9 +473,9 @@ class DiffsProcessor:
         if len(missing_metadata_and_idx) == 0:
             return metadatas
 
-        with ExifToolHelper() as exiftool_client:
+        with ExifToolPool(self.exiftool_num_workers) as exiftool_pool:
             file_paths = [d[0].file_path for d in missing_metadata_and_idx]
-            raw_metadatas = exiftool_client.get_tags(
+            raw_metadatas = exiftool_pool.get_tags(
                 file_paths,
                 [
                     "Composite:GPSLatitude",
@@ -334,8 +536,8 @@ class DiffsProcessor:
 
         return metadatas
 
-    def __populate_processed_diffs_with_captions(
-        self, diffs: list[Diff], processed_diffs: list[ProcessedDiff]
+    def __populate_processed_diffs_with_captions_and_embeddings(
+        self, processed_diffs: list[ProcessedDiff]
     ) -> list[ProcessedDiff]:
         diffs_to_process: list[Tuple[int, ProcessedDiff]] = [
             (i, processed_diff)
@@ -345,65 +547,152 @@ class DiffsProcessor:
             and is_image(processed_diff.mime_type)
         ]
 
-        updated_processed_diffs = processed_diffs.copy()
+        # Images with the same bytes get the same captions and embeddings, so only
+        # one image per file hash goes through the models
+        file_hash_to_indices: dict[bytes, list[int]] = {}
+        for i, processed_diff in diffs_to_process:
+            file_hash_to_indices.setdefault(processed_diff.file_hash, []).append(i)
 
-        def load_images(diff_batch):
-            images = []
-            for _, diff in diff_batch:
-                with Image.open(diff.file_path) as img:
-                    images.append(img.convert("RGB").copy())
-            return images
-
-        with tqdm(
-            total=len(diffs_to_process), desc="Generating image captions"
-        ) as pbar:
-            for start in range(0, len(diffs_to_process), self.captions_batch_size):
-                batch = diffs_to_process[start : start + self.captions_batch_size]
-                images = load_images(batch)
-
-                captions = self.image_captions.generate_caption(images)
-                for idx_in_batch, (proc_idx, _) in enumerate(batch):
-                    updated_processed_diffs[proc_idx] = replace(
-                        updated_processed_diffs[proc_idx],
-                        captions=captions[idx_in_batch],
-                    )
-                    pbar.update(1)
-
-        return updated_processed_diffs
-
-    def __populate_processed_diffs_with_embeddings(
-        self, diffs: list[Diff], processed_diffs: list[ProcessedDiff]
-    ) -> list[ProcessedDiff]:
-        diffs_to_process: list[Tuple[int, ProcessedDiff]] = [
-            (i, processed_diff)
-            for i, processed_diff in enumerate(processed_diffs)
-            if processed_diff.modifier == "+"
-            and processed_diff.mime_type
-            and is_image(processed_diff.mime_type)
+        file_hash_to_outputs = self.__get_cached_embeddings_by_file_hashes(
+            list(file_hash_to_indices.keys())
+        )
+        num_reused_from_cache = sum(
+            len(file_hash_to_indices[file_hash]) for file_hash in file_hash_to_outputs
+        )
+        diffs_to_embed = [
+            processed_diffs[indices[0]]
+            for file_hash, indices in file_hash_to_indices.items()
+            if file_hash not in file_hash_to_outputs
         ]
+        file_hash_to_outputs.update(self.__get_captions_and_embeddings(diffs_to_embed))
 
         updated_processed_diffs = processed_diffs.copy()
+        for file_hash, indices in file_hash_to_indices.items():
+            outputs = file_hash_to_outputs[file_hash]
+            for i in indices:
+                updated_processed_diffs[i] = replace(
+                    updated_processed_diffs[i],
+                    captions=outputs.captions,
+                    embedding=outputs.embedding,
+                )
+
+        num_images = len(diffs_to_process)
+        num_reused_from_duplicates = (
+            num_images - num_reused_from_cache - len(diffs_to_embed)
+        )
+        self.last_embedding_reuse_report = EmbeddingReuseReport(
+            num_images=num_images,
+            num_reused_from_duplicates=num_reused_from_duplicates,
+            num_reused_from_cache=num_reused_from_cache,
+            reuse_rate=(
+                (num_reused_from_duplicates + num_reused_from_cache) / num_images
+                if num_images > 0
+                else 0.0
+            ),
+        )
+        if num_images > 0:
+            logger.info(
+                f"Reused embeddings for {num_images - len(diffs_to_embed)} of "
+                + f"{num_images} images "
+                + f"({self.last_embedding_reuse_report.reuse_rate:.1%}): "
+                + f"{num_reused_from_duplicates} duplicates, "
+                + f"{num_reused_from_cache} from the enrichment cache"
+            )
+
+        return updated_processed_diffs
 
-        def load_images(diff_batch):
-            images = []
-            for _, diff in diff_batch:
-                with Image.open(diff.file_path) as img:
-                    images.append(img.convert("RGB").copy())
-            return images
+    def __get_cached_embeddings_by_file_hashes(
+        self, file_hashes: list[bytes]
+    ) -> dict[bytes, CachedEmbedding]:
+        if self.enrichment_cache is None or len(file_hashes) == 0:
+            return {}
+
+        return {
+            file_hash: cached_embedding
+            for file_hash, cached_embedding in (
+                self.enrichment_cache.get_embeddings_by_file_hashes(
+                    file_hashes, cast(str, self.embedding_model_id)
+                ).items()
+            )
+            if self.image_captions is None
+            or cached_embedding.captions != EMPTY_CAPTIONS
+        }
+
+    def __get_captions_and_embeddings(
+        self, diffs_to_process: list[ProcessedDiff]
+    ) -> dict[bytes, CachedEmbedding]:
+        file_hash_to_outputs: dict[bytes, CachedEmbedding] = {}
+        if len(diffs_to_process) == 0:
+            return file_hash_to_outputs
+
+        # Decode each image once, and feed it to all of the models
+        image_batches = self.image_loader.load_batches(
+            [diff.file_path for diff in diffs_to_process], self.__get_decode_batch_size
+        )
 
         with tqdm(
-            total=len(diffs_to_process), desc="Generating image embeddings"
+            total=len(diffs_to_process),
+            desc=(
+                "Generating image captions and embeddings"
+                if self.image_captions is not None
+                else "Generating image embeddings"
+            ),
         ) as pbar:
-            for start in range(0, len(diffs_to_process), self.embedder_batch_size):
-                batch = diffs_to_process[start : start + self.embedder_batch_size]
-                images = load_images(batch)
-
-                embeddings = self.image_embedder.embed_images(images)
-                for idx_in_batch, (proc_idx, _) in enumerate(batch):
-                    updated_processed_diffs[proc_idx] = replace(
-                        updated_processed_diffs[proc_idx],
+            start = 0
+            for images in image_batches:
+                batch = diffs_to_process[start : start + len(images)]
+                start += len(images)
+
+                captions: list[str] = [EMPTY_CAPTIONS] * len(images)
+                if self.image_captions is not None:
+                    captions = []
+                    while len(captions) < len(images):
+                        batch_size = self.__get_captions_batch_size()
+                        images_batch = images[
+                            len(captions) : len(captions) + batch_size
+                        ]
+                        start_time = time.perf_counter()
+                        captions.extend(
+                            self.image_captions.generate_caption(images_batch)
+                        )
+                        if self.__captions_batch_sizer is not None:
+                            self.__captions_batch_sizer.record_batch(
+                                len(images_batch), time.perf_counter() - start_time
+                            )
+
+                embeddings: list[np.ndarray] = []
+                while len(embeddings) < len(images):
+                    batch_size = self.__get_embedder_batch_size()
+                    images_batch = images[
+                        len(embeddings) : len(embeddings) + batch_size
+                    ]
+                    start_time = time.perf_counter()
+                    embeddings.extend(self.image_embedder.embed_images(images_batch))
+                    if self.__embedder_batch_sizer is not None:
+                        self.__embedder_batch_sizer.record_batch(
+                            len(images_batch), time.perf_counter() - start_time
+                        )
+
+                for idx_in_batch, diff in enumerate(batch):
+                    file_hash_to_outputs[diff.file_hash] = CachedEmbedding(
+                        captions=captions[idx_in_batch],
                         embedding=embeddings[idx_in_batch],
                     )
                     pbar.update(1)
 
-        return updated_processed_diffs
+        return file_hash_to_outputs
+
+    def __get_decode_batch_size(self) -> int:
+        if self.image_captions is None:
+            return self.__get_embedder_batch_size()
+        return max(self.__get_captions_batch_size(), self.__get_embedder_batch_size())
+
+    def __get_embedder_batch_size(self) -> int:
+        if self.__embedder_batch_sizer is not None:
+            return self.__embedder_batch_sizer.get_batch_size()
+        return self.embedder_batch_size
+
+    def __get_captions_batch_size(self) -> int:
+        if self.__captions_batch_sizer is not None:
+            return self.__captions_batch_sizer.get_batch_size()
+        return self.captions_batch_size
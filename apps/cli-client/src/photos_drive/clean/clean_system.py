@@ -1,7 +1,7 @@
 from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 from dataclasses import dataclass
 import logging
-from typing import Dict, Optional
+from typing import Dict
 
 from bson.objectid import ObjectId
 
@@ -114,6 +114,9 @@ class SystemCleaner:
         # Step 5: Delete all unlinked albums
         album_ids_to_delete = all_album_ids - album_ids_to_keep
         media_item_ids_to_delete = all_media_item_ids - media_item_ids_to_keep
+
+        # Media items with the same bytes can share a gmedia item, so a gmedia item
+        # is only deleted when none of the media items to keep refer to it
         gphoto_media_item_ids_to_delete = (
             all_gphoto_media_item_ids - gmedia_item_ids_to_keep
         )
@@ -345,50 +348,16 @@ class SystemCleaner:
             client.albums().add_photos_to_album(galbum_id, chunked_gmedia_item_ids)
 
     def __prune_albums(self) -> int:
-        def process_album(album_id: AlbumId) -> tuple[list[AlbumId], Optional[AlbumId]]:
-            album = self.__albums_repo.get_album_by_id(album_id)
-
-            child_album_ids = [
-                child_album.id
-                for child_album in self.__albums_repo.find_child_albums(album.id)
-            ]
-            num_media_items = self.__media_items_repo.get_num_media_items_in_album(
-                album_id
-            )
-            prune_album_id = (
-                album_id if len(child_album_ids) == 0 and num_media_items == 0 else None
-            )
-
-            return child_album_ids, prune_album_id
-
         logger.info("Pruning albums")
-        empty_leaf_album_ids = []
-        root_album_id = self.__config.get_root_album_id()
-
-        with ThreadPoolExecutor() as executor:
-            current_level = [root_album_id]
-            while current_level:
-                futures = [
-                    executor.submit(process_album, album_id)
-                    for album_id in current_level
-                ]
-                next_level = []
-                for future in as_completed(futures):
-                    children, prune_id = future.result()
-                    next_level += children
-
-                    if prune_id is not None:
-                        empty_leaf_album_ids.append(prune_id)
-
-                current_level = next_level
+        album_ids = [album.id for album in self.__albums_repo.get_all_albums()]
 
-        total_albums_pruned = 0
         pruner = AlbumsPruner(
-            root_album_id, self.__albums_repo, self.__media_items_repo
+            self.__config.get_root_album_id(),
+            self.__albums_repo,
+            self.__media_items_repo,
         )
-        for album_id in empty_leaf_album_ids:
-            with TransactionsContext(self.__mongodb_clients_repo):
-                total_albums_pruned += pruner.prune_album(album_id)
+        with TransactionsContext(self.__mongodb_clients_repo):
+            total_albums_pruned = pruner.prune_albums(album_ids)
 
         logger.info("Finished pruning albums")
         return total_albums_pruned
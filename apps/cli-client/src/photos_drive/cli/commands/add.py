@@ -4,10 +4,17 @@ import os
 import typer
 from typing_extensions import Annotated
 
+from photos_drive.backup.backup_journal import BackupJournal
 from photos_drive.backup.backup_photos import PhotosBackup
 from photos_drive.backup.diffs import Diff
+from photos_drive.backup.enrichment_cache import EnrichmentCache
+from photos_drive.backup.image_loading import ImageBatchLoader
 from photos_drive.backup.processed_diffs import DiffsProcessor
-from photos_drive.cli.shared.config import build_config_from_options
+from photos_drive.cli.shared.config import (
+    build_config_from_options,
+    get_backup_journal_path,
+    get_enrichment_cache_path,
+)
 from photos_drive.cli.shared.files import (
     get_media_file_paths_from_path,
 )
@@ -33,11 +40,13 @@ from photos_drive.shared.core.media_items.repository.union import (
 from photos_drive.shared.core.storage.gphotos.clients_repository import (
     GPhotosClientsRepository,
 )
-from photos_drive.shared.features.llm.models.blip_image_captions import (
-    BlipImageCaptions,
-)
-from photos_drive.shared.features.llm.models.open_clip_image_embeddings import (
-    OpenCLIPImageEmbeddings,
+from photos_drive.shared.features.llm.models.cpu_backend import parse_cpu_backend
+from photos_drive.shared.features.llm.models.lazy_models import (
+    create_lazy_blip_image_captions,
+    create_lazy_cpu_optimized_clip_image_embeddings,
+    create_lazy_multi_process_image_embeddings,
+    create_lazy_open_clip_image_embeddings,
+    get_image_embeddings_model_id,
 )
 from photos_drive.shared.features.llm.vector_stores import vector_store_builder
 from photos_drive.shared.features.llm.vector_stores.distributed_vector_store import (
@@ -46,6 +55,7 @@ from photos_drive.shared.features.llm.vector_stores.distributed_vector_store imp
 from photos_drive.shared.features.maps.repository.union import (
     create_union_map_cells_repository_from_db_clients,
 )
+from photos_drive.shared.utils.hashes.file_hasher import parse_hash_algorithm
 
 logger = logging.getLogger(__name__)
 
@@ -87,6 +97,84 @@ def add(
             help="Whether to parallelize uploads or not",
         ),
     ] = False,
+    use_backup_journal: Annotated[
+        bool,
+        typer.Option(
+            "--backup-journal/--no-backup-journal",
+            help="Whether to record the progress of each file locally, so that a "
+            + "failed backup resumes without uploading the same files again, or not",
+        ),
+    ] = True,
+    pipeline_uploads: Annotated[
+        bool,
+        typer.Option(
+            "--pipeline-uploads",
+            help="Whether to add uploaded photos to the database in batches while "
+            + "the other photos are still uploading or not",
+        ),
+    ] = False,
+    dedup_uploads: Annotated[
+        bool,
+        typer.Option(
+            "--dedup-uploads",
+            help="Whether to reuse the photos in Google Photos with the same bytes "
+            + "as the photos to upload, instead of uploading them again, or not",
+        ),
+    ] = False,
+    use_enrichment_cache: Annotated[
+        bool,
+        typer.Option(
+            "--enrichment-cache/--no-enrichment-cache",
+            help="Whether to reuse the metadata of files processed in previous runs "
+            + "or not",
+        ),
+    ] = True,
+    generate_captions: Annotated[
+        bool,
+        typer.Option(
+            "--generate-captions",
+            help="Whether to generate captions for images and store them or not",
+        ),
+    ] = False,
+    cpu_embeddings_backend: Annotated[
+        str | None,
+        typer.Option(
+            "--cpu-embeddings-backend",
+            help="Generate image embeddings with a CPU-optimized backend: "
+            + "int8 or onnx",
+        ),
+    ] = None,
+    embedding_workers: Annotated[
+        int,
+        typer.Option(
+            "--embedding-workers",
+            help="Generate image embeddings in this many worker processes, each "
+            + "with its own model. 0 generates them in this process",
+        ),
+    ] = 0,
+    parallelize_image_decoding: Annotated[
+        bool,
+        typer.Option(
+            "--parallelize-image-decoding",
+            help="Whether to decode images for the models in multiple processes "
+            + "or not",
+        ),
+    ] = False,
+    hash_algorithm: Annotated[
+        str,
+        typer.Option(
+            "--hash-algorithm",
+            help="The algorithm for hashing new files: xxh64 or xxh3_128",
+        ),
+    ] = "xxh64",
+    adaptive_batch_sizes: Annotated[
+        bool,
+        typer.Option(
+            "--adaptive-batch-sizes",
+            help="Whether to tune the batch sizes of the models from their "
+            + "throughput and memory usage or not",
+        ),
+    ] = False,
 ):
     setup_logging(verbose)
 
@@ -97,7 +185,21 @@ def add(
         + f" config_file: {config_file}\n"
         + f" config_mongodb={config_mongodb}\n"
         + f" verbose={verbose}\n"
-        + f" parallelize_uploads={parallelize_uploads}"
+        + f" parallelize_uploads={parallelize_uploads}\n"
+        + f" use_backup_journal={use_backup_journal}\n"
+        + f" pipeline_uploads={pipeline_uploads}\n"
+        + f" dedup_uploads={dedup_uploads}\n"
+        + f" use_enrichment_cache={use_enrichment_cache}\n"
+        + f" generate_captions={generate_captions}\n"
+        + f" cpu_embeddings_backend={cpu_embeddings_backend}\n"
+        + f" embedding_workers={embedding_workers}\n"
+        + f" parallelize_image_decoding={parallelize_image_decoding}\n"
+        + f" hash_algorithm={hash_algorithm}\n"
+        + f" adaptive_batch_sizes={adaptive_batch_sizes}"
+    )
+    file_hash_algorithm = parse_hash_algorithm(hash_algorithm)
+    cpu_backend = (
+        parse_cpu_backend(cpu_embeddings_backend) if cpu_embeddings_backend else None
     )
 
     # Set up the repos
@@ -125,8 +227,33 @@ def add(
     ]
 
     # Process the diffs with metadata
-    diff_processor = DiffsProcessor(OpenCLIPImageEmbeddings(), BlipImageCaptions())
-    processed_diffs = diff_processor.process_raw_diffs(diffs)
+    enrichment_cache = None
+    if use_enrichment_cache:
+        enrichment_cache = EnrichmentCache(get_enrichment_cache_path(config_file))
+    if embedding_workers > 0:
+        image_embedder = create_lazy_multi_process_image_embeddings(
+            embedding_workers, cpu_backend
+        )
+    elif cpu_backend:
+        image_embedder = create_lazy_cpu_optimized_clip_image_embeddings(cpu_backend)
+    else:
+        image_embedder = create_lazy_open_clip_image_embeddings()
+    diff_processor = DiffsProcessor(
+        image_embedder,
+        create_lazy_blip_image_captions() if generate_captions else None,
+        enrichment_cache=enrichment_cache,
+        image_loader=ImageBatchLoader(
+            num_processes=(os.cpu_count() or 1) if parallelize_image_decoding else 0
+        ),
+        hash_algorithm=file_hash_algorithm,
+        adaptive_batch_sizes=adaptive_batch_sizes,
+        embedding_model_id=get_image_embeddings_model_id(cpu_backend),
+    )
+    try:
+        processed_diffs = diff_processor.process_raw_diffs(diffs)
+    finally:
+        if enrichment_cache:
+            enrichment_cache.close()
     for processed_diff in processed_diffs:
         logger.debug(f"Processed diff: {processed_diff}")
 
@@ -137,18 +264,28 @@ def add(
         return
 
     # Process the diffs
-    backup_service = PhotosBackup(
-        config,
-        albums_repo,
-        media_items_repo,
-        map_cells_repository,
-        vector_store,
-        gphoto_clients_repo,
-        mongodb_clients_repo,
-        parallelize_uploads,
-    )
-    backup_results = backup_service.backup(processed_diffs)
-    logger.debug(f"Backup results: {backup_results}")
+    backup_journal = None
+    if use_backup_journal:
+        backup_journal = BackupJournal(get_backup_journal_path(config_file))
+    try:
+        backup_service = PhotosBackup(
+            config,
+            albums_repo,
+            media_items_repo,
+            map_cells_repository,
+            vector_store,
+            gphoto_clients_repo,
+            mongodb_clients_repo,
+            parallelize_uploads,
+            pipeline_uploads,
+            journal=backup_journal,
+            dedup_uploads=dedup_uploads,
+        )
+        backup_results = backup_service.backup(processed_diffs)
+        logger.debug(f"Backup results: {backup_results}")
+    finally:
+        if backup_journal:
+            backup_journal.close()
 
     print(f"Added {len(diffs)} items.")
     print(f"Items added: {backup_results.num_media_items_added}")
@@ -1,10 +1,14 @@
 import logging
+import os
 
 import typer
 from typing_extensions import Annotated
 
 from photos_drive.clean.clean_system import SystemCleaner
-from photos_drive.cli.shared.config import build_config_from_options
+from photos_drive.cli.shared.config import (
+    build_config_from_options,
+    get_backup_journal_path,
+)
 from photos_drive.cli.shared.inputs import prompt_user_for_yes_no_answer
 from photos_drive.cli.shared.logging import setup_logging
 from photos_drive.cli.shared.printer import pretty_print_items_to_delete
@@ -91,6 +95,11 @@ def clean(
 
     cleanup_results = cleaner.delete_items(items_to_delete)
 
+    # The partially backed up files are cleaned up, so they cannot be resumed
+    backup_journal_path = get_backup_journal_path(config_file)
+    if os.path.exists(backup_journal_path):
+        os.remove(backup_journal_path)
+
     typer.echo("Cleanup success!")
     typer.echo(
         f"Number of media items deleted: {cleanup_results.num_media_items_deleted}"
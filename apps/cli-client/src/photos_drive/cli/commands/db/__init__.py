@@ -10,6 +10,7 @@ from photos_drive.cli.commands.db.delete_media_items_without_album_id import (
     delete_media_items_without_album_id,
 )
 from photos_drive.cli.commands.db.dump import dump
+from photos_drive.cli.commands.db.generate_captions import generate_captions
 from photos_drive.cli.commands.db.generate_embeddings import generate_embeddings
 from photos_drive.cli.commands.db.initialize_map_cells_db import initialize_map_cells_db
 from photos_drive.cli.commands.db.restore import restore
@@ -34,3 +35,4 @@ app.command()(delete_child_album_ids_from_albums_db)
 app.command()(delete_media_items_without_album_id)
 app.command()(initialize_map_cells_db)
 app.command()(generate_embeddings)
+app.command()(generate_captions)
@@ -0,0 +1,166 @@
+import logging
+import os
+
+from tqdm import tqdm
+import typer
+from typing_extensions import Annotated
+
+from photos_drive.backup.image_loading import ImageBatchLoader
+from photos_drive.cli.shared.config import build_config_from_options
+from photos_drive.cli.shared.inputs import (
+    prompt_user_for_yes_no_answer,
+)
+from photos_drive.cli.shared.logging import setup_logging
+from photos_drive.cli.shared.typer import (
+    createMutuallyExclusiveGroup,
+)
+from photos_drive.shared.core.albums.album_path_index import AlbumPathIndex
+from photos_drive.shared.core.albums.repository.union import (
+    create_union_albums_repository_from_db_clients,
+)
+from photos_drive.shared.core.databases.mongodb import (
+    MongoDBClientsRepository,
+)
+from photos_drive.shared.core.media_items.media_item_id import MediaItemId
+from photos_drive.shared.core.media_items.repository.base import (
+    FindMediaItemRequest,
+    UpdateMediaItemRequest,
+)
+from photos_drive.shared.core.media_items.repository.union import (
+    create_union_media_items_repository_from_db_clients,
+)
+from photos_drive.shared.features.llm.models.lazy_models import (
+    create_lazy_blip_image_captions,
+)
+from photos_drive.shared.utils.mime_type.utils import is_image
+
+logger = logging.getLogger(__name__)
+
+app = typer.Typer()
+config_exclusivity_callback = createMutuallyExclusiveGroup(2)
+
+
+@app.command()
+def generate_captions(
+    config_file: Annotated[
+        str | None,
+        typer.Option(
+            "--config-file",
+            help="Path to config file",
+            callback=config_exclusivity_callback,
+        ),
+    ] = None,
+    config_mongodb: Annotated[
+        str | None,
+        typer.Option(
+            "--config-mongodb",
+            help="Connection string to a MongoDB account that has the configs",
+            is_eager=False,
+            callback=config_exclusivity_callback,
+        ),
+    ] = None,
+    verbose: Annotated[
+        bool,
+        typer.Option(
+            "--verbose",
+            help="Whether to show all logging debug statements or not",
+        ),
+    ] = False,
+    batch_size: Annotated[
+        int,
+        typer.Option(
+            "--batch-size",
+            help="The number of images to caption at a time",
+        ),
+    ] = 16,
+    write_batch_size: Annotated[
+        int,
+        typer.Option(
+            "--write-batch-size",
+            help="The number of captions to write to the database at a time",
+        ),
+    ] = 500,
+):
+    setup_logging(verbose)
+
+    logger.debug(
+        "Called db generate-captions handler with args:\n"
+        + f" config_file: {config_file}\n"
+        + f" config_mongodb={config_mongodb}\n"
+        + f" verbose={verbose}\n"
+        + f" batch_size={batch_size}\n"
+        + f" write_batch_size={write_batch_size}"
+    )
+
+    # Set up the repos
+    config = build_config_from_options(config_file, config_mongodb)
+    mongodb_clients_repo = MongoDBClientsRepository.build_from_config(config)
+    albums_repo = create_union_albums_repository_from_db_clients(mongodb_clients_repo)
+    media_items_repo = create_union_media_items_repository_from_db_clients(
+        mongodb_clients_repo
+    )
+
+    # Find all images without captions that are on this machine
+    album_path_index = AlbumPathIndex(config.get_root_album_id(), albums_repo)
+    file_paths: list[str] = []
+    media_item_ids: list[MediaItemId] = []
+
+    with tqdm(desc="Finding media items without captions") as pbar:
+        for album_path, album in album_path_index.get_all_album_paths():
+            for media_item in media_items_repo.find_media_items(
+                FindMediaItemRequest(album_id=album.id)
+            ):
+                if media_item.captions is not None or not is_image(
+                    media_item.mime_type
+                ):
+                    continue
+
+                if album_path:
+                    file_path = '/'.join(['.', album_path, media_item.file_name])
+                else:
+                    file_path = media_item.file_name
+
+                if not os.path.exists(file_path):
+                    logger.warning(f"Skipping {file_path} since it does not exist")
+                    continue
+
+                file_paths.append(file_path)
+                media_item_ids.append(media_item.id)
+                pbar.update(1)
+
+    print(f"Need to generate {len(file_paths)} captions")
+    if len(file_paths) == 0:
+        return
+
+    if not prompt_user_for_yes_no_answer('Generate captions? [Y/N]:'):
+        raise ValueError("Operation cancelled")
+
+    # Generate the captions, and write them to the db in bulk
+    image_captions = create_lazy_blip_image_captions()
+    image_batches = ImageBatchLoader().load_batches(file_paths, batch_size)
+    update_requests: list[UpdateMediaItemRequest] = []
+    num_captions_written = 0
+
+    with tqdm(total=len(file_paths), desc="Generating captions") as pbar:
+        for start, images in zip(range(0, len(file_paths), batch_size), image_batches):
+            captions = image_captions.generate_caption(images)
+            for media_item_id, caption in zip(
+                media_item_ids[start : start + batch_size], captions, strict=True
+            ):
+                update_requests.append(
+                    UpdateMediaItemRequest(
+                        media_item_id=media_item_id, new_captions=caption
+                    )
+                )
+            pbar.update(len(images))
+
+            if len(update_requests) >= write_batch_size:
+                media_items_repo.update_many_media_items(update_requests)
+                num_captions_written += len(update_requests)
+                update_requests = []
+
+    if len(update_requests) > 0:
+        media_items_repo.update_many_media_items(update_requests)
+        num_captions_written += len(update_requests)
+
+    print(f"Added captions to {num_captions_written} media items")
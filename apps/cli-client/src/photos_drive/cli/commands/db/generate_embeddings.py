@@ -31,11 +31,9 @@ from photos_drive.shared.core.media_items.repository.base import (
 from photos_drive.shared.core.media_items.repository.union import (
     create_union_media_items_repository_from_db_clients,
 )
-from photos_drive.shared.features.llm.models.blip_image_captions import (
-    BlipImageCaptions,
-)
-from photos_drive.shared.features.llm.models.open_clip_image_embeddings import (
-    OpenCLIPImageEmbeddings,
+from photos_drive.shared.features.llm.models.lazy_models import (
+    create_lazy_blip_image_captions,
+    create_lazy_open_clip_image_embeddings,
 )
 from photos_drive.shared.features.llm.vector_stores.base_vector_store import (
     CreateMediaItemEmbeddingRequest,
@@ -89,8 +87,8 @@ def generate_embeddings(
         + f" verbose={verbose}"
     )
 
-    image_embedder = OpenCLIPImageEmbeddings()
-    image_captions = BlipImageCaptions()
+    image_embedder = create_lazy_open_clip_image_embeddings()
+    image_captions = create_lazy_blip_image_captions()
 
     # Set up the repos
     config = build_config_from_options(config_file, config_mongodb)
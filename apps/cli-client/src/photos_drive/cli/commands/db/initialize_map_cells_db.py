@@ -26,6 +26,9 @@ from photos_drive.shared.features.maps.repository.union import (
 
 logger = logging.getLogger(__name__)
 
+# The number of media items whose cells are inserted at once
+MEDIA_ITEMS_PER_BATCH = 1000
+
 app = typer.Typer()
 config_exclusivity_callback = createMutuallyExclusiveGroup(2)
 
@@ -88,7 +91,12 @@ def initialize_map_cells_db(
             for (client_id, client) in transaction_repository.get_all_clients()
         ]
     )
-    for media_item in media_items_repo.get_all_media_items():
-        if media_item.location is not None:
-            tiles_repo.add_media_item(media_item)
-            print(f'Added media item {media_item.id}')
+    media_items = [
+        media_item
+        for media_item in media_items_repo.get_all_media_items()
+        if media_item.location is not None
+    ]
+    for start in range(0, len(media_items), MEDIA_ITEMS_PER_BATCH):
+        batch = media_items[start : start + MEDIA_ITEMS_PER_BATCH]
+        tiles_repo.add_many_media_items(batch)
+        print(f'Added {start + len(batch)} / {len(media_items)} media items')
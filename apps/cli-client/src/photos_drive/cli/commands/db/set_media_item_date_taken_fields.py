@@ -1,7 +1,5 @@
-from collections import deque
 from datetime import datetime
 import logging
-from typing import cast
 
 from exiftool import ExifToolHelper
 from tqdm import tqdm
@@ -16,7 +14,7 @@ from photos_drive.cli.shared.logging import setup_logging
 from photos_drive.cli.shared.typer import (
     createMutuallyExclusiveGroup,
 )
-from photos_drive.shared.core.albums.album_id import AlbumId
+from photos_drive.shared.core.albums.album_path_index import AlbumPathIndex
 from photos_drive.shared.core.albums.repository.union import (
     create_union_albums_repository_from_db_clients,
 )
@@ -90,31 +88,17 @@ def set_media_item_date_taken_fields(
     )
 
     update_media_item_requests: list[UpdateMediaItemRequest] = []
-    root_album_id = config.get_root_album_id()
-    albums_queue: deque[tuple[AlbumId, list[str]]] = deque([(root_album_id, [])])
+    album_path_index = AlbumPathIndex(config.get_root_album_id(), albums_repo)
 
     with tqdm(desc="Finding media items") as pbar:
-        while len(albums_queue) > 0:
-            album_id, prev_albums_path = albums_queue.popleft()
-            album = albums_repo.get_album_by_id(album_id)
-
-            for child_album in albums_repo.find_child_albums(album.id):
-                if album_id == root_album_id:
-                    albums_queue.append((child_album.id, prev_albums_path + ['.']))
-                else:
-                    albums_queue.append(
-                        (child_album.id, prev_albums_path + [cast(str, album.name)])
-                    )
-
+        for album_path, album in album_path_index.get_all_album_paths():
             for media_item in media_items_repo.find_media_items(
-                FindMediaItemRequest(album_id=album_id)
+                FindMediaItemRequest(album_id=album.id)
             ):
-                if album_id == root_album_id:
-                    file_path = '/'.join(prev_albums_path + [media_item.file_name])
+                if album_path:
+                    file_path = '/'.join(['.', album_path, media_item.file_name])
                 else:
-                    file_path = '/'.join(
-                        prev_albums_path + [cast(str, album.name), media_item.file_name]
-                    )
+                    file_path = media_item.file_name
                 pbar.update(1)
 
                 if not rewrite and media_item.date_taken != datetime(1970, 1, 1):
@@ -1,6 +1,4 @@
-from collections import deque
 import logging
-from typing import cast
 
 from tqdm import tqdm
 import typer
@@ -14,7 +12,7 @@ from photos_drive.cli.shared.logging import setup_logging
 from photos_drive.cli.shared.typer import (
     createMutuallyExclusiveGroup,
 )
-from photos_drive.shared.core.albums.album_id import AlbumId
+from photos_drive.shared.core.albums.album_path_index import AlbumPathIndex
 from photos_drive.shared.core.albums.repository.union import (
     create_union_albums_repository_from_db_clients,
 )
@@ -35,6 +33,7 @@ from photos_drive.shared.core.storage.gphotos.valid_file_extensions import (
 from photos_drive.shared.utils.dimensions.cv2_video_dimensions import (
     get_width_height_of_video,
 )
+from photos_drive.shared.utils.dimensions.header_probe import probe_media
 from photos_drive.shared.utils.dimensions.pillow_image_dimensions import (
     get_width_height_of_image,
 )
@@ -98,31 +97,17 @@ def set_media_item_width_height_fields(
     )
 
     update_media_item_requests: list[UpdateMediaItemRequest] = []
-    root_album_id = config.get_root_album_id()
-    albums_queue: deque[tuple[AlbumId, list[str]]] = deque([(root_album_id, [])])
+    album_path_index = AlbumPathIndex(config.get_root_album_id(), albums_repo)
 
     with tqdm(desc="Finding media items") as pbar:
-        while len(albums_queue) > 0:
-            album_id, prev_albums_path = albums_queue.popleft()
-            album = albums_repo.get_album_by_id(album_id)
-
-            for child_album in albums_repo.find_child_albums(album.id):
-                if album_id == root_album_id:
-                    albums_queue.append((child_album.id, prev_albums_path + ['.']))
-                else:
-                    albums_queue.append(
-                        (child_album.id, prev_albums_path + [cast(str, album.name)])
-                    )
-
+        for album_path, album in album_path_index.get_all_album_paths():
             for media_item in media_items_repo.find_media_items(
-                FindMediaItemRequest(album_id=album_id)
+                FindMediaItemRequest(album_id=album.id)
             ):
-                if album_id == root_album_id:
-                    file_path = '/'.join(prev_albums_path + [media_item.file_name])
+                if album_path:
+                    file_path = '/'.join(['.', album_path, media_item.file_name])
                 else:
-                    file_path = '/'.join(
-                        prev_albums_path + [cast(str, album.name), media_item.file_name]
-                    )
+                    file_path = media_item.file_name
                 pbar.update(1)
 
                 if not rewrite and media_item.width != 0 and media_item.height != 0:
@@ -130,7 +115,10 @@ def set_media_item_width_height_fields(
 
                 try:
                     width, height = None, None
-                    if file_path.lower().endswith(IMAGE_FILE_EXTENSIONS):
+                    probed_media = probe_media(file_path)
+                    if probed_media:
+                        width, height = probed_media.width, probed_media.height
+                    elif file_path.lower().endswith(IMAGE_FILE_EXTENSIONS):
                         width, height = get_width_height_of_image(file_path)
                     elif file_path.lower().endswith(VIDEO_FILE_EXTENSIONS):
                         width, height = get_width_height_of_video(file_path)
@@ -30,11 +30,8 @@ from photos_drive.shared.core.media_items.repository.union import (
 from photos_drive.shared.core.storage.gphotos.clients_repository import (
     GPhotosClientsRepository,
 )
-from photos_drive.shared.features.llm.models.blip_image_captions import (
-    BlipImageCaptions,
-)
-from photos_drive.shared.features.llm.models.open_clip_image_embeddings import (
-    OpenCLIPImageEmbeddings,
+from photos_drive.shared.features.llm.models.lazy_models import (
+    create_lazy_open_clip_image_embeddings,
 )
 from photos_drive.shared.features.llm.vector_stores import vector_store_builder
 from photos_drive.shared.features.llm.vector_stores.distributed_vector_store import (
@@ -119,7 +116,7 @@ def delete(
         return
 
     # Process the diffs with metadata
-    diff_processor = DiffsProcessor(OpenCLIPImageEmbeddings(), BlipImageCaptions())
+    diff_processor = DiffsProcessor(create_lazy_open_clip_image_embeddings())
     processed_diffs = diff_processor.process_raw_diffs(diffs)
     for processed_diff in processed_diffs:
         logger.debug(f"Processed diff: {processed_diff}")
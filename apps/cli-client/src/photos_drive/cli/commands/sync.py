@@ -1,21 +1,37 @@
+from concurrent.futures import (
+    ALL_COMPLETED,
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import closing
 import logging
 import math
 import os
-from typing import Generator
+import time
+from typing import Generator, Iterable
 
 import typer
 from typing_extensions import Annotated
 
+from photos_drive.backup.backup_journal import BackupJournal
 from photos_drive.backup.backup_photos import (
     BackupResults,
     PhotosBackup,
 )
-from photos_drive.backup.diffs import Diff
+from photos_drive.backup.diffs import Diff, Modifier
+from photos_drive.backup.enrichment_cache import EnrichmentCache
+from photos_drive.backup.image_loading import ImageBatchLoader
 from photos_drive.backup.processed_diffs import (
     DiffsProcessor,
     ProcessedDiff,
 )
-from photos_drive.cli.shared.config import build_config_from_options
+from photos_drive.cli.shared.config import (
+    build_config_from_options,
+    get_backup_journal_path,
+    get_enrichment_cache_path,
+)
 from photos_drive.cli.shared.inputs import (
     prompt_user_for_yes_no_answer,
 )
@@ -37,11 +53,13 @@ from photos_drive.shared.core.media_items.repository.union import (
 from photos_drive.shared.core.storage.gphotos.clients_repository import (
     GPhotosClientsRepository,
 )
-from photos_drive.shared.features.llm.models.blip_image_captions import (
-    BlipImageCaptions,
-)
-from photos_drive.shared.features.llm.models.open_clip_image_embeddings import (
-    OpenCLIPImageEmbeddings,
+from photos_drive.shared.features.llm.models.cpu_backend import parse_cpu_backend
+from photos_drive.shared.features.llm.models.lazy_models import (
+    create_lazy_blip_image_captions,
+    create_lazy_cpu_optimized_clip_image_embeddings,
+    create_lazy_multi_process_image_embeddings,
+    create_lazy_open_clip_image_embeddings,
+    get_image_embeddings_model_id,
 )
 from photos_drive.shared.features.llm.vector_stores import vector_store_builder
 from photos_drive.shared.features.llm.vector_stores.distributed_vector_store import (
@@ -50,6 +68,8 @@ from photos_drive.shared.features.llm.vector_stores.distributed_vector_store imp
 from photos_drive.shared.features.maps.repository.union import (
     create_union_map_cells_repository_from_db_clients,
 )
+from photos_drive.shared.utils.hashes.file_hasher import parse_hash_algorithm
+from photos_drive.shared.utils.prefetch import prefetch
 
 logger = logging.getLogger(__name__)
 
@@ -92,6 +112,30 @@ def sync(
             help="Whether to parallelize uploads or not",
         ),
     ] = False,
+    use_backup_journal: Annotated[
+        bool,
+        typer.Option(
+            "--backup-journal/--no-backup-journal",
+            help="Whether to record the progress of each file locally, so that a "
+            + "failed backup resumes without uploading the same files again, or not",
+        ),
+    ] = True,
+    pipeline_uploads: Annotated[
+        bool,
+        typer.Option(
+            "--pipeline-uploads",
+            help="Whether to add uploaded photos to the database in batches while "
+            + "the other photos are still uploading or not",
+        ),
+    ] = False,
+    dedup_uploads: Annotated[
+        bool,
+        typer.Option(
+            "--dedup-uploads",
+            help="Whether to reuse the photos in Google Photos with the same bytes "
+            + "as the photos to upload, instead of uploading them again, or not",
+        ),
+    ] = False,
     batch_size: Annotated[
         int,
         typer.Option(
@@ -99,6 +143,82 @@ def sync(
             help="The amount to batch the syncs",
         ),
     ] = 50,
+    stream: Annotated[
+        bool,
+        typer.Option(
+            "--stream",
+            help="Whether to back up each batch as soon as it is processed or not",
+        ),
+    ] = False,
+    max_prefetched_batches: Annotated[
+        int,
+        typer.Option(
+            "--max-prefetched-batches",
+            help="The max. number of batches to process ahead of the backup "
+            + "when streaming",
+        ),
+    ] = 2,
+    max_concurrent_batches: Annotated[
+        int,
+        typer.Option(
+            "--max-concurrent-batches",
+            help="The max. number of batches to back up at the same time",
+        ),
+    ] = 1,
+    use_enrichment_cache: Annotated[
+        bool,
+        typer.Option(
+            "--enrichment-cache/--no-enrichment-cache",
+            help="Whether to reuse the metadata of files processed in previous runs "
+            + "or not",
+        ),
+    ] = True,
+    generate_captions: Annotated[
+        bool,
+        typer.Option(
+            "--generate-captions",
+            help="Whether to generate captions for images and store them or not",
+        ),
+    ] = False,
+    cpu_embeddings_backend: Annotated[
+        str | None,
+        typer.Option(
+            "--cpu-embeddings-backend",
+            help="Generate image embeddings with a CPU-optimized backend: "
+            + "int8 or onnx",
+        ),
+    ] = None,
+    embedding_workers: Annotated[
+        int,
+        typer.Option(
+            "--embedding-workers",
+            help="Generate image embeddings in this many worker processes, each "
+            + "with its own model. 0 generates them in this process",
+        ),
+    ] = 0,
+    parallelize_image_decoding: Annotated[
+        bool,
+        typer.Option(
+            "--parallelize-image-decoding",
+            help="Whether to decode images for the models in multiple processes "
+            + "or not",
+        ),
+    ] = False,
+    hash_algorithm: Annotated[
+        str,
+        typer.Option(
+            "--hash-algorithm",
+            help="The algorithm for hashing new files: xxh64 or xxh3_128",
+        ),
+    ] = "xxh64",
+    adaptive_batch_sizes: Annotated[
+        bool,
+        typer.Option(
+            "--adaptive-batch-sizes",
+            help="Whether to tune the batch sizes of the models from their "
+            + "throughput and memory usage or not",
+        ),
+    ] = False,
 ):
     setup_logging(verbose)
 
@@ -110,7 +230,25 @@ def sync(
         + f" config_file: {config_file}\n"
         + f" config_mongodb={config_mongodb}\n"
         + f" verbose={verbose}\n"
-        + f" parallelize_uploads={parallelize_uploads}"
+        + f" parallelize_uploads={parallelize_uploads}\n"
+        + f" use_backup_journal={use_backup_journal}\n"
+        + f" pipeline_uploads={pipeline_uploads}\n"
+        + f" dedup_uploads={dedup_uploads}\n"
+        + f" batch_size={batch_size}\n"
+        + f" stream={stream}\n"
+        + f" max_prefetched_batches={max_prefetched_batches}\n"
+        + f" max_concurrent_batches={max_concurrent_batches}\n"
+        + f" use_enrichment_cache={use_enrichment_cache}\n"
+        + f" generate_captions={generate_captions}\n"
+        + f" cpu_embeddings_backend={cpu_embeddings_backend}\n"
+        + f" embedding_workers={embedding_workers}\n"
+        + f" parallelize_image_decoding={parallelize_image_decoding}\n"
+        + f" hash_algorithm={hash_algorithm}\n"
+        + f" adaptive_batch_sizes={adaptive_batch_sizes}"
+    )
+    file_hash_algorithm = parse_hash_algorithm(hash_algorithm)
+    cpu_backend = (
+        parse_cpu_backend(cpu_embeddings_backend) if cpu_embeddings_backend else None
     )
 
     config = build_config_from_options(config_file, config_mongodb)
@@ -123,6 +261,7 @@ def sync(
         config=config,
         albums_repo=albums_repo,
         media_items_repo=media_items_repo,
+        hash_algorithm=file_hash_algorithm,
     )
     diff_results = diff_comparator.get_diffs(local_dir_path, remote_albums_path)
     logger.debug(f'Diff results: {diff_results}')
@@ -137,10 +276,6 @@ def sync(
         print("Operation cancelled.")
         return
 
-    # Process the diffs
-    diff_processor = DiffsProcessor(OpenCLIPImageEmbeddings(), BlipImageCaptions())
-    processed_diffs = diff_processor.process_raw_diffs(backup_diffs)
-
     gphoto_clients_repo = GPhotosClientsRepository.build_from_config(config)
     map_cells_repository = create_union_map_cells_repository_from_db_clients(
         mongodb_clients_repo
@@ -152,6 +287,12 @@ def sync(
         ]
     )
 
+    enrichment_cache = None
+    if use_enrichment_cache:
+        enrichment_cache = EnrichmentCache(get_enrichment_cache_path(config_file))
+    backup_journal = None
+    if use_backup_journal:
+        backup_journal = BackupJournal(get_backup_journal_path(config_file))
     backup_service = PhotosBackup(
         config,
         albums_repo,
@@ -161,11 +302,68 @@ def sync(
         gphoto_clients_repo,
         mongodb_clients_repo,
         parallelize_uploads,
+        pipeline_uploads,
+        journal=backup_journal,
+        dedup_uploads=dedup_uploads,
     )
 
-    backup_results = __backup_diffs_to_system(
-        backup_service, processed_diffs, batch_size
-    )
+    # Process the diffs
+    try:
+        if embedding_workers > 0:
+            image_embedder = create_lazy_multi_process_image_embeddings(
+                embedding_workers, cpu_backend
+            )
+        elif cpu_backend:
+            image_embedder = create_lazy_cpu_optimized_clip_image_embeddings(
+                cpu_backend
+            )
+        else:
+            image_embedder = create_lazy_open_clip_image_embeddings()
+        diff_processor = DiffsProcessor(
+            image_embedder,
+            create_lazy_blip_image_captions() if generate_captions else None,
+            enrichment_cache=enrichment_cache,
+            image_loader=ImageBatchLoader(
+                num_processes=(os.cpu_count() or 1) if parallelize_image_decoding else 0
+            ),
+            hash_algorithm=file_hash_algorithm,
+            adaptive_batch_sizes=adaptive_batch_sizes,
+            embedding_model_id=get_image_embeddings_model_id(cpu_backend),
+        )
+        processed_diffs_batches: Generator[list[ProcessedDiff], None, None]
+        if stream:
+            processed_diffs_batches = prefetch(
+                diff_processor.process_raw_diffs_in_chunks(backup_diffs, batch_size),
+                max_prefetched_batches,
+            )
+        else:
+            processed_diffs = diff_processor.process_raw_diffs(backup_diffs)
+            processed_diffs_batches = __chunked(processed_diffs, batch_size)
+
+        # Stops processing the next chunks before the cache and journal are closed
+        num_total_chunks = math.ceil(len(backup_diffs) / batch_size)
+        with closing(processed_diffs_batches):
+            if max_concurrent_batches > 1:
+                backup_results = __backup_diffs_to_system_concurrently(
+                    backup_service,
+                    processed_diffs_batches,
+                    num_total_chunks,
+                    max_concurrent_batches,
+                    backup_journal is not None,
+                )
+            else:
+                backup_results = __backup_diffs_to_system(
+                    backup_service,
+                    processed_diffs_batches,
+                    num_total_chunks,
+                    backup_journal is not None,
+                )
+    finally:
+        if enrichment_cache:
+            enrichment_cache.close()
+        if backup_journal:
+            backup_journal.close()
+
     print("Sync complete.")
     print(f"Albums created: {backup_results.num_albums_created}")
     print(f"Albums deleted: {backup_results.num_albums_deleted}")
@@ -192,19 +390,22 @@ def __convert_diff_results_to_backup_diffs(diff_results: DiffResults) -> list[Di
 
 def __backup_diffs_to_system(
     backup_service: PhotosBackup,
-    processed_diffs: list[ProcessedDiff],
-    batch_size: int,
+    processed_diffs_batches: Iterable[list[ProcessedDiff]],
+    num_total_chunks: int,
+    is_resumable: bool,
 ) -> BackupResults:
     overall_results = BackupResults(0, 0, 0, 0, 0)
-    num_total_chunks = math.ceil(len(processed_diffs) / batch_size)
     num_chunks_completed = 0
 
-    for batch in __chunked(processed_diffs, batch_size):
+    for batch in processed_diffs_batches:
         try:
             logger.info(f'Backing up chunk {num_chunks_completed} / {num_total_chunks}')
             batch_results = backup_service.backup(batch)
 
-            logger.info(f'Backed up {num_chunks_completed} / {num_total_chunks} chunks')
+            logger.info(
+                f'Backed up {num_chunks_completed} / {num_total_chunks} chunks '
+                + f'in {batch_results.total_elapsed_time:.2f} seconds'
+            )
             logger.debug(f"Batch results: {batch_results}")
 
             num_chunks_completed += 1
@@ -212,25 +413,127 @@ def __backup_diffs_to_system(
 
         except BaseException as e:
             logger.error(f'Chunk failed: {num_chunks_completed} / {num_total_chunks}')
-            logger.error(e)
+            __log_failed_backup(e, overall_results, is_resumable)
+            raise e
 
-            logger.info(f"Albums created: {overall_results.num_albums_created}")
-            logger.info(f"Albums deleted: {overall_results.num_albums_deleted}")
-            logger.info(f"Media items created: {overall_results.num_media_items_added}")
-            logger.info(
-                f"Media items deleted: {overall_results.num_media_items_deleted}"
+    logger.debug(f"Backup results: {overall_results}")
+    return overall_results
+
+
+def __backup_diffs_to_system_concurrently(
+    backup_service: PhotosBackup,
+    processed_diffs_batches: Iterable[list[ProcessedDiff]],
+    num_total_chunks: int,
+    max_concurrent_batches: int,
+    is_resumable: bool,
+) -> BackupResults:
+    """
+    Backs up up to {@code max_concurrent_batches} chunks at the same time.
+    The elapsed time of the results is the wall-clock time of all of the chunks,
+    since the elapsed times of chunks overlap.
+
+    A chunk that deletes a file does not run at the same time as a chunk that adds
+    a file with the same album and file name, like the two diffs of a replaced
+    file, since deletions are found by album and file name and would delete the
+    new media item.
+    """
+    start_time = time.time()
+    overall_results = BackupResults(0, 0, 0, 0, 0)
+    future_to_chunk: dict[Future[BackupResults], int] = {}
+    future_to_file_keys: dict[Future[BackupResults], tuple[set, set]] = {}
+
+    def has_conflicting_chunk(deleted_file_keys: set, added_file_keys: set) -> bool:
+        return any(
+            deleted_file_keys & other_added_file_keys
+            or added_file_keys & other_deleted_file_keys
+            for other_deleted_file_keys, other_added_file_keys in (
+                future_to_file_keys.values()
             )
+        )
+
+    def wait_for_chunks(return_when: str):
+        nonlocal overall_results
+        done, _ = wait(future_to_chunk.keys(), return_when=return_when)
+        error = None
+        for future in done:
+            chunk = future_to_chunk.pop(future)
+            future_to_file_keys.pop(future)
+            if future.exception():
+                logger.error(f'Chunk failed: {chunk} / {num_total_chunks}')
+                error = error or future.exception()
+                continue
+
+            batch_results = future.result()
             logger.info(
-                f"Elapsed time: {overall_results.total_elapsed_time:.6f} seconds"
+                f'Backed up chunk {chunk} / {num_total_chunks} '
+                + f'in {batch_results.total_elapsed_time:.2f} seconds'
             )
+            logger.debug(f"Batch results: {batch_results}")
+            overall_results = __merge_results(overall_results, batch_results)
+
+        if error:
+            raise error
+
+    with ThreadPoolExecutor(max_workers=max_concurrent_batches) as executor:
+        try:
+            for chunk, batch in enumerate(processed_diffs_batches):
+                deleted_file_keys = __get_file_keys(batch, '-')
+                added_file_keys = __get_file_keys(batch, '+')
+                while len(future_to_chunk) >= max_concurrent_batches or (
+                    has_conflicting_chunk(deleted_file_keys, added_file_keys)
+                ):
+                    wait_for_chunks(FIRST_COMPLETED)
 
-            print("Run photos_drive_cli clean to fix errors")
+                logger.info(f'Backing up chunk {chunk} / {num_total_chunks}')
+                future = executor.submit(backup_service.backup, batch)
+                future_to_chunk[future] = chunk
+                future_to_file_keys[future] = (deleted_file_keys, added_file_keys)
+
+            wait_for_chunks(ALL_COMPLETED)
+
+        except BaseException as e:
+            # Chunks that already started cannot be stopped, so wait for them
+            executor.shutdown(wait=True, cancel_futures=True)
+            __log_failed_backup(e, overall_results, is_resumable)
             raise e
 
+    logger.info(
+        f'Backed up {num_total_chunks} chunks in '
+        + f'{overall_results.total_elapsed_time:.2f} seconds of chunk time'
+    )
+    overall_results.total_elapsed_time = time.time() - start_time
     logger.debug(f"Backup results: {overall_results}")
     return overall_results
 
 
+def __get_file_keys(
+    batch: list[ProcessedDiff], modifier: Modifier
+) -> set[tuple[str, str]]:
+    return {
+        (diff.album_name, diff.file_name) for diff in batch if diff.modifier == modifier
+    }
+
+
+def __log_failed_backup(
+    e: BaseException, overall_results: BackupResults, is_resumable: bool
+):
+    logger.error(e)
+
+    logger.info(f"Albums created: {overall_results.num_albums_created}")
+    logger.info(f"Albums deleted: {overall_results.num_albums_deleted}")
+    logger.info(f"Media items created: {overall_results.num_media_items_added}")
+    logger.info(f"Media items deleted: {overall_results.num_media_items_deleted}")
+    logger.info(f"Elapsed time: {overall_results.total_elapsed_time:.6f} seconds")
+
+    if is_resumable:
+        print(
+            "Run this command again to resume the backup, "
+            + "or run photos_drive_cli clean to fix errors"
+        )
+    else:
+        print("Run photos_drive_cli clean to fix errors")
+
+
 def __merge_results(result1: BackupResults, result2: BackupResults) -> BackupResults:
     return BackupResults(
         num_media_items_added=result1.num_media_items_added
@@ -1,5 +1,9 @@
+import os
+
 from pymongo import MongoClient
 
+from photos_drive.backup.backup_journal import BACKUP_JOURNAL_FILE_NAME
+from photos_drive.backup.enrichment_cache import ENRICHMENT_CACHE_FILE_NAME
 from photos_drive.shared.core.config.config import Config
 from photos_drive.shared.core.config.config_from_file import (
     ConfigFromFile,
@@ -8,6 +12,8 @@ from photos_drive.shared.core.config.config_from_mongodb import (
     ConfigFromMongoDb,
 )
 
+DEFAULT_LOCAL_DATA_DIRECTORY = os.path.join(os.path.expanduser('~'), '.photos_drive')
+
 
 def build_config_from_options(
     config_file: str | None, config_mongodb: str | None
@@ -28,3 +34,43 @@ def build_config_from_options(
         return ConfigFromMongoDb(MongoClient(config_mongodb))
     else:
         raise ValueError('Unknown arg type')
+
+
+def get_enrichment_cache_path(config_file: str | None) -> str:
+    '''
+    Returns the path to the local enrichment cache.
+    It is next to the config file if there is one; else it is in the user's home
+    directory.
+
+    Args:
+        config_file (str): Path to the config file.
+
+    Returns:
+        str: The path to the enrichment cache.
+    '''
+    if config_file:
+        directory = os.path.dirname(os.path.abspath(config_file))
+    else:
+        directory = DEFAULT_LOCAL_DATA_DIRECTORY
+
+    return os.path.join(directory, ENRICHMENT_CACHE_FILE_NAME)
+
+
+def get_backup_journal_path(config_file: str | None) -> str:
+    '''
+    Returns the path to the local backup journal.
+    It is next to the config file if there is one; else it is in the user's home
+    directory.
+
+    Args:
+        config_file (str): Path to the config file.
+
+    Returns:
+        str: The path to the backup journal.
+    '''
+    if config_file:
+        directory = os.path.dirname(os.path.abspath(config_file))
+    else:
+        directory = DEFAULT_LOCAL_DATA_DIRECTORY
+
+    return os.path.join(directory, BACKUP_JOURNAL_FILE_NAME)
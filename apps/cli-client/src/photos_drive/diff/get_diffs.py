@@ -1,12 +1,12 @@
-from collections import deque
+from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 import logging
 import os
-from typing import cast
+from typing import Optional, cast
 
 from photos_drive.shared.core.albums.album_id import AlbumId
-from photos_drive.shared.core.albums.albums import Album
+from photos_drive.shared.core.albums.album_path_index import AlbumPathIndex
 from photos_drive.shared.core.albums.repository.base import (
     AlbumsRepository,
 )
@@ -18,7 +18,11 @@ from photos_drive.shared.core.media_items.repository.base import (
 from photos_drive.shared.core.storage.gphotos.valid_file_extensions import (
     MEDIA_ITEM_FILE_EXTENSIONS,
 )
-from photos_drive.shared.utils.hashes.xxhash import compute_file_hash
+from photos_drive.shared.utils.hashes.file_hasher import (
+    FileHasher,
+    HashAlgorithm,
+    get_hash_algorithm,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -73,10 +77,27 @@ class FolderSyncDiff:
         config: Config,
         albums_repo: AlbumsRepository,
         media_items_repo: MediaItemsRepository,
+        hash_algorithm: HashAlgorithm = HashAlgorithm.XXH64,
+        file_hasher: Optional[FileHasher] = None,
     ):
+        '''
+        Constructs an instance of {@code FolderSyncDiff}
+
+        Args:
+            - config (Config): The config.
+            - albums_repo (AlbumsRepository): The albums repo.
+            - media_items_repo (MediaItemsRepository): The media items repo.
+            - hash_algorithm (HashAlgorithm):
+                The algorithm used to hash local files that are not in the system.
+                Files that are in the system are hashed with the same algorithm as
+                their existing hashes, so that they can be compared.
+            - file_hasher (Optional[FileHasher]): Hashes the local files.
+        '''
         self.__config = config
         self.__albums_repo = albums_repo
         self.__media_items_repo = media_items_repo
+        self.__hash_algorithm = hash_algorithm
+        self.__file_hasher = file_hasher or FileHasher(hash_algorithm)
 
     def get_diffs(self, local_dir_path: str, remote_dir_path: str) -> DiffResults:
         # Step 1: Go through the database and get all of its files
@@ -84,7 +105,7 @@ class FolderSyncDiff:
         logger.debug(f'Remote items: {remote_files}')
 
         # Step 2: Go through the entire folder directory and build a tree
-        local_files = self.__get_local_files(local_dir_path)
+        local_files = self.__get_local_files(local_dir_path, remote_files)
         logger.debug(f'Local items: {local_files}')
 
         # Step 3: Compare the trees
@@ -93,7 +114,10 @@ class FolderSyncDiff:
     def __get_remote_files(self, remote_dir_path: str) -> list[RemoteFile]:
         found_files: list[RemoteFile] = []
 
-        base_album = self.__find_leaf_album_in_dir_path(remote_dir_path)
+        album_path_index = AlbumPathIndex(
+            self.__config.get_root_album_id(), self.__albums_repo
+        )
+        base_album = album_path_index.get_album_by_path(remote_dir_path)
         logger.debug(f"Base album: {base_album}")
 
         if not base_album:
@@ -112,7 +136,7 @@ class FolderSyncDiff:
             - a list of child album tuples (child_album_id, new_prev_path)
             '''
 
-            album = self.__albums_repo.get_album_by_id(album_id)
+            album = album_path_index.get_album_by_id(album_id)
             local_found_files: list[RemoteFile] = []
 
             # Process media items for this album.
@@ -146,7 +170,7 @@ class FolderSyncDiff:
 
             # Build new tuples for child albums.
             child_album_tuples = []
-            for child_album in self.__albums_repo.find_child_albums(album.id):
+            for child_album in album_path_index.find_child_albums(album.id):
                 if album_id == base_album_id:
                     child_album_tuples.append((child_album.id, prev_path.copy()))
                 else:
@@ -177,72 +201,58 @@ class FolderSyncDiff:
 
         return found_files
 
-    def __find_leaf_album_in_dir_path(self, remote_dir_path: str) -> Album | None:
-        cur_album = self.__albums_repo.get_album_by_id(
-            self.__config.get_root_album_id()
-        )
-
-        if len(remote_dir_path) == 0:
-            return cur_album
-
-        album_names_queue = deque(remote_dir_path.split('/'))
-
-        while len(album_names_queue) > 0:
-            album_name = album_names_queue.popleft()
-
-            new_cur_album = None
-            for child_album in self.__albums_repo.find_child_albums(cur_album.id):
-                if child_album.name == album_name:
-                    new_cur_album = child_album
-
-            if not new_cur_album:
-                return None
-
-            cur_album = new_cur_album
-
-        return cur_album
-
-    def __get_local_files(self, dir_path: str) -> list[LocalFile]:
-        def process_file(base_album_path: str, root: str, file: str) -> LocalFile:
-            """
-            Processes a single file: computes its relative path, computes the file hash,
-            and returns a LocalFile instance.
-            """
-            remote_album_path = os.path.relpath(root)
-            if remote_album_path.startswith(base_album_path):
-                remote_album_path = remote_album_path[len(base_album_path) + 1 :]
-
-            remote_file_path = os.path.join(remote_album_path, file).replace(
-                os.sep, "/"
-            )
-            local_file_path = os.path.join(
-                ".", os.path.relpath(os.path.join(root, file))
-            )
-            file_hash = compute_file_hash(local_file_path).hex()
-
-            return LocalFile(
-                key=f'{remote_file_path}:{file_hash}',
-                local_relative_file_path=local_file_path,
+    def __get_local_files(
+        self, dir_path: str, remote_files: list[RemoteFile]
+    ) -> list[LocalFile]:
+        # Hash each local file with the algorithm of the remote file at its path
+        remote_file_path_to_algorithm: dict[str, HashAlgorithm] = {}
+        for remote_file in remote_files:
+            remote_file_path, file_hash_str = remote_file.key.rsplit(':', 1)
+            remote_file_path_to_algorithm[remote_file_path] = get_hash_algorithm(
+                bytes.fromhex(file_hash_str)
             )
 
-        found_files: list[LocalFile] = []
         base_album_path = os.path.relpath(dir_path)
-        tasks = []
+        algorithm_to_files: dict[HashAlgorithm, list[tuple[str, str]]] = defaultdict(
+            list
+        )
 
         for root, _, files in os.walk(dir_path):
             for file in files:
                 if not file.lower().endswith(MEDIA_ITEM_FILE_EXTENSIONS):
                     continue
 
-                tasks.append((root, file))
+                remote_album_path = os.path.relpath(root)
+                if remote_album_path.startswith(base_album_path):
+                    remote_album_path = remote_album_path[len(base_album_path) + 1 :]
 
-        with ThreadPoolExecutor() as executor:
-            futures = [
-                executor.submit(process_file, base_album_path, root, file)
-                for root, file in tasks
-            ]
-            for future in as_completed(futures):
-                found_files.append(future.result())
+                remote_file_path = os.path.join(remote_album_path, file).replace(
+                    os.sep, "/"
+                )
+                local_file_path = os.path.join(
+                    ".", os.path.relpath(os.path.join(root, file))
+                )
+                algorithm = remote_file_path_to_algorithm.get(
+                    remote_file_path, self.__hash_algorithm
+                )
+                algorithm_to_files[algorithm].append(
+                    (remote_file_path, local_file_path)
+                )
+
+        found_files: list[LocalFile] = []
+        for algorithm, files_to_hash in algorithm_to_files.items():
+            file_hashes = self.__file_hasher.hash_files(
+                [local_file_path for _, local_file_path in files_to_hash], algorithm
+            )
+            for (remote_file_path, local_file_path), file_hash in zip(
+                files_to_hash, file_hashes, strict=True
+            ):
+                found_files.append(
+                    LocalFile(
+                        key=f'{remote_file_path}:{file_hash.hex()}',
+                        local_relative_file_path=local_file_path,
+                    )
+                )
 
         return found_files
 
@@ -0,0 +1,224 @@
+from collections import defaultdict
+import logging
+import threading
+from typing import Optional
+
+from photos_drive.shared.core.albums.album_id import AlbumId
+from photos_drive.shared.core.albums.albums import Album
+from photos_drive.shared.core.albums.repository.base import AlbumsRepository
+
+logger = logging.getLogger(__name__)
+
+
+class AlbumPathIndex:
+    '''
+    An in-memory index of the albums tree, which maps the path of each album under
+    the root album (ex: "Photos/2010/Dog") to its album.
+
+    All albums are loaded once, with one query per MongoDB client, instead of
+    walking the tree with a query per album. Albums created or deleted through the
+    index are reflected in it right away.
+
+    Sibling albums can have the same name, and so the same path. Looking up that
+    path returns the first of them, but all of them are still in the albums tree.
+    '''
+
+    def __init__(self, root_album_id: AlbumId, albums_repo: AlbumsRepository):
+        '''
+        Constructs an instance of {@code AlbumPathIndex}, and loads all of the
+        albums.
+
+        Args:
+            - root_album_id (AlbumId): The ID of the root album.
+            - albums_repo (AlbumsRepository): The albums repo.
+        '''
+        self.__root_album_id = root_album_id
+        self.__albums_repo = albums_repo
+        self.__lock = threading.RLock()
+
+        self.__id_to_album: dict[AlbumId, Album] = {}
+        self.__id_to_child_ids: dict[AlbumId, list[AlbumId]] = defaultdict(list)
+        for album in albums_repo.get_all_albums():
+            self.__id_to_album[album.id] = album
+            if album.parent_album_id is not None:
+                self.__id_to_child_ids[album.parent_album_id].append(album.id)
+
+        if root_album_id not in self.__id_to_album:
+            raise ValueError(f"Root album {root_album_id} does not exist")
+
+        self.__path_to_id: dict[str, AlbumId] = {}
+        self.__id_to_path: dict[AlbumId, str] = {}
+        self.__add_paths(root_album_id, '')
+
+        logger.debug(
+            f"Indexed {len(self.__id_to_path)} albums out of "
+            + f"{len(self.__id_to_album)} albums"
+        )
+
+    def get_album_by_path(self, album_path: str) -> Optional[Album]:
+        '''
+        Returns the album at a path under the root album.
+
+        Args:
+            - album_path (str):
+                The path, like "Photos/2010/Dog". An empty path is the root album.
+
+        Returns:
+            Optional[Album]: The album if it exists; else None.
+        '''
+        with self.__lock:
+            album_id = self.__path_to_id.get(self.__normalize_path(album_path))
+            return self.__id_to_album[album_id] if album_id is not None else None
+
+    def get_album_path(self, album_id: AlbumId) -> str:
+        '''
+        Returns the path of an album under the root album.
+
+        Args:
+            - album_id (AlbumId): The album ID.
+
+        Returns:
+            str: The path, like "Photos/2010/Dog". It is empty for the root album.
+
+        Raises:
+            ValueError: If the album is not in the albums tree.
+        '''
+        with self.__lock:
+            if album_id not in self.__id_to_path:
+                raise ValueError(f"Album {album_id} is not in the albums tree")
+            return self.__id_to_path[album_id]
+
+    def get_album_by_id(self, album_id: AlbumId) -> Album:
+        '''
+        Returns an album.
+
+        Args:
+            - album_id (AlbumId): The album ID.
+
+        Returns:
+            Album: The album.
+
+        Raises:
+            ValueError: If no album exists.
+        '''
+        with self.__lock:
+            if album_id not in self.__id_to_album:
+                raise ValueError(f"Album {album_id} does not exist!")
+            return self.__id_to_album[album_id]
+
+    def find_child_albums(self, album_id: AlbumId) -> list[Album]:
+        '''
+        Returns the child albums of an album.
+
+        Args:
+            - album_id (AlbumId): The album ID.
+
+        Returns:
+            list[Album]: The child albums.
+        '''
+        with self.__lock:
+            return [
+                self.__id_to_album[child_id]
+                for child_id in self.__id_to_child_ids.get(album_id, [])
+            ]
+
+    def get_all_album_paths(self) -> list[tuple[str, Album]]:
+        '''
+        Returns all of the albums in the albums tree with their paths, where parent
+        albums come before their child albums. Albums with the same path are all
+        returned.
+
+        Returns:
+            list[tuple[str, Album]]: A list of album paths with their albums.
+        '''
+        with self.__lock:
+            return [
+                (album_path, self.__id_to_album[album_id])
+                for album_id, album_path in self.__id_to_path.items()
+            ]
+
+    def create_album(self, album_name: str, parent_album_id: AlbumId) -> Album:
+        '''
+        Creates an album in the albums repo, and adds it to the index.
+
+        Args:
+            - album_name (str): The album name.
+            - parent_album_id (AlbumId): The parent album ID.
+
+        Returns:
+            Album: The new album.
+        '''
+        album = self.__albums_repo.create_album(album_name, parent_album_id)
+
+        with self.__lock:
+            self.__id_to_album[album.id] = album
+            self.__id_to_child_ids[parent_album_id].append(album.id)
+
+            parent_path = self.__id_to_path.get(parent_album_id)
+            if parent_path is not None:
+                self.__add_paths(album.id, self.__join_path(parent_path, album_name))
+
+        return album
+
+    def delete_many_albums(self, album_ids: list[AlbumId]):
+        '''
+        Deletes albums from the albums repo, and removes them from the index.
+        The albums under a deleted album are no longer reachable by path.
+
+        Args:
+            - album_ids (list[AlbumId]): The IDs of the albums to delete.
+        '''
+        self.__albums_repo.delete_many_albums(album_ids)
+
+        with self.__lock:
+            for album_id in album_ids:
+                self.__remove_paths(album_id)
+
+                album = self.__id_to_album.pop(album_id, None)
+                if album is not None and album.parent_album_id is not None:
+                    sibling_ids = self.__id_to_child_ids.get(album.parent_album_id, [])
+                    if album_id in sibling_ids:
+                        sibling_ids.remove(album_id)
+
+    def __add_paths(self, album_id: AlbumId, album_path: str):
+        '''
+        Adds the paths of an album and the albums under it, in breadth-first order.
+        '''
+        queue = [(album_id, album_path)]
+        for cur_album_id, cur_album_path in queue:
+            # The first album with a path wins lookups, like a lookup by name would
+            if cur_album_path in self.__path_to_id:
+                logger.warning(
+                    f"Album {cur_album_id} has the same path '{cur_album_path}' as "
+                    + f"album {self.__path_to_id[cur_album_path]}"
+                )
+            else:
+                self.__path_to_id[cur_album_path] = cur_album_id
+
+            self.__id_to_path[cur_album_id] = cur_album_path
+            for child_id in self.__id_to_child_ids.get(cur_album_id, []):
+                child_name = self.__id_to_album[child_id].name or ''
+                queue.append((child_id, self.__join_path(cur_album_path, child_name)))
+
+    def __remove_paths(self, album_id: AlbumId):
+        album_path = self.__id_to_path.pop(album_id, None)
+        if album_path is None:
+            return
+
+        if self.__path_to_id.get(album_path) == album_id:
+            del self.__path_to_id[album_path]
+
+            # Another album with the same path takes over the path
+            for other_album_id, other_album_path in self.__id_to_path.items():
+                if other_album_path == album_path:
+                    self.__path_to_id[album_path] = other_album_id
+                    break
+
+        for child_id in self.__id_to_child_ids.get(album_id, []):
+            self.__remove_paths(child_id)
+
+    def __normalize_path(self, album_path: str) -> str:
+        return '/'.join(name for name in album_path.split('/') if name)
+
+    def __join_path(self, parent_path: str, album_name: str) -> str:
+        return f'{parent_path}/{album_name}' if parent_path else album_name
@@ -1,11 +1,15 @@
-from typing import cast
+from collections import defaultdict, deque
+import logging
 
 from photos_drive.shared.core.albums.album_id import AlbumId
+from photos_drive.shared.core.albums.albums import Album
 from photos_drive.shared.core.albums.repository.base import AlbumsRepository
 from photos_drive.shared.core.media_items.repository.base import (
     MediaItemsRepository,
 )
 
+logger = logging.getLogger(__name__)
+
 
 class AlbumsPruner:
     '''A class responsible for pruning albums in the albums tree.'''
@@ -44,28 +48,74 @@ class AlbumsPruner:
         Returns:
             int: The number of albums that have been deleted.
         '''
-        albums_to_delete: set[AlbumId] = set()
-        cur_album_id = album_id
-        cur_album = self.__albums_repo.get_album_by_id(cur_album_id)
+        return self.prune_albums([album_id])
 
-        while True:
-            cur_album = self.__albums_repo.get_album_by_id(cur_album_id)
-            child_albums = self.__albums_repo.find_child_albums(cur_album_id)
-            child_album_ids_set = set([child_album.id for child_album in child_albums])
-            if len(child_album_ids_set - albums_to_delete) > 0:
-                break
+    def prune_albums(self, album_ids: list[AlbumId]) -> int:
+        '''
+        Prunes albums upwards in the albums tree from many starting albums at once,
+        like calling {@code prune_album} on each of them.
 
-            if self.__media_items_repo.get_num_media_items_in_album(cur_album_id) > 0:
-                break
+        The albums are loaded once, with one query per MongoDB client, and the
+        media items in the starting albums and their ancestors are counted with one
+        query per MongoDB client. The empty albums are then deleted with one query
+        per MongoDB client, so callers can delete them in a single transaction.
 
-            if cur_album.id == self.__root_album_id:
-                break
+        Starting albums that no longer exist are skipped.
 
-            parent_album_id = cast(AlbumId, cur_album.parent_album_id)
-            albums_to_delete.add(cur_album_id)
+        Args:
+            album_ids (list[AlbumId]): The starting nodes.
 
-            cur_album_id = parent_album_id
+        Returns:
+            int: The number of albums that have been deleted.
+        '''
+        if len(album_ids) == 0:
+            return 0
+
+        id_to_album: dict[AlbumId, Album] = {}
+        id_to_child_ids: dict[AlbumId, set[AlbumId]] = defaultdict(set)
+        for album in self.__albums_repo.get_all_albums():
+            id_to_album[album.id] = album
+            if album.parent_album_id is not None:
+                id_to_child_ids[album.parent_album_id].add(album.id)
+
+        # Only the starting albums and their ancestors can become empty
+        affected_album_ids: set[AlbumId] = set()
+        for album_id in album_ids:
+            cur_album_id = album_id
+            while (
+                cur_album_id in id_to_album and cur_album_id not in affected_album_ids
+            ):
+                affected_album_ids.add(cur_album_id)
+                parent_album_id = id_to_album[cur_album_id].parent_album_id
+                if parent_album_id is None:
+                    break
+                cur_album_id = parent_album_id
+
+        album_id_to_num_media_items = (
+            self.__media_items_repo.get_num_media_items_in_albums(
+                list(affected_album_ids)
+            )
+        )
+
+        # Delete albums bottom-up, checking a parent again once a child is deleted
+        albums_to_delete: set[AlbumId] = set()
+        queue = deque(album_id for album_id in album_ids if album_id in id_to_album)
+        while len(queue) > 0:
+            cur_album_id = queue.popleft()
+            if (
+                cur_album_id in albums_to_delete
+                or cur_album_id == self.__root_album_id
+                or album_id_to_num_media_items.get(cur_album_id, 0) > 0
+                or len(id_to_child_ids[cur_album_id] - albums_to_delete) > 0
+            ):
+                continue
+
+            albums_to_delete.add(cur_album_id)
+            parent_album_id = id_to_album[cur_album_id].parent_album_id
+            if parent_album_id is not None and parent_album_id in id_to_album:
+                queue.append(parent_album_id)
 
+        logger.debug(f"Pruning {len(albums_to_delete)} albums")
         self.__albums_repo.delete_many_albums(list(albums_to_delete))
 
         return len(albums_to_delete)
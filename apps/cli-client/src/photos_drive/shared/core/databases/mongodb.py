@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 import logging
+import threading
 from typing import Dict, override
 
 from bson.objectid import ObjectId
@@ -35,15 +36,26 @@ class MongoDBSessionsProvider(ABC):
         pass
 
 
+class _TransactionsState(threading.local):
+    '''
+    The sessions of the transactions started by a thread, so that threads can run
+    their own transactions at the same time.
+    '''
+
+    def __init__(self) -> None:
+        self.client_id_to_session: dict[ObjectId, ClientSession] = {}
+        self.transaction_in_progress = False
+
+
 class MongoDBClientsRepository(MongoDBSessionsProvider, TransactionsManager):
     '''
     This class is a repository for MongoDB clients and its sessions.
+    Transactions are scoped to the thread that started them.
     '''
 
     def __init__(self) -> None:
         self.__id_to_client: Dict[str, MongoClient] = {}
-        self.__client_id_to_session: dict[ObjectId, ClientSession] = {}
-        self.__transaction_in_progress = False
+        self.__transactions_state = _TransactionsState()
 
     @staticmethod
     def build_from_config(
@@ -80,7 +92,7 @@ class MongoDBClientsRepository(MongoDBSessionsProvider, TransactionsManager):
         Raises:
             ValueError: If ID already exists.
         """
-        if self.__transaction_in_progress:
+        if self.__transactions_state.transaction_in_progress:
             raise ValueError("Transaction is still in progress")
 
         str_id = str(id)
@@ -115,45 +127,51 @@ class MongoDBClientsRepository(MongoDBSessionsProvider, TransactionsManager):
 
     @override
     def start_transactions(self):
-        if self.__transaction_in_progress:
+        if self.__transactions_state.transaction_in_progress:
             raise ValueError("Transaction already in progress")
 
-        self.__transaction_in_progress = True
+        self.__transactions_state.transaction_in_progress = True
         for client_id, client in self.get_all_clients():
             session = client.start_session()
             session.start_transaction(
                 ReadConcern(level="snapshot"), WriteConcern(w="majority")
             )
-            self.__client_id_to_session[client_id] = session
+            self.__transactions_state.client_id_to_session[client_id] = session
 
     @override
     def get_session_for_client_id(self, client_id: ObjectId) -> ClientSession | None:
-        return self.__client_id_to_session.get(client_id, None)
+        return self.__transactions_state.client_id_to_session.get(client_id, None)
 
     @override
     def commit_and_end_transactions(self):
-        if not self.__transaction_in_progress:
+        if not self.__transactions_state.transaction_in_progress:
             raise ValueError("Transaction not in progress")
 
-        for client_id, session in self.__client_id_to_session.items():
+        for (
+            client_id,
+            session,
+        ) in self.__transactions_state.client_id_to_session.items():
             if session.in_transaction:
                 logger.debug(f"Commiting transaction for {client_id}")
                 session.commit_transaction()
             session.end_session()
 
-        self.__client_id_to_session.clear()
-        self.__transaction_in_progress = False
+        self.__transactions_state.client_id_to_session.clear()
+        self.__transactions_state.transaction_in_progress = False
 
     @override
     def abort_and_end_transactions(self):
-        if not self.__transaction_in_progress:
+        if not self.__transactions_state.transaction_in_progress:
             raise ValueError("Transaction not in progress")
 
-        for client_id, session in self.__client_id_to_session.items():
+        for (
+            client_id,
+            session,
+        ) in self.__transactions_state.client_id_to_session.items():
             if session.in_transaction:
                 logger.debug(f"Ending transaction for {client_id}")
                 session.abort_transaction()
             session.end_session()
 
-        self.__client_id_to_session.clear()
-        self.__transaction_in_progress = False
+        self.__transactions_state.client_id_to_session.clear()
+        self.__transactions_state.transaction_in_progress = False
@@ -34,6 +34,7 @@ class MediaItem:
         embedding_id (Optional[MediaItemEmbeddingId]): The ID referring to its embedding
             in the vector store.
         mime_type (str): The mime type of the media item.
+        captions (Optional[str]): The captions of the media item, if generated.
     """
 
     id: MediaItemId
@@ -48,3 +49,4 @@ class MediaItem:
     date_taken: datetime
     embedding_id: Optional[MediaItemEmbeddingId]
     mime_type: str
+    captions: Optional[str] = None
@@ -35,6 +35,7 @@ class CreateMediaItemRequest:
         embedding_id (Optional[MediaItemEmbeddingId]): An ID referring to its embedding,
             if present.
         mime_type (str): The mime type of the media item.
+        captions (Optional[str]): The captions of the media item, if generated.
     """
 
     file_name: str
@@ -48,6 +49,7 @@ class CreateMediaItemRequest:
     date_taken: datetime
     embedding_id: Optional[MediaItemEmbeddingId]
     mime_type: str
+    captions: Optional[str] = None
 
 
 @dataclass(frozen=True)
@@ -76,6 +78,7 @@ class UpdateMediaItemRequest:
         clear_embedding_id (bool): Whether to clear the embedding ID.
         new_embedding_id (Optional[MediaItemEmbeddingId]): The new embedding ID.
         new_mime_type (Optional[str]): The new mime type.
+        new_captions (Optional[str]): The new captions.
     '''
 
     media_item_id: MediaItemId
@@ -92,6 +95,7 @@ class UpdateMediaItemRequest:
     clear_embedding_id: Optional[bool] = False
     new_embedding_id: Optional[MediaItemEmbeddingId] = None
     new_mime_type: Optional[str] = None
+    new_captions: Optional[str] = None
 
 
 @dataclass(frozen=True)
@@ -166,6 +170,21 @@ class MediaItemsRepository(ABC):
             MediaItem: The media item
         """
 
+    @abstractmethod
+    def get_media_items_by_ids(
+        self, ids: list[MediaItemId]
+    ) -> dict[MediaItemId, MediaItem]:
+        """
+        Returns many media items by their IDs.
+
+        Args:
+            ids (list[MediaItemId]): The media item IDs.
+
+        Returns:
+            dict[MediaItemId, MediaItem]: A map of media item IDs to their media
+                items. Media items that do not exist are left out.
+        """
+
     @abstractmethod
     def get_all_media_items(self) -> list[MediaItem]:
         """
@@ -199,6 +218,52 @@ class MediaItemsRepository(ABC):
             int: total number of media items in an album.
         '''
 
+    @abstractmethod
+    def get_num_media_items_in_albums(
+        self, album_ids: list[AlbumId]
+    ) -> dict[AlbumId, int]:
+        '''
+        Returns the total number of media items in many albums.
+
+        Args:
+            album_ids (list[AlbumId]): The album IDs.
+
+        Returns:
+            dict[AlbumId, int]: A map of each album ID to its number of media items.
+        '''
+
+    @abstractmethod
+    def find_media_items_by_album_and_file_names(
+        self, keys: list[tuple[AlbumId, str]]
+    ) -> dict[AlbumId, list[MediaItem]]:
+        '''
+        Finds all media items with the given file names in the given albums.
+
+        Args:
+            keys (list[tuple[AlbumId, str]]):
+                A list of album IDs with the file name to find in the album.
+
+        Returns:
+            dict[AlbumId, list[MediaItem]]: A map of album IDs to the media items
+                found in the album. Albums with no media items found are left out.
+        '''
+
+    @abstractmethod
+    def find_media_items_by_file_hashes(
+        self, file_hashes: list[bytes]
+    ) -> dict[bytes, list[MediaItem]]:
+        '''
+        Finds all media items with the given file hashes.
+
+        Args:
+            file_hashes (list[bytes]): A list of file hashes, in bytes.
+
+        Returns:
+            dict[bytes, list[MediaItem]]: A map of file hashes to the media items
+                with that file hash. File hashes with no media items found are left
+                out.
+        '''
+
     @abstractmethod
     def create_media_item(self, request: CreateMediaItemRequest) -> MediaItem:
         """
@@ -211,6 +276,21 @@ class MediaItemsRepository(ABC):
             MediaItem: The media item.
         """
 
+    @abstractmethod
+    def create_many_media_items(
+        self, requests: list[CreateMediaItemRequest]
+    ) -> list[MediaItem]:
+        """
+        Creates many media items in the database.
+
+        Args:
+            requests (list[CreateMediaItemRequest]):
+                A list of requests to create media items.
+
+        Returns:
+            list[MediaItem]: The media items, in the same order as the requests.
+        """
+
     @abstractmethod
     def update_many_media_items(self, requests: list[UpdateMediaItemRequest]):
         '''
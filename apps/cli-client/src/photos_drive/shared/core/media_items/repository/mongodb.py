@@ -1,3 +1,4 @@
+from collections import defaultdict
 from datetime import datetime
 import logging
 from typing import Any, Mapping, cast
@@ -35,6 +36,8 @@ logger = logging.getLogger(__name__)
 
 LOCATION_INDEX_NAME = 'location_index'
 
+FILE_HASH_INDEX_NAME = 'file_hash_index'
+
 
 class MongoDBMediaItemsRepository(MediaItemsRepository):
     """Implementation class for MediaItemsRepository."""
@@ -45,6 +48,7 @@ class MongoDBMediaItemsRepository(MediaItemsRepository):
         mongodb_client: pymongo.MongoClient,
         mongodb_sessions_provider: MongoDBSessionsProvider,
         location_index_name=LOCATION_INDEX_NAME,
+        file_hash_index_name=FILE_HASH_INDEX_NAME,
     ):
         """
         Creates a MediaItemsRepository
@@ -60,8 +64,10 @@ class MongoDBMediaItemsRepository(MediaItemsRepository):
         self._mongodb_sessions_provider = mongodb_sessions_provider
         self._collection = self._mongodb_client["photos_drive"]["media_items"]
 
-        if not self.__has_location_index(self._collection, location_index_name):
+        if not self.__has_index(self._collection, location_index_name):
             self.__create_location_index(self._collection, location_index_name)
+        if not self.__has_index(self._collection, file_hash_index_name):
+            self.__create_file_hash_index(self._collection, file_hash_index_name)
 
     def get_client_id(self) -> ObjectId:
         return self._client_id
@@ -69,13 +75,17 @@ class MongoDBMediaItemsRepository(MediaItemsRepository):
     def get_available_free_space(self) -> int:
         return get_free_space(self._mongodb_client)
 
-    def __has_location_index(self, collection, index_name):
+    def __has_index(self, collection, index_name):
         return any([index["name"] == index_name for index in collection.list_indexes()])
 
     def __create_location_index(self, collection, index_name):
         collection.create_index([("location", "2dsphere")], name=index_name)
         logger.debug(f'Created location index {index_name}')
 
+    def __create_file_hash_index(self, collection, index_name):
+        collection.create_index([("file_hash", pymongo.ASCENDING)], name=index_name)
+        logger.debug(f'Created file hash index {index_name}')
+
     def get_media_item_by_id(self, id: MediaItemId) -> MediaItem:
         if id.client_id != self._client_id:
             raise ValueError(f"Media item {id} belongs to a different client")
@@ -92,6 +102,32 @@ class MongoDBMediaItemsRepository(MediaItemsRepository):
 
         return self.__parse_raw_document_to_media_item_obj(self._client_id, raw_item)
 
+    def get_media_items_by_ids(
+        self, ids: list[MediaItemId]
+    ) -> dict[MediaItemId, MediaItem]:
+        if len(ids) == 0:
+            return {}
+
+        object_ids: list[ObjectId] = []
+        for id in ids:
+            if id.client_id != self._client_id:
+                raise ValueError(f"Media item {id} belongs to a different client")
+            object_ids.append(id.object_id)
+
+        session = self._mongodb_sessions_provider.get_session_for_client_id(
+            self._client_id,
+        )
+        id_to_media_item: dict[MediaItemId, MediaItem] = {}
+        for raw_item in self._collection.find(
+            filter={"_id": {"$in": object_ids}}, session=session
+        ):
+            media_item = self.__parse_raw_document_to_media_item_obj(
+                self._client_id, raw_item
+            )
+            id_to_media_item[media_item.id] = media_item
+
+        return id_to_media_item
+
     def get_all_media_items(self) -> list[MediaItem]:
         media_items: list[MediaItem] = []
 
@@ -165,11 +201,116 @@ class MongoDBMediaItemsRepository(MediaItemsRepository):
             filter={'album_id': album_id_to_string(album_id)}, session=session
         )
 
+    def get_num_media_items_in_albums(
+        self, album_ids: list[AlbumId]
+    ) -> dict[AlbumId, int]:
+        album_id_to_num_media_items = {album_id: 0 for album_id in album_ids}
+        if len(album_ids) == 0:
+            return album_id_to_num_media_items
+
+        session = self._mongodb_sessions_provider.get_session_for_client_id(
+            self._client_id,
+        )
+        pipeline: list[Mapping[str, Any]] = [
+            {
+                '$match': {
+                    'album_id': {
+                        '$in': [album_id_to_string(album_id) for album_id in album_ids]
+                    }
+                }
+            },
+            {'$group': {'_id': '$album_id', 'count': {'$sum': 1}}},
+        ]
+        for doc in self._collection.aggregate(pipeline, session=session):
+            album_id = parse_string_to_album_id(doc['_id'])
+            album_id_to_num_media_items[album_id] = doc['count']
+
+        return album_id_to_num_media_items
+
+    def find_media_items_by_album_and_file_names(
+        self, keys: list[tuple[AlbumId, str]]
+    ) -> dict[AlbumId, list[MediaItem]]:
+        album_id_to_file_names: dict[str, set[str]] = defaultdict(set)
+        for album_id, file_name in keys:
+            album_id_to_file_names[album_id_to_string(album_id)].add(file_name)
+
+        if len(album_id_to_file_names) == 0:
+            return {}
+
+        session = self._mongodb_sessions_provider.get_session_for_client_id(
+            self._client_id,
+        )
+        mongo_filter = {
+            '$or': [
+                {'album_id': album_id, 'file_name': {'$in': list(file_names)}}
+                for album_id, file_names in album_id_to_file_names.items()
+            ]
+        }
+
+        album_id_to_media_items: dict[AlbumId, list[MediaItem]] = defaultdict(list)
+        for raw_item in self._collection.find(filter=mongo_filter, session=session):
+            media_item = self.__parse_raw_document_to_media_item_obj(
+                self._client_id, raw_item
+            )
+            album_id_to_media_items[media_item.album_id].append(media_item)
+
+        return dict(album_id_to_media_items)
+
+    def find_media_items_by_file_hashes(
+        self, file_hashes: list[bytes]
+    ) -> dict[bytes, list[MediaItem]]:
+        if len(file_hashes) == 0:
+            return {}
+
+        session = self._mongodb_sessions_provider.get_session_for_client_id(
+            self._client_id,
+        )
+        mongo_filter = {
+            'file_hash': {'$in': [Binary(file_hash) for file_hash in set(file_hashes)]}
+        }
+
+        file_hash_to_media_items: dict[bytes, list[MediaItem]] = defaultdict(list)
+        for raw_item in self._collection.find(filter=mongo_filter, session=session):
+            media_item = self.__parse_raw_document_to_media_item_obj(
+                self._client_id, raw_item
+            )
+            file_hash_to_media_items[media_item.file_hash].append(media_item)
+
+        return dict(file_hash_to_media_items)
+
     def create_media_item(self, request: CreateMediaItemRequest) -> MediaItem:
         session = self._mongodb_sessions_provider.get_session_for_client_id(
             self._client_id,
         )
+        insert_result = self._collection.insert_one(
+            document=self.__build_document(request), session=session
+        )
+        return self.__build_media_item(request, insert_result.inserted_id)
+
+    def create_many_media_items(
+        self, requests: list[CreateMediaItemRequest]
+    ) -> list[MediaItem]:
+        if len(requests) == 0:
+            return []
+
+        session = self._mongodb_sessions_provider.get_session_for_client_id(
+            self._client_id,
+        )
+
+        # The IDs are generated on the client, so they are in the same order as
+        # the documents even if the inserts are not ordered
+        insert_result = self._collection.insert_many(
+            documents=[self.__build_document(request) for request in requests],
+            ordered=False,
+            session=session,
+        )
+
+        return [
+            self.__build_media_item(request, object_id)
+            for request, object_id in zip(requests, insert_result.inserted_ids)
+        ]
 
+    def __build_document(self, request: CreateMediaItemRequest) -> Any:
         data_object: Any = {
             "file_name": request.file_name,
             'file_hash': Binary(request.file_hash),
@@ -191,14 +332,16 @@ class MongoDBMediaItemsRepository(MediaItemsRepository):
         if request.embedding_id:
             data_object["embedding_id"] = embedding_id_to_string(request.embedding_id)
 
-        insert_result = self._collection.insert_one(
-            document=data_object, session=session
-        )
+        if request.captions is not None:
+            data_object["captions"] = request.captions
 
+        return data_object
+
+    def __build_media_item(
+        self, request: CreateMediaItemRequest, object_id: ObjectId
+    ) -> MediaItem:
         return MediaItem(
-            id=MediaItemId(
-                client_id=self._client_id, object_id=insert_result.inserted_id
-            ),
+            id=MediaItemId(client_id=self._client_id, object_id=object_id),
             file_name=request.file_name,
             file_hash=request.file_hash,
             location=request.location,
@@ -210,6 +353,7 @@ class MongoDBMediaItemsRepository(MediaItemsRepository):
             date_taken=request.date_taken,
             embedding_id=request.embedding_id,
             mime_type=request.mime_type,
+            captions=request.captions,
         )
 
     def update_many_media_items(self, requests: list[UpdateMediaItemRequest]):
@@ -249,6 +393,8 @@ class MongoDBMediaItemsRepository(MediaItemsRepository):
                 set_query['$set']['date_taken'] = request.new_date_taken
             if request.new_mime_type is not None:
                 set_query['$set']['mime_type'] = request.new_mime_type
+            if request.new_captions is not None:
+                set_query['$set']['captions'] = request.new_captions
 
             if request.clear_location:
                 set_query["$set"]['location'] = None
@@ -360,4 +506,5 @@ class MongoDBMediaItemsRepository(MediaItemsRepository):
             date_taken=date_taken,
             embedding_id=embedding_id,
             mime_type=raw_item.get("mime_type", "none"),
+            captions=raw_item.get("captions"),
         )
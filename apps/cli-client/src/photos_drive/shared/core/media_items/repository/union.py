@@ -48,6 +48,23 @@ class UnionMediaItemsRepository(MediaItemsRepository):
             raise ValueError(f"No repository found for client {id.client_id}")
         return self._client_id_to_repo[id.client_id].get_media_item_by_id(id)
 
+    def get_media_items_by_ids(
+        self, ids: list[MediaItemId]
+    ) -> dict[MediaItemId, MediaItem]:
+        ids_by_client = defaultdict(list)
+        for media_item_id in ids:
+            ids_by_client[media_item_id.client_id].append(media_item_id)
+
+        id_to_media_item: dict[MediaItemId, MediaItem] = {}
+        for client_id, client_ids in ids_by_client.items():
+            if client_id not in self._client_id_to_repo:
+                raise ValueError(f"No repository found for client {client_id}")
+            id_to_media_item.update(
+                self._client_id_to_repo[client_id].get_media_items_by_ids(client_ids)
+            )
+
+        return id_to_media_item
+
     def get_all_media_items(self) -> list[MediaItem]:
         all_items = []
         for repo in self._repositories:
@@ -65,12 +82,69 @@ class UnionMediaItemsRepository(MediaItemsRepository):
             repo.get_num_media_items_in_album(album_id) for repo in self._repositories
         )
 
+    def get_num_media_items_in_albums(
+        self, album_ids: list[AlbumId]
+    ) -> dict[AlbumId, int]:
+        album_id_to_num_media_items = {album_id: 0 for album_id in album_ids}
+        if len(album_ids) == 0:
+            return album_id_to_num_media_items
+
+        for repo in self._repositories:
+            for album_id, count in repo.get_num_media_items_in_albums(
+                album_ids
+            ).items():
+                album_id_to_num_media_items[album_id] += count
+
+        return album_id_to_num_media_items
+
+    def find_media_items_by_album_and_file_names(
+        self, keys: list[tuple[AlbumId, str]]
+    ) -> dict[AlbumId, list[MediaItem]]:
+        if len(keys) == 0:
+            return {}
+
+        album_id_to_media_items: dict[AlbumId, list[MediaItem]] = defaultdict(list)
+        for repo in self._repositories:
+            for album_id, media_items in repo.find_media_items_by_album_and_file_names(
+                keys
+            ).items():
+                album_id_to_media_items[album_id].extend(media_items)
+
+        return dict(album_id_to_media_items)
+
+    def find_media_items_by_file_hashes(
+        self, file_hashes: list[bytes]
+    ) -> dict[bytes, list[MediaItem]]:
+        if len(file_hashes) == 0:
+            return {}
+
+        file_hash_to_media_items: dict[bytes, list[MediaItem]] = defaultdict(list)
+        for repo in self._repositories:
+            for file_hash, media_items in repo.find_media_items_by_file_hashes(
+                file_hashes
+            ).items():
+                file_hash_to_media_items[file_hash].extend(media_items)
+
+        return dict(file_hash_to_media_items)
+
     def create_media_item(self, request: CreateMediaItemRequest) -> MediaItem:
         target_repo = max(
             self._repositories, key=lambda repo: repo.get_available_free_space()
         )
         return target_repo.create_media_item(request)
 
+    def create_many_media_items(
+        self, requests: list[CreateMediaItemRequest]
+    ) -> list[MediaItem]:
+        if len(requests) == 0:
+            return []
+
+        # The free space is checked once for the whole batch
+        target_repo = max(
+            self._repositories, key=lambda repo: repo.get_available_free_space()
+        )
+        return target_repo.create_many_media_items(requests)
+
     def update_many_media_items(self, requests: list[UpdateMediaItemRequest]):
         requests_by_client = defaultdict(list)
         for request in requests:
@@ -59,17 +59,33 @@ class IllegalStateException(ValueError):
         super().__init__(message)
 
 
+class UploadedPhotosPartiallyAddedError(ValueError):
+    """
+    Exception raised when only some of the uploaded photos are added to Google
+    Photos.
+
+    Attributes:
+        result (UploadedPhotosToGPhotosResult): The results of the added photos.
+    """
+
+    def __init__(self, message: str, result: UploadedPhotosToGPhotosResult):
+        super().__init__(message)
+        self.result = result
+
+
 class GPhotosMediaItemsClient:
     def __init__(self, session: AuthorizedSession):
         self._session = session
 
-    @backoff.on_exception(backoff.expo, (RequestException), max_time=60)
     def add_uploaded_photos_to_gphotos(
         self, upload_tokens: list[str], album_id: Optional[str] = None
     ) -> UploadedPhotosToGPhotosResult:
         """
         Adds a list of uploaded photos to Google Photos.
 
+        Photos that fail with a retryable code are retried on their own, so the
+        photos that were already added are not added again.
+
         Args:
             upload_tokens (list[str]): A list of upload tokens for each uploaded photo.
             album_id (str): The album ID
@@ -77,9 +93,66 @@ class GPhotosMediaItemsClient:
         Returns:
             UploadedPhotosToGPhotosResult: The results from the operation.
 
+        Raises:
+            UploadedPhotosPartiallyAddedError: If some of the photos were added but
+                the rest failed to be added. It has the results of the added photos.
         """
         logger.debug(f"Add uploaded photos {upload_tokens} to album {album_id}")
 
+        new_media_items: list[dict] = []
+        remaining_upload_tokens = upload_tokens
+
+        @backoff.on_exception(backoff.expo, (RequestException), max_time=60)
+        def add_remaining_photos():
+            nonlocal remaining_upload_tokens
+            res_json = self.__batch_create_media_items(
+                remaining_upload_tokens, album_id
+            )
+
+            failed_upload_tokens = []
+            retryable_error = None
+            non_retryable_error = None
+            for upload_token, result in zip(
+                remaining_upload_tokens, res_json["newMediaItemResults"]
+            ):
+                if result["status"]["message"] == "Success":
+                    new_media_items.append(result)
+                    continue
+
+                code = result["status"]["code"]
+                message = result["status"]["message"]
+
+                if code == 6:
+                    continue
+                elif code in DEFAULT_RETRYABLE_ERROR_CODES_FOR_UPLOADED_PHOTOS:
+                    failed_upload_tokens.append(upload_token)
+                    retryable_error = HTTPError(f"code: {code}, message: {message}")
+                else:
+                    non_retryable_error = ValueError(
+                        f"code: {code}, message: {message}"
+                    )
+
+            remaining_upload_tokens = failed_upload_tokens
+            if non_retryable_error:
+                raise non_retryable_error
+            if retryable_error:
+                raise retryable_error
+
+        try:
+            add_remaining_photos()
+        except (RequestException, ValueError) as e:
+            if len(new_media_items) == 0:
+                raise
+
+            raise UploadedPhotosPartiallyAddedError(
+                str(e), self.__to_uploaded_photos_result(new_media_items)
+            ) from e
+
+        return self.__to_uploaded_photos_result(new_media_items)
+
+    def __batch_create_media_items(
+        self, upload_tokens: list[str], album_id: Optional[str]
+    ) -> dict:
         create_body = json.dumps(
             {
                 "albumId": album_id,
@@ -99,27 +172,14 @@ class GPhotosMediaItemsClient:
             create_body,
         )
         res.raise_for_status()
-        res_json = res.json()
-
-        new_media_items = []
-        for result in res_json["newMediaItemResults"]:
-            if result["status"]["message"] == "Success":
-                new_media_items.append(result)
-            else:
-                code = result["status"]["code"]
-                message = result["status"]["message"]
+        return res.json()
 
-                if code == 6:
-                    continue
-                elif code in DEFAULT_RETRYABLE_ERROR_CODES_FOR_UPLOADED_PHOTOS:
-                    raise HTTPError(f"code: {code}, message: {message}")
-                else:
-                    raise ValueError(f"code: {code}, message: {message}")
-
-        new_res = {"newMediaItemResults": new_media_items}
+    def __to_uploaded_photos_result(
+        self, new_media_items: list[dict]
+    ) -> UploadedPhotosToGPhotosResult:
         return from_dict(
             UploadedPhotosToGPhotosResult,
-            new_res,
+            {"newMediaItemResults": new_media_items},
             config=dacite.Config(cast=[VideoProcessingStatus]),
         )
 
@@ -20,8 +20,8 @@ class FakeGPhotosMediaItemsClient(GPhotosMediaItemsClient):
     def add_uploaded_photos_to_gphotos(
         self, upload_tokens: list[str], album_id: Optional[str] = None
     ) -> UploadedPhotosToGPhotosResult:
-        if len(upload_tokens) >= 50:
-            raise ValueError("Must have less than 50 upload tokens")
+        if len(upload_tokens) > 50:
+            raise ValueError("Must have at most 50 upload tokens")
 
         return self.repository.add_uploaded_photos_to_gphotos(
             self.id, upload_tokens, album_id
@@ -0,0 +1,281 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from PIL import Image
+import numpy as np
+from typing_extensions import override
+
+from photos_drive.shared.features.llm.models.image_embeddings import ImageEmbeddings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CACHED_TEXTS = 1024
+
+DEFAULT_MAX_PERSISTED_TEXTS = 100_000
+
+# SQLite limits the number of variables in a single query
+MAX_TEXTS_PER_QUERY = 500
+
+
+@dataclass(frozen=True)
+class TextEmbeddingsCacheReport:
+    """
+    Stores the usage statistics of the text embeddings cache.
+
+    Attributes:
+        num_hits (int): The number of texts that were embedded without the model.
+        num_misses (int): The number of texts that the model had to embed.
+        num_disk_hits (int): The number of hits that were read from disk.
+        num_evictions (int): The number of texts evicted from memory.
+    """
+
+    num_hits: int
+    num_misses: int
+    num_disk_hits: int
+    num_evictions: int
+
+    @property
+    def hit_rate(self) -> float:
+        num_lookups = self.num_hits + self.num_misses
+        return self.num_hits / num_lookups if num_lookups > 0 else 0.0
+
+
+def normalize_text(text: str) -> str:
+    '''
+    Returns the cache key of a text.
+
+    CLIP lowercases its text and collapses its whitespace before tokenizing it, so
+    texts that only differ by case or whitespace have the same embedding.
+
+    Args:
+        - text (str): The text.
+
+    Returns:
+        str: The normalized text.
+    '''
+    return ' '.join(text.split()).lower()
+
+
+class CachedTextEmbeddings(ImageEmbeddings):
+    '''
+    An image embedder that caches the embeddings of texts in front of another
+    image embedder, so that repeated queries do not run the text model again.
+
+    The most recently used texts are kept in memory, and they can also be persisted
+    to a SQLite database so that they outlive the process. The returned embeddings
+    are read-only, since they share memory with the cache.
+    '''
+
+    def __init__(
+        self,
+        model: ImageEmbeddings,
+        max_size: int = DEFAULT_MAX_CACHED_TEXTS,
+        db_path: Optional[str] = None,
+        model_name: Optional[str] = None,
+        max_persisted_size: int = DEFAULT_MAX_PERSISTED_TEXTS,
+    ):
+        '''
+        Constructs an instance of {@code CachedTextEmbeddings}
+
+        Args:
+            - model (ImageEmbeddings): The image embedder to cache.
+            - max_size (int): The max. number of texts kept in memory.
+            - db_path (Optional[str]):
+                The path to a SQLite database to persist the embeddings to. If it
+                is None, embeddings are only cached in memory.
+            - model_name (Optional[str]):
+                The name of the model and its backend, such as the one returned
+                by {@code get_image_embeddings_model_id}, which separates the
+                persisted embeddings of different models. It is required when
+                db_path is set.
+            - max_persisted_size (int): The max. number of texts kept on disk.
+        '''
+        if max_size < 1:
+            raise ValueError(f"max_size must be positive, got {max_size}")
+        if db_path is not None and model_name is None:
+            raise ValueError("model_name is required when db_path is set")
+
+        self.__model = model
+        self.__max_size = max_size
+        self.__model_name = model_name
+        self.__max_persisted_size = max_persisted_size
+        self.__lock = threading.RLock()
+        self.__embeddings: OrderedDict[str, np.ndarray] = OrderedDict()
+
+        self.__num_hits = 0
+        self.__num_misses = 0
+        self.__num_disk_hits = 0
+        self.__num_evictions = 0
+
+        self.__connection: Optional[sqlite3.Connection] = None
+        if db_path is not None:
+            if os.path.dirname(db_path):
+                os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+            self.__connection = sqlite3.connect(db_path, check_same_thread=False)
+            self.__connection.execute(
+                '''
+                CREATE TABLE IF NOT EXISTS text_embeddings (
+                    model_name TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
+                    last_accessed_at REAL NOT NULL,
+                    PRIMARY KEY (model_name, text)
+                )
+                '''
+            )
+            self.__connection.commit()
+
+    @override
+    def get_embedding_dimension(self) -> int:
+        return self.__model.get_embedding_dimension()
+
+    @override
+    def embed_texts(self, texts: list[str]) -> np.ndarray:
+        keys = [normalize_text(text) for text in texts]
+
+        with self.__lock:
+            embeddings_by_key: dict[str, np.ndarray] = {}
+            for key in keys:
+                embedding = self.__embeddings.get(key)
+                if embedding is not None:
+                    self.__embeddings.move_to_end(key)
+                    embeddings_by_key[key] = embedding
+
+            missing_keys = [
+                key for key in dict.fromkeys(keys) if key not in embeddings_by_key
+            ]
+            persisted_embeddings = self.__get_persisted_embeddings(missing_keys)
+            self.__num_disk_hits += sum(keys.count(key) for key in persisted_embeddings)
+            embeddings_by_key.update(persisted_embeddings)
+
+            # Each distinct text is embedded once, even if it repeats in the call
+            uncached_keys = [
+                key for key in missing_keys if key not in embeddings_by_key
+            ]
+            if len(uncached_keys) > 0:
+                new_embeddings = self.__model.embed_texts(uncached_keys)
+                for key, embedding in zip(uncached_keys, new_embeddings):
+                    embeddings_by_key[key] = self.__to_read_only(embedding)
+                self.__persist_embeddings(
+                    {key: embeddings_by_key[key] for key in uncached_keys}
+                )
+
+            self.__num_misses += len(uncached_keys)
+            self.__num_hits += len(keys) - len(uncached_keys)
+
+            for key in list(persisted_embeddings) + uncached_keys:
+                self.__embeddings[key] = embeddings_by_key[key]
+            self.__evict_embeddings()
+
+        if len(keys) == 1:
+            return embeddings_by_key[keys[0]][np.newaxis]
+
+        if len(keys) == 0:
+            output = np.empty((0, self.get_embedding_dimension()), dtype=np.float32)
+        else:
+            output = np.stack([embeddings_by_key[key] for key in keys])
+        output.setflags(write=False)
+        return output
+
+    @override
+    def embed_images(self, images: list[Image.Image]) -> np.ndarray:
+        return self.__model.embed_images(images)
+
+    def get_report(self) -> TextEmbeddingsCacheReport:
+        '''
+        Returns the usage statistics of the cache.
+
+        Returns:
+            TextEmbeddingsCacheReport: The report.
+        '''
+        with self.__lock:
+            return TextEmbeddingsCacheReport(
+                num_hits=self.__num_hits,
+                num_misses=self.__num_misses,
+                num_disk_hits=self.__num_disk_hits,
+                num_evictions=self.__num_evictions,
+            )
+
+    def close(self):
+        '''
+        Closes the connection to the database, if there is one.
+        '''
+        with self.__lock:
+            if self.__connection is not None:
+                self.__connection.close()
+                self.__connection = None
+
+    def __get_persisted_embeddings(self, keys: list[str]) -> dict[str, np.ndarray]:
+        if self.__connection is None or len(keys) == 0:
+            return {}
+
+        embeddings = {}
+        for start in range(0, len(keys), MAX_TEXTS_PER_QUERY):
+            chunk = keys[start : start + MAX_TEXTS_PER_QUERY]
+            rows = self.__connection.execute(
+                '''
+                SELECT text, embedding FROM text_embeddings
+                WHERE model_name = ? AND text IN ({})
+                '''.format(
+                    ', '.join('?' * len(chunk))
+                ),
+                [self.__model_name, *chunk],
+            ).fetchall()
+            for text, embedding in rows:
+                embeddings[text] = self.__to_read_only(
+                    np.frombuffer(embedding, dtype=np.float32)
+                )
+
+        if len(embeddings) > 0:
+            now = time.time()
+            self.__connection.executemany(
+                '''
+                UPDATE text_embeddings SET last_accessed_at = ?
+                WHERE model_name = ? AND text = ?
+                ''',
+                [(now, self.__model_name, text) for text in embeddings],
+            )
+            self.__connection.commit()
+
+        return embeddings
+
+    def __persist_embeddings(self, embeddings: dict[str, np.ndarray]):
+        if self.__connection is None:
+            return
+
+        now = time.time()
+        self.__connection.executemany(
+            'INSERT OR REPLACE INTO text_embeddings VALUES (?, ?, ?, ?)',
+            [
+                (self.__model_name, text, embedding.astype(np.float32).tobytes(), now)
+                for text, embedding in embeddings.items()
+            ],
+        )
+        self.__connection.execute(
+            '''
+            DELETE FROM text_embeddings WHERE rowid IN (
+                SELECT rowid FROM text_embeddings
+                ORDER BY last_accessed_at DESC
+                LIMIT -1 OFFSET ?
+            )
+            ''',
+            (self.__max_persisted_size,),
+        )
+        self.__connection.commit()
+
+    def __evict_embeddings(self):
+        while len(self.__embeddings) > self.__max_size:
+            self.__embeddings.popitem(last=False)
+            self.__num_evictions += 1
+
+    def __to_read_only(self, embedding: np.ndarray) -> np.ndarray:
+        embedding = np.array(embedding, dtype=np.float32)
+        embedding.setflags(write=False)
+        return embedding
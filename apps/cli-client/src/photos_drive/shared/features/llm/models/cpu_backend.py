@@ -0,0 +1,30 @@
+from enum import Enum
+
+
+class CPUBackend(Enum):
+    """
+    The ways to run the CLIP model on a CPU.
+    """
+
+    # Runs the model in PyTorch, with its linear layers quantized to int8.
+    INT8 = "int8"
+
+    # Runs the image model in ONNX Runtime. It needs the onnx and onnxruntime
+    # packages.
+    ONNX = "onnx"
+
+
+def parse_cpu_backend(name: str) -> CPUBackend:
+    '''
+    Returns the CPU backend with a given name.
+
+    Args:
+        name (str): The name of the backend, like int8 or onnx.
+
+    Returns:
+        CPUBackend: The backend.
+    '''
+    for backend in CPUBackend:
+        if backend.value == name.lower():
+            return backend
+    raise ValueError(f"Unknown CPU embeddings backend {name}")
@@ -0,0 +1,173 @@
+import logging
+import os
+from typing import Any, Optional
+
+from PIL import Image
+import numpy as np
+import torch
+from transformers import CLIPModel, CLIPProcessor
+from typing_extensions import override
+
+from photos_drive.shared.features.llm.models.cpu_backend import CPUBackend
+from photos_drive.shared.features.llm.models.image_embeddings import ImageEmbeddings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_NAME = "openai/clip-vit-large-patch14"
+
+DEFAULT_ONNX_MODELS_DIRECTORY = os.path.join(
+    os.path.expanduser('~'), '.photos_drive', 'onnx_models'
+)
+
+ONNX_OPSET_VERSION = 17
+
+
+class CPUOptimizedCLIPImageEmbeddings(ImageEmbeddings):
+    '''
+    A CLIP image embedder that is optimized for hosts without a GPU.
+
+    It produces embeddings in the same space as {@code OpenCLIPImageEmbeddings}
+    for the same model, within a small numerical deviation.
+    '''
+
+    def __init__(
+        self,
+        backend: CPUBackend = CPUBackend.INT8,
+        model_name: str = DEFAULT_MODEL_NAME,
+        num_threads: Optional[int] = None,
+        onnx_models_directory: str = DEFAULT_ONNX_MODELS_DIRECTORY,
+    ):
+        '''
+        Constructs an instance of {@code CPUOptimizedCLIPImageEmbeddings}
+
+        Args:
+            - backend (CPUBackend): How to run the model.
+            - model_name (str): The name of the CLIP model on Hugging Face.
+            - num_threads (Optional[int]):
+                The number of threads used within each operation. Defaults to the
+                number of cores.
+            - onnx_models_directory (str):
+                Where the exported ONNX models are saved, so that they are only
+                exported once.
+        '''
+        self.backend = backend
+        self.num_threads = num_threads or os.cpu_count() or 1
+        torch.set_num_threads(self.num_threads)
+
+        model = CLIPModel.from_pretrained(
+            model_name,
+            trust_remote_code=True,
+            use_safetensors=True,
+            torch_dtype=torch.float32,
+            # The ONNX exporter cannot translate the fused attention kernel
+            attn_implementation="eager" if backend == CPUBackend.ONNX else None,
+        ).eval()
+        self.processor = CLIPProcessor.from_pretrained(model_name)
+        self.embedding_dimension = model.config.projection_dim
+
+        if backend == CPUBackend.INT8:
+            self.model = torch.ao.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+            self.onnx_session = None
+        elif backend == CPUBackend.ONNX:
+            self.__check_onnx_is_installed()
+
+            # Texts are only embedded for searches, so they stay in PyTorch
+            self.model = model
+            onnx_model_path = os.path.join(
+                onnx_models_directory, f"{model_name.replace('/', '--')}.onnx"
+            )
+            if not os.path.exists(onnx_model_path):
+                self.__export_image_model_to_onnx(model, onnx_model_path)
+            self.onnx_session = self.__create_onnx_session(onnx_model_path)
+        else:
+            raise ValueError(f"Unknown backend {backend}")
+
+    @override
+    def get_embedding_dimension(self) -> int:
+        return self.embedding_dimension
+
+    @override
+    def embed_texts(self, texts: list[str]) -> np.ndarray:
+        inputs = self.processor(text=texts, return_tensors="pt", padding=True)
+        with torch.no_grad():
+            embeddings = self.model.get_text_features(**inputs)
+        return self.__normalize(embeddings.numpy())
+
+    @override
+    def embed_images(self, images: list[Image.Image]) -> np.ndarray:
+        inputs = self.processor(images=images, return_tensors="pt")
+
+        if self.onnx_session is not None:
+            embeddings = self.onnx_session.run(
+                ["image_embeds"], {"pixel_values": inputs["pixel_values"].numpy()}
+            )[0]
+        else:
+            with torch.no_grad():
+                embeddings = self.model.get_image_features(**inputs).numpy()
+
+        return self.__normalize(embeddings)
+
+    def __normalize(self, embeddings: np.ndarray) -> np.ndarray:
+        embeddings = embeddings.astype(np.float32)
+        return embeddings / np.linalg.norm(embeddings, ord=2, axis=-1, keepdims=True)
+
+    def __export_image_model_to_onnx(self, model: CLIPModel, onnx_model_path: str):
+        logger.info(f"Exporting the image model to {onnx_model_path}")
+        os.makedirs(os.path.dirname(onnx_model_path), exist_ok=True)
+
+        image_size = model.config.vision_config.image_size
+        dummy_pixel_values = torch.zeros((1, 3, image_size, image_size))
+
+        # Exports to a temporary file first so a failed export is never reused
+        temp_onnx_model_path = f"{onnx_model_path}.tmp"
+        with torch.no_grad():
+            torch.onnx.export(
+                _CLIPImageFeatures(model),
+                (dummy_pixel_values,),
+                temp_onnx_model_path,
+                input_names=["pixel_values"],
+                output_names=["image_embeds"],
+                dynamic_axes={
+                    "pixel_values": {0: "batch_size"},
+                    "image_embeds": {0: "batch_size"},
+                },
+                opset_version=ONNX_OPSET_VERSION,
+            )
+        os.replace(temp_onnx_model_path, onnx_model_path)
+
+    def __check_onnx_is_installed(self):
+        try:
+            import onnx  # noqa: F401
+            import onnxruntime  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                "The onnx backend needs onnx and onnxruntime. "
+                + "Install them with 'pip install onnx onnxruntime'."
+            ) from e
+
+    def __create_onnx_session(self, onnx_model_path: str) -> Any:
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = self.num_threads
+        options.graph_optimization_level = (
+            onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+        return onnxruntime.InferenceSession(
+            onnx_model_path, options, providers=["CPUExecutionProvider"]
+        )
+
+
+class _CLIPImageFeatures(torch.nn.Module):
+    '''
+    Wraps the image tower of a CLIP model so that it can be exported to ONNX.
+    '''
+
+    def __init__(self, model: CLIPModel):
+        super().__init__()
+        self.model = model
+
+    def forward(self, pixel_values: torch.Tensor) -> torch.Tensor:
+        return self.model.get_image_features(pixel_values=pixel_values)
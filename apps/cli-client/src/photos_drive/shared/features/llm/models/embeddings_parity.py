@@ -0,0 +1,150 @@
+from dataclasses import dataclass
+import os
+import time
+
+from PIL import Image
+import numpy as np
+import typer
+from typing_extensions import Annotated
+
+from photos_drive.shared.features.llm.models.image_embeddings import ImageEmbeddings
+
+
+@dataclass(frozen=True)
+class EmbeddingsParityReport:
+    """
+    Compares the speed and the output of an image embedder against a reference
+    image embedder.
+
+    Attributes:
+        num_images (int): The number of images embedded by each embedder.
+        reference_images_per_second (float): The throughput of the reference.
+        candidate_images_per_second (float): The throughput of the candidate.
+        mean_cosine_deviation (float): The mean of 1 - cosine similarity between
+            the reference and the candidate embeddings of each image.
+        max_cosine_deviation (float): The max. of 1 - cosine similarity between
+            the reference and the candidate embeddings of each image.
+    """
+
+    num_images: int
+    reference_images_per_second: float
+    candidate_images_per_second: float
+    mean_cosine_deviation: float
+    max_cosine_deviation: float
+
+
+def compare_image_embeddings(
+    reference: ImageEmbeddings,
+    candidate: ImageEmbeddings,
+    images: list[Image.Image],
+    batch_size: int = 16,
+) -> EmbeddingsParityReport:
+    '''
+    Embeds the same images with both embedders, and compares their throughput and
+    their embeddings.
+
+    Args:
+        - reference (ImageEmbeddings): The embedder to compare against.
+        - candidate (ImageEmbeddings): The embedder being measured.
+        - images (list[Image.Image]): The images to embed.
+        - batch_size (int): The number of images to embed at a time.
+
+    Returns:
+        EmbeddingsParityReport: The report.
+    '''
+    if len(images) == 0:
+        raise ValueError("Need at least one image to compare")
+
+    reference_embeddings, reference_elapsed_time = __embed_images(
+        reference, images, batch_size
+    )
+    candidate_embeddings, candidate_elapsed_time = __embed_images(
+        candidate, images, batch_size
+    )
+
+    cosine_similarities = np.sum(
+        __normalize(reference_embeddings) * __normalize(candidate_embeddings), axis=1
+    )
+    cosine_deviations = 1 - cosine_similarities
+
+    return EmbeddingsParityReport(
+        num_images=len(images),
+        reference_images_per_second=len(images) / reference_elapsed_time,
+        candidate_images_per_second=len(images) / candidate_elapsed_time,
+        mean_cosine_deviation=float(np.mean(cosine_deviations)),
+        max_cosine_deviation=float(np.max(cosine_deviations)),
+    )
+
+
+def __embed_images(
+    embedder: ImageEmbeddings, images: list[Image.Image], batch_size: int
+) -> tuple[np.ndarray, float]:
+    start_time = time.perf_counter()
+    embeddings = np.vstack(
+        [
+            embedder.embed_images(images[start : start + batch_size])
+            for start in range(0, len(images), batch_size)
+        ]
+    )
+    return embeddings, max(time.perf_counter() - start_time, 1e-9)
+
+
+def __normalize(embeddings: np.ndarray) -> np.ndarray:
+    embeddings = embeddings.astype(np.float32)
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+app = typer.Typer()
+
+
+@app.command()
+def benchmark(
+    images_dir: str,
+    backend: Annotated[
+        str,
+        typer.Option("--backend", help="The CPU backend to compare: int8 or onnx"),
+    ] = "int8",
+    num_threads: Annotated[
+        int | None,
+        typer.Option("--num-threads", help="The number of threads per operation"),
+    ] = None,
+    batch_size: Annotated[
+        int,
+        typer.Option("--batch-size", help="The number of images to embed at a time"),
+    ] = 16,
+):
+    '''
+    Compares a CPU backend against OpenCLIPImageEmbeddings on a folder of images.
+    '''
+    from photos_drive.shared.features.llm.models.cpu_clip_image_embeddings import (
+        CPUBackend,
+        CPUOptimizedCLIPImageEmbeddings,
+    )
+    from photos_drive.shared.features.llm.models.open_clip_image_embeddings import (
+        OpenCLIPImageEmbeddings,
+    )
+
+    images = []
+    for file_name in sorted(os.listdir(images_dir)):
+        try:
+            with Image.open(os.path.join(images_dir, file_name)) as image:
+                images.append(image.convert("RGB"))
+        except Exception:
+            continue
+
+    report = compare_image_embeddings(
+        OpenCLIPImageEmbeddings(device="cpu"),
+        CPUOptimizedCLIPImageEmbeddings(CPUBackend(backend), num_threads=num_threads),
+        images,
+        batch_size,
+    )
+
+    print(f"Images: {report.num_images}")
+    print(f"Reference: {report.reference_images_per_second:.2f} images/s")
+    print(f"Candidate ({backend}): {report.candidate_images_per_second:.2f} images/s")
+    print(f"Mean cosine deviation: {report.mean_cosine_deviation:.6f}")
+    print(f"Max cosine deviation: {report.max_cosine_deviation:.6f}")
+
+
+if __name__ == '__main__':
+    app()
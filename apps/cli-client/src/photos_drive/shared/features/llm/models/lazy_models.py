@@ -0,0 +1,245 @@
+import functools
+import logging
+import os
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+from PIL import Image
+import numpy as np
+from typing_extensions import override
+
+from photos_drive.shared.features.llm.models.cpu_backend import CPUBackend
+from photos_drive.shared.features.llm.models.image_captions import ImageCaptions
+from photos_drive.shared.features.llm.models.image_embeddings import ImageEmbeddings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# The CLIP model behind every image embedder
+CLIP_MODEL_NAME = "openai/clip-vit-large-patch14"
+
+
+class _LazyModel(Generic[T]):
+    '''
+    Holds a model that is only created the first time it is needed.
+    '''
+
+    def __init__(self, create_model: Callable[[], T]):
+        self.__create_model = create_model
+        self.__model: Optional[T] = None
+        self.__lock = threading.Lock()
+
+    def is_loaded(self) -> bool:
+        return self.__model is not None
+
+    def get(self) -> T:
+        if self.__model is None:
+            with self.__lock:
+                if self.__model is None:
+                    start_time = time.time()
+                    self.__model = self.__create_model()
+                    logger.debug(
+                        f"Loaded {type(self.__model).__name__} in "
+                        + f"{time.time() - start_time:.2f} seconds"
+                    )
+        return self.__model
+
+
+class LazyImageEmbeddings(ImageEmbeddings):
+    '''
+    An image embedder that only loads the underlying model the first time it is
+    used, so that commands that never embed anything do not pay for loading it.
+    '''
+
+    def __init__(self, create_model: Callable[[], ImageEmbeddings]):
+        '''
+        Constructs an instance of {@code LazyImageEmbeddings}
+
+        Args:
+            - create_model (Callable[[], ImageEmbeddings]):
+                Creates the underlying image embedder.
+        '''
+        self.__model = _LazyModel(create_model)
+
+    def is_loaded(self) -> bool:
+        '''
+        Returns whether the underlying model was loaded or not.
+
+        Returns:
+            bool: True if it was loaded; else False.
+        '''
+        return self.__model.is_loaded()
+
+    @override
+    def get_embedding_dimension(self) -> int:
+        return self.__model.get().get_embedding_dimension()
+
+    @override
+    def embed_texts(self, texts: list[str]) -> np.ndarray:
+        return self.__model.get().embed_texts(texts)
+
+    @override
+    def embed_images(self, images: list[Image.Image]) -> np.ndarray:
+        return self.__model.get().embed_images(images)
+
+
+class LazyImageCaptions(ImageCaptions):
+    '''
+    An image captions generator that only loads the underlying model the first time
+    it is used.
+    '''
+
+    def __init__(self, create_model: Callable[[], ImageCaptions]):
+        '''
+        Constructs an instance of {@code LazyImageCaptions}
+
+        Args:
+            - create_model (Callable[[], ImageCaptions]):
+                Creates the underlying image captions generator.
+        '''
+        self.__model = _LazyModel(create_model)
+
+    def is_loaded(self) -> bool:
+        '''
+        Returns whether the underlying model was loaded or not.
+
+        Returns:
+            bool: True if it was loaded; else False.
+        '''
+        return self.__model.is_loaded()
+
+    @override
+    def generate_caption(self, images: list[Image.Image]) -> list[str]:
+        return self.__model.get().generate_caption(images)
+
+
+def get_image_embeddings_model_id(cpu_backend: Optional[CPUBackend] = None) -> str:
+    '''
+    Returns the ID of the model that the image embedders with a CPU backend run,
+    so that embeddings from different models or backends are not mixed up.
+
+    Args:
+        - cpu_backend (Optional[CPUBackend]):
+            The CPU backend of the image embedder, or None for OpenCLIP.
+
+    Returns:
+        str: The model ID, like openai/clip-vit-large-patch14:int8.
+    '''
+    if cpu_backend is None:
+        return CLIP_MODEL_NAME
+    return f"{CLIP_MODEL_NAME}:{cpu_backend.value}"
+
+
+def create_lazy_open_clip_image_embeddings() -> LazyImageEmbeddings:
+    '''
+    Returns an OpenCLIP image embedder that is loaded on its first use.
+
+    Returns:
+        LazyImageEmbeddings: The image embedder.
+    '''
+    return LazyImageEmbeddings(_create_open_clip_image_embeddings)
+
+
+def create_lazy_cpu_optimized_clip_image_embeddings(
+    backend: CPUBackend, num_threads: Optional[int] = None
+) -> LazyImageEmbeddings:
+    '''
+    Returns a CLIP image embedder that is optimized for CPUs, and is loaded on its
+    first use.
+
+    Args:
+        - backend (CPUBackend): The CPU backend.
+        - num_threads (Optional[int]): The number of threads per operation.
+
+    Returns:
+        LazyImageEmbeddings: The image embedder.
+    '''
+    return LazyImageEmbeddings(
+        functools.partial(
+            _create_cpu_optimized_clip_image_embeddings, backend, num_threads
+        )
+    )
+
+
+def create_lazy_multi_process_image_embeddings(
+    num_workers: int, cpu_backend: Optional[CPUBackend] = None
+) -> LazyImageEmbeddings:
+    '''
+    Returns an image embedder that runs a CLIP model in each of many worker
+    processes, and starts the workers on its first use.
+
+    Args:
+        - num_workers (int): The number of worker processes.
+        - cpu_backend (Optional[CPUBackend]):
+            The CPU backend of each worker. Defaults to OpenCLIP.
+
+    Returns:
+        LazyImageEmbeddings: The image embedder.
+    '''
+    num_threads_per_worker = max(1, (os.cpu_count() or 1) // max(num_workers, 1))
+
+    # The workers are spawned, so their models must be created by picklable
+    # top-level functions rather than closures
+    create_worker_model: Callable[[], ImageEmbeddings] = (
+        functools.partial(
+            _create_cpu_optimized_clip_image_embeddings,
+            cpu_backend,
+            num_threads_per_worker,
+        )
+        if cpu_backend
+        else _create_open_clip_image_embeddings
+    )
+
+    def create_model() -> ImageEmbeddings:
+        from photos_drive.shared.features.llm.models.multi_process_embeddings import (
+            MultiProcessImageEmbeddings,
+        )
+
+        return MultiProcessImageEmbeddings(
+            create_worker_model, num_workers, num_threads_per_worker
+        )
+
+    return LazyImageEmbeddings(create_model)
+
+
+def _create_open_clip_image_embeddings() -> ImageEmbeddings:
+    # Imported here since importing torch alone takes seconds
+    from photos_drive.shared.features.llm.models.open_clip_image_embeddings import (
+        OpenCLIPImageEmbeddings,
+    )
+
+    return OpenCLIPImageEmbeddings(CLIP_MODEL_NAME)
+
+
+def _create_cpu_optimized_clip_image_embeddings(
+    backend: CPUBackend, num_threads: Optional[int]
+) -> ImageEmbeddings:
+    # Imported here since importing torch alone takes seconds
+    from photos_drive.shared.features.llm.models.cpu_clip_image_embeddings import (
+        CPUOptimizedCLIPImageEmbeddings,
+    )
+
+    return CPUOptimizedCLIPImageEmbeddings(
+        backend, model_name=CLIP_MODEL_NAME, num_threads=num_threads
+    )
+
+
+def create_lazy_blip_image_captions() -> LazyImageCaptions:
+    '''
+    Returns a BLIP image captions generator that is loaded on its first use.
+
+    Returns:
+        LazyImageCaptions: The image captions generator.
+    '''
+
+    def create_model() -> ImageCaptions:
+        # Imported here since importing torch alone takes seconds
+        from photos_drive.shared.features.llm.models.blip_image_captions import (
+            BlipImageCaptions,
+        )
+
+        return BlipImageCaptions()
+
+    return LazyImageCaptions(create_model)
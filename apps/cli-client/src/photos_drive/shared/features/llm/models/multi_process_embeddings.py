@@ -0,0 +1,290 @@
+import logging
+import math
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+import os
+import queue
+import sys
+import threading
+import traceback
+from typing import Any, Callable, Optional
+import weakref
+
+from PIL import Image
+import numpy as np
+from typing_extensions import override
+
+from photos_drive.shared.features.llm.models.image_embeddings import ImageEmbeddings
+
+logger = logging.getLogger(__name__)
+
+# The kinds of inputs that a worker can embed
+_TEXTS = 'texts'
+_IMAGES = 'images'
+
+# How often to check that the workers are still alive while waiting on them
+_WORKER_POLL_INTERVAL_IN_SECONDS = 1.0
+
+# How long to wait for a worker to exit before killing it
+_WORKER_SHUTDOWN_TIMEOUT_IN_SECONDS = 10.0
+
+
+class MultiProcessImageEmbeddings(ImageEmbeddings):
+    '''
+    An image embedder that spreads its work over many worker processes, where each
+    worker holds its own model and runs it with a fixed number of threads.
+
+    Each call is split into one chunk per worker, and the chunks are handed out
+    round-robin. The workers write their embeddings into shared memory instead of
+    sending them back through a pipe, so they are never pickled.
+    '''
+
+    def __init__(
+        self,
+        create_model: Callable[[], ImageEmbeddings],
+        num_workers: int,
+        num_threads_per_worker: Optional[int] = None,
+    ):
+        '''
+        Constructs an instance of {@code MultiProcessImageEmbeddings}, and waits
+        until every worker has loaded its model.
+
+        Args:
+            - create_model (Callable[[], ImageEmbeddings]):
+                Creates the model of a worker. It must be picklable, like a
+                top-level function or a partial of one.
+            - num_workers (int): The number of worker processes.
+            - num_threads_per_worker (Optional[int]):
+                The number of threads of each worker. Defaults to splitting the
+                CPUs evenly between the workers.
+        '''
+        if num_workers < 1:
+            raise ValueError(f"num_workers must be positive, got {num_workers}")
+
+        self.__num_workers = num_workers
+        self.__num_threads_per_worker = num_threads_per_worker or max(
+            1, (os.cpu_count() or 1) // num_workers
+        )
+        self.__lock = threading.Lock()
+        self.__next_worker_index = 0
+        self.__next_task_id = 0
+
+        # Torch is not fork-safe once its thread pools are started
+        context = multiprocessing.get_context('spawn')
+        self.__result_queue: Any = context.Queue()
+        self.__task_queues: list[Any] = []
+        self.__processes: list[Any] = []
+        self.__buffers: list[Optional[SharedMemory]] = [None] * num_workers
+        self.__finalizer = weakref.finalize(
+            self,
+            _shut_down_workers,
+            self.__processes,
+            self.__task_queues,
+            self.__buffers,
+        )
+
+        for worker_index in range(num_workers):
+            task_queue = context.Queue()
+            process = context.Process(
+                target=_run_worker,
+                args=(
+                    create_model,
+                    self.__num_threads_per_worker,
+                    worker_index,
+                    task_queue,
+                    self.__result_queue,
+                ),
+                daemon=True,
+            )
+            process.start()
+            self.__task_queues.append(task_queue)
+            self.__processes.append(process)
+
+        dimensions = set()
+        try:
+            for _ in range(num_workers):
+                status, _, payload = self.__get_result()
+                if status != 'ready':
+                    raise RuntimeError(f"Failed to load a worker's model:\n{payload}")
+                dimensions.add(payload)
+        except BaseException:
+            self.close()
+            raise
+
+        if len(dimensions) != 1:
+            self.close()
+            raise RuntimeError(f"Workers have different dimensions: {dimensions}")
+        self.__dimension: int = dimensions.pop()
+
+        logger.debug(
+            f"Started {num_workers} embedding workers with "
+            + f"{self.__num_threads_per_worker} threads each"
+        )
+
+    def close(self):
+        '''
+        Stops the worker processes and frees their shared memory.
+        '''
+        self.__finalizer()
+
+    @override
+    def get_embedding_dimension(self) -> int:
+        return self.__dimension
+
+    @override
+    def embed_texts(self, texts: list[str]) -> np.ndarray:
+        return self.__embed(_TEXTS, texts)
+
+    @override
+    def embed_images(self, images: list[Image.Image]) -> np.ndarray:
+        return self.__embed(_IMAGES, images)
+
+    def __embed(self, kind: str, inputs: list) -> np.ndarray:
+        embeddings = np.empty((len(inputs), self.__dimension), dtype=np.float32)
+        if len(inputs) == 0:
+            return embeddings
+
+        with self.__lock:
+            num_chunks = min(self.__num_workers, len(inputs))
+            chunk_size = math.ceil(len(inputs) / num_chunks)
+
+            # Maps the ID of each task to its shared memory and its rows in the output
+            pending_tasks: dict[int, tuple[SharedMemory, int, int]] = {}
+            for start in range(0, len(inputs), chunk_size):
+                end = min(start + chunk_size, len(inputs))
+                worker_index = self.__next_worker_index
+                self.__next_worker_index = (worker_index + 1) % self.__num_workers
+
+                buffer = self.__get_buffer(worker_index, end - start)
+                task_id = self.__next_task_id
+                self.__next_task_id += 1
+
+                self.__task_queues[worker_index].put(
+                    (task_id, kind, inputs[start:end], buffer.name)
+                )
+                pending_tasks[task_id] = (buffer, start, end)
+
+            errors = []
+            while pending_tasks:
+                status, task_id, payload = self.__get_result()
+
+                # Results of tasks from a previous call that failed midway
+                if task_id not in pending_tasks:
+                    continue
+
+                buffer, start, end = pending_tasks.pop(task_id)
+                if status != 'done':
+                    errors.append(payload)
+                    continue
+
+                embeddings[start:end] = np.ndarray(
+                    (end - start, self.__dimension), dtype=np.float32, buffer=buffer.buf
+                )
+
+            if len(errors) > 0:
+                raise RuntimeError(f"Failed to embed {kind}:\n" + "\n".join(errors))
+
+        return embeddings
+
+    def __get_buffer(self, worker_index: int, num_rows: int) -> SharedMemory:
+        '''
+        Returns the shared memory that a worker writes its embeddings into, and
+        replaces it with a bigger one if it cannot hold {@code num_rows} rows.
+        '''
+        num_bytes = num_rows * self.__dimension * np.dtype(np.float32).itemsize
+        buffer = self.__buffers[worker_index]
+        if buffer is not None and buffer.size >= num_bytes:
+            return buffer
+
+        if buffer is not None:
+            buffer.close()
+            buffer.unlink()
+
+        # Grows in powers of two so that batches that slowly grow do not
+        # reallocate on every call
+        capacity = 1 << max(num_bytes - 1, 1).bit_length()
+        new_buffer = SharedMemory(create=True, size=capacity)
+        self.__buffers[worker_index] = new_buffer
+        return new_buffer
+
+    def __get_result(self) -> tuple[str, int, Any]:
+        while True:
+            try:
+                return self.__result_queue.get(timeout=_WORKER_POLL_INTERVAL_IN_SECONDS)
+            except queue.Empty:
+                for worker_index, process in enumerate(self.__processes):
+                    if not process.is_alive():
+                        raise RuntimeError(
+                            f"Embedding worker {worker_index} exited with code "
+                            + f"{process.exitcode}"
+                        )
+
+
+def _run_worker(
+    create_model: Callable[[], ImageEmbeddings],
+    num_threads: int,
+    worker_index: int,
+    task_queue: Any,
+    result_queue: Any,
+):
+    # Libraries read these when they are imported, so it is set before the model
+    for env_var in ['OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS']:
+        os.environ[env_var] = str(num_threads)
+
+    try:
+        model = create_model()
+        if 'torch' in sys.modules:
+            sys.modules['torch'].set_num_threads(num_threads)
+    except Exception:
+        result_queue.put(('error', worker_index, traceback.format_exc()))
+        return
+    result_queue.put(('ready', worker_index, model.get_embedding_dimension()))
+
+    buffer: Optional[SharedMemory] = None
+    try:
+        while (task := task_queue.get()) is not None:
+            task_id, kind, inputs, buffer_name = task
+            try:
+                if kind == _IMAGES:
+                    embeddings = model.embed_images(inputs)
+                else:
+                    embeddings = model.embed_texts(inputs)
+
+                if buffer is None or buffer.name != buffer_name:
+                    if buffer is not None:
+                        buffer.close()
+                    buffer = SharedMemory(name=buffer_name)
+
+                output: np.ndarray = np.ndarray(
+                    embeddings.shape, dtype=np.float32, buffer=buffer.buf
+                )
+                output[:] = embeddings
+                del output
+                result_queue.put(('done', task_id, None))
+            except Exception:
+                result_queue.put(('error', task_id, traceback.format_exc()))
+    finally:
+        if buffer is not None:
+            buffer.close()
+
+
+def _shut_down_workers(
+    processes: list[Any],
+    task_queues: list[Any],
+    buffers: list[Optional[SharedMemory]],
+):
+    for process, task_queue in zip(processes, task_queues):
+        if process.is_alive():
+            task_queue.put(None)
+
+    for process in processes:
+        process.join(timeout=_WORKER_SHUTDOWN_TIMEOUT_IN_SECONDS)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+
+    for i, buffer in enumerate(buffers):
+        if buffer is not None:
+            buffer.close()
+            buffer.unlink()
+            buffers[i] = None
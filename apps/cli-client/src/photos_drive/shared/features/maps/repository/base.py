@@ -35,6 +35,18 @@ class MapCellsRepository(ABC):
         Adds a media item to the cells repository.
         '''
 
+    @abstractmethod
+    def add_many_media_items(self, media_items: list[MediaItem]):
+        '''
+        Adds a list of media items to the cells repository.
+
+        Args:
+            media_items (list[MediaItem]): The media items to add.
+
+        Raises:
+            ValueError: If a media item has no gps location.
+        '''
+
     @abstractmethod
     def remove_media_item(self, media_item_id: MediaItemId):
         '''
@@ -48,6 +48,26 @@ class MongoDBMapCellsRepository(MapCellsRepository):
         return get_free_space(self._mongodb_client)
 
     def add_media_item(self, media_item: MediaItem):
+        self.add_many_media_items([media_item])
+
+    def add_many_media_items(self, media_items: list[MediaItem]):
+        docs = []
+        for media_item in media_items:
+            docs.extend(self.__build_docs(media_item))
+
+        if len(docs) == 0:
+            return
+
+        session = self._mongodb_sessions_provider.get_session_for_client_id(
+            self._client_id,
+        )
+        self._mongodb_client["photos_drive"]["map_cells"].insert_many(
+            docs,
+            ordered=False,
+            session=session,
+        )
+
+    def __build_docs(self, media_item: MediaItem) -> list[dict]:
         if not media_item.location:
             raise ValueError(f"No gps location for media item {media_item}")
 
@@ -61,11 +81,7 @@ class MongoDBMapCellsRepository(MapCellsRepository):
             for res in range(0, MAX_CELL_RESOLUTION + 1)
         )
 
-        session = self._mongodb_sessions_provider.get_session_for_client_id(
-            self._client_id,
-        )
-
-        docs = [
+        return [
             {
                 "cell_id": cid,
                 "album_id": album_id_to_string(media_item.album_id),
@@ -74,11 +90,6 @@ class MongoDBMapCellsRepository(MapCellsRepository):
             for cid in cell_ids
         ]
 
-        self._mongodb_client["photos_drive"]["map_cells"].insert_many(
-            docs,
-            session=session,
-        )
-
     def remove_media_item(self, media_item_id: MediaItemId):
         session = self._mongodb_sessions_provider.get_session_for_client_id(
             self._client_id,
@@ -45,6 +45,20 @@ class UnionMapCellsRepository(MapCellsRepository):
         )
         target_repo.add_media_item(media_item)
 
+    def add_many_media_items(self, media_items: list[MediaItem]):
+        for media_item in media_items:
+            if not media_item.location:
+                raise ValueError(f"No gps location for media item {media_item}")
+
+        if len(media_items) == 0:
+            return
+
+        # The free space is checked once for the whole batch
+        target_repo = max(
+            self._repositories, key=lambda repo: repo.get_available_free_space()
+        )
+        target_repo.add_many_media_items(media_items)
+
     def remove_media_item(self, media_item_id: MediaItemId):
         for repo in self._repositories:
             repo.remove_media_item(media_item_id)
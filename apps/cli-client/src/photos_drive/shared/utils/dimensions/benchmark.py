@@ -0,0 +1,100 @@
+from dataclasses import dataclass
+import os
+import time
+from typing import Callable
+
+import typer
+
+from photos_drive.shared.utils.dimensions.cv2_video_dimensions import (
+    get_width_height_of_video,
+)
+from photos_drive.shared.utils.dimensions.header_probe import probe_media
+from photos_drive.shared.utils.dimensions.pillow_image_dimensions import (
+    get_width_height_of_image,
+)
+from photos_drive.shared.utils.mime_type.utils import get_mime_type, is_image
+
+
+@dataclass(frozen=True)
+class ProbingBenchmarkResult:
+    """
+    Stores the throughput of one way of reading the mime type and dimensions of a
+    set of files.
+
+    Attributes:
+        name (str): The name of the method.
+        num_files (int): The number of files read.
+        elapsed_time (float): The time taken to read all of the files, in seconds.
+    """
+
+    name: str
+    num_files: int
+    elapsed_time: float
+
+
+def benchmark_media_probing(file_paths: list[str]) -> list[ProbingBenchmarkResult]:
+    '''
+    Reads the mime type, width and height of the same files with libmagic and
+    Pillow / OpenCV, and with {@code probe_media}, and measures the throughput of
+    each.
+
+    Args:
+        - file_paths (list[str]): The images and videos to read.
+
+    Returns:
+        list[ProbingBenchmarkResult]: The results of each method.
+    '''
+    methods: list[tuple[str, Callable[[str], object]]] = [
+        ('libmagic + pillow / cv2', __read_with_existing_utils),
+        ('header probe', probe_media),
+    ]
+
+    results = []
+    for name, read_file in methods:
+        start_time = time.perf_counter()
+        for file_path in file_paths:
+            read_file(file_path)
+        results.append(
+            ProbingBenchmarkResult(
+                name=name,
+                num_files=len(file_paths),
+                elapsed_time=max(time.perf_counter() - start_time, 1e-9),
+            )
+        )
+
+    return results
+
+
+def __read_with_existing_utils(file_path: str) -> tuple[str, int, int]:
+    mime_type = get_mime_type(file_path)
+    if is_image(mime_type):
+        return mime_type, *get_width_height_of_image(file_path)
+    return mime_type, *get_width_height_of_video(file_path)
+
+
+app = typer.Typer()
+
+
+@app.command()
+def benchmark(dir_path: str):
+    '''
+    Compares the throughput of the ways to read the dimensions of the images and
+    videos in a folder.
+    '''
+    file_paths = []
+    for root, _, file_names in os.walk(dir_path):
+        for file_name in file_names:
+            file_path = os.path.join(root, file_name)
+            if probe_media(file_path) is not None:
+                file_paths.append(file_path)
+
+    for result in benchmark_media_probing(file_paths):
+        print(
+            f"{result.name}: {result.num_files} files in "
+            + f"{result.elapsed_time:.3f}s "
+            + f"({result.num_files / result.elapsed_time:.0f} files/s)"
+        )
+
+
+if __name__ == '__main__':
+    app()
@@ -0,0 +1,435 @@
+from dataclasses import dataclass
+from io import BytesIO
+import logging
+import re
+import struct
+from typing import BinaryIO, Generator, Optional
+
+logger = logging.getLogger(__name__)
+
+# EXIF orientations that rotate the image by 90 or 270 degrees
+TRANSPOSED_EXIF_ORIENTATIONS = (5, 6, 7, 8)
+
+# The JPEG markers of frames that hold the width and height of the image
+JPEG_SOF_MARKERS = frozenset(
+    [0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF]
+)
+
+# JPEG markers that are not followed by a segment length
+JPEG_STANDALONE_MARKERS = frozenset([0x01, 0xD8] + list(range(0xD0, 0xD8)))
+
+EXIF_ORIENTATION_TAG = 0x0112
+
+XMP_ORIENTATION_PATTERN = re.compile(rb'tiff:Orientation(?:>|=")(\d)')
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Maps the brands in the ftyp box of HEIF files to their mime types
+HEIF_BRANDS_TO_MIME_TYPES = {
+    b'heic': 'image/heic',
+    b'heix': 'image/heic',
+    b'heim': 'image/heic',
+    b'heis': 'image/heic',
+    b'mif1': 'image/heif',
+    b'msf1': 'image/heif',
+    b'avif': 'image/avif',
+}
+
+# Maps the brands in the ftyp box of MP4 / MOV files to their mime types, if they
+# are not video/mp4
+VIDEO_BRANDS_TO_MIME_TYPES = {
+    b'qt  ': 'video/quicktime',
+    b'M4V ': 'video/x-m4v',
+    b'M4VH': 'video/x-m4v',
+    b'M4VP': 'video/x-m4v',
+    b'3gp4': 'video/3gpp',
+    b'3gp5': 'video/3gpp',
+    b'3gp6': 'video/3gpp',
+    b'3g2a': 'video/3gpp2',
+}
+
+
+@dataclass(frozen=True)
+class ProbedMedia:
+    """
+    Represents the metadata of an image / video read from its container headers.
+
+    Attributes:
+        mime_type (str): The mime type.
+        width (int): The width, after applying its rotation.
+        height (int): The height, after applying its rotation.
+    """
+
+    mime_type: str
+    width: int
+    height: int
+
+
+def probe_media(file_path: str) -> Optional[ProbedMedia]:
+    '''
+    Reads the mime type, width and height of an image / video from its container
+    headers, without decoding it.
+
+    It supports JPEG, PNG, HEIF, MP4 / MOV and AVI files. Only the headers are
+    read, seeking past everything else.
+
+    Args:
+        file_path (str): The path to the file.
+
+    Returns:
+        Optional[ProbedMedia]: The metadata, or None if the format is not
+            supported or its headers could not be parsed.
+    '''
+    with open(file_path, 'rb') as file:
+        return __probe(file, file_path)
+
+
+def probe_media_from_file(file: BinaryIO, name: str) -> Optional[ProbedMedia]:
+    '''
+    Same as {@code probe_media}, except that it reads the file from a file object
+    that is already open.
+
+    Args:
+        file (BinaryIO): The file object. It needs to be seekable.
+        name (str): The name of the file, for logging.
+
+    Returns:
+        Optional[ProbedMedia]: The metadata, or None if the format is not
+            supported or its headers could not be parsed.
+    '''
+    return __probe(file, name)
+
+
+def probe_media_from_buffer(buffer: bytes) -> Optional[ProbedMedia]:
+    '''
+    Same as {@code probe_media}, except that it reads the file from its contents
+    in memory.
+
+    Args:
+        buffer (bytes): The contents of the file.
+
+    Returns:
+        Optional[ProbedMedia]: The metadata, or None if the format is not
+            supported or its headers are not in the buffer.
+    '''
+    return __probe(BytesIO(buffer), '<buffer>')
+
+
+def __probe(file: BinaryIO, name: str) -> Optional[ProbedMedia]:
+    try:
+        file.seek(0, 2)
+        file_size = file.tell()
+        file.seek(0)
+        header = file.read(12)
+
+        if header[:2] == b'\xff\xd8':
+            return __probe_jpeg(file)
+        if header[:8] == PNG_SIGNATURE:
+            return __probe_png(file)
+        if header[4:8] == b'ftyp':
+            return __probe_iso_bmff(file, file_size)
+        if header[:4] == b'RIFF' and header[8:12] == b'AVI ':
+            return __probe_avi(file)
+        return None
+
+    except (struct.error, ValueError, OverflowError, IndexError) as e:
+        logger.debug(f"Cannot parse the headers of {name}: {e}")
+        return None
+
+
+def __probe_jpeg(file: BinaryIO) -> Optional[ProbedMedia]:
+    orientation = None
+    file.seek(2)
+
+    while True:
+        # Markers can be padded with any number of 0xFF bytes
+        byte = __read_exactly(file, 1)
+        if byte != b'\xff':
+            return None
+        while byte == b'\xff':
+            byte = __read_exactly(file, 1)
+        marker = byte[0]
+
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        if marker in (0xD9, 0xDA):
+            # The image data started without a frame header
+            return None
+
+        (length,) = struct.unpack('>H', __read_exactly(file, 2))
+        if length < 2:
+            return None
+
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack('>xHH', __read_exactly(file, 5))
+            if orientation in TRANSPOSED_EXIF_ORIENTATIONS:
+                width, height = height, width
+            return ProbedMedia('image/jpeg', width, height)
+
+        if marker == 0xE1 and orientation is None:
+            segment = __read_exactly(file, length - 2)
+            if segment.startswith(b'Exif\x00\x00'):
+                orientation = __get_exif_orientation(segment[6:])
+            elif segment.startswith(b'http://ns.adobe.com/xap/1.0/\x00'):
+                orientation = __get_xmp_orientation(segment)
+        else:
+            file.seek(length - 2, 1)
+
+
+def __get_exif_orientation(tiff: bytes) -> Optional[int]:
+    if tiff[:2] == b'II':
+        byte_order = '<'
+    elif tiff[:2] == b'MM':
+        byte_order = '>'
+    else:
+        return None
+
+    (ifd_offset,) = struct.unpack_from(byte_order + 'I', tiff, 4)
+    (num_entries,) = struct.unpack_from(byte_order + 'H', tiff, ifd_offset)
+    for i in range(num_entries):
+        tag, _, _, value = struct.unpack_from(
+            byte_order + 'HHIH', tiff, ifd_offset + 2 + i * 12
+        )
+        if tag == EXIF_ORIENTATION_TAG:
+            return value
+    return None
+
+
+def __get_xmp_orientation(segment: bytes) -> Optional[int]:
+    match = XMP_ORIENTATION_PATTERN.search(segment)
+    return int(match.group(1)) if match else None
+
+
+def __probe_png(file: BinaryIO) -> Optional[ProbedMedia]:
+    file.seek(8)
+    length, chunk_type = struct.unpack('>I4s', __read_exactly(file, 8))
+    if chunk_type != b'IHDR':
+        return None
+    width, height = struct.unpack('>II', __read_exactly(file, 8))
+    file.seek(length - 8 + 4, 1)
+
+    # The EXIF orientation of a PNG file is in an optional eXIf chunk
+    while True:
+        length, chunk_type = struct.unpack('>I4s', __read_exactly(file, 8))
+        if chunk_type in (b'IDAT', b'IEND'):
+            break
+        if chunk_type == b'eXIf':
+            exif = __read_exactly(file, length)
+            if exif.startswith(b'Exif\x00\x00'):
+                exif = exif[6:]
+            if __get_exif_orientation(exif) in TRANSPOSED_EXIF_ORIENTATIONS:
+                width, height = height, width
+            break
+        file.seek(length + 4, 1)
+
+    return ProbedMedia('image/png', width, height)
+
+
+def __probe_iso_bmff(file: BinaryIO, file_size: int) -> Optional[ProbedMedia]:
+    boxes = {
+        box_type: (start, end)
+        for box_type, start, end in __iter_boxes(file, 0, file_size)
+    }
+    if b'ftyp' not in boxes:
+        return None
+
+    file.seek(boxes[b'ftyp'][0])
+    ftyp = __read_exactly(file, min(boxes[b'ftyp'][1] - boxes[b'ftyp'][0], 64))
+    major_brand = ftyp[:4]
+    compatible_brands = [ftyp[i : i + 4] for i in range(8, len(ftyp) - 3, 4)]
+
+    if major_brand in HEIF_BRANDS_TO_MIME_TYPES:
+        if b'meta' not in boxes:
+            return None
+        width_height = __get_heif_width_height(file, *boxes[b'meta'])
+        if width_height is None:
+            return None
+        return ProbedMedia(HEIF_BRANDS_TO_MIME_TYPES[major_brand], *width_height)
+
+    if b'moov' not in boxes:
+        return None
+    width_height = __get_video_width_height(file, *boxes[b'moov'])
+    if width_height is None:
+        return None
+
+    mime_type = VIDEO_BRANDS_TO_MIME_TYPES.get(major_brand)
+    if mime_type is None and major_brand.startswith(b'3g2'):
+        mime_type = 'video/3gpp2'
+    elif mime_type is None and major_brand.startswith(b'3gp'):
+        mime_type = 'video/3gpp'
+    elif mime_type is None and b'qt  ' in compatible_brands:
+        mime_type = 'video/quicktime'
+    return ProbedMedia(mime_type or 'video/mp4', *width_height)
+
+
+def __get_heif_width_height(
+    file: BinaryIO, meta_start: int, meta_end: int
+) -> Optional[tuple[int, int]]:
+    # The meta box is a full box, so its children start after its version / flags
+    children = {
+        box_type: (start, end)
+        for box_type, start, end in __iter_boxes(file, meta_start + 4, meta_end)
+    }
+    if b'pitm' not in children or b'iprp' not in children:
+        return None
+
+    file.seek(children[b'pitm'][0])
+    version = __read_exactly(file, 4)[0]
+    (primary_item_id,) = struct.unpack(
+        '>H' if version == 0 else '>I', __read_exactly(file, 2 if version == 0 else 4)
+    )
+
+    properties: list[tuple[bytes, int, int]] = []
+    item_property_indices: list[int] = []
+    for box_type, start, end in __iter_boxes(file, *children[b'iprp']):
+        if box_type == b'ipco':
+            properties = list(__iter_boxes(file, start, end))
+        elif box_type == b'ipma':
+            item_property_indices = __get_item_property_indices(
+                file, start, primary_item_id
+            )
+
+    width_height: Optional[tuple[int, int]] = None
+    rotation = 0
+    for index in item_property_indices:
+        if index < 1 or index > len(properties):
+            return None
+        box_type, start, _ = properties[index - 1]
+        file.seek(start)
+        if box_type == b'ispe':
+            width_height = struct.unpack('>4xII', __read_exactly(file, 12))
+        elif box_type == b'irot':
+            rotation = __read_exactly(file, 1)[0] & 0x03
+        elif box_type == b'clap':
+            # Cropped images are left to the image libraries
+            return None
+
+    if width_height is None:
+        return None
+    width, height = width_height
+    if rotation % 2 == 1:
+        return height, width
+    return width, height
+
+
+def __get_item_property_indices(
+    file: BinaryIO, ipma_start: int, item_id: int
+) -> list[int]:
+    file.seek(ipma_start)
+    version_and_flags = __read_exactly(file, 4)
+    version, flags = version_and_flags[0], version_and_flags[3]
+    (num_entries,) = struct.unpack('>I', __read_exactly(file, 4))
+
+    for _ in range(num_entries):
+        if version < 1:
+            (cur_item_id,) = struct.unpack('>H', __read_exactly(file, 2))
+        else:
+            (cur_item_id,) = struct.unpack('>I', __read_exactly(file, 4))
+        num_associations = __read_exactly(file, 1)[0]
+
+        indices = []
+        for _ in range(num_associations):
+            if flags & 0x01:
+                (association,) = struct.unpack('>H', __read_exactly(file, 2))
+                indices.append(association & 0x7FFF)
+            else:
+                indices.append(__read_exactly(file, 1)[0] & 0x7F)
+
+        if cur_item_id == item_id:
+            return indices
+    return []
+
+
+def __get_video_width_height(
+    file: BinaryIO, moov_start: int, moov_end: int
+) -> Optional[tuple[int, int]]:
+    for box_type, trak_start, trak_end in __iter_boxes(file, moov_start, moov_end):
+        if box_type != b'trak':
+            continue
+
+        trak_children = {
+            child_type: (start, end)
+            for child_type, start, end in __iter_boxes(file, trak_start, trak_end)
+        }
+        if b'tkhd' not in trak_children or b'mdia' not in trak_children:
+            continue
+        if __get_handler_type(file, *trak_children[b'mdia']) != b'vide':
+            continue
+
+        file.seek(trak_children[b'tkhd'][0])
+        version = __read_exactly(file, 4)[0]
+        # Skips the times, track ID, duration, layer, group and volume
+        file.seek(36 if version == 0 else 48, 1)
+        matrix = struct.unpack('>9i', __read_exactly(file, 36))
+        width, height = struct.unpack('>II', __read_exactly(file, 8))
+        width, height = width >> 16, height >> 16
+        if width == 0 or height == 0:
+            continue
+
+        # The matrix is [a b u c d v x y w]; a rotation by 90 or 270 degrees
+        # zeroes out a and d
+        a, b, _, c, d, *_ = matrix
+        if a == 0 and d == 0 and b != 0 and c != 0:
+            return height, width
+        return width, height
+
+    return None
+
+
+def __get_handler_type(
+    file: BinaryIO, mdia_start: int, mdia_end: int
+) -> Optional[bytes]:
+    for box_type, start, _ in __iter_boxes(file, mdia_start, mdia_end):
+        if box_type == b'hdlr':
+            file.seek(start + 8)
+            return __read_exactly(file, 4)
+    return None
+
+
+def __probe_avi(file: BinaryIO) -> Optional[ProbedMedia]:
+    file.seek(12)
+    list_type, _, list_kind = struct.unpack('<4sI4s', __read_exactly(file, 12))
+    if list_type != b'LIST' or list_kind != b'hdrl':
+        return None
+
+    chunk_type, _ = struct.unpack('<4sI', __read_exactly(file, 8))
+    if chunk_type != b'avih':
+        return None
+
+    # Skips the frame rate, data rate, flags, frame counts, streams and buffer size
+    width, height = struct.unpack('<32xII', __read_exactly(file, 40))
+    if width == 0 or height == 0:
+        return None
+    return ProbedMedia('video/x-msvideo', width, height)
+
+
+def __iter_boxes(
+    file: BinaryIO, start: int, end: int
+) -> Generator[tuple[bytes, int, int], None, None]:
+    '''
+    Yields the type, the start of the contents, and the end of each ISO BMFF box
+    between two offsets.
+    '''
+    offset = start
+    while offset + 8 <= end:
+        file.seek(offset)
+        size, box_type = struct.unpack('>I4s', __read_exactly(file, 8))
+        header_size = 8
+        if size == 1:
+            (size,) = struct.unpack('>Q', __read_exactly(file, 8))
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+
+        if size < header_size or offset + size > end:
+            raise ValueError(f"Invalid size {size} of box {box_type!r}")
+
+        yield box_type, offset + header_size, offset + size
+        offset += size
+
+
+def __read_exactly(file: BinaryIO, num_bytes: int) -> bytes:
+    data = file.read(num_bytes)
+    if len(data) != num_bytes:
+        raise ValueError("Unexpected end of file")
+    return data
@@ -1,8 +1,14 @@
-from PIL import Image, ImageOps
+from io import BytesIO
+from typing import BinaryIO
+
+from PIL import ExifTags, Image, ImageOps
 from pillow_heif import register_heif_opener
 
 register_heif_opener()
 
+# EXIF orientations that rotate the image by 90 or 270 degrees
+TRANSPOSED_EXIF_ORIENTATIONS = (5, 6, 7, 8)
+
 
 def get_width_height_of_image(file_path: str) -> tuple[int, int]:
     '''
@@ -16,3 +22,39 @@ def get_width_height_of_image(file_path: str) -> tuple[int, int]:
     '''
     with Image.open(file_path) as image:
         return ImageOps.exif_transpose(image).size
+
+
+def get_width_height_of_image_from_buffer(buffer: bytes) -> tuple[int, int]:
+    '''
+    Get the width and height of an image from its contents in memory.
+
+    Unlike {@code get_width_height_of_image}, it does not decode the pixels: it
+    only reads the image header and its EXIF orientation tag.
+
+    Args:
+        buffer: The contents of the image file
+
+    Returns:
+        Tuple of (width, height)
+    '''
+    return get_width_height_of_image_from_file(BytesIO(buffer))
+
+
+def get_width_height_of_image_from_file(file: BinaryIO) -> tuple[int, int]:
+    '''
+    Same as {@code get_width_height_of_image_from_buffer}, except that it reads the
+    image from a file object that is already open.
+
+    Args:
+        file: The image file object. It needs to be seekable.
+
+    Returns:
+        Tuple of (width, height)
+    '''
+    with Image.open(file) as image:
+        width, height = image.size
+        orientation = image.getexif().get(ExifTags.Base.Orientation)
+
+    if orientation in TRANSPOSED_EXIF_ORIENTATIONS:
+        return height, width
+    return width, height
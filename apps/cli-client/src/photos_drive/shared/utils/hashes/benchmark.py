@@ -0,0 +1,144 @@
+from dataclasses import dataclass
+import os
+import tempfile
+import time
+from typing import Callable, Optional
+
+import typer
+from typing_extensions import Annotated
+import xxhash
+
+from photos_drive.shared.utils.hashes.file_hasher import FileHasher, HashAlgorithm
+
+# The number of files and the size of each file in the generated data set, which
+# mimics a photo library with many photos and a few long videos
+MIXED_FILE_SIZES = [
+    (256, 64 * 1024),
+    (128, 4 * 1024 * 1024),
+    (4, 64 * 1024 * 1024),
+    (1, 512 * 1024 * 1024),
+]
+
+
+@dataclass(frozen=True)
+class HashingBenchmarkResult:
+    """
+    Stores the throughput of one way of hashing a set of files.
+
+    Attributes:
+        name (str): The name of the hashing method.
+        num_files (int): The number of files hashed.
+        num_bytes (int): The total size of the files hashed, in bytes.
+        elapsed_time (float): The time taken to hash all of the files, in seconds.
+    """
+
+    name: str
+    num_files: int
+    num_bytes: int
+    elapsed_time: float
+
+
+def benchmark_file_hashing(file_paths: list[str]) -> list[HashingBenchmarkResult]:
+    '''
+    Hashes the same files with the original chunked loop and with the
+    {@code FileHasher}, and measures the throughput of each.
+
+    Args:
+        - file_paths (list[str]): The files to hash.
+
+    Returns:
+        list[HashingBenchmarkResult]: The results of each hashing method.
+    '''
+    num_bytes = sum(os.path.getsize(file_path) for file_path in file_paths)
+    hasher = FileHasher()
+    methods: list[tuple[str, Callable[[], object]]] = [
+        (
+            'xxh64, 8 KiB reads (original)',
+            lambda: [__hash_file_in_8kb_chunks(p) for p in file_paths],
+        ),
+        (
+            'xxh64, sequential',
+            lambda: [hasher.hash_file(p) for p in file_paths],
+        ),
+        (
+            'xxh64, parallel',
+            lambda: hasher.hash_files(file_paths),
+        ),
+        (
+            'xxh3_128, parallel',
+            lambda: hasher.hash_files(file_paths, HashAlgorithm.XXH3_128),
+        ),
+    ]
+
+    results = []
+    for name, hash_files in methods:
+        start_time = time.perf_counter()
+        hash_files()
+        results.append(
+            HashingBenchmarkResult(
+                name=name,
+                num_files=len(file_paths),
+                num_bytes=num_bytes,
+                elapsed_time=max(time.perf_counter() - start_time, 1e-9),
+            )
+        )
+
+    return results
+
+
+def __hash_file_in_8kb_chunks(file_path: str) -> bytes:
+    hash_obj = xxhash.xxh64()
+    with open(file_path, 'rb') as file:
+        while chunk := file.read(8192):
+            hash_obj.update(chunk)
+    return hash_obj.digest()
+
+
+def __create_mixed_files(dir_path: str, scale: float) -> list[str]:
+    file_paths = []
+    for num_files, file_size in MIXED_FILE_SIZES:
+        for i in range(max(int(num_files * scale), 1)):
+            file_path = os.path.join(dir_path, f'{file_size}-{i}.bin')
+            with open(file_path, 'wb') as file:
+                file.write(os.urandom(file_size))
+            file_paths.append(file_path)
+    return file_paths
+
+
+app = typer.Typer()
+
+
+@app.command()
+def benchmark(
+    dir_path: Annotated[
+        Optional[str],
+        typer.Argument(help="A folder of files to hash. Defaults to generated files."),
+    ] = None,
+    scale: Annotated[
+        float,
+        typer.Option("--scale", help="Scales the number of generated files"),
+    ] = 1.0,
+):
+    '''
+    Compares the throughput of the ways to hash files.
+    '''
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if dir_path is None:
+            file_paths = __create_mixed_files(temp_dir, scale)
+        else:
+            file_paths = [
+                os.path.join(root, file_name)
+                for root, _, file_names in os.walk(dir_path)
+                for file_name in file_names
+            ]
+
+        for result in benchmark_file_hashing(file_paths):
+            mb_per_second = result.num_bytes / result.elapsed_time / (1024 * 1024)
+            print(
+                f"{result.name}: {result.num_files} files in "
+                + f"{result.elapsed_time:.2f}s ({mb_per_second:.0f} MiB/s)"
+            )
+
+
+if __name__ == '__main__':
+    app()
@@ -0,0 +1,210 @@
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+import mmap
+import os
+import threading
+from typing import Optional
+
+import xxhash
+
+# The size of the buffer that each thread reads files into
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+# Files of at least this size are hashed from a memory map instead of being read
+DEFAULT_MMAP_THRESHOLD = 64 * 1024 * 1024
+
+# The max. number of files that are read at the same time
+DEFAULT_MAX_IO_DEPTH = 16
+
+
+class HashAlgorithm(Enum):
+    """
+    The algorithms that a file hash can be computed with.
+
+    The value of each algorithm is the tag stored in front of its hashes, so that
+    hashes from different algorithms can be stored side by side.
+    """
+
+    # The original algorithm. Its hashes have no tag so that existing hashes in the
+    # database stay valid.
+    XXH64 = 0
+
+    # A faster algorithm with a 128-bit digest.
+    XXH3_128 = 1
+
+
+def get_hash_algorithm(file_hash: bytes) -> HashAlgorithm:
+    '''
+    Returns the algorithm that a file hash was computed with.
+
+    Args:
+        file_hash (bytes): The file hash.
+
+    Returns:
+        HashAlgorithm: The algorithm. Hashes without a known tag are xxh64 hashes.
+    '''
+    if (
+        len(file_hash) == xxhash.xxh3_128().digest_size + 1
+        and file_hash[0] == HashAlgorithm.XXH3_128.value
+    ):
+        return HashAlgorithm.XXH3_128
+    return HashAlgorithm.XXH64
+
+
+def parse_hash_algorithm(name: str) -> HashAlgorithm:
+    '''
+    Returns the hash algorithm with a given name.
+
+    Args:
+        name (str): The name of the algorithm, like xxh64 or xxh3_128.
+
+    Returns:
+        HashAlgorithm: The algorithm.
+    '''
+    for algorithm in HashAlgorithm:
+        if algorithm.name.lower() == name.lower():
+            return algorithm
+    raise ValueError(f"Unknown hash algorithm {name}")
+
+
+class IncrementalFileHasher:
+    '''
+    Computes the hash of a file from its contents, fed in one chunk at a time.
+    '''
+
+    def __init__(self, algorithm: HashAlgorithm = HashAlgorithm.XXH64):
+        '''
+        Constructs an instance of {@code IncrementalFileHasher}
+
+        Args:
+            - algorithm (HashAlgorithm): The hash algorithm.
+        '''
+        self.algorithm = algorithm
+        self.__hash_obj: xxhash.xxh64 | xxhash.xxh3_128
+        if algorithm == HashAlgorithm.XXH64:
+            self.__hash_obj = xxhash.xxh64()
+        elif algorithm == HashAlgorithm.XXH3_128:
+            self.__hash_obj = xxhash.xxh3_128()
+        else:
+            raise ValueError(f"Unknown hash algorithm {algorithm}")
+
+    def update(self, data: bytes | bytearray | memoryview | mmap.mmap):
+        '''
+        Feeds the next chunk of the file into the hash.
+
+        Args:
+            - data (bytes | bytearray | memoryview | mmap.mmap): The chunk.
+        '''
+        self.__hash_obj.update(data)
+
+    def digest(self) -> bytes:
+        '''
+        Returns the file hash, with its algorithm tag.
+
+        Returns:
+            bytes: The file hash, in bytes.
+        '''
+        if self.algorithm == HashAlgorithm.XXH64:
+            return self.__hash_obj.digest()
+        return bytes([self.algorithm.value]) + self.__hash_obj.digest()
+
+
+class FileHasher:
+    '''
+    A class responsible for hashing files quickly.
+
+    Small files are read into a buffer that is reused for every file in a thread,
+    and big files are hashed straight from a memory map. Many files are hashed in
+    parallel, with a limit on the number of files being read at the same time.
+    '''
+
+    def __init__(
+        self,
+        algorithm: HashAlgorithm = HashAlgorithm.XXH64,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        mmap_threshold: int = DEFAULT_MMAP_THRESHOLD,
+        max_io_depth: int = DEFAULT_MAX_IO_DEPTH,
+    ):
+        '''
+        Constructs an instance of {@code FileHasher}
+
+        Args:
+            - algorithm (HashAlgorithm): The default hash algorithm.
+            - buffer_size (int): The size of each read.
+            - mmap_threshold (int):
+                Files of at least this size are hashed from a memory map.
+            - max_io_depth (int): The max. number of files read at the same time.
+        '''
+        if max_io_depth < 1:
+            raise ValueError("max_io_depth must be at least 1")
+
+        self.algorithm = algorithm
+        self.__buffer_size = buffer_size
+        self.__mmap_threshold = max(mmap_threshold, 1)
+        self.__max_io_depth = max_io_depth
+        self.__thread_local = threading.local()
+
+    def hash_file(
+        self, file_path: str, algorithm: Optional[HashAlgorithm] = None
+    ) -> bytes:
+        '''
+        Computes the hash of a file.
+
+        Args:
+            - file_path (str): The file path.
+            - algorithm (Optional[HashAlgorithm]):
+                The hash algorithm. Defaults to the algorithm of this hasher.
+
+        Returns:
+            bytes: The file hash, in bytes.
+        '''
+        hasher = IncrementalFileHasher(
+            algorithm if algorithm is not None else self.algorithm
+        )
+
+        with open(file_path, 'rb', buffering=0) as file:
+            file_size = os.fstat(file.fileno()).st_size
+
+            if file_size >= self.__mmap_threshold:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                        mapped.madvise(mmap.MADV_SEQUENTIAL)
+                    hasher.update(mapped)
+            else:
+                buffer, view = self.__get_buffer()
+                while num_bytes_read := file.readinto(buffer):
+                    hasher.update(view[:num_bytes_read])
+
+        return hasher.digest()
+
+    def hash_files(
+        self, file_paths: list[str], algorithm: Optional[HashAlgorithm] = None
+    ) -> list[bytes]:
+        '''
+        Computes the hashes of many files in parallel.
+
+        Args:
+            - file_paths (list[str]): The file paths.
+            - algorithm (Optional[HashAlgorithm]):
+                The hash algorithm. Defaults to the algorithm of this hasher.
+
+        Returns:
+            list[bytes]: The file hashes, in the same order as {@code file_paths}.
+        '''
+        if len(file_paths) <= 1:
+            return [self.hash_file(file_path, algorithm) for file_path in file_paths]
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.__max_io_depth, len(file_paths))
+        ) as executor:
+            return list(
+                executor.map(
+                    lambda file_path: self.hash_file(file_path, algorithm), file_paths
+                )
+            )
+
+    def __get_buffer(self) -> tuple[bytearray, memoryview]:
+        if not hasattr(self.__thread_local, 'buffer'):
+            self.__thread_local.buffer = bytearray(self.__buffer_size)
+            self.__thread_local.view = memoryview(self.__thread_local.buffer)
+        return self.__thread_local.buffer, self.__thread_local.view
@@ -1,18 +1,39 @@
-import xxhash
+from photos_drive.shared.utils.hashes.file_hasher import (
+    FileHasher,
+    HashAlgorithm,
+    IncrementalFileHasher,
+)
 
+_file_hasher = FileHasher()
 
-def compute_file_hash(file_path: str) -> bytes:
+
+def compute_file_hash(
+    file_path: str, algorithm: HashAlgorithm = HashAlgorithm.XXH64
+) -> bytes:
     '''
     Computes the file hash using xxhash library.
 
     Args:
         file_path (str): The file path
+        algorithm (HashAlgorithm): The hash algorithm. Defaults to xxh64.
 
     Returns:
         bytes: The file hash, in bytes.
     '''
-    hash_obj = xxhash.xxh64()
-    with open(file_path, 'rb') as file:
-        while chunk := file.read(8192):
-            hash_obj.update(chunk)
-    return hash_obj.digest()
+    return _file_hasher.hash_file(file_path, algorithm)
+
+
+def create_file_hasher(
+    algorithm: HashAlgorithm = HashAlgorithm.XXH64,
+) -> IncrementalFileHasher:
+    '''
+    Returns a new incremental hasher that produces the same hashes as
+    {@code compute_file_hash} once it is fed the contents of a file.
+
+    Args:
+        algorithm (HashAlgorithm): The hash algorithm. Defaults to xxh64.
+
+    Returns:
+        IncrementalFileHasher: The hasher.
+    '''
+    return IncrementalFileHasher(algorithm)
@@ -19,3 +19,13 @@ def get_mime_type(file_path: str) -> str:
             - file_path (str): The path to the file
     '''
     return magic.from_file(file_path, mime=True)
+
+
+def get_mime_type_from_buffer(buffer: bytes) -> str:
+    '''
+    Returns the mime type of a file from the first few bytes of its contents.
+
+    Args:
+        - buffer (bytes): The leading bytes of the file
+    '''
+    return magic.from_buffer(buffer, mime=True)
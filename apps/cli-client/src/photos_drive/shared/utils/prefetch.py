@@ -0,0 +1,76 @@
+import queue
+import threading
+from typing import Generator, Iterable, TypeVar
+
+T = TypeVar('T')
+
+_DONE = object()
+
+
+def prefetch(
+    iterable: Iterable[T], max_prefetched: int = 1
+) -> Generator[T, None, None]:
+    '''
+    Iterates through an iterable in a background thread, and yields its items in
+    order.
+
+    Up to {@code max_prefetched} items are produced ahead of the consumer. Once the
+    buffer is full, the background thread blocks until the consumer catches up, so
+    memory stays bounded.
+
+    Exceptions raised by the iterable are re-raised in the consumer's thread.
+
+    Closing the generator stops the background thread, and waits for the item being
+    produced, so the iterable is not used after the consumer cleans up.
+
+    Args:
+        iterable (Iterable[T]): The iterable to prefetch items from.
+        max_prefetched (int): The max. number of items produced ahead of the
+            consumer.
+
+    Returns:
+        Generator[T, None, None]: A generator of the items in the iterable.
+    '''
+    if max_prefetched < 1:
+        raise ValueError(f"max_prefetched must be positive, got {max_prefetched}")
+
+    buffer: queue.Queue = queue.Queue(maxsize=max_prefetched)
+    is_cancelled = threading.Event()
+
+    def put(item) -> bool:
+        while not is_cancelled.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+            put((_DONE, None))
+        except Exception as e:
+            put((_DONE, e))
+        except BaseException as e:
+            # Unblocks the consumer before the background thread stops
+            put((_DONE, e))
+            raise
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+
+    try:
+        while True:
+            item, error = buffer.get()
+            if error is not None:
+                raise error
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        # Stops the producer if the consumer stopped early
+        is_cancelled.set()
+        producer.join()
@@ -0,0 +1,150 @@
+import os
+import subprocess
+import sys
+import unittest
+
+from photos_drive.backup.adaptive_batching import (
+    AdaptiveBatchSizer,
+    get_resident_memory_in_bytes,
+)
+
+GB = 1024 * 1024 * 1024
+
+
+class TestAdaptiveBatchSizer(unittest.TestCase):
+    def test_record_batch_grows_batch_size_while_throughput_improves(self):
+        sizer = AdaptiveBatchSizer(
+            'test', initial_batch_size=4, max_memory_in_bytes=GB, num_warmup_batches=0
+        )
+
+        sizer.record_batch(4, 1.0, memory_in_bytes=100)
+        self.assertEqual(sizer.get_batch_size(), 8)
+        sizer.record_batch(8, 1.0, memory_in_bytes=100)
+        self.assertEqual(sizer.get_batch_size(), 16)
+
+    def test_record_batch_settles_on_best_batch_size_once_throughput_plateaus(self):
+        sizer = AdaptiveBatchSizer(
+            'test', initial_batch_size=4, max_memory_in_bytes=GB, num_warmup_batches=0
+        )
+
+        sizer.record_batch(4, 1.0, memory_in_bytes=100)
+        sizer.record_batch(8, 1.0, memory_in_bytes=100)
+        sizer.record_batch(16, 1.95, memory_in_bytes=100)
+        self.assertEqual(sizer.get_batch_size(), 8)
+
+        # It stops growing, even if later batches are faster
+        sizer.record_batch(8, 0.1, memory_in_bytes=100)
+        self.assertEqual(sizer.get_batch_size(), 8)
+
+    def test_record_batch_shrinks_batch_size_when_over_memory_ceiling(self):
+        sizer = AdaptiveBatchSizer(
+            'test',
+            initial_batch_size=16,
+            min_batch_size=4,
+            max_memory_in_bytes=1000,
+            num_warmup_batches=0,
+        )
+
+        sizer.record_batch(16, 1.0, memory_in_bytes=2000)
+        self.assertEqual(sizer.get_batch_size(), 8)
+        sizer.record_batch(8, 1.0, memory_in_bytes=2500)
+        self.assertEqual(sizer.get_batch_size(), 4)
+        sizer.record_batch(4, 1.0, memory_in_bytes=3000)
+        self.assertEqual(sizer.get_batch_size(), 4)
+
+    def test_record_batch_holds_batch_size_when_memory_stays_over_ceiling(self):
+        sizer = AdaptiveBatchSizer(
+            'test',
+            initial_batch_size=16,
+            max_memory_in_bytes=1000,
+            num_warmup_batches=0,
+        )
+
+        sizer.record_batch(16, 1.0, memory_in_bytes=2000)
+        self.assertEqual(sizer.get_batch_size(), 8)
+        for _ in range(10):
+            sizer.record_batch(8, 1.0, memory_in_bytes=2000)
+        self.assertEqual(sizer.get_batch_size(), 8)
+
+    def test_record_batch_shrinks_again_after_memory_falls_and_rises(self):
+        sizer = AdaptiveBatchSizer(
+            'test',
+            initial_batch_size=16,
+            max_memory_in_bytes=1000,
+            num_warmup_batches=0,
+        )
+
+        sizer.record_batch(16, 1.0, memory_in_bytes=2000)
+        sizer.record_batch(8, 1.0, memory_in_bytes=500)
+        self.assertEqual(sizer.get_batch_size(), 8)
+        sizer.record_batch(8, 1.0, memory_in_bytes=1500)
+        self.assertEqual(sizer.get_batch_size(), 4)
+
+    def test_record_batch_stops_growing_when_next_batch_would_exceed_memory(self):
+        sizer = AdaptiveBatchSizer(
+            'test', initial_batch_size=4, max_memory_in_bytes=1000, num_warmup_batches=0
+        )
+
+        sizer.record_batch(4, 1.0, memory_in_bytes=400)
+        sizer.record_batch(8, 1.0, memory_in_bytes=800)
+
+        # Each image takes 100 bytes, so 16 images would need 1600 bytes
+        self.assertEqual(sizer.get_batch_size(), 8)
+
+    def test_record_batch_ignores_warmup_and_partial_batches(self):
+        sizer = AdaptiveBatchSizer(
+            'test', initial_batch_size=4, max_memory_in_bytes=GB, num_warmup_batches=1
+        )
+
+        sizer.record_batch(4, 100.0, memory_in_bytes=100)
+        sizer.record_batch(3, 1.0, memory_in_bytes=100)
+        self.assertEqual(sizer.get_batch_size(), 4)
+
+        sizer.record_batch(4, 1.0, memory_in_bytes=100)
+        self.assertEqual(sizer.get_batch_size(), 8)
+
+    def test_record_batch_does_not_grow_past_max_batch_size(self):
+        sizer = AdaptiveBatchSizer(
+            'test',
+            initial_batch_size=4,
+            max_batch_size=6,
+            max_memory_in_bytes=GB,
+            num_warmup_batches=0,
+        )
+
+        sizer.record_batch(4, 1.0, memory_in_bytes=100)
+        sizer.record_batch(6, 0.1, memory_in_bytes=100)
+
+        self.assertEqual(sizer.get_batch_size(), 6)
+
+    def test_constructor_with_invalid_batch_sizes_raises_error(self):
+        with self.assertRaises(ValueError):
+            AdaptiveBatchSizer('test', initial_batch_size=0)
+        with self.assertRaises(ValueError):
+            AdaptiveBatchSizer('test', initial_batch_size=16, max_batch_size=8)
+
+    def test_get_resident_memory_in_bytes(self):
+        self.assertGreater(get_resident_memory_in_bytes(), 0)
+
+    @unittest.skipUnless(os.path.exists('/proc/self/statm'), "requires /proc")
+    def test_get_resident_memory_in_bytes_includes_child_processes(self):
+        memory_before = get_resident_memory_in_bytes()
+        child_process = subprocess.Popen(
+            [
+                sys.executable,
+                '-c',
+                'import sys; data = b"x" * (256 * 1024 * 1024); print("ready"); '
+                + 'sys.stdout.flush(); sys.stdin.read()',
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        try:
+            assert child_process.stdout is not None
+            child_process.stdout.readline()
+
+            memory_after = get_resident_memory_in_bytes()
+        finally:
+            child_process.communicate()
+
+        self.assertGreater(memory_after - memory_before, 200 * 1024 * 1024)
@@ -0,0 +1,127 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from bson.objectid import ObjectId
+
+from photos_drive.backup.backup_journal import (
+    UPLOAD_TOKEN_TTL_IN_SECONDS,
+    BackupJournal,
+    BackupJournalEntry,
+    BackupJournalKey,
+    get_backup_journal_key,
+)
+from photos_drive.shared.core.media_items.media_item_id import MediaItemId
+from photos_drive.shared.features.llm.vector_stores.base_vector_store import (
+    MediaItemEmbeddingId,
+)
+
+GPHOTOS_CLIENT_ID = ObjectId()
+
+
+class TestBackupJournal(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'journal.sqlite3')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_get_entries_returns_progress_recorded_in_previous_session(self):
+        key = BackupJournalKey('/Photos/dog.jpg', b'hash')
+        media_item_id = MediaItemId(ObjectId(), ObjectId())
+        embedding_id = MediaItemEmbeddingId(ObjectId(), ObjectId())
+        journal = BackupJournal(self.db_path)
+        journal.record_upload_token(key, GPHOTOS_CLIENT_ID, 'token-1')
+        journal.record_gphotos_media_item_id(key, GPHOTOS_CLIENT_ID, 'gphotos-1')
+        journal.record_media_item_ids([(key, media_item_id)])
+        journal.record_embedding_ids([(key, embedding_id)])
+        journal.close()
+
+        journal = BackupJournal(self.db_path)
+        entries = journal.get_entries([key])
+        journal.close()
+
+        self.assertEqual(
+            entries,
+            {
+                key: BackupJournalEntry(
+                    gphotos_client_id=GPHOTOS_CLIENT_ID,
+                    upload_token='token-1',
+                    gphotos_media_item_id='gphotos-1',
+                    media_item_id=media_item_id,
+                    embedding_id=embedding_id,
+                )
+            },
+        )
+
+    def test_get_entries_with_unknown_files_returns_no_entries(self):
+        journal = BackupJournal(self.db_path)
+        journal.record_upload_token(
+            BackupJournalKey('/Photos/dog.jpg', b'hash'), GPHOTOS_CLIENT_ID, 'token'
+        )
+
+        entries = journal.get_entries(
+            [
+                BackupJournalKey('/Photos/dog.jpg', b'new-hash'),
+                BackupJournalKey('/Photos/cat.jpg', b'hash'),
+            ]
+        )
+        journal.close()
+
+        self.assertEqual(entries, {})
+
+    def test_get_entries_with_many_files(self):
+        keys = [BackupJournalKey(f'/Photos/{i}.jpg', b'hash') for i in range(600)]
+        journal = BackupJournal(self.db_path)
+        for key in keys:
+            journal.record_gphotos_media_item_id(key, GPHOTOS_CLIENT_ID, key.file_path)
+
+        entries = journal.get_entries(keys)
+        journal.close()
+
+        self.assertEqual(len(entries), 600)
+        self.assertEqual(entries[keys[599]].gphotos_media_item_id, '/Photos/599.jpg')
+
+    def test_get_entries_drops_expired_upload_tokens(self):
+        key = BackupJournalKey('/Photos/dog.jpg', b'hash')
+        journal = BackupJournal(self.db_path)
+        with patch('time.time', return_value=1000.0):
+            journal.record_upload_token(key, GPHOTOS_CLIENT_ID, 'token')
+
+        with patch('time.time', return_value=1000.0 + UPLOAD_TOKEN_TTL_IN_SECONDS + 1):
+            entries = journal.get_entries([key])
+        journal.close()
+
+        self.assertIsNone(entries[key].upload_token)
+        self.assertEqual(entries[key].gphotos_client_id, GPHOTOS_CLIENT_ID)
+
+    def test_remove_entries(self):
+        key_1 = BackupJournalKey('/Photos/dog.jpg', b'hash')
+        key_2 = BackupJournalKey('/Photos/cat.jpg', b'hash')
+        journal = BackupJournal(self.db_path)
+        journal.record_upload_token(key_1, GPHOTOS_CLIENT_ID, 'token-1')
+        journal.record_upload_token(key_2, GPHOTOS_CLIENT_ID, 'token-2')
+
+        journal.remove_entries([key_1])
+        entries = journal.get_entries([key_1, key_2])
+        journal.close()
+
+        self.assertEqual(list(entries.keys()), [key_2])
+
+    def test_constructor_creates_missing_directories(self):
+        db_path = os.path.join(self.temp_dir.name, 'a', 'b', 'journal.sqlite3')
+
+        BackupJournal(db_path).close()
+
+        self.assertTrue(os.path.exists(db_path))
+
+
+class TestGetBackupJournalKey(unittest.TestCase):
+    def test_get_backup_journal_key_returns_absolute_path(self):
+        key = get_backup_journal_key('./Photos/dog.jpg', b'hash')
+
+        self.assertEqual(
+            key, BackupJournalKey(os.path.abspath('Photos/dog.jpg'), b'hash')
+        )
@@ -1,9 +1,15 @@
+from concurrent.futures import ThreadPoolExecutor
+import dataclasses
 from datetime import datetime, timezone
+import os
+import tempfile
+from unittest.mock import patch
 
 from bson import Binary
 from bson.objectid import ObjectId
 from unittest_parametrize import ParametrizedTestCase, parametrize
 
+from photos_drive.backup.backup_journal import BackupJournal, get_backup_journal_key
 from photos_drive.backup.backup_photos import PhotosBackup
 from photos_drive.backup.processed_diffs import ProcessedDiff
 from photos_drive.shared.core.albums.album_id import album_id_to_string
@@ -27,10 +33,16 @@ from photos_drive.shared.core.media_items.repository.union import (
 from photos_drive.shared.core.storage.gphotos.clients_repository import (
     GPhotosClientsRepository,
 )
+from photos_drive.shared.core.storage.gphotos.media_items_client import (
+    UploadedPhotosPartiallyAddedError,
+)
 from photos_drive.shared.core.storage.gphotos.testing import (
     FakeGPhotosClient,
     FakeItemsRepository,
 )
+from photos_drive.shared.core.storage.gphotos.testing.fake_media_items_client import (
+    FakeGPhotosMediaItemsClient,
+)
 from photos_drive.shared.core.testing import (
     create_mock_mongo_client,
 )
@@ -1071,3 +1083,733 @@ class TestPhotosBackup(ParametrizedTestCase):
         # Test assert: Check that archives album is updated correctly
         self.assertEqual(albums[1].id, public_album.id)
         self.assertEqual(albums[1].parent_album_id, root_album.id)
+
+    @parametrize_use_parallel_uploads
+    def test_backup_with_pipelined_uploads_adds_items_in_batches(
+        self, use_parallel_uploads: bool
+    ):
+        (
+            config,
+            mongodb_clients_repo,
+            gphotos_client_repo,
+            albums_repo,
+            media_items_repo,
+            map_cells_repo,
+            vector_store,
+        ) = self.__create_repos()
+        diffs = [
+            self.__create_add_diff(file_name)
+            for file_name in ['dog.png', 'cat.png', 'fish.png']
+        ]
+        backup = PhotosBackup(
+            config,
+            albums_repo,
+            media_items_repo,
+            map_cells_repo,
+            vector_store,
+            gphotos_client_repo,
+            mongodb_clients_repo,
+            parallelize_uploads=use_parallel_uploads,
+            pipeline_uploads=True,
+            pipeline_batch_size=2,
+        )
+        with patch.object(
+            media_items_repo,
+            'create_many_media_items',
+            wraps=media_items_repo.create_many_media_items,
+        ) as mock_create_many_media_items:
+            backup_results = backup.backup(diffs)
+
+        self.assertEqual(backup_results.num_media_items_added, 3)
+        self.assertEqual(backup_results.num_albums_created, 3)
+        self.assertEqual(
+            [len(c.args[0]) for c in mock_create_many_media_items.call_args_list],
+            [2, 1],
+        )
+
+        media_items = media_items_repo.get_all_media_items()
+        self.assertEqual(
+            sorted(media_item.file_name for media_item in media_items),
+            ['cat.png', 'dog.png', 'fish.png'],
+        )
+        self.assertEqual(
+            len(
+                vector_store.get_embeddings_by_media_item_ids(
+                    [media_item.id for media_item in media_items]
+                )
+            ),
+            3,
+        )
+        [(_, mongodb_client)] = mongodb_clients_repo.get_all_clients()
+        self.assertEqual(
+            mongodb_client['photos_drive']['map_cells'].count_documents({}), 16 * 3
+        )
+
+    def test_backup_with_pipelined_uploads_adds_uploaded_items_on_failure(self):
+        (
+            config,
+            mongodb_clients_repo,
+            gphotos_client_repo,
+            albums_repo,
+            media_items_repo,
+            map_cells_repo,
+            vector_store,
+        ) = self.__create_repos()
+        diffs = [
+            self.__create_add_diff(file_name)
+            for file_name in ['dog.png', 'cat.png', 'fish.png']
+        ]
+        backup = PhotosBackup(
+            config,
+            albums_repo,
+            media_items_repo,
+            map_cells_repo,
+            vector_store,
+            gphotos_client_repo,
+            mongodb_clients_repo,
+            pipeline_uploads=True,
+            pipeline_batch_size=10,
+        )
+        upload_photo_in_chunks = FakeGPhotosMediaItemsClient.upload_photo_in_chunks
+
+        def upload_photo_or_fail(client, file_path, file_name):
+            if file_name == 'fish.png':
+                raise ValueError("Upload failed")
+            return upload_photo_in_chunks(client, file_path, file_name)
+
+        with patch.object(
+            FakeGPhotosMediaItemsClient,
+            'upload_photo_in_chunks',
+            autospec=True,
+            side_effect=upload_photo_or_fail,
+        ):
+            with self.assertRaisesRegex(ValueError, "Upload failed"):
+                backup.backup(diffs)
+
+        media_items = media_items_repo.get_all_media_items()
+        self.assertEqual(
+            sorted(media_item.file_name for media_item in media_items),
+            ['cat.png', 'dog.png'],
+        )
+
+    def test_backup_with_pipelined_uploads_journals_all_photos_on_add_failure(self):
+        (
+            config,
+            mongodb_clients_repo,
+            gphotos_client_repo,
+            albums_repo,
+            media_items_repo,
+            map_cells_repo,
+            vector_store,
+        ) = self.__create_repos()
+        diffs = [
+            self.__create_add_diff(file_name)
+            for file_name in ['dog.png', 'cat.png', 'fish.png', 'bird.png']
+        ]
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        journal = BackupJournal(os.path.join(temp_dir.name, 'journal.sqlite3'))
+        self.addCleanup(journal.close)
+        backup = PhotosBackup(
+            config,
+            albums_repo,
+            media_items_repo,
+            map_cells_repo,
+            vector_store,
+            gphotos_client_repo,
+            mongodb_clients_repo,
+            pipeline_uploads=True,
+            pipeline_batch_size=1,
+            journal=journal,
+        )
+
+        # Act: fail to add the media items of the first uploaded photo
+        with patch.object(
+            MongoDBMediaItemsRepository,
+            'create_many_media_items',
+            side_effect=ValueError("Failed to add media items"),
+        ):
+            with self.assertRaisesRegex(ValueError, "Failed to add media items"):
+                backup.backup(diffs)
+
+        # Test assert: every photo that is in Google Photos is journaled
+        entries = journal.get_entries(
+            [get_backup_journal_key(d.file_path, d.file_hash) for d in diffs]
+        )
+        self.assertEqual(len(entries), 4)
+        self.assertTrue(all(entry.gphotos_media_item_id for entry in entries.values()))
+
+    def test_constructor_with_invalid_pipeline_batch_size_raises_error(self):
+        config, mongodb_clients_repo, gphotos_client_repo, *repos = (
+            self.__create_repos()
+        )
+        albums_repo, media_items_repo, map_cells_repo, vector_store = repos
+
+        with self.assertRaises(ValueError):
+            PhotosBackup(
+                config,
+                albums_repo,
+                media_items_repo,
+                map_cells_repo,
+                vector_store,
+                gphotos_client_repo,
+                mongodb_clients_repo,
+                pipeline_uploads=True,
+                pipeline_batch_size=0,
+            )
+
+    @parametrize(
+        "pipeline_uploads",
+        [(True,), (False,)],
+    )
+    def test_backup_with_journal_resumes_uploads_after_failure(
+        self, pipeline_uploads: bool
+    ):
+        (
+            config,
+            mongodb_clients_repo,
+            gphotos_client_repo,
+            albums_repo,
+            media_items_repo,
+            map_cells_repo,
+            vector_store,
+        ) = self.__create_repos()
+        diffs = [
+            self.__create_add_diff(file_name)
+            for file_name in ['dog.png', 'cat.png', 'fish.png']
+        ]
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        journal = BackupJournal(os.path.join(temp_dir.name, 'journal.sqlite3'))
+        backup = PhotosBackup(
+            config,
+            albums_repo,
+            media_items_repo,
+            map_cells_repo,
+            vector_store,
+            gphotos_client_repo,
+            mongodb_clients_repo,
+            pipeline_uploads=pipeline_uploads,
+            journal=journal,
+        )
+        upload_photo_in_chunks = FakeGPhotosMediaItemsClient.upload_photo_in_chunks
+
+        def upload_photo_or_fail(client, file_path, file_name):
+            if file_name == 'fish.png':
+                raise ValueError("Upload failed")
+            return upload_photo_in_chunks(client, file_path, file_name)
+
+        # Act: fail to upload the last photo, and then run the backup again
+        with patch.object(
+            FakeGPhotosMediaItemsClient,
+            'upload_photo_in_chunks',
+            autospec=True,
+            side_effect=upload_photo_or_fail,
+        ):
+            with self.assertRaisesRegex(ValueError, "Upload failed"):
+                backup.backup(diffs)
+        with patch.object(
+            FakeGPhotosMediaItemsClient,
+            'upload_photo_in_chunks',
+            autospec=True,
+            side_effect=upload_photo_in_chunks,
+        ) as mock_upload_photo_in_chunks:
+            backup_results = backup.backup(diffs)
+
+        # Test assert: only the photo that failed is uploaded again
+        self.assertEqual(
+            [c.args[2] for c in mock_upload_photo_in_chunks.call_args_list],
+            ['fish.png'],
+        )
+        self.assertEqual(backup_results.num_media_items_added, 3)
+        [(_, gphotos_client)] = gphotos_client_repo.get_all_clients()
+        self.assertEqual(len(gphotos_client.media_items().search_for_media_items()), 3)
+
+        # Test assert: each photo has one media item, map cells, and embedding
+        media_items = media_items_repo.get_all_media_items()
+        self.assertEqual(
+            sorted(media_item.file_name for media_item in media_items),
+            ['cat.png', 'dog.png', 'fish.png'],
+        )
+        [(_, mongodb_client)] = mongodb_clients_repo.get_all_clients()
+        self.assertEqual(
+            mongodb_client['photos_drive']['map_cells'].count_documents({}), 16 * 3
+        )
+        self.assertEqual(
+            len(
+                vector_store.get_embeddings_by_media_item_ids(
+                    [media_item.id for media_item in media_items]
+                )
+            ),
+            3,
+        )
+
+        # Test assert: the journal is emptied
+        self.assertEqual(
+            journal.get_entries(
+                [get_backup_journal_key(d.file_path, d.file_hash) for d in diffs]
+            ),
+            {},
+        )
+        journal.close()
+
+    def test_backup_with_journal_reuses_upload_tokens_and_media_items(self):
+        (
+            config,
+            mongodb_clients_repo,
+            gphotos_client_repo,
+            albums_repo,
+            media_items_repo,
+            map_cells_repo,
+            vector_store,
+        ) = self.__create_repos()
+        diffs = [
+            self.__create_add_diff(file_name) for file_name in ['dog.png', 'cat.png']
+        ]
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        journal = BackupJournal(os.path.join(temp_dir.name, 'journal.sqlite3'))
+        backup = PhotosBackup(
+            config,
+            albums_repo,
+            media_items_repo,
+            map_cells_repo,
+            vector_store,
+            gphotos_client_repo,
+            mongodb_clients_repo,
+            pipeline_uploads=True,
+            pipeline_batch_size=1,
+            journal=journal,
+        )
+        add_uploaded_photos_to_gphotos = (
+            FakeGPhotosMediaItemsClient.add_uploaded_photos_to_gphotos
+        )
+        add_media_item_embeddings = FakeVectorStore.add_media_item_embeddings
+
+        def add_uploaded_photos_or_fail(client, upload_tokens, *args):
+            result = add_uploaded_photos_to_gphotos(client, upload_tokens[:1], *args)
+            if len(upload_tokens) > 1:
+                raise UploadedPhotosPartiallyAddedError("Failed to add photos", result)
+            return result
+
+        def add_media_item_embeddings_and_fail(store, requests):
+            raise ValueError("Failed to add embeddings")
+
+        # Act: create the first media item but fail to add its embedding, and fail
+        # to add the second photo after its bytes are uploaded
+        with (
+            patch.object(
+                FakeGPhotosMediaItemsClient,
+                'add_uploaded_photos_to_gphotos',
+                autospec=True,
+                side_effect=add_uploaded_photos_or_fail,
+            ),
+            patch.object(
+                FakeVectorStore,
+                'add_media_item_embeddings',
+                autospec=True,
+                side_effect=add_media_item_embeddings_and_fail,
+            ),
+        ):
+            with self.assertRaises(ValueError):
+                backup.backup(diffs)
+        self.assertEqual(len(media_items_repo.get_all_media_items()), 1)
+
+        # Act: run the backup again
+        with (
+            patch.object(
+                FakeGPhotosMediaItemsClient,
+                'upload_photo_in_chunks',
+                autospec=True,
+            ) as mock_upload_photo_in_chunks,
+            patch.object(
+                FakeVectorStore,
+                'add_media_item_embeddings',
+                autospec=True,
+                side_effect=add_media_item_embeddings,
+            ),
+        ):
+            backup_results = backup.backup(diffs)
+
+        # Test assert: nothing is uploaded again, and no media item is duplicated
+        mock_upload_photo_in_chunks.assert_not_called()
+        self.assertEqual(backup_results.num_media_items_added, 2)
+        media_items = media_items_repo.get_all_media_items()
+        self.assertEqual(
+            sorted(media_item.file_name for media_item in media_items),
+            ['cat.png', 'dog.png'],
+        )
+        [(_, mongodb_client)] = mongodb_clients_repo.get_all_clients()
+        self.assertEqual(
+            mongodb_client['photos_drive']['map_cells'].count_documents({}), 16 * 2
+        )
+        self.assertEqual(
+            len(
+                vector_store.get_embeddings_by_media_item_ids(
+                    [media_item.id for media_item in media_items]
+                )
+            ),
+            2,
+        )
+        journal.close()
+
+    def test_backup_with_journal_recreates_media_items_that_no_longer_exist(self):
+        (
+            config,
+            mongodb_clients_repo,
+            gphotos_client_repo,
+            albums_repo,
+            media_items_repo,
+            map_cells_repo,
+            vector_store,
+        ) = self.__create_repos()
+        diffs = [self.__create_add_diff('dog.png')]
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        journal = BackupJournal(os.path.join(temp_dir.name, 'journal.sqlite3'))
+        self.addCleanup(journal.close)
+        backup = PhotosBackup(
+            config,
+            albums_repo,
+            media_items_repo,
+            map_cells_repo,
+            vector_store,
+            gphotos_client_repo,
+            mongodb_clients_repo,
+            journal=journal,
+        )
+
+        # Act: create the media item but fail to add its embedding, and then
+        # delete the media item
+        with patch.object(
+            FakeVectorStore,
+            'add_media_item_embeddings',
+            autospec=True,
+            side_effect=ValueError("Failed to add embeddings"),
+        ):
+            with self.assertRaises(ValueError):
+                backup.backup(diffs)
+        [old_media_item] = media_items_repo.get_all_media_items()
+        media_items_repo.delete_media_item(old_media_item.id)
+
+        # Act: run the backup again
+        backup_results = backup.backup(diffs)
+
+        # Test assert: the media item is created again
+        self.assertEqual(backup_results.num_media_items_added, 1)
+        [media_item] = media_items_repo.get_all_media_items()
+        self.assertEqual(media_item.file_name, 'dog.png')
+        self.assertNotEqual(media_item.id, old_media_item.id)
+        self.assertEqual(
+            len(vector_store.get_embeddings_by_media_item_ids([media_item.id])), 1
+        )
+
+    def test_backup_concurrently_does_not_prune_albums_being_added_to(self):
+        (
+            config,
+            mongodb_clients_repo,
+            gphotos_client_repo,
+            albums_repo,
+            media_items_repo,
+            map_cells_repo,
+            vector_store,
+        ) = self.__create_repos()
+        backup = PhotosBackup(
+            config,
+            albums_repo,
+            media_items_repo,
+            map_cells_repo,
+            vector_store,
+            gphotos_client_repo,
+            mongodb_clients_repo,
+        )
+        dog_diff = self.__create_add_diff('dog.png')
+        backup.backup([dog_diff])
+
+        # Act: delete the only photo in an album while adding a photo to it
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            delete_future = executor.submit(
+                backup.backup, [dataclasses.replace(dog_diff, modifier='-')]
+            )
+            add_future = executor.submit(
+                backup.backup, [self.__create_add_diff('cat.png')]
+            )
+            delete_future.result()
+            add_future.result()
+
+        # Test assert: the new photo is in an album that exists
+        [cat_media_item] = media_items_repo.get_all_media_items()
+        self.assertEqual(cat_media_item.file_name, 'cat.png')
+        cat_album = albums_repo.get_album_by_id(cat_media_item.album_id)
+        self.assertEqual(cat_album.name, '2010')
+
+    @parametrize(
+        "pipeline_uploads",
+        [(True,), (False,)],
+    )
+    def test_backup_with_dedup_uploads_reuses_photos_in_gphotos(
+        self, pipeline_uploads: bool
+    ):
+        (
+            config,
+            mongodb_clients_repo,
+            gphotos_client_repo,
+            albums_repo,
+            media_items_repo,
+            map_cells_repo,
+            vector_store,
+        ) = self.__create_repos()
+        backup = PhotosBackup(
+            config,
+            albums_repo,
+            media_items_repo,
+            map_cells_repo,
+            vector_store,
+            gphotos_client_repo,
+            mongodb_clients_repo,
+            pipeline_uploads=pipeline_uploads,
+            dedup_uploads=True,
+        )
+        backup.backup([self.__create_add_diff('dog.png')])
+        [dog_media_item] = media_items_repo.get_all_media_items()
+
+        # Act: add a copy of the photo to another album, and a new photo
+        dog_copy_diff = dataclasses.replace(
+            self.__create_add_diff('dog.png'),
+            file_path='./Archives/Copies/dog.png',
+            album_name='Archives/Copies',
+        )
+        cat_diff = dataclasses.replace(
+            self.__create_add_diff('cat.png'), file_hash=b'cat_hash'
+        )
+        upload_photo_in_chunks = FakeGPhotosMediaItemsClient.upload_photo_in_chunks
+        with patch.object(
+            FakeGPhotosMediaItemsClient,
+            'upload_photo_in_chunks',
+            autospec=True,
+            side_effect=upload_photo_in_chunks,
+        ) as mock_upload_photo_in_chunks:
+            backup_results = backup.backup([dog_copy_diff, cat_diff])
+
+        # Test assert: only the new photo is uploaded
+        self.assertEqual(
+            [c.args[2] for c in mock_upload_photo_in_chunks.call_args_list],
+            ['cat.png'],
+        )
+        self.assertEqual(backup_results.num_media_items_added, 2)
+        [(_, gphotos_client)] = gphotos_client_repo.get_all_clients()
+        self.assertEqual(len(gphotos_client.media_items().search_for_media_items()), 2)
+
+        # Test assert: the copy points to the same photo in Google Photos
+        media_items = media_items_repo.find_media_items_by_file_hashes(
+            [MOCK_FILE_HASH]
+        )[MOCK_FILE_HASH]
+        self.assertEqual(len(media_items), 2)
+        dog_copy_media_item = next(
+            item for item in media_items if item.id != dog_media_item.id
+        )
+        self.assertEqual(
+            albums_repo.get_album_by_id(dog_copy_media_item.album_id).name, 'Copies'
+        )
+        self.assertEqual(
+            dog_copy_media_item.gphotos_client_id, dog_media_item.gphotos_client_id
+        )
+        self.assertEqual(
+            dog_copy_media_item.gphotos_media_item_id,
+            dog_media_item.gphotos_media_item_id,
+        )
+        self.assertEqual(
+            len(
+                vector_store.get_embeddings_by_media_item_ids([dog_copy_media_item.id])
+            ),
+            1,
+        )
+
+    @parametrize(
+        "pipeline_uploads",
+        [(True,), (False,)],
+    )
+    def test_backup_with_dedup_uploads_uploads_duplicate_photos_once(
+        self, pipeline_uploads: bool
+    ):
+        (
+            config,
+            mongodb_clients_repo,
+            gphotos_client_repo,
+            albums_repo,
+            media_items_repo,
+            map_cells_repo,
+            vector_store,
+        ) = self.__create_repos()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        journal = BackupJournal(os.path.join(temp_dir.name, 'journal.sqlite3'))
+        backup = PhotosBackup(
+            config,
+            albums_repo,
+            media_items_repo,
+            map_cells_repo,
+            vector_store,
+            gphotos_client_repo,
+            mongodb_clients_repo,
+            pipeline_uploads=pipeline_uploads,
+            pipeline_batch_size=1,
+            journal=journal,
+            dedup_uploads=True,
+        )
+        diffs = [
+            self.__create_add_diff('dog.png'),
+            dataclasses.replace(
+                self.__create_add_diff('dog.png'),
+                file_path='./Archives/Copies/dog.png',
+                album_name='Archives/Copies',
+            ),
+            dataclasses.replace(
+                self.__create_add_diff('cat.png'), file_hash=b'cat_hash'
+            ),
+        ]
+
+        backup_results = backup.backup(diffs)
+
+        # Test assert: the photos with the same bytes are uploaded once
+        self.assertEqual(backup_results.num_media_items_added, 3)
+        [(_, gphotos_client)] = gphotos_client_repo.get_all_clients()
+        self.assertEqual(len(gphotos_client.media_items().search_for_media_items()), 2)
+        media_items = media_items_repo.get_all_media_items()
+        self.assertEqual(len(media_items), 3)
+        dog_media_items = [item for item in media_items if item.file_name == 'dog.png']
+        self.assertEqual(len(dog_media_items), 2)
+        self.assertEqual(
+            dog_media_items[0].gphotos_media_item_id,
+            dog_media_items[1].gphotos_media_item_id,
+        )
+
+        # Test assert: the journal is emptied
+        self.assertEqual(
+            journal.get_entries(
+                [get_backup_journal_key(d.file_path, d.file_hash) for d in diffs]
+            ),
+            {},
+        )
+        journal.close()
+
+    def test_backup_with_dedup_uploads_moves_photo_without_uploading_it(self):
+        (
+            config,
+            mongodb_clients_repo,
+            gphotos_client_repo,
+            albums_repo,
+            media_items_repo,
+            map_cells_repo,
+            vector_store,
+        ) = self.__create_repos()
+        backup = PhotosBackup(
+            config,
+            albums_repo,
+            media_items_repo,
+            map_cells_repo,
+            vector_store,
+            gphotos_client_repo,
+            mongodb_clients_repo,
+            dedup_uploads=True,
+        )
+        dog_diff = self.__create_add_diff('dog.png')
+        backup.backup([dog_diff])
+        [dog_media_item] = media_items_repo.get_all_media_items()
+
+        # Act: move the photo to another album
+        with patch.object(
+            FakeGPhotosMediaItemsClient, 'upload_photo_in_chunks', autospec=True
+        ) as mock_upload_photo_in_chunks:
+            backup_results = backup.backup(
+                [
+                    dataclasses.replace(dog_diff, modifier='-'),
+                    dataclasses.replace(
+                        dog_diff,
+                        file_path='./Archives/Copies/dog.png',
+                        album_name='Archives/Copies',
+                    ),
+                ]
+            )
+
+        # Test assert: the moved media item still points to the photo in Google
+        # Photos, even though the old media item is deleted
+        mock_upload_photo_in_chunks.assert_not_called()
+        self.assertEqual(backup_results.num_media_items_added, 1)
+        self.assertEqual(backup_results.num_media_items_deleted, 1)
+        [moved_media_item] = media_items_repo.get_all_media_items()
+        self.assertNotEqual(moved_media_item.id, dog_media_item.id)
+        self.assertEqual(
+            moved_media_item.gphotos_media_item_id,
+            dog_media_item.gphotos_media_item_id,
+        )
+        [(_, gphotos_client)] = gphotos_client_repo.get_all_clients()
+        self.assertEqual(
+            [item.id for item in gphotos_client.media_items().search_for_media_items()],
+            [dog_media_item.gphotos_media_item_id],
+        )
+
+    def __create_repos(self):
+        config = InMemoryConfig()
+        mongodb_client_id = ObjectId()
+        mongodb_clients_repo = MongoDBClientsRepository()
+        mongodb_clients_repo.add_mongodb_client(
+            mongodb_client_id, create_mock_mongo_client(1000)
+        )
+        mongodb_client = mongodb_clients_repo.get_client_by_id(mongodb_client_id)
+
+        gphotos_client_id = ObjectId()
+        gphotos_client_repo = GPhotosClientsRepository()
+        gphotos_client_repo.add_gphotos_client(
+            gphotos_client_id,
+            FakeGPhotosClient(FakeItemsRepository(), 'bob@gmail.com'),
+        )
+
+        albums_repo = MongoDBAlbumsRepository(
+            mongodb_client_id, mongodb_client, mongodb_clients_repo
+        )
+        media_items_repo = UnionMediaItemsRepository(
+            [
+                MongoDBMediaItemsRepository(
+                    mongodb_client_id, mongodb_client, mongodb_clients_repo
+                )
+            ]
+        )
+        map_cells_repo = UnionMapCellsRepository(
+            [
+                MongoDBMapCellsRepository(
+                    mongodb_client_id, mongodb_client, mongodb_clients_repo
+                )
+            ]
+        )
+        vector_store = FakeVectorStore()
+
+        root_album = albums_repo.create_album('', None)
+        config.set_root_album_id(root_album.id)
+
+        return (
+            config,
+            mongodb_clients_repo,
+            gphotos_client_repo,
+            albums_repo,
+            media_items_repo,
+            map_cells_repo,
+            vector_store,
+        )
+
+    def __create_add_diff(self, file_name: str) -> ProcessedDiff:
+        return ProcessedDiff(
+            modifier='+',
+            file_path=f'./Archives/Photos/2010/{file_name}',
+            album_name="Archives/Photos/2010",
+            file_name=file_name,
+            file_size=10,
+            file_hash=MOCK_FILE_HASH,
+            location=GpsLocation(latitude=-1, longitude=1),
+            width=100,
+            height=200,
+            date_taken=MOCK_DATE_TAKEN,
+            mime_type='image/png',
+            captions=FAKE_CAPTIONS,
+            embedding=FAKE_EMBEDDING,
+        )
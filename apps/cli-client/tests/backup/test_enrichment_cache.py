@@ -0,0 +1,171 @@
+from datetime import datetime
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import numpy as np
+
+from photos_drive.backup.enrichment_cache import (
+    CachedProcessedDiff,
+    EnrichmentCache,
+    EnrichmentCacheKey,
+    get_enrichment_cache_key,
+)
+from photos_drive.shared.core.media_items.gps_location import GpsLocation
+
+
+class TestEnrichmentCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'cache.sqlite3')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_get_returns_entry_put_in_previous_session(self):
+        key = EnrichmentCacheKey('/Photos/dog.jpg', 100, 1, 2)
+        entry = self.__create_entry('/Photos/dog.jpg')
+        cache = EnrichmentCache(self.db_path)
+        cache.put_many([(key, entry)])
+        cache.close()
+
+        cache = EnrichmentCache(self.db_path)
+        cached_entry = cache.get(key)
+        cache.close()
+
+        self.assertEqual(cached_entry, entry)
+        assert cached_entry is not None
+        np.testing.assert_array_equal(cached_entry.embedding, entry.embedding)
+        self.assertEqual(cached_entry.embedding.dtype, np.float32)
+
+    def test_get_with_changed_mtime_returns_none(self):
+        key = EnrichmentCacheKey('/Photos/dog.jpg', 100, 1, 2)
+        cache = EnrichmentCache(self.db_path)
+        cache.put_many([(key, self.__create_entry('/Photos/dog.jpg'))])
+
+        cached_entry = cache.get(EnrichmentCacheKey('/Photos/dog.jpg', 100, 3, 2))
+        cache.close()
+
+        self.assertIsNone(cached_entry)
+
+    def test_put_many_evicts_least_recently_used_entries(self):
+        key_1 = EnrichmentCacheKey('/Photos/1.jpg', 100, 1, 1)
+        key_2 = EnrichmentCacheKey('/Photos/2.jpg', 100, 1, 2)
+        key_3 = EnrichmentCacheKey('/Photos/3.jpg', 100, 1, 3)
+        cache = EnrichmentCache(self.db_path, max_size_in_bytes=100)
+        cache.put_many([(key_1, self.__create_entry('/Photos/1.jpg'))])
+        cache.put_many([(key_2, self.__create_entry('/Photos/2.jpg'))])
+        cache.get(key_1)
+        cache.put_many([(key_3, self.__create_entry('/Photos/3.jpg'))])
+
+        self.assertIsNotNone(cache.get(key_1))
+        self.assertIsNone(cache.get(key_2))
+        self.assertIsNotNone(cache.get(key_3))
+        self.assertEqual(cache.get_report().num_evictions, 1)
+        cache.close()
+
+    def test_get_report(self):
+        key = EnrichmentCacheKey('/Photos/dog.jpg', 100, 1, 2)
+        cache = EnrichmentCache(self.db_path)
+        cache.put_many([(key, self.__create_entry('/Photos/dog.jpg'))])
+        cache.get(key)
+        cache.get(key)
+        cache.get(EnrichmentCacheKey('/Photos/cat.jpg', 100, 1, 2))
+
+        report = cache.get_report()
+        cache.close()
+
+        self.assertEqual(report.num_hits, 2)
+        self.assertEqual(report.num_misses, 1)
+        self.assertEqual(report.num_evictions, 0)
+
+    def test_get_embeddings_by_file_hashes(self):
+        cache = EnrichmentCache(self.db_path)
+        cache.put_many(
+            [
+                (
+                    EnrichmentCacheKey('/Photos/dog.jpg', 100, 1, 1),
+                    self.__create_entry('/Photos/dog.jpg', file_hash=b'dog'),
+                ),
+                (
+                    EnrichmentCacheKey('/Photos/dog.mp4', 100, 1, 2),
+                    self.__create_entry(
+                        '/Photos/dog.mp4', file_hash=b'video', mime_type='video/mp4'
+                    ),
+                ),
+                (
+                    EnrichmentCacheKey('/Photos/cat.jpg', 100, 1, 3),
+                    self.__create_entry(
+                        '/Photos/cat.jpg',
+                        file_hash=b'cat',
+                        embedding_model_id='clip:int8',
+                    ),
+                ),
+            ]
+        )
+
+        cached_embeddings = cache.get_embeddings_by_file_hashes(
+            [b'dog', b'dog', b'video', b'cat'], 'clip'
+        )
+        report = cache.get_report()
+        cache.close()
+
+        self.assertEqual(list(cached_embeddings.keys()), [b'dog'])
+        self.assertEqual(cached_embeddings[b'dog'].captions, 'a dog')
+        np.testing.assert_array_equal(
+            cached_embeddings[b'dog'].embedding, np.arange(4, dtype=np.float32)
+        )
+        self.assertEqual(report.num_hits, 0)
+        self.assertEqual(report.num_misses, 0)
+
+    def test_constructor_clears_cache_from_older_version(self):
+        connection = sqlite3.connect(self.db_path)
+        connection.execute(
+            'CREATE TABLE processed_diffs (file_path TEXT NOT NULL, embedding BLOB)'
+        )
+        connection.commit()
+        connection.close()
+        key = EnrichmentCacheKey('/Photos/dog.jpg', 100, 1, 2)
+        entry = self.__create_entry('/Photos/dog.jpg')
+
+        cache = EnrichmentCache(self.db_path)
+        cache.put_many([(key, entry)])
+        cached_entry = cache.get(key)
+        cache.close()
+
+        self.assertEqual(cached_entry, entry)
+
+    def test_get_enrichment_cache_key(self):
+        file_path = os.path.join(self.temp_dir.name, 'dog.jpg')
+        with open(file_path, 'wb') as f:
+            f.write(b'1234')
+
+        key = get_enrichment_cache_key(file_path)
+
+        self.assertEqual(key.file_path, os.path.abspath(file_path))
+        self.assertEqual(key.file_size, 4)
+        self.assertEqual(key.mtime_ns, os.stat(file_path).st_mtime_ns)
+
+    def __create_entry(
+        self,
+        file_path: str,
+        file_hash: bytes = b'\x01\x02',
+        mime_type: str = 'image/jpeg',
+        embedding_model_id: str = 'clip',
+    ) -> CachedProcessedDiff:
+        return CachedProcessedDiff(
+            file_path=file_path,
+            album_name='Photos',
+            file_name=os.path.basename(file_path),
+            file_size=100,
+            file_hash=file_hash,
+            location=GpsLocation(latitude=1.5, longitude=2.5),
+            width=10,
+            height=20,
+            date_taken=datetime(2010, 2, 2, 10, 30),
+            mime_type=mime_type,
+            captions='a dog',
+            embedding_model_id=embedding_model_id,
+            embedding=np.arange(4, dtype=np.float32),
+        )
@@ -0,0 +1,73 @@
+from typing import AbstractSet
+import unittest
+from unittest.mock import MagicMock, patch
+
+from photos_drive.backup.exiftool_pool import ExifToolPool
+
+
+def create_fake_worker(
+    failing_file_paths: AbstractSet[str] = frozenset(),
+) -> MagicMock:
+    def get_tags(file_paths, tags):
+        if failing_file_paths & set(file_paths):
+            raise RuntimeError("exiftool crashed")
+        return [{"SourceFile": file_path} for file_path in file_paths]
+
+    worker = MagicMock()
+    worker.get_tags.side_effect = get_tags
+    return worker
+
+
+class TestExifToolPool(unittest.TestCase):
+    def test_get_tags_returns_results_in_order(self):
+        file_paths = [f"{i}.jpg" for i in range(10)]
+        with patch(
+            "photos_drive.backup.exiftool_pool.ExifToolHelper",
+            side_effect=lambda: create_fake_worker(),
+        ) as mock_exiftool_helper:
+            with ExifToolPool(num_workers=2, chunk_size=3) as pool:
+                results = pool.get_tags(file_paths, ["EXIF:DateTimeOriginal"])
+
+        self.assertEqual([r["SourceFile"] for r in results], file_paths)
+        self.assertEqual(mock_exiftool_helper.call_count, 2)
+
+    def test_get_tags_starts_at_most_one_worker_per_chunk(self):
+        with patch(
+            "photos_drive.backup.exiftool_pool.ExifToolHelper",
+            side_effect=lambda: create_fake_worker(),
+        ) as mock_exiftool_helper:
+            with ExifToolPool(num_workers=8, chunk_size=3) as pool:
+                pool.get_tags(["1.jpg", "2.jpg"], ["EXIF:DateTimeOriginal"])
+
+        self.assertEqual(mock_exiftool_helper.call_count, 1)
+
+    def test_get_tags_retries_only_failed_chunk(self):
+        crashing_worker = create_fake_worker({"4.jpg"})
+        workers = [crashing_worker, create_fake_worker()]
+        with patch(
+            "photos_drive.backup.exiftool_pool.ExifToolHelper",
+            side_effect=lambda: workers.pop(0),
+        ):
+            with ExifToolPool(num_workers=1, chunk_size=2) as pool:
+                results = pool.get_tags(
+                    ["1.jpg", "2.jpg", "3.jpg", "4.jpg"], ["EXIF:DateTimeOriginal"]
+                )
+
+        self.assertEqual(
+            [r["SourceFile"] for r in results], ["1.jpg", "2.jpg", "3.jpg", "4.jpg"]
+        )
+        self.assertEqual(crashing_worker.get_tags.call_count, 2)
+        crashing_worker.terminate.assert_called_once()
+
+    def test_get_tags_raises_error_if_retry_fails(self):
+        with patch(
+            "photos_drive.backup.exiftool_pool.ExifToolHelper",
+            side_effect=lambda: create_fake_worker({"1.jpg"}),
+        ):
+            with ExifToolPool(num_workers=1) as pool:
+                with self.assertRaisesRegex(RuntimeError, "exiftool crashed"):
+                    pool.get_tags(["1.jpg"], ["EXIF:DateTimeOriginal"])
+
+    def test_constructor_with_invalid_chunk_size_raises_error(self):
+        with self.assertRaises(ValueError):
+            ExifToolPool(chunk_size=0)
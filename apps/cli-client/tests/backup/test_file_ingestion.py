@@ -0,0 +1,123 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from PIL import Image
+
+from photos_drive.backup.file_ingestion import (
+    FileIngestor,
+    build_ingestion_report,
+)
+from photos_drive.shared.utils.hashes.xxhash import compute_file_hash
+
+TEST_FILES_DIRECTORY = "./tests/backup/resources/test_processed_diffs_files"
+
+
+class TestFileIngestor(unittest.TestCase):
+    def test_ingest_file_image(self):
+        file_path = f"{TEST_FILES_DIRECTORY}/image-with-location.jpg"
+
+        ingested_file = FileIngestor().ingest_file(file_path)
+
+        self.assertEqual(ingested_file.file_path, file_path)
+        self.assertEqual(ingested_file.file_size, 2622777)
+        self.assertEqual(ingested_file.file_hash, compute_file_hash(file_path))
+        self.assertEqual(ingested_file.mime_type, 'image/jpeg')
+        self.assertEqual(ingested_file.width, 3264)
+        self.assertEqual(ingested_file.height, 2448)
+        self.assertEqual(ingested_file.bytes_read, 2622777)
+
+    def test_ingest_file_heic_image(self):
+        file_path = f"{TEST_FILES_DIRECTORY}/heic-image.heic"
+
+        ingested_file = FileIngestor().ingest_file(file_path)
+
+        self.assertEqual(ingested_file.file_hash, compute_file_hash(file_path))
+        self.assertEqual(ingested_file.mime_type, 'image/heic')
+        self.assertEqual(ingested_file.width, 4032)
+        self.assertEqual(ingested_file.height, 3024)
+        self.assertEqual(ingested_file.bytes_read, ingested_file.file_size)
+
+    def test_ingest_file_video(self):
+        file_path = f"{TEST_FILES_DIRECTORY}/video.mov"
+
+        ingested_file = FileIngestor().ingest_file(file_path)
+
+        self.assertEqual(ingested_file.file_hash, compute_file_hash(file_path))
+        self.assertEqual(ingested_file.mime_type, 'video/quicktime')
+        self.assertEqual(ingested_file.width, 1744)
+        self.assertEqual(ingested_file.height, 1308)
+
+    def test_ingest_file_larger_than_buffer_streams_file(self):
+        file_path = f"{TEST_FILES_DIRECTORY}/image-without-location.jpg"
+
+        ingested_file = FileIngestor(max_buffer_size=1024).ingest_file(file_path)
+
+        self.assertEqual(ingested_file.file_hash, compute_file_hash(file_path))
+        self.assertEqual(ingested_file.mime_type, 'image/jpeg')
+        self.assertEqual(ingested_file.width, 3264)
+        self.assertEqual(ingested_file.height, 2448)
+        # The whole file for the hash, and then its headers for the dimensions
+        self.assertEqual(ingested_file.bytes_read, 2622651 + 15393)
+
+    def test_ingest_file_video_larger_than_buffer_counts_probed_headers(self):
+        file_path = f"{TEST_FILES_DIRECTORY}/video.mov"
+
+        with patch(
+            'photos_drive.backup.file_ingestion.get_width_height_of_video'
+        ) as mock_get_width_height_of_video:
+            ingested_file = FileIngestor(max_buffer_size=1024).ingest_file(file_path)
+
+        mock_get_width_height_of_video.assert_not_called()
+        self.assertEqual(ingested_file.mime_type, 'video/quicktime')
+        self.assertEqual(ingested_file.width, 1744)
+        self.assertEqual(ingested_file.height, 1308)
+        self.assertEqual(ingested_file.bytes_read, 2571720 + 164)
+
+    def test_ingest_file_image_larger_than_buffer_with_unknown_format(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'image.gif')
+            Image.new('RGB', (30, 20)).save(file_path)
+
+            ingested_file = FileIngestor(max_buffer_size=1).ingest_file(file_path)
+
+        self.assertEqual(ingested_file.mime_type, 'image/gif')
+        self.assertEqual(ingested_file.width, 30)
+        self.assertEqual(ingested_file.height, 20)
+        self.assertGreater(ingested_file.bytes_read, ingested_file.file_size)
+
+    def test_ingest_file_with_known_fields(self):
+        file_path = f"{TEST_FILES_DIRECTORY}/image-with-location.jpg"
+
+        ingested_file = FileIngestor().ingest_file(
+            file_path, mime_type='image/png', width=10, height=20
+        )
+
+        self.assertEqual(ingested_file.mime_type, 'image/png')
+        self.assertEqual(ingested_file.width, 10)
+        self.assertEqual(ingested_file.height, 20)
+
+    def test_ingest_file_with_unknown_format_falls_back_to_image_libraries(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'image.gif')
+            Image.new('RGB', (30, 20)).save(file_path)
+
+            ingested_file = FileIngestor().ingest_file(file_path)
+
+        self.assertEqual(ingested_file.mime_type, 'image/gif')
+        self.assertEqual(ingested_file.width, 30)
+        self.assertEqual(ingested_file.height, 20)
+
+    def test_build_ingestion_report(self):
+        ingestor = FileIngestor()
+        ingested_files = [
+            ingestor.ingest_file(f"{TEST_FILES_DIRECTORY}/image-with-location.jpg"),
+            ingestor.ingest_file(f"{TEST_FILES_DIRECTORY}/image-without-dates.jpg"),
+        ]
+
+        report = build_ingestion_report(ingested_files)
+
+        self.assertEqual(report.num_files, 2)
+        self.assertEqual(report.total_file_size, 2622777 + 2620046)
+        self.assertEqual(report.total_bytes_read, 2622777 + 2620046)
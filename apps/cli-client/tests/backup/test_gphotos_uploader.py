@@ -1,4 +1,6 @@
+import time
 import unittest
+from unittest.mock import Mock, patch
 
 from bson.objectid import ObjectId
 
@@ -10,13 +12,48 @@ from photos_drive.backup.gphotos_uploader import (
 from photos_drive.shared.core.storage.gphotos.clients_repository import (
     GPhotosClientsRepository,
 )
+from photos_drive.shared.core.storage.gphotos.media_items_client import (
+    UploadedPhotosPartiallyAddedError,
+)
 from photos_drive.shared.core.storage.gphotos.testing import (
     FakeGPhotosClient,
     FakeItemsRepository,
 )
+from photos_drive.shared.core.storage.gphotos.testing.fake_media_items_client import (
+    FakeGPhotosMediaItemsClient,
+)
+
+add_uploaded_photos_to_gphotos = (
+    FakeGPhotosMediaItemsClient.add_uploaded_photos_to_gphotos
+)
 
 
 class TestGPhotosMediaItemUploaderImpl(unittest.TestCase):
+    def test_upload_photos_calls_on_photo_uploaded(self):
+        gphotos_client_id = ObjectId()
+        gphotos_client = FakeGPhotosClient(FakeItemsRepository(), 'bob@gmail.com')
+        gphotos_clients_repo = GPhotosClientsRepository()
+        gphotos_clients_repo.add_gphotos_client(gphotos_client_id, gphotos_client)
+        uploader = GPhotosMediaItemUploaderImpl(gphotos_clients_repo)
+        on_photo_uploaded = Mock()
+
+        media_item_ids = uploader.upload_photos(
+            [
+                UploadRequest(
+                    file_path=f"path/to/photo{i}.jpg",
+                    file_name=f"photo{i}.jpg",
+                    gphotos_client_id=gphotos_client_id,
+                )
+                for i in range(3)
+            ],
+            on_photo_uploaded,
+        )
+
+        self.assertEqual(
+            sorted(c.args for c in on_photo_uploaded.call_args_list),
+            [(i, media_item_ids[i]) for i in range(3)],
+        )
+
     def test_upload_photos_success(self):
         gphotos_client_id = ObjectId()
         gphotos_client_id_str = str(gphotos_client_id)
@@ -48,8 +85,233 @@ class TestGPhotosMediaItemUploaderImpl(unittest.TestCase):
         self.assertEqual(stored_media_items[0].id, media_item_ids[0])
         self.assertEqual(stored_media_items[1].id, media_item_ids[1])
 
+    def test_upload_photos_adds_photos_in_batches_per_client(self):
+        gphotos_client_id_1 = ObjectId()
+        gphotos_client_id_2 = ObjectId()
+        gphotos_repo = FakeItemsRepository()
+        gphotos_clients_repo = GPhotosClientsRepository()
+        gphotos_clients_repo.add_gphotos_client(
+            gphotos_client_id_1,
+            FakeGPhotosClient(gphotos_repo, str(gphotos_client_id_1)),
+        )
+        gphotos_clients_repo.add_gphotos_client(
+            gphotos_client_id_2,
+            FakeGPhotosClient(gphotos_repo, str(gphotos_client_id_2)),
+        )
+        uploader = GPhotosMediaItemUploaderImpl(
+            gphotos_clients_repo, max_batch_size=2, max_batch_delay_in_seconds=60
+        )
+        upload_requests = [
+            UploadRequest(
+                file_path=f"path/to/photo{i}.jpg",
+                file_name=f"photo{i}.jpg",
+                gphotos_client_id=(
+                    gphotos_client_id_1 if i < 5 else gphotos_client_id_2
+                ),
+            )
+            for i in range(6)
+        ]
+
+        with patch.object(
+            FakeGPhotosMediaItemsClient,
+            'add_uploaded_photos_to_gphotos',
+            autospec=True,
+            side_effect=add_uploaded_photos_to_gphotos,
+        ) as mock_add_uploaded_photos:
+            media_item_ids = uploader.upload_photos(upload_requests)
+
+        self.assertEqual(
+            [len(c.args[1]) for c in mock_add_uploaded_photos.call_args_list],
+            [2, 2, 1, 1],
+        )
+        media_item_id_to_file_name = {
+            media_item.id: media_item.filename
+            for client_id in [gphotos_client_id_1, gphotos_client_id_2]
+            for media_item in gphotos_repo.search_for_media_items(
+                client_id=str(client_id)
+            )
+        }
+        self.assertEqual(
+            [media_item_id_to_file_name[id] for id in media_item_ids],
+            [request.file_name for request in upload_requests],
+        )
+
+    def test_upload_photos_with_no_batch_delay_adds_each_photo_right_away(self):
+        gphotos_client_id = ObjectId()
+        gphotos_client = FakeGPhotosClient(FakeItemsRepository(), 'bob@gmail.com')
+        gphotos_clients_repo = GPhotosClientsRepository()
+        gphotos_clients_repo.add_gphotos_client(gphotos_client_id, gphotos_client)
+        uploader = GPhotosMediaItemUploaderImpl(
+            gphotos_clients_repo, max_batch_delay_in_seconds=0
+        )
+
+        with patch.object(
+            FakeGPhotosMediaItemsClient,
+            'add_uploaded_photos_to_gphotos',
+            autospec=True,
+            side_effect=add_uploaded_photos_to_gphotos,
+        ) as mock_add_uploaded_photos:
+            uploader.upload_photos(
+                [
+                    UploadRequest(
+                        file_path=f"path/to/photo{i}.jpg",
+                        file_name=f"photo{i}.jpg",
+                        gphotos_client_id=gphotos_client_id,
+                    )
+                    for i in range(3)
+                ]
+            )
+
+        self.assertEqual(
+            [len(c.args[1]) for c in mock_add_uploaded_photos.call_args_list],
+            [1, 1, 1],
+        )
+
+    def test_upload_photos_partially_added_calls_on_photo_uploaded_and_throws_error(
+        self,
+    ):
+        gphotos_client_id = ObjectId()
+        gphotos_client = FakeGPhotosClient(FakeItemsRepository(), 'bob@gmail.com')
+        gphotos_clients_repo = GPhotosClientsRepository()
+        gphotos_clients_repo.add_gphotos_client(gphotos_client_id, gphotos_client)
+        uploader = GPhotosMediaItemUploaderImpl(gphotos_clients_repo)
+        on_photo_uploaded = Mock()
+
+        def add_first_uploaded_photo(client, upload_tokens, *args):
+            result = add_uploaded_photos_to_gphotos(client, upload_tokens[:1], *args)
+            raise UploadedPhotosPartiallyAddedError("Failed to add photos", result)
+
+        with (
+            patch.object(
+                FakeGPhotosMediaItemsClient,
+                'add_uploaded_photos_to_gphotos',
+                autospec=True,
+                side_effect=add_first_uploaded_photo,
+            ),
+            self.assertRaises(UploadedPhotosPartiallyAddedError),
+        ):
+            uploader.upload_photos(
+                [
+                    UploadRequest(
+                        file_path=f"path/to/photo{i}.jpg",
+                        file_name=f"photo{i}.jpg",
+                        gphotos_client_id=gphotos_client_id,
+                    )
+                    for i in range(3)
+                ],
+                on_photo_uploaded,
+            )
+
+        self.assertEqual(on_photo_uploaded.call_count, 1)
+        self.assertEqual(on_photo_uploaded.call_args.args[0], 0)
+
+    def test_upload_photos_with_failed_batch_adds_batches_of_other_clients(self):
+        gphotos_client_id_1 = ObjectId()
+        gphotos_client_id_2 = ObjectId()
+        gphotos_client_1 = FakeGPhotosClient(FakeItemsRepository(), 'bob@gmail.com')
+        gphotos_client_2 = FakeGPhotosClient(FakeItemsRepository(), 'sam@gmail.com')
+        gphotos_clients_repo = GPhotosClientsRepository()
+        gphotos_clients_repo.add_gphotos_client(gphotos_client_id_1, gphotos_client_1)
+        gphotos_clients_repo.add_gphotos_client(gphotos_client_id_2, gphotos_client_2)
+        uploader = GPhotosMediaItemUploaderImpl(
+            gphotos_clients_repo, max_batch_delay_in_seconds=60
+        )
+        on_photo_uploaded = Mock()
+
+        def add_uploaded_photos_of_second_client(client, *args):
+            if client is gphotos_client_1.media_items():
+                raise ValueError("Failed to add photos")
+            return add_uploaded_photos_to_gphotos(client, *args)
+
+        with (
+            patch.object(
+                FakeGPhotosMediaItemsClient,
+                'add_uploaded_photos_to_gphotos',
+                autospec=True,
+                side_effect=add_uploaded_photos_of_second_client,
+            ),
+            self.assertRaisesRegex(ValueError, "Failed to add photos"),
+        ):
+            uploader.upload_photos(
+                [
+                    UploadRequest(
+                        file_path="path/to/photo1.jpg",
+                        file_name="photo1.jpg",
+                        gphotos_client_id=gphotos_client_id_1,
+                    ),
+                    UploadRequest(
+                        file_path="path/to/photo2.jpg",
+                        file_name="photo2.jpg",
+                        gphotos_client_id=gphotos_client_id_2,
+                    ),
+                ],
+                on_photo_uploaded,
+            )
+
+        self.assertEqual(on_photo_uploaded.call_count, 1)
+        self.assertEqual(on_photo_uploaded.call_args.args[0], 1)
+
+    def test_upload_photos_stops_uploading_once_cancelled(self):
+        gphotos_client_id = ObjectId()
+        gphotos_client = FakeGPhotosClient(FakeItemsRepository(), 'bob@gmail.com')
+        gphotos_clients_repo = GPhotosClientsRepository()
+        gphotos_clients_repo.add_gphotos_client(gphotos_client_id, gphotos_client)
+        uploader = GPhotosMediaItemUploaderImpl(gphotos_clients_repo)
+        on_upload_token_created = Mock()
+
+        media_item_ids = uploader.upload_photos(
+            [
+                UploadRequest(
+                    file_path=f"path/to/photo{i}.jpg",
+                    file_name=f"photo{i}.jpg",
+                    gphotos_client_id=gphotos_client_id,
+                )
+                for i in range(4)
+            ],
+            on_upload_token_created=on_upload_token_created,
+            is_cancelled=lambda: on_upload_token_created.call_count >= 2,
+        )
+
+        self.assertEqual(on_upload_token_created.call_count, 2)
+        self.assertNotEqual(media_item_ids[0], '')
+        self.assertNotEqual(media_item_ids[1], '')
+        self.assertEqual(media_item_ids[2:], ['', ''])
+
+    def test_constructor_with_invalid_max_batch_size_throws_error(self):
+        gphotos_clients_repo = GPhotosClientsRepository()
+
+        with self.assertRaises(ValueError):
+            GPhotosMediaItemUploaderImpl(gphotos_clients_repo, max_batch_size=0)
+        with self.assertRaises(ValueError):
+            GPhotosMediaItemUploaderImpl(gphotos_clients_repo, max_batch_size=51)
+
 
 class TestGPhotosMediaItemParallelUploaderImpl(unittest.TestCase):
+    def test_upload_photos_calls_on_photo_uploaded(self):
+        gphotos_client_id = ObjectId()
+        gphotos_client = FakeGPhotosClient(FakeItemsRepository(), 'bob@gmail.com')
+        gphotos_clients_repo = GPhotosClientsRepository()
+        gphotos_clients_repo.add_gphotos_client(gphotos_client_id, gphotos_client)
+        uploader = GPhotosMediaItemParallelUploaderImpl(gphotos_clients_repo)
+        on_photo_uploaded = Mock()
+
+        media_item_ids = uploader.upload_photos(
+            [
+                UploadRequest(
+                    file_path=f"path/to/photo{i}.jpg",
+                    file_name=f"photo{i}.jpg",
+                    gphotos_client_id=gphotos_client_id,
+                )
+                for i in range(3)
+            ],
+            on_photo_uploaded,
+        )
+
+        self.assertEqual(
+            sorted(c.args for c in on_photo_uploaded.call_args_list),
+            [(i, media_item_ids[i]) for i in range(3)],
+        )
+
     def test_upload_photos_success(self):
         gphotos_client_id = ObjectId()
         gphotos_client_id_str = str(gphotos_client_id)
@@ -120,3 +382,116 @@ class TestGPhotosMediaItemParallelUploaderImpl(unittest.TestCase):
         self.assertEqual(len(stored_media_items_2), 1)
         self.assertEqual(stored_media_items_1[0].id, media_item_ids[0])
         self.assertEqual(stored_media_items_2[0].id, media_item_ids[1])
+
+    def test_upload_photos_adds_photos_in_batches(self):
+        gphotos_client_id = ObjectId()
+        gphotos_client = FakeGPhotosClient(FakeItemsRepository(), 'bob@gmail.com')
+        gphotos_clients_repo = GPhotosClientsRepository()
+        gphotos_clients_repo.add_gphotos_client(gphotos_client_id, gphotos_client)
+        uploader = GPhotosMediaItemParallelUploaderImpl(
+            gphotos_clients_repo, max_batch_size=2, max_batch_delay_in_seconds=60
+        )
+        on_photo_uploaded = Mock()
+
+        with patch.object(
+            FakeGPhotosMediaItemsClient,
+            'add_uploaded_photos_to_gphotos',
+            autospec=True,
+            side_effect=add_uploaded_photos_to_gphotos,
+        ) as mock_add_uploaded_photos:
+            media_item_ids = uploader.upload_photos(
+                [
+                    UploadRequest(
+                        file_path=f"path/to/photo{i}.jpg",
+                        file_name=f"photo{i}.jpg",
+                        gphotos_client_id=gphotos_client_id,
+                    )
+                    for i in range(5)
+                ],
+                on_photo_uploaded,
+            )
+
+        self.assertEqual(
+            [len(c.args[1]) for c in mock_add_uploaded_photos.call_args_list],
+            [2, 2, 1],
+        )
+        self.assertEqual(
+            sorted(c.args for c in on_photo_uploaded.call_args_list),
+            [(i, media_item_ids[i]) for i in range(5)],
+        )
+
+    def test_upload_photos_when_cancelled_does_not_upload_photos(self):
+        gphotos_client_id = ObjectId()
+        gphotos_repo = FakeItemsRepository()
+        gphotos_client = FakeGPhotosClient(gphotos_repo, str(gphotos_client_id))
+        gphotos_clients_repo = GPhotosClientsRepository()
+        gphotos_clients_repo.add_gphotos_client(gphotos_client_id, gphotos_client)
+        uploader = GPhotosMediaItemParallelUploaderImpl(gphotos_clients_repo)
+
+        media_item_ids = uploader.upload_photos(
+            [
+                UploadRequest(
+                    file_path=f"path/to/photo{i}.jpg",
+                    file_name=f"photo{i}.jpg",
+                    gphotos_client_id=gphotos_client_id,
+                )
+                for i in range(3)
+            ],
+            is_cancelled=lambda: True,
+        )
+
+        self.assertEqual(media_item_ids, ['', '', ''])
+        self.assertEqual(
+            gphotos_repo.search_for_media_items(client_id=str(gphotos_client_id)), []
+        )
+
+    def test_upload_photos_with_failed_upload_adds_uploaded_photos_and_throws_error(
+        self,
+    ):
+        gphotos_client_id = ObjectId()
+        gphotos_client = FakeGPhotosClient(FakeItemsRepository(), 'bob@gmail.com')
+        gphotos_clients_repo = GPhotosClientsRepository()
+        gphotos_clients_repo.add_gphotos_client(gphotos_client_id, gphotos_client)
+        uploader = GPhotosMediaItemParallelUploaderImpl(gphotos_clients_repo)
+        on_photo_uploaded = Mock()
+        on_upload_token_created = Mock()
+        upload_photo_in_chunks = FakeGPhotosMediaItemsClient.upload_photo_in_chunks
+
+        def upload_photo_or_fail(client, file_path, file_name):
+            if file_name == 'photo0.jpg':
+                raise ValueError("Failed to upload photo")
+            time.sleep(0.2)
+            return upload_photo_in_chunks(client, file_path, file_name)
+
+        with (
+            patch.object(
+                FakeGPhotosMediaItemsClient,
+                'upload_photo_in_chunks',
+                autospec=True,
+                side_effect=upload_photo_or_fail,
+            ),
+            self.assertRaisesRegex(ValueError, "Failed to upload photo"),
+        ):
+            uploader.upload_photos(
+                [
+                    UploadRequest(
+                        file_path=f"path/to/photo{i}.jpg",
+                        file_name=f"photo{i}.jpg",
+                        gphotos_client_id=gphotos_client_id,
+                    )
+                    for i in range(10)
+                ],
+                on_photo_uploaded,
+                on_upload_token_created,
+            )
+
+        # Every photo that was uploaded is recorded and added to Google Photos
+        uploaded_indices = {c.args[0] for c in on_upload_token_created.call_args_list}
+        added_indices = {c.args[0] for c in on_photo_uploaded.call_args_list}
+        self.assertNotIn(0, uploaded_indices)
+        self.assertGreater(len(uploaded_indices), 0)
+        self.assertEqual(added_indices, uploaded_indices)
+        self.assertEqual(
+            len(gphotos_client.media_items().search_for_media_items()),
+            len(uploaded_indices),
+        )
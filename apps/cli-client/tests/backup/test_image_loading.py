@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+
+from PIL import Image
+
+from photos_drive.backup.image_loading import ImageBatchLoader, load_image
+
+TEST_FILES_DIRECTORY = "./tests/backup/resources/test_processed_diffs_files"
+
+
+class TestLoadImage(unittest.TestCase):
+    def test_load_image_jpeg_decodes_at_reduced_resolution(self):
+        image = load_image(f"{TEST_FILES_DIRECTORY}/image-with-location.jpg", 384)
+
+        self.assertEqual(image.mode, "RGB")
+        self.assertEqual(image.size, (512, 384))
+
+    def test_load_image_small_image_keeps_its_size(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "small.png")
+            Image.new("RGBA", (100, 50)).save(file_path)
+
+            image = load_image(file_path, 384)
+
+        self.assertEqual(image.mode, "RGB")
+        self.assertEqual(image.size, (100, 50))
+
+
+class TestImageBatchLoader(unittest.TestCase):
+    def test_load_batches(self):
+        file_paths = [
+            f"{TEST_FILES_DIRECTORY}/image-with-location.jpg",
+            f"{TEST_FILES_DIRECTORY}/image-without-location.jpg",
+            f"{TEST_FILES_DIRECTORY}/image-without-dates.jpg",
+        ]
+
+        batches = list(ImageBatchLoader(min_side=64).load_batches(file_paths, 2))
+
+        self.assertEqual([len(batch) for batch in batches], [2, 1])
+        self.assertEqual(batches[0][0].size, (86, 64))
+
+    def test_load_batches_in_processes(self):
+        file_paths = [
+            f"{TEST_FILES_DIRECTORY}/image-with-location.jpg",
+            f"{TEST_FILES_DIRECTORY}/image-without-location.jpg",
+            f"{TEST_FILES_DIRECTORY}/image-without-dates.jpg",
+        ]
+        loader = ImageBatchLoader(num_processes=2, min_side=64)
+
+        batches = list(loader.load_batches(file_paths, 2))
+
+        self.assertEqual([len(batch) for batch in batches], [2, 1])
+        self.assertEqual(batches[1][0].size, (86, 64))
+
+    def test_load_batches_with_changing_batch_size(self):
+        file_paths = [f"{TEST_FILES_DIRECTORY}/image-with-location.jpg"] * 6
+        batch_sizes = iter([1, 2, 3])
+
+        batches = list(
+            ImageBatchLoader(min_side=64).load_batches(
+                file_paths, lambda: next(batch_sizes)
+            )
+        )
+
+        self.assertEqual([len(batch) for batch in batches], [1, 2, 3])
+
+    def test_constructor_with_invalid_num_processes_raises_error(self):
+        with self.assertRaises(ValueError):
+            ImageBatchLoader(num_processes=-1)
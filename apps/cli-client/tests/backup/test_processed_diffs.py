@@ -1,11 +1,21 @@
 from datetime import datetime, timezone
+import os
+import shutil
+import tempfile
 import unittest
+from unittest.mock import patch
 
 from photos_drive.backup.diffs import Diff
+from photos_drive.backup.enrichment_cache import (
+    EnrichmentCache,
+    get_enrichment_cache_key,
+)
+from photos_drive.backup.image_loading import load_image
 from photos_drive.backup.processed_diffs import (
     EMPTY_CAPTIONS,
     EMPTY_EMBEDDING,
     DiffsProcessor,
+    EmbeddingReuseReport,
     ProcessedDiff,
 )
 from photos_drive.shared.core.media_items.gps_location import GpsLocation
@@ -17,6 +27,7 @@ from photos_drive.shared.features.llm.models.testing.fake_image_embedder import
     FAKE_EMBEDDING,
     FakeImageEmbedder,
 )
+from photos_drive.shared.utils.hashes.file_hasher import HashAlgorithm
 from photos_drive.shared.utils.hashes.xxhash import compute_file_hash
 
 MOCK_DATE_TAKEN = datetime(2025, 6, 6, 14, 30, 0, tzinfo=timezone.utc)
@@ -264,6 +275,274 @@ class TestDiffsProcessor(unittest.TestCase):
             ),
         )
 
+    def test_process_raw_diffs_in_chunks(self):
+        diffs = [Diff(modifier="-", file_path=f"Photos/2010/{i}.jpg") for i in range(5)]
+
+        processor = DiffsProcessor(FakeImageEmbedder(), FakeImageCaptions())
+        chunks = list(processor.process_raw_diffs_in_chunks(diffs, 2))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual(
+            [diff.file_name for chunk in chunks for diff in chunk],
+            ['0.jpg', '1.jpg', '2.jpg', '3.jpg', '4.jpg'],
+        )
+
+    def test_process_raw_diffs_with_enrichment_cache(self):
+        test_file_path = self.__get_file_path("image-with-location.jpg")
+        diff = Diff(
+            modifier="+",
+            file_path=test_file_path,
+            album_name='Photos/2010',
+            location=GpsLocation(latitude=100, longitude=200),
+            date_taken=datetime(2010, 2, 2),
+        )
+        embedder = FakeImageEmbedder()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = EnrichmentCache(os.path.join(temp_dir, 'cache.sqlite3'))
+            processor = DiffsProcessor(
+                embedder,
+                FakeImageCaptions(),
+                enrichment_cache=cache,
+                embedding_model_id='clip',
+            )
+
+            first_processed_diffs = processor.process_raw_diffs([diff])
+            with patch.object(embedder, 'embed_images') as mock_embed_images:
+                second_processed_diffs = processor.process_raw_diffs(
+                    [diff, Diff(modifier="-", file_path="Photos/2010/dog.jpg")]
+                )
+                mock_embed_images.assert_not_called()
+            report = cache.get_report()
+            cache.close()
+
+        self.assertEqual(second_processed_diffs[0], first_processed_diffs[0])
+        self.assertEqual(second_processed_diffs[1].modifier, '-')
+        self.assertEqual(report.num_hits, 1)
+        self.assertEqual(report.num_misses, 1)
+
+    def test_process_raw_diffs_with_enrichment_cache_and_new_hash_algorithm(self):
+        diff = Diff(
+            modifier="+",
+            file_path=self.__get_file_path("image-with-location.jpg"),
+            album_name='Photos/2010',
+            location=GpsLocation(latitude=100, longitude=200),
+            date_taken=datetime(2010, 2, 2),
+        )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = EnrichmentCache(os.path.join(temp_dir, 'cache.sqlite3'))
+            DiffsProcessor(
+                FakeImageEmbedder(),
+                enrichment_cache=cache,
+                embedding_model_id='clip',
+                hash_algorithm=HashAlgorithm.XXH64,
+            ).process_raw_diffs([diff])
+
+            processed_diffs = DiffsProcessor(
+                FakeImageEmbedder(),
+                enrichment_cache=cache,
+                embedding_model_id='clip',
+                hash_algorithm=HashAlgorithm.XXH3_128,
+            ).process_raw_diffs([diff])
+            cached_processed_diff = cache.get(get_enrichment_cache_key(diff.file_path))
+            cache.close()
+
+        self.assertEqual(processed_diffs[0].file_hash[0], HashAlgorithm.XXH3_128.value)
+        self.assertEqual(len(processed_diffs[0].file_hash), 17)
+        assert cached_processed_diff is not None
+        self.assertEqual(cached_processed_diff.file_hash, processed_diffs[0].file_hash)
+
+    def test_process_raw_diffs_with_enrichment_cache_of_other_model_embeds_again(
+        self,
+    ):
+        diff = Diff(
+            modifier="+",
+            file_path=self.__get_file_path("image-with-location.jpg"),
+            album_name='Photos/2010',
+            location=GpsLocation(latitude=100, longitude=200),
+            date_taken=datetime(2010, 2, 2),
+        )
+        embedder = FakeImageEmbedder()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = EnrichmentCache(os.path.join(temp_dir, 'cache.sqlite3'))
+            DiffsProcessor(
+                embedder, enrichment_cache=cache, embedding_model_id='clip'
+            ).process_raw_diffs([diff])
+
+            with patch.object(
+                embedder, 'embed_images', wraps=embedder.embed_images
+            ) as mock_embed_images:
+                DiffsProcessor(
+                    embedder, enrichment_cache=cache, embedding_model_id='clip:int8'
+                ).process_raw_diffs([diff])
+            cache.close()
+
+        self.assertEqual(mock_embed_images.call_count, 1)
+
+    def test_constructor_with_enrichment_cache_and_no_model_id_throws_error(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = EnrichmentCache(os.path.join(temp_dir, 'cache.sqlite3'))
+            with self.assertRaises(ValueError):
+                DiffsProcessor(FakeImageEmbedder(), enrichment_cache=cache)
+            cache.close()
+
+    def test_process_raw_diffs_with_duplicate_images_embeds_once(self):
+        embedder = FakeImageEmbedder()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            diffs = []
+            for file_name in ["dog.jpg", "copy-of-dog.jpg"]:
+                file_path = os.path.join(temp_dir, file_name)
+                shutil.copy(self.__get_file_path("image-with-location.jpg"), file_path)
+                diffs.append(
+                    Diff(
+                        modifier="+",
+                        file_path=file_path,
+                        album_name='Photos/2010',
+                        location=GpsLocation(latitude=100, longitude=200),
+                        date_taken=datetime(2010, 2, 2),
+                    )
+                )
+
+            processor = DiffsProcessor(embedder, FakeImageCaptions())
+            with patch.object(
+                embedder, 'embed_images', wraps=embedder.embed_images
+            ) as mock_embed_images:
+                processed_diffs = processor.process_raw_diffs(diffs)
+
+        self.assertEqual(mock_embed_images.call_count, 1)
+        self.assertEqual(len(mock_embed_images.call_args.args[0]), 1)
+        self.assertEqual(
+            [diff.captions for diff in processed_diffs], [FAKE_CAPTIONS] * 2
+        )
+        self.assertEqual(len(processed_diffs[1].embedding), len(FAKE_EMBEDDING))
+        self.assertEqual(
+            processor.last_embedding_reuse_report,
+            EmbeddingReuseReport(
+                num_images=2,
+                num_reused_from_duplicates=1,
+                num_reused_from_cache=0,
+                reuse_rate=0.5,
+            ),
+        )
+
+    def test_process_raw_diffs_with_moved_image_reuses_cached_embedding(self):
+        embedder = FakeImageEmbedder()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            old_file_path = os.path.join(temp_dir, "2010", "dog.jpg")
+            new_file_path = os.path.join(temp_dir, "2011", "dog.jpg")
+            os.makedirs(os.path.dirname(old_file_path))
+            shutil.copy(self.__get_file_path("image-with-location.jpg"), old_file_path)
+            cache = EnrichmentCache(os.path.join(temp_dir, 'cache.sqlite3'))
+            processor = DiffsProcessor(
+                embedder,
+                FakeImageCaptions(),
+                enrichment_cache=cache,
+                embedding_model_id='clip',
+            )
+            first_processed_diffs = processor.process_raw_diffs(
+                [
+                    Diff(
+                        modifier="+",
+                        file_path=old_file_path,
+                        location=GpsLocation(latitude=100, longitude=200),
+                        date_taken=datetime(2010, 2, 2),
+                    )
+                ]
+            )
+
+            os.makedirs(os.path.dirname(new_file_path))
+            shutil.move(old_file_path, new_file_path)
+            with patch.object(embedder, 'embed_images') as mock_embed_images:
+                second_processed_diffs = processor.process_raw_diffs(
+                    [
+                        Diff(modifier="-", file_path=old_file_path),
+                        Diff(
+                            modifier="+",
+                            file_path=new_file_path,
+                            location=GpsLocation(latitude=100, longitude=200),
+                            date_taken=datetime(2010, 2, 2),
+                        ),
+                    ]
+                )
+                mock_embed_images.assert_not_called()
+            cache.close()
+
+        self.assertEqual(second_processed_diffs[1].captions, FAKE_CAPTIONS)
+        self.assertEqual(
+            list(second_processed_diffs[1].embedding),
+            list(first_processed_diffs[0].embedding),
+        )
+        self.assertEqual(
+            processor.last_embedding_reuse_report,
+            EmbeddingReuseReport(
+                num_images=1,
+                num_reused_from_duplicates=0,
+                num_reused_from_cache=1,
+                reuse_rate=1.0,
+            ),
+        )
+
+    def test_process_raw_diffs_decodes_each_image_once(self):
+        diffs = [
+            Diff(
+                modifier="+",
+                file_path=self.__get_file_path(file_name),
+                location=GpsLocation(latitude=100, longitude=200),
+                date_taken=datetime(2010, 2, 2),
+            )
+            for file_name in ["image-with-location.jpg", "image-without-dates.jpg"]
+        ]
+
+        with patch(
+            "photos_drive.backup.image_loading.load_image", wraps=load_image
+        ) as mock_load_image:
+            processor = DiffsProcessor(FakeImageEmbedder(), FakeImageCaptions())
+            processed_diffs = processor.process_raw_diffs(diffs)
+
+        self.assertEqual(mock_load_image.call_count, 2)
+        self.assertEqual(
+            [diff.captions for diff in processed_diffs], [FAKE_CAPTIONS] * 2
+        )
+        self.assertEqual(len(processed_diffs[1].embedding), len(FAKE_EMBEDDING))
+
+    def test_process_raw_diffs_with_adaptive_batch_sizes(self):
+        diffs = [
+            Diff(
+                modifier="+",
+                file_path=self.__get_file_path(file_name),
+                location=GpsLocation(latitude=100, longitude=200),
+                date_taken=datetime(2010, 2, 2),
+            )
+            for file_name in ["image-with-location.jpg", "image-without-dates.jpg"]
+        ]
+
+        processor = DiffsProcessor(
+            FakeImageEmbedder(),
+            FakeImageCaptions(),
+            embedder_batch_size=1,
+            captions_batch_size=1,
+            adaptive_batch_sizes=True,
+        )
+        processed_diffs = processor.process_raw_diffs(diffs)
+
+        self.assertEqual(
+            [diff.captions for diff in processed_diffs], [FAKE_CAPTIONS] * 2
+        )
+        self.assertEqual(len(processed_diffs[1].embedding), len(FAKE_EMBEDDING))
+
+    def test_process_raw_diffs_without_image_captions(self):
+        diff = Diff(
+            modifier="+",
+            file_path=self.__get_file_path("image-with-location.jpg"),
+            location=GpsLocation(latitude=100, longitude=200),
+            date_taken=datetime(2010, 2, 2),
+        )
+
+        processor = DiffsProcessor(FakeImageEmbedder())
+        processed_diffs = processor.process_raw_diffs([diff])
+
+        self.assertEqual(processed_diffs[0].captions, EMPTY_CAPTIONS)
+        self.assertEqual(len(processed_diffs[0].embedding), len(FAKE_EMBEDDING))
+
     def test_process_raw_diffs_file_not_exist(self):
         diff = Diff(
             modifier="+", file_path="path/to/nonexistent_photo.jpg", album_name=None
@@ -408,6 +408,86 @@ class SystemCleanerTests(unittest.TestCase):
         self.assertEqual(len(gmedia_items), 1)
         self.assertEqual(gmedia_items[0].filename, 'cat.png')
 
+    def test_clean_keeps_gmedia_items_shared_with_attached_media_items(self):
+        # Test setup 1: Build the wrapper objects
+        mongodb_clients_repo = MongoDBClientsRepository()
+        gphotos_client_id = ObjectId()
+        gphotos_client = FakeGPhotosClient(FakeItemsRepository(), 'bob@gmail.com')
+        gphotos_clients_repo = GPhotosClientsRepository()
+        gphotos_clients_repo.add_gphotos_client(gphotos_client_id, gphotos_client)
+
+        client_id = ObjectId()
+        mongodb_clients_repo.add_mongodb_client(
+            client_id, create_mock_mongo_client(1000)
+        )
+        albums_repo = MongoDBAlbumsRepository(
+            client_id,
+            mongodb_clients_repo.get_client_by_id(client_id),
+            mongodb_clients_repo,
+        )
+        media_items_repo = MongoDBMediaItemsRepository(
+            client_id,
+            mongodb_clients_repo.get_client_by_id(client_id),
+            mongodb_clients_repo,
+        )
+
+        # Test setup 2: Attach 'Archives' in root album but not 'Photos'
+        root_album = albums_repo.create_album('', None)
+        config = InMemoryConfig()
+        config.set_root_album_id(root_album.id)
+        archives_album = albums_repo.create_album('Archives', root_album.id)
+        photos_album = albums_repo.create_album('Photos', None)
+
+        # Test setup 3: Add the same image to both albums, sharing one gmedia item
+        dog_upload_token = gphotos_client.media_items().upload_photo(
+            './Archives/dog.png', 'dog.png'
+        )
+        gmedia_item_id = (
+            gphotos_client.media_items()
+            .add_uploaded_photos_to_gphotos([dog_upload_token])
+            .newMediaItemResults[0]
+            .mediaItem.id
+        )
+        archives_dog, photos_dog = media_items_repo.create_many_media_items(
+            [
+                CreateMediaItemRequest(
+                    file_name='dog.png',
+                    file_hash=MOCK_FILE_HASH,
+                    location=None,
+                    gphotos_client_id=gphotos_client_id,
+                    gphotos_media_item_id=gmedia_item_id,
+                    album_id=album_id,
+                    width=100,
+                    height=200,
+                    date_taken=MOCK_DATE_TAKEN,
+                    embedding_id=None,
+                    mime_type='image/png',
+                )
+                for album_id in [archives_album.id, photos_album.id]
+            ]
+        )
+
+        # Act: clean the system
+        cleaner = SystemCleaner(
+            config,
+            albums_repo,
+            media_items_repo,
+            gphotos_clients_repo,
+            mongodb_clients_repo,
+        )
+        items_to_delete = cleaner.find_item_to_delete()
+        clean_results = cleaner.delete_items(items_to_delete)
+
+        # Assert: the unattached media item is deleted but its gmedia item is kept
+        self.assertSetEqual(items_to_delete.media_item_ids_to_delete, {photos_dog.id})
+        self.assertSetEqual(items_to_delete.gphotos_media_item_ids_to_delete, set())
+        self.assertEqual(clean_results.num_gmedia_items_moved_to_trash, 0)
+        self.assertEqual(
+            [item.id for item in media_items_repo.get_all_media_items()],
+            [archives_dog.id],
+        )
+        self.assertEqual(gphotos_client.albums().list_albums(), [])
+
     def test_clean_prunes_albums(self):
         # Test setup 1: Build the wrapper objects
         mongodb_clients_repo = MongoDBClientsRepository()
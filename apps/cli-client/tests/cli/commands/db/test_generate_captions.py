@@ -0,0 +1,171 @@
+from datetime import datetime
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from PIL import Image
+from bson import ObjectId
+from typer.testing import CliRunner
+
+from photos_drive.cli.app import build_app
+from photos_drive.shared.core.albums.album_id import AlbumId
+from photos_drive.shared.core.albums.repository.mongodb import (
+    MongoDBAlbumsRepository,
+)
+from photos_drive.shared.core.databases.mongodb import MongoDBClientsRepository
+from photos_drive.shared.core.media_items.repository.base import (
+    CreateMediaItemRequest,
+)
+from photos_drive.shared.core.media_items.repository.mongodb import (
+    MongoDBMediaItemsRepository,
+)
+from photos_drive.shared.core.testing.mock_mongo_client import (
+    create_mock_mongo_client,
+)
+from photos_drive.shared.features.llm.models.testing.fake_image_captions import (
+    FAKE_CAPTIONS,
+    FakeImageCaptions,
+)
+
+
+class TestDbGenerateCaptions(unittest.TestCase):
+    def setUp(self):
+        self.mongodb_client_id = ObjectId()
+        self.mock_mongo_client = create_mock_mongo_client(1000 * 1024 * 1024)
+        self.mongodb_clients_repo = MongoDBClientsRepository()
+        self.mongodb_clients_repo.add_mongodb_client(
+            self.mongodb_client_id, self.mock_mongo_client
+        )
+        self.albums_repo = MongoDBAlbumsRepository(
+            self.mongodb_client_id, self.mock_mongo_client, self.mongodb_clients_repo
+        )
+        self.media_items_repo = MongoDBMediaItemsRepository(
+            self.mongodb_client_id, self.mock_mongo_client, self.mongodb_clients_repo
+        )
+        self.root_album = self.albums_repo.create_album("", None)
+        self.photos_album = self.albums_repo.create_album("Photos", self.root_album.id)
+
+        self.config_dir = tempfile.TemporaryDirectory()
+        self.config_file_path = os.path.join(self.config_dir.name, "config.ini")
+        with open(self.config_file_path, "w") as f:
+            f.write(
+                f"[{self.mongodb_client_id}]\n"
+                + "type = mongodb_config\n"
+                + "name = TestMongoDB\n"
+                + "read_write_connection_string = mongodb://localhost:27017\n"
+                + "read_only_connection_string = mongodb://localhost:27016\n"
+                + "\n"
+                + f"[{ObjectId()}]\n"
+                + "type = root_album\n"
+                + f"client_id = {self.root_album.id.client_id}\n"
+                + f"object_id = {self.root_album.id.object_id}\n"
+            )
+
+        self.patchers = [
+            patch.object(
+                MongoDBClientsRepository,
+                "build_from_config",
+                return_value=self.mongodb_clients_repo,
+            ),
+            patch(
+                "photos_drive.cli.commands.db.generate_captions."
+                + "create_lazy_blip_image_captions",
+                return_value=FakeImageCaptions(),
+            ),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        self.config_dir.cleanup()
+
+    def test_generate_captions_for_media_items_without_captions(self):
+        dog = self.__create_media_item("dog.jpg", "image/jpeg", None)
+        cat = self.__create_media_item("cat.jpg", "image/jpeg", "a cat")
+        video = self.__create_media_item("video.mp4", "video/mp4", None)
+        runner = CliRunner()
+
+        with runner.isolated_filesystem():
+            os.mkdir("Photos")
+            for file_name in ["dog.jpg", "cat.jpg"]:
+                Image.new("RGB", (800, 600)).save(os.path.join("Photos", file_name))
+
+            result = runner.invoke(
+                build_app(),
+                [
+                    "db",
+                    "generate-captions",
+                    "--config-file",
+                    self.config_file_path,
+                ],
+                input="y\n",
+            )
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Added captions to 1 media items", result.output)
+        self.assertEqual(
+            self.media_items_repo.get_media_item_by_id(dog.id).captions,
+            FAKE_CAPTIONS,
+        )
+        self.assertEqual(
+            self.media_items_repo.get_media_item_by_id(cat.id).captions, "a cat"
+        )
+        self.assertIsNone(self.media_items_repo.get_media_item_by_id(video.id).captions)
+
+    def test_generate_captions_for_media_items_in_nested_albums(self):
+        album_2010 = self.albums_repo.create_album("2010", self.photos_album.id)
+        bird = self.__create_media_item(
+            "bird.jpg", "image/jpeg", None, album_id=album_2010.id
+        )
+        runner = CliRunner()
+
+        with runner.isolated_filesystem():
+            os.makedirs(os.path.join("Photos", "2010"))
+            Image.new("RGB", (800, 600)).save(
+                os.path.join("Photos", "2010", "bird.jpg")
+            )
+
+            result = runner.invoke(
+                build_app(),
+                [
+                    "db",
+                    "generate-captions",
+                    "--config-file",
+                    self.config_file_path,
+                ],
+                input="y\n",
+            )
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Added captions to 1 media items", result.output)
+        self.assertEqual(
+            self.media_items_repo.get_media_item_by_id(bird.id).captions,
+            FAKE_CAPTIONS,
+        )
+
+    def __create_media_item(
+        self,
+        file_name: str,
+        mime_type: str,
+        captions: str | None,
+        album_id: AlbumId | None = None,
+    ):
+        return self.media_items_repo.create_media_item(
+            CreateMediaItemRequest(
+                file_name=file_name,
+                file_hash=b'hash',
+                location=None,
+                gphotos_client_id=ObjectId(),
+                gphotos_media_item_id=f"gphotos_{file_name}",
+                album_id=album_id or self.photos_album.id,
+                width=800,
+                height=600,
+                date_taken=datetime(2010, 2, 2),
+                embedding_id=None,
+                mime_type=mime_type,
+                captions=captions,
+            )
+        )
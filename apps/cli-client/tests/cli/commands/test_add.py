@@ -3,6 +3,7 @@ import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
 
+from PIL import Image
 from bson import ObjectId
 from typer.testing import CliRunner
 
@@ -139,11 +140,11 @@ class TestAddCli(unittest.TestCase):
                 return_value=self.gphotos_clients_repo,
             ),
             patch(
-                "photos_drive.cli.commands.add.OpenCLIPImageEmbeddings",
+                "photos_drive.cli.commands.add.create_lazy_open_clip_image_embeddings",
                 return_value=FakeImageEmbedder(),
             ),
             patch(
-                "photos_drive.cli.commands.add.BlipImageCaptions",
+                "photos_drive.cli.commands.add.create_lazy_blip_image_captions",
                 return_value=FakeImageCaptions(),
             ),
             patch(
@@ -151,15 +152,19 @@ class TestAddCli(unittest.TestCase):
                 return_value=FakeVectorStore(),
             ),
             # Mocking magic to avoid libmagic dependency issues in some environments
-            patch("magic.from_file", return_value="image/jpeg"),
+            patch("magic.from_buffer", return_value="image/jpeg"),
             # Mocking PIL and ExifTool to avoid real file processing
-            patch("PIL.Image.open", return_value=MagicMock()),
             patch(
-                "photos_drive.backup.processed_diffs.get_width_height_of_image",
+                "PIL.Image.open",
+                side_effect=lambda *args, **kwargs: Image.new("RGB", (800, 600)),
+            ),
+            patch(
+                "photos_drive.backup.file_ingestion."
+                + "get_width_height_of_image_from_buffer",
                 return_value=(800, 600),
             ),
             patch(
-                "photos_drive.backup.processed_diffs.ExifToolHelper",
+                "photos_drive.backup.exiftool_pool.ExifToolHelper",
                 return_value=self.exif_mock,
             ),
         ]
@@ -233,6 +238,31 @@ class TestAddCli(unittest.TestCase):
         gitems = self.fake_gphotos_client.media_items().search_for_media_items()
         self.assertEqual(len(gitems), 2)
 
+    def test_add_with_unknown_cpu_embeddings_backend_fails_before_processing(self):
+        runner = CliRunner()
+        app = build_app()
+
+        # Act
+        result = runner.invoke(
+            app,
+            args=[
+                "add",
+                self.image1_path,
+                "--config-file",
+                self.config_file_path,
+                "--cpu-embeddings-backend",
+                "gpu",
+            ],
+            input="y\n",
+        )
+
+        # Assert
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertIsInstance(result.exception, ValueError)
+        self.exif_mock.get_tags.assert_not_called()
+        media_items_coll = self.mock_mongo_client["photos_drive"]["media_items"]
+        self.assertEqual(media_items_coll.count_documents({}), 0)
+
     def test_add_cancelled_by_user(self):
         with patch(
             "photos_drive.cli.commands.add.prompt_user_for_yes_no_answer",
@@ -254,3 +254,24 @@ class TestCleanCli(unittest.TestCase):
         self.assertIn("Number of media items deleted: 0", result.stdout)
         self.assertIn("Number of albums deleted: 0", result.stdout)
         self.assertIn("Number of Google Photos items trashed: 0", result.stdout)
+
+    def test_clean_removes_backup_journal(self):
+        journal_path = os.path.join(
+            self.config_dir.name, "photos_drive_backup_journal.sqlite3"
+        )
+        with open(journal_path, "w") as f:
+            f.write("")
+
+        runner = CliRunner()
+        app = build_app()
+
+        # Act
+        result = runner.invoke(
+            app,
+            args=["clean", "--config-file", self.config_file_path],
+            input="y\n",
+        )
+
+        # Assert
+        self.assertEqual(result.exit_code, 0)
+        self.assertFalse(os.path.exists(journal_path))
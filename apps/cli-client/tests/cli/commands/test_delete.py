@@ -2,8 +2,9 @@ from datetime import datetime
 import os
 import tempfile
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, Mock, patch
 
+from PIL import Image
 from bson import ObjectId
 from typer.testing import CliRunner
 
@@ -28,8 +29,8 @@ from photos_drive.shared.core.storage.gphotos.testing import (
 from photos_drive.shared.core.testing.mock_mongo_client import (
     create_mock_mongo_client,
 )
-from photos_drive.shared.features.llm.models.testing.fake_image_captions import (
-    FakeImageCaptions,
+from photos_drive.shared.features.llm.models.lazy_models import (
+    LazyImageEmbeddings,
 )
 from photos_drive.shared.features.llm.models.testing.fake_image_embedder import (
     FakeImageEmbedder,
@@ -108,6 +109,10 @@ class TestDeleteCli(unittest.TestCase):
                 + "path = memory\n"
             )
 
+        # 5. Set up a model that should never be loaded
+        self.create_image_embedder = Mock(return_value=FakeImageEmbedder())
+        self.image_embedder = LazyImageEmbeddings(self.create_image_embedder)
+
         # 6. Apply patches
         self.patchers = [
             patch.object(
@@ -121,25 +126,26 @@ class TestDeleteCli(unittest.TestCase):
                 return_value=self.gphotos_clients_repo,
             ),
             patch(
-                "photos_drive.cli.commands.delete.OpenCLIPImageEmbeddings",
-                return_value=FakeImageEmbedder(),
-            ),
-            patch(
-                "photos_drive.cli.commands.delete.BlipImageCaptions",
-                return_value=FakeImageCaptions(),
+                "photos_drive.cli.commands.delete."
+                + "create_lazy_open_clip_image_embeddings",
+                return_value=self.image_embedder,
             ),
             patch(
                 "photos_drive.cli.commands.delete.DistributedVectorStore",
                 return_value=FakeVectorStore(),
             ),
-            patch("magic.from_file", return_value="image/jpeg"),
-            patch("PIL.Image.open", return_value=MagicMock()),
+            patch("magic.from_buffer", return_value="image/jpeg"),
+            patch(
+                "PIL.Image.open",
+                side_effect=lambda *args, **kwargs: Image.new("RGB", (800, 600)),
+            ),
             patch(
-                "photos_drive.backup.processed_diffs.get_width_height_of_image",
+                "photos_drive.backup.file_ingestion."
+                + "get_width_height_of_image_from_buffer",
                 return_value=(800, 600),
             ),
             patch(
-                "photos_drive.backup.processed_diffs.ExifToolHelper",
+                "photos_drive.backup.exiftool_pool.ExifToolHelper",
                 return_value=MagicMock(),
             ),
         ]
@@ -195,6 +201,7 @@ class TestDeleteCli(unittest.TestCase):
             # Assert
             self.assertEqual(result.exit_code, 0)
             self.assertIn("Items deleted: 1", result.stdout)
+            self.create_image_embedder.assert_not_called()
 
             # Verify MongoDB state
             media_items_coll = self.mock_mongo_client["photos_drive"]["media_items"]
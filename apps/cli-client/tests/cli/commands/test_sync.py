@@ -1,13 +1,17 @@
 from datetime import datetime
 import os
 import tempfile
+import time
 from typing import Any, cast
 import unittest
 from unittest.mock import MagicMock, patch
 
+from PIL import Image
 from bson import ObjectId
 from typer.testing import CliRunner
 
+from photos_drive.backup.backup_photos import PhotosBackup
+from photos_drive.backup.processed_diffs import DiffsProcessor
 from photos_drive.cli.app import build_app
 from photos_drive.shared.core.albums.repository.mongodb import (
     MongoDBAlbumsRepository,
@@ -128,25 +132,29 @@ class TestSyncCli(unittest.TestCase):
                 return_value=self.gphotos_clients_repo,
             ),
             patch(
-                "photos_drive.cli.commands.sync.OpenCLIPImageEmbeddings",
+                "photos_drive.cli.commands.sync.create_lazy_open_clip_image_embeddings",
                 return_value=FakeImageEmbedder(),
             ),
             patch(
-                "photos_drive.cli.commands.sync.BlipImageCaptions",
+                "photos_drive.cli.commands.sync.create_lazy_blip_image_captions",
                 return_value=FakeImageCaptions(),
             ),
             patch(
                 "photos_drive.cli.commands.sync.DistributedVectorStore",
                 return_value=FakeVectorStore(),
             ),
-            patch("magic.from_file", return_value="image/jpeg"),
-            patch("PIL.Image.open", return_value=MagicMock()),
+            patch("magic.from_buffer", return_value="image/jpeg"),
             patch(
-                "photos_drive.backup.processed_diffs.get_width_height_of_image",
+                "PIL.Image.open",
+                side_effect=lambda *args, **kwargs: Image.new("RGB", (800, 600)),
+            ),
+            patch(
+                "photos_drive.backup.file_ingestion."
+                + "get_width_height_of_image_from_buffer",
                 return_value=(800, 600),
             ),
             patch(
-                "photos_drive.backup.processed_diffs.ExifToolHelper",
+                "photos_drive.backup.exiftool_pool.ExifToolHelper",
                 return_value=self.exif_mock,
             ),
         ]
@@ -186,6 +194,168 @@ class TestSyncCli(unittest.TestCase):
                 cast(Any, media_items_coll.find_one())["file_name"], filename
             )
 
+    def test_sync_additions_with_streaming(self):
+        runner = CliRunner()
+        app = build_app()
+
+        with runner.isolated_filesystem():
+            for i in range(3):
+                with open(f"new_image_{i}.jpg", "wb") as f:
+                    f.write(f"new data {i}".encode())
+
+            # Act
+            result = runner.invoke(
+                app,
+                args=[
+                    "sync",
+                    ".",
+                    "--config-file",
+                    self.config_file_path,
+                    "--stream",
+                    "--batch-size",
+                    "2",
+                ],
+                input="y\n",
+            )
+
+            # Assert
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn("Media items created: 3", result.stdout)
+
+            media_items_coll = self.mock_mongo_client["photos_drive"]["media_items"]
+            self.assertEqual(media_items_coll.count_documents({}), 3)
+
+    def test_sync_with_streaming_stops_processing_when_backup_fails(self):
+        runner = CliRunner()
+        app = build_app()
+        process_raw_diffs = DiffsProcessor.process_raw_diffs
+        num_chunks_in_progress = 0
+
+        def slow_process_raw_diffs(diff_processor, diffs):
+            nonlocal num_chunks_in_progress
+            num_chunks_in_progress += 1
+            time.sleep(0.2)
+            processed_diffs = process_raw_diffs(diff_processor, diffs)
+            num_chunks_in_progress -= 1
+            return processed_diffs
+
+        with runner.isolated_filesystem():
+            for i in range(5):
+                with open(f"new_image_{i}.jpg", "wb") as f:
+                    f.write(f"new data {i}".encode())
+
+            # Act
+            with (
+                patch.object(
+                    DiffsProcessor,
+                    'process_raw_diffs',
+                    autospec=True,
+                    side_effect=slow_process_raw_diffs,
+                ),
+                patch.object(
+                    PhotosBackup, 'backup', side_effect=ValueError("Backup failed")
+                ),
+            ):
+                result = runner.invoke(
+                    app,
+                    args=[
+                        "sync",
+                        ".",
+                        "--config-file",
+                        self.config_file_path,
+                        "--stream",
+                        "--batch-size",
+                        "1",
+                    ],
+                    input="y\n",
+                )
+
+            # Assert
+            self.assertIsInstance(result.exception, ValueError)
+            self.assertEqual(num_chunks_in_progress, 0)
+
+    def test_sync_failure_with_backup_journal_suggests_resuming(self):
+        result = self.__invoke_failing_sync([])
+
+        self.assertIsInstance(result.exception, ValueError)
+        self.assertIn("Run this command again to resume the backup", result.stdout)
+
+    def test_sync_failure_without_backup_journal_suggests_cleaning(self):
+        result = self.__invoke_failing_sync(["--no-backup-journal"])
+
+        self.assertIsInstance(result.exception, ValueError)
+        self.assertNotIn("resume the backup", result.stdout)
+        self.assertIn("Run photos_drive_cli clean to fix errors", result.stdout)
+
+    def test_sync_additions_with_concurrent_batches(self):
+        runner = CliRunner()
+        app = build_app()
+
+        with runner.isolated_filesystem():
+            os.makedirs("Trip")
+            for i in range(5):
+                with open(os.path.join("Trip", f"new_image_{i}.jpg"), "wb") as f:
+                    f.write(f"new data {i}".encode())
+
+            # Act
+            result = runner.invoke(
+                app,
+                args=[
+                    "sync",
+                    ".",
+                    "--config-file",
+                    self.config_file_path,
+                    "--batch-size",
+                    "1",
+                    "--max-concurrent-batches",
+                    "3",
+                ],
+                input="y\n",
+            )
+
+            # Assert
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn("Media items created: 5", result.stdout)
+            self.assertIn("Albums created: 1", result.stdout)
+
+            db = self.mock_mongo_client["photos_drive"]
+            self.assertEqual(db["media_items"].count_documents({}), 5)
+            self.assertEqual(db["albums"].count_documents({"name": "Trip"}), 1)
+
+    def test_sync_additions_with_dedup_uploads(self):
+        runner = CliRunner()
+        app = build_app()
+
+        with runner.isolated_filesystem():
+            for album_name in ["Trip", "Copies"]:
+                os.makedirs(album_name)
+                with open(os.path.join(album_name, "new_image.jpg"), "wb") as f:
+                    f.write(b"new data")
+
+            # Act
+            result = runner.invoke(
+                app,
+                args=[
+                    "sync",
+                    ".",
+                    "--config-file",
+                    self.config_file_path,
+                    "--dedup-uploads",
+                ],
+                input="y\n",
+            )
+
+            # Assert
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn("Media items created: 2", result.stdout)
+
+            media_items_coll = self.mock_mongo_client["photos_drive"]["media_items"]
+            self.assertEqual(media_items_coll.count_documents({}), 2)
+            self.assertEqual(
+                len(self.fake_gphotos_client.media_items().search_for_media_items()),
+                1,
+            )
+
     def test_sync_deletions(self):
         runner = CliRunner()
         app = build_app()
@@ -233,6 +403,74 @@ class TestSyncCli(unittest.TestCase):
             media_items_coll = self.mock_mongo_client["photos_drive"]["media_items"]
             self.assertEqual(media_items_coll.count_documents({}), 0)
 
+    def test_sync_replaced_file_with_concurrent_batches_keeps_new_media_item(self):
+        runner = CliRunner()
+        app = build_app()
+        backup = PhotosBackup.backup
+
+        def backup_with_slow_deletions(backup_service, diffs):
+            # Lets chunks that add files finish first if they run concurrently
+            if any(diff.modifier == '-' for diff in diffs):
+                time.sleep(0.5)
+            return backup(backup_service, diffs)
+
+        with runner.isolated_filesystem():
+            filename = "image.jpg"
+            with open(filename, "wb") as f:
+                f.write(b"new data")
+
+            # Seed MongoDB and GPhotos with an older version of the file
+            up = self.fake_gphotos_client.media_items().upload_photo(filename, filename)
+            res = self.fake_gphotos_client.media_items().add_uploaded_photos_to_gphotos(
+                [up]
+            )
+            self.media_items_repo.create_media_item(
+                CreateMediaItemRequest(
+                    file_name=filename,
+                    file_hash=b"h1",
+                    location=None,
+                    gphotos_client_id=self.gphotos_client_id,
+                    gphotos_media_item_id=res.newMediaItemResults[0].mediaItem.id,
+                    album_id=self.root_album.id,
+                    width=800,
+                    height=600,
+                    date_taken=datetime(2025, 1, 1),
+                    embedding_id=None,
+                    mime_type='image/jpeg',
+                )
+            )
+
+            # Act
+            with patch.object(
+                PhotosBackup,
+                'backup',
+                autospec=True,
+                side_effect=backup_with_slow_deletions,
+            ):
+                result = runner.invoke(
+                    app,
+                    args=[
+                        "sync",
+                        ".",
+                        "--config-file",
+                        self.config_file_path,
+                        "--batch-size",
+                        "1",
+                        "--max-concurrent-batches",
+                        "2",
+                    ],
+                    input="y\n",
+                )
+
+            # Assert
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn("Media items created: 1", result.stdout)
+            self.assertIn("Media items deleted: 1", result.stdout)
+            media_items = self.media_items_repo.get_all_media_items()
+            self.assertEqual(len(media_items), 1)
+            self.assertEqual(media_items[0].file_name, filename)
+            self.assertNotEqual(media_items[0].file_hash, b"h1")
+
     def test_sync_cancelled(self):
         runner = CliRunner()
         app = build_app()
@@ -256,3 +494,21 @@ class TestSyncCli(unittest.TestCase):
             # Verify MongoDB still empty
             media_items_coll = self.mock_mongo_client["photos_drive"]["media_items"]
             self.assertEqual(media_items_coll.count_documents({}), 0)
+
+    def __invoke_failing_sync(self, extra_args: list[str]):
+        runner = CliRunner()
+        app = build_app()
+
+        with runner.isolated_filesystem():
+            with open("new_image.jpg", "wb") as f:
+                f.write(b"new data")
+
+            with patch.object(
+                PhotosBackup, 'backup', side_effect=ValueError("Backup failed")
+            ):
+                return runner.invoke(
+                    app,
+                    args=["sync", ".", "--config-file", self.config_file_path]
+                    + extra_args,
+                    input="y\n",
+                )
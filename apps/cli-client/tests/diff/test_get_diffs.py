@@ -29,6 +29,7 @@ from photos_drive.shared.core.storage.gphotos.testing import (
 from photos_drive.shared.core.testing import (
     create_mock_mongo_client,
 )
+from photos_drive.shared.utils.hashes.file_hasher import HashAlgorithm
 from photos_drive.shared.utils.hashes.xxhash import compute_file_hash
 
 MOCK_DATE_TAKEN = datetime(2025, 6, 6, 14, 30, 0, tzinfo=timezone.utc)
@@ -111,6 +112,88 @@ class FolderSyncDiffTests(TestCase):
             ),
         )
 
+    def test_get_diffs__different_hash_algorithm__compares_with_remote_algorithm(
+        self,
+    ):
+        # Test setup: create directories
+        self.fs.create_dir('/Archives/Photos/2010')
+        self.fs.create_dir('/Archives/Photos/2011')
+        self.fs.create_file('/Archives/Photos/2010/dog.jpg', contents='Dog')
+        self.fs.create_file('/Archives/Photos/2011/cat.jpg', contents='Cat')
+
+        # Test setup: set up the cloud
+        config = InMemoryConfig()
+        gphotos_client_id = ObjectId()
+        gphotos_client = FakeGPhotosClient(FakeItemsRepository(), 'bob@gmail.com')
+        mongodb_clients_repo = MongoDBClientsRepository()
+        client_id = ObjectId()
+        mongodb_clients_repo.add_mongodb_client(client_id, create_mock_mongo_client())
+        albums_repo = MongoDBAlbumsRepository(
+            client_id,
+            mongodb_clients_repo.get_client_by_id(client_id),
+            mongodb_clients_repo,
+        )
+        media_items_repo = MongoDBMediaItemsRepository(
+            client_id,
+            mongodb_clients_repo.get_client_by_id(client_id),
+            mongodb_clients_repo,
+        )
+
+        # Test setup: create content on the cloud
+        root_album = albums_repo.create_album('', None)
+        archives_album = albums_repo.create_album('Archives', root_album.id)
+        photos_album = albums_repo.create_album('Photos', archives_album.id)
+        album_2010 = albums_repo.create_album('2010', photos_album.id)
+        albums_repo.create_album('2011', photos_album.id)
+        config.set_root_album_id(root_album.id)
+        dog_upload_token = gphotos_client.media_items().upload_photo(
+            './Archives/Photos/2010/dog.jpg', 'dog.jpg'
+        )
+        media_items_repo.create_media_item(
+            CreateMediaItemRequest(
+                file_name='dog.jpg',
+                file_hash=compute_file_hash('./Archives/Photos/2010/dog.jpg'),
+                location=None,
+                gphotos_client_id=ObjectId(gphotos_client_id),
+                gphotos_media_item_id=gphotos_client.media_items()
+                .add_uploaded_photos_to_gphotos([dog_upload_token])
+                .newMediaItemResults[0]
+                .mediaItem.id,
+                album_id=album_2010.id,
+                width=100,
+                height=200,
+                date_taken=MOCK_DATE_TAKEN,
+                embedding_id=None,
+                mime_type='image/jpeg',
+            )
+        )
+
+        # Act: compute the diff
+        diffs_comparator = FolderSyncDiff(
+            config,
+            albums_repo,
+            media_items_repo,
+            hash_algorithm=HashAlgorithm.XXH3_128,
+        )
+        diff_results = diffs_comparator.get_diffs('.', '')
+
+        # Assert: verify the diff
+        self.assertEqual(
+            diff_results,
+            DiffResults(
+                missing_remote_files_in_local=[],
+                missing_local_files_in_remote=[
+                    LocalFile(
+                        key='Archives/Photos/2011/cat.jpg:'
+                        + compute_file_hash(
+                            './Archives/Photos/2011/cat.jpg', HashAlgorithm.XXH3_128
+                        ).hex(),
+                        local_relative_file_path='./Archives/Photos/2011/cat.jpg',
+                    )
+                ],
+            ),
+        )
+
     def test_get_diffs__missing_files_on_local__returns_diff(self):
         # Test setup: create directories
         self.fs.create_dir('/Archives/Photos/2010')
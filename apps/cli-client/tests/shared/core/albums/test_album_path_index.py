@@ -0,0 +1,173 @@
+import unittest
+from unittest.mock import patch
+
+from bson.objectid import ObjectId
+
+from photos_drive.shared.core.albums.album_id import AlbumId
+from photos_drive.shared.core.albums.album_path_index import AlbumPathIndex
+from photos_drive.shared.core.albums.repository.base import AlbumsRepository
+from photos_drive.shared.core.albums.repository.mongodb import (
+    MongoDBAlbumsRepository,
+)
+from photos_drive.shared.core.albums.repository.union import UnionAlbumsRepository
+from photos_drive.shared.core.databases.mongodb import (
+    MongoDBClientsRepository,
+)
+from photos_drive.shared.core.testing import (
+    create_mock_mongo_client,
+)
+
+
+class AlbumPathIndexTests(unittest.TestCase):
+    def setUp(self):
+        mongodb_clients_repo = MongoDBClientsRepository()
+        self.albums_repos: list[AlbumsRepository] = []
+        for _ in range(2):
+            client_id = ObjectId()
+            mongodb_clients_repo.add_mongodb_client(
+                client_id, create_mock_mongo_client()
+            )
+            self.albums_repos.append(
+                MongoDBAlbumsRepository(
+                    client_id,
+                    mongodb_clients_repo.get_client_by_id(client_id),
+                    mongodb_clients_repo,
+                )
+            )
+        self.albums_repo = UnionAlbumsRepository(self.albums_repos)
+
+        # Spread the albums tree across both clients
+        repo_1, repo_2 = self.albums_repos
+        self.root_album = repo_1.create_album('', None)
+        self.archives_album = repo_2.create_album('Archives', self.root_album.id)
+        self.photos_album = repo_1.create_album('Photos', self.archives_album.id)
+        self.album_2010 = repo_2.create_album('2010', self.photos_album.id)
+        self.dog_album = repo_1.create_album('Dog', self.album_2010.id)
+
+    def test_get_album_by_path(self):
+        index = AlbumPathIndex(self.root_album.id, self.albums_repo)
+
+        self.assertEqual(index.get_album_by_path(''), self.root_album)
+        self.assertEqual(index.get_album_by_path('Archives'), self.archives_album)
+        self.assertEqual(
+            index.get_album_by_path('Archives/Photos/2010/Dog'), self.dog_album
+        )
+        self.assertEqual(
+            index.get_album_by_path('/Archives/Photos/2010/'), self.album_2010
+        )
+        self.assertIsNone(index.get_album_by_path('Archives/Photos/2011'))
+        self.assertIsNone(index.get_album_by_path('Photos'))
+
+    def test_constructor_loads_albums_with_one_query_per_client(self):
+        with (
+            patch.object(
+                MongoDBAlbumsRepository,
+                'get_all_albums',
+                autospec=True,
+                side_effect=MongoDBAlbumsRepository.get_all_albums,
+            ) as mock_get_all_albums,
+            patch.object(MongoDBAlbumsRepository, 'find_child_albums') as mock_find,
+        ):
+            index = AlbumPathIndex(self.root_album.id, self.albums_repo)
+            index.get_album_by_path('Archives/Photos/2010/Dog')
+            index.find_child_albums(self.photos_album.id)
+
+        self.assertEqual(mock_get_all_albums.call_count, 2)
+        mock_find.assert_not_called()
+
+    def test_get_album_path(self):
+        index = AlbumPathIndex(self.root_album.id, self.albums_repo)
+
+        self.assertEqual(index.get_album_path(self.root_album.id), '')
+        self.assertEqual(
+            index.get_album_path(self.dog_album.id), 'Archives/Photos/2010/Dog'
+        )
+        with self.assertRaises(ValueError):
+            index.get_album_path(AlbumId(ObjectId(), ObjectId()))
+
+    def test_find_child_albums(self):
+        index = AlbumPathIndex(self.root_album.id, self.albums_repo)
+
+        self.assertEqual(
+            index.find_child_albums(self.root_album.id), [self.archives_album]
+        )
+        self.assertEqual(index.find_child_albums(self.dog_album.id), [])
+
+    def test_get_all_album_paths_returns_parents_before_children(self):
+        index = AlbumPathIndex(self.root_album.id, self.albums_repo)
+
+        self.assertEqual(
+            index.get_all_album_paths(),
+            [
+                ('', self.root_album),
+                ('Archives', self.archives_album),
+                ('Archives/Photos', self.photos_album),
+                ('Archives/Photos/2010', self.album_2010),
+                ('Archives/Photos/2010/Dog', self.dog_album),
+            ],
+        )
+
+    def test_get_all_album_paths_returns_albums_with_duplicate_paths(self):
+        repo_1, repo_2 = self.albums_repos
+        other_photos_album = repo_2.create_album('Photos', self.archives_album.id)
+        other_album_2010 = repo_1.create_album('2010', other_photos_album.id)
+        index = AlbumPathIndex(self.root_album.id, self.albums_repo)
+
+        album_paths = index.get_all_album_paths()
+
+        self.assertIn(('Archives/Photos', self.photos_album), album_paths)
+        self.assertIn(('Archives/Photos', other_photos_album), album_paths)
+        self.assertIn(('Archives/Photos/2010', self.album_2010), album_paths)
+        self.assertIn(('Archives/Photos/2010', other_album_2010), album_paths)
+        self.assertEqual(len(album_paths), 7)
+        self.assertEqual(index.get_album_by_path('Archives/Photos'), self.photos_album)
+        self.assertEqual(
+            index.get_album_path(other_album_2010.id), 'Archives/Photos/2010'
+        )
+
+    def test_delete_many_albums_with_duplicate_path_keeps_path_of_other_album(self):
+        other_photos_album = self.albums_repos[1].create_album(
+            'Photos', self.archives_album.id
+        )
+        index = AlbumPathIndex(self.root_album.id, self.albums_repo)
+
+        index.delete_many_albums([self.photos_album.id])
+
+        self.assertEqual(index.get_album_by_path('Archives/Photos'), other_photos_album)
+
+    def test_create_album_adds_album_to_index_and_repo(self):
+        index = AlbumPathIndex(self.root_album.id, self.albums_repo)
+
+        cat_album = index.create_album('Cat', self.album_2010.id)
+
+        self.assertEqual(index.get_album_by_path('Archives/Photos/2010/Cat'), cat_album)
+        self.assertEqual(index.get_album_path(cat_album.id), 'Archives/Photos/2010/Cat')
+        self.assertIn(cat_album, index.find_child_albums(self.album_2010.id))
+        self.assertEqual(self.albums_repo.get_album_by_id(cat_album.id), cat_album)
+
+    def test_delete_many_albums_removes_albums_from_index_and_repo(self):
+        index = AlbumPathIndex(self.root_album.id, self.albums_repo)
+
+        index.delete_many_albums([self.album_2010.id])
+
+        self.assertIsNone(index.get_album_by_path('Archives/Photos/2010'))
+        self.assertIsNone(index.get_album_by_path('Archives/Photos/2010/Dog'))
+        self.assertEqual(index.find_child_albums(self.photos_album.id), [])
+        with self.assertRaises(ValueError):
+            index.get_album_by_id(self.album_2010.id)
+        with self.assertRaises(ValueError):
+            self.albums_repo.get_album_by_id(self.album_2010.id)
+
+    def test_delete_many_albums_then_create_album_with_same_name(self):
+        index = AlbumPathIndex(self.root_album.id, self.albums_repo)
+
+        index.delete_many_albums([self.dog_album.id])
+        new_dog_album = index.create_album('Dog', self.album_2010.id)
+
+        self.assertEqual(
+            index.get_album_by_path('Archives/Photos/2010/Dog'), new_dog_album
+        )
+
+    def test_constructor_with_unknown_root_album_raises_error(self):
+        with self.assertRaises(ValueError):
+            AlbumPathIndex(AlbumId(ObjectId(), ObjectId()), self.albums_repo)
@@ -1,21 +1,29 @@
 from datetime import datetime, timezone
 import unittest
+from unittest.mock import patch
 
 from bson.objectid import ObjectId
 
+from photos_drive.shared.core.albums.album_id import AlbumId
 from photos_drive.shared.core.albums.albums_pruner import AlbumsPruner
+from photos_drive.shared.core.albums.repository.base import AlbumsRepository
 from photos_drive.shared.core.albums.repository.mongodb import (
     MongoDBAlbumsRepository,
 )
+from photos_drive.shared.core.albums.repository.union import UnionAlbumsRepository
 from photos_drive.shared.core.databases.mongodb import (
     MongoDBClientsRepository,
 )
 from photos_drive.shared.core.media_items.repository.base import (
     CreateMediaItemRequest,
+    MediaItemsRepository,
 )
 from photos_drive.shared.core.media_items.repository.mongodb import (
     MongoDBMediaItemsRepository,
 )
+from photos_drive.shared.core.media_items.repository.union import (
+    UnionMediaItemsRepository,
+)
 from photos_drive.shared.core.storage.gphotos.testing import (
     FakeGPhotosClient,
     FakeItemsRepository,
@@ -226,3 +234,121 @@ class AlbumsPrunerTests(unittest.TestCase):
 
         self.assertEqual(albums[2].id, videos_album.id)
         self.assertEqual(albums[2].parent_album_id, archives_album.id)
+
+    def test_prune_albums__deletes_empty_ancestors_across_clients(self):
+        # Test setup: Build the repos over two MongoDB clients
+        mongodb_clients_repo = MongoDBClientsRepository()
+        albums_repos: list[AlbumsRepository] = []
+        media_items_repos: list[MediaItemsRepository] = []
+        for _ in range(2):
+            client_id = ObjectId()
+            mongodb_clients_repo.add_mongodb_client(
+                client_id, create_mock_mongo_client()
+            )
+            albums_repos.append(
+                MongoDBAlbumsRepository(
+                    client_id,
+                    mongodb_clients_repo.get_client_by_id(client_id),
+                    mongodb_clients_repo,
+                )
+            )
+            media_items_repos.append(
+                MongoDBMediaItemsRepository(
+                    client_id,
+                    mongodb_clients_repo.get_client_by_id(client_id),
+                    mongodb_clients_repo,
+                )
+            )
+        albums_repo = UnionAlbumsRepository(albums_repos)
+        media_items_repo = UnionMediaItemsRepository(media_items_repos)
+
+        # Test setup: Spread the albums tree across both clients
+        repo_1, repo_2 = albums_repos
+        root_album = repo_1.create_album('', None)
+        archives_album = repo_2.create_album('Archives', root_album.id)
+        photos_album = repo_1.create_album('Photos', archives_album.id)
+        album_2010 = repo_2.create_album('2010', photos_album.id)
+        album_2011 = repo_1.create_album('2011', photos_album.id)
+        videos_album = repo_2.create_album('Videos', archives_album.id)
+        album_2012 = repo_1.create_album('2012', videos_album.id)
+        album_2013 = repo_2.create_album('2013', videos_album.id)
+
+        # Test setup: Add cat.png to Archives/Videos/2013
+        media_items_repo.create_media_item(
+            CreateMediaItemRequest(
+                file_name='cat.png',
+                file_hash=MOCK_FILE_HASH,
+                location=None,
+                gphotos_client_id=ObjectId(),
+                gphotos_media_item_id='gphotos_cat',
+                album_id=album_2013.id,
+                width=100,
+                height=200,
+                date_taken=MOCK_DATE_TAKEN,
+                embedding_id=None,
+                mime_type='image/png',
+            )
+        )
+
+        # Act: prune on the leaf albums, an album with children, and a deleted album
+        pruner = AlbumsPruner(root_album.id, albums_repo, media_items_repo)
+        with (
+            patch.object(
+                MongoDBAlbumsRepository,
+                'get_all_albums',
+                autospec=True,
+                side_effect=MongoDBAlbumsRepository.get_all_albums,
+            ) as mock_get_all_albums,
+            patch.object(
+                MongoDBAlbumsRepository,
+                'delete_many_albums',
+                autospec=True,
+                side_effect=MongoDBAlbumsRepository.delete_many_albums,
+            ) as mock_delete_many_albums,
+            patch.object(MongoDBAlbumsRepository, 'get_album_by_id') as mock_get,
+            patch.object(MongoDBAlbumsRepository, 'find_child_albums') as mock_find,
+        ):
+            num_albums_deleted = pruner.prune_albums(
+                [
+                    album_2010.id,
+                    album_2011.id,
+                    album_2012.id,
+                    videos_album.id,
+                    AlbumId(ObjectId(), ObjectId()),
+                ]
+            )
+
+        # Test assert: Photos and its children, and Videos/2012 are deleted
+        self.assertEqual(num_albums_deleted, 4)
+        self.assertCountEqual(
+            [album.id for album in albums_repo.get_all_albums()],
+            [root_album.id, archives_album.id, videos_album.id, album_2013.id],
+        )
+
+        # Test assert: the albums are read and deleted once per client
+        self.assertEqual(mock_get_all_albums.call_count, 2)
+        self.assertEqual(mock_delete_many_albums.call_count, 2)
+        mock_get.assert_not_called()
+        mock_find.assert_not_called()
+
+    def test_prune_albums__with_no_albums_deletes_nothing(self):
+        mongodb_clients_repo = MongoDBClientsRepository()
+        client_id = ObjectId()
+        mongodb_clients_repo.add_mongodb_client(client_id, create_mock_mongo_client())
+        albums_repo = MongoDBAlbumsRepository(
+            client_id,
+            mongodb_clients_repo.get_client_by_id(client_id),
+            mongodb_clients_repo,
+        )
+        media_items_repo = MongoDBMediaItemsRepository(
+            client_id,
+            mongodb_clients_repo.get_client_by_id(client_id),
+            mongodb_clients_repo,
+        )
+        root_album = albums_repo.create_album('', None)
+
+        pruner = AlbumsPruner(root_album.id, albums_repo, media_items_repo)
+
+        self.assertEqual(pruner.prune_albums([]), 0)
+        self.assertEqual(pruner.prune_albums([root_album.id]), 0)
+        self.assertEqual(len(albums_repo.get_all_albums()), 1)
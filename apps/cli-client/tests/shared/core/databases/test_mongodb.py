@@ -1,3 +1,4 @@
+import threading
 from typing import cast
 import unittest
 from unittest.mock import Mock, patch
@@ -115,6 +116,26 @@ class TestMongoDBClientsRepository(unittest.TestCase):
         self.assertIsInstance(repo.get_session_for_client_id(client_id_1), Mock)
         self.assertIsInstance(repo.get_session_for_client_id(client_id_2), Mock)
 
+    def test_start_transactions__other_thread__does_not_share_sessions(self):
+        client_id = ObjectId()
+        repo = MongoDBClientsRepository()
+        repo.add_mongodb_client(client_id, create_mock_mongo_client())
+        repo.start_transactions()
+
+        other_thread_sessions = []
+
+        def run_other_thread():
+            other_thread_sessions.append(repo.get_session_for_client_id(client_id))
+            repo.start_transactions()
+            repo.commit_and_end_transactions()
+
+        thread = threading.Thread(target=run_other_thread)
+        thread.start()
+        thread.join()
+
+        self.assertEqual(other_thread_sessions, [None])
+        self.assertIsInstance(repo.get_session_for_client_id(client_id), Mock)
+
     def test_start_transactions__in_transaction__throws_error(self):
         client_id_1 = ObjectId()
         client_id_2 = ObjectId()
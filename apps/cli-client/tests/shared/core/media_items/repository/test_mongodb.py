@@ -319,6 +319,116 @@ class TestMediaItemsRepositoryImpl(unittest.TestCase):
         self.assertEqual(self.repo.get_num_media_items_in_album(MOCK_ALBUM_ID), 1)
         self.assertEqual(self.repo.get_num_media_items_in_album(MOCK_ALBUM_ID_2), 2)
 
+    def test_get_num_media_items_in_albums(self):
+        empty_album_id = AlbumId(ObjectId(), ObjectId())
+        self.repo.create_many_media_items(
+            [
+                self.__create_request("dog.jpg", MOCK_ALBUM_ID),
+                self.__create_request("cat.jpg", MOCK_ALBUM_ID),
+                self.__create_request("dog.jpg", MOCK_ALBUM_ID_2),
+            ]
+        )
+
+        counts = self.repo.get_num_media_items_in_albums(
+            [MOCK_ALBUM_ID, MOCK_ALBUM_ID_2, empty_album_id]
+        )
+
+        self.assertEqual(
+            counts, {MOCK_ALBUM_ID: 2, MOCK_ALBUM_ID_2: 1, empty_album_id: 0}
+        )
+
+    def test_get_num_media_items_in_albums_with_no_albums(self):
+        self.assertEqual(self.repo.get_num_media_items_in_albums([]), {})
+
+    def test_find_media_items_by_album_and_file_names(self):
+        dog, cat, _, dog_2 = self.repo.create_many_media_items(
+            [
+                self.__create_request("dog.jpg", MOCK_ALBUM_ID),
+                self.__create_request("cat.jpg", MOCK_ALBUM_ID),
+                self.__create_request("bird.jpg", MOCK_ALBUM_ID),
+                self.__create_request("dog.jpg", MOCK_ALBUM_ID_2),
+            ]
+        )
+
+        media_items = self.repo.find_media_items_by_album_and_file_names(
+            [
+                (MOCK_ALBUM_ID, "dog.jpg"),
+                (MOCK_ALBUM_ID, "cat.jpg"),
+                (MOCK_ALBUM_ID, "dog.jpg"),
+                (MOCK_ALBUM_ID_2, "dog.jpg"),
+                (MOCK_ALBUM_ID_2, "cat.jpg"),
+                (AlbumId(ObjectId(), ObjectId()), "dog.jpg"),
+            ]
+        )
+
+        self.assertEqual(media_items.keys(), {MOCK_ALBUM_ID, MOCK_ALBUM_ID_2})
+        self.assertCountEqual(media_items[MOCK_ALBUM_ID], [dog, cat])
+        self.assertEqual(media_items[MOCK_ALBUM_ID_2], [dog_2])
+
+    def test_find_media_items_by_album_and_file_names_with_no_keys(self):
+        self.assertEqual(self.repo.find_media_items_by_album_and_file_names([]), {})
+
+    def test_get_media_items_by_ids(self):
+        dog, cat, _ = self.repo.create_many_media_items(
+            [
+                self.__create_request("dog.jpg", MOCK_ALBUM_ID),
+                self.__create_request("cat.jpg", MOCK_ALBUM_ID),
+                self.__create_request("bird.jpg", MOCK_ALBUM_ID),
+            ]
+        )
+        missing_id = MediaItemId(self.mongodb_client_id, ObjectId())
+
+        media_items = self.repo.get_media_items_by_ids([dog.id, cat.id, missing_id])
+
+        self.assertEqual(media_items, {dog.id: dog, cat.id: cat})
+
+    def test_get_media_items_by_ids_with_no_ids(self):
+        self.assertEqual(self.repo.get_media_items_by_ids([]), {})
+
+    def test_get_media_items_by_ids_from_different_client_raises_error(self):
+        with self.assertRaisesRegex(ValueError, "belongs to a different client"):
+            self.repo.get_media_items_by_ids([MediaItemId(ObjectId(), ObjectId())])
+
+    def test_find_media_items_by_file_hashes(self):
+        dog, cat, _, dog_2 = self.repo.create_many_media_items(
+            [
+                self.__create_request("dog.jpg", MOCK_ALBUM_ID),
+                self.__create_request("cat.jpg", MOCK_ALBUM_ID),
+                self.__create_request("bird.jpg", MOCK_ALBUM_ID),
+                self.__create_request("dog.jpg", MOCK_ALBUM_ID_2),
+            ]
+        )
+        self.repo.update_many_media_items(
+            [
+                UpdateMediaItemRequest(
+                    media_item_id=dog_2.id, new_file_hash=dog.file_hash
+                )
+            ]
+        )
+
+        media_items = self.repo.find_media_items_by_file_hashes(
+            [dog.file_hash, cat.file_hash, dog.file_hash, os.urandom(16)]
+        )
+
+        self.assertEqual(media_items.keys(), {dog.file_hash, cat.file_hash})
+        self.assertCountEqual(
+            [item.id for item in media_items[dog.file_hash]], [dog.id, dog_2.id]
+        )
+        self.assertEqual(media_items[cat.file_hash], [cat])
+
+    def test_find_media_items_by_file_hashes_with_no_file_hashes(self):
+        self.assertEqual(self.repo.find_media_items_by_file_hashes([]), {})
+
+    def test_constructor_creates_file_hash_index(self):
+        index_names = [
+            index['name']
+            for index in self.mongodb_client['photos_drive'][
+                'media_items'
+            ].list_indexes()
+        ]
+
+        self.assertIn('file_hash_index', index_names)
+
     def test_create_media_item(self):
         fake_file_hash = os.urandom(16)
         request = CreateMediaItemRequest(
@@ -388,6 +498,41 @@ class TestMediaItemsRepositoryImpl(unittest.TestCase):
         self.assertIsNone(media_item.embedding_id)
         self.assertEqual(media_item.mime_type, "image/png")
 
+    def test_create_many_media_items(self):
+        requests = [
+            CreateMediaItemRequest(
+                file_name=f"image_{i}.jpg",
+                file_hash=os.urandom(16),
+                location=GpsLocation(longitude=12.34, latitude=56.78) if i else None,
+                gphotos_client_id=ObjectId("5f50c31e8a7d4b1c9c9b0b1a"),
+                gphotos_media_item_id=f"gphotos_{i}",
+                album_id=MOCK_ALBUM_ID,
+                width=100,
+                height=200,
+                date_taken=MOCK_DATE_TAKEN,
+                embedding_id=None,
+                mime_type="image/jpeg",
+                captions="A dog" if i else None,
+            )
+            for i in range(3)
+        ]
+
+        media_items = self.repo.create_many_media_items(requests)
+
+        self.assertEqual(
+            [media_item.file_name for media_item in media_items],
+            ["image_0.jpg", "image_1.jpg", "image_2.jpg"],
+        )
+        for request, media_item in zip(requests, media_items):
+            self.assertEqual(media_item.id.client_id, self.mongodb_client_id)
+            self.assertEqual(media_item.file_hash, request.file_hash)
+            self.assertEqual(media_item.location, request.location)
+            self.assertEqual(media_item.captions, request.captions)
+            self.assertEqual(self.repo.get_media_item_by_id(media_item.id), media_item)
+
+    def test_create_many_media_items_with_no_requests_returns_empty_list(self):
+        self.assertEqual(self.repo.create_many_media_items([]), [])
+
     def test_update_many_media_items(self):
         media_item_1 = self.repo.create_media_item(
             CreateMediaItemRequest(
@@ -543,6 +688,54 @@ class TestMediaItemsRepositoryImpl(unittest.TestCase):
         new_media_item_1 = self.repo.get_media_item_by_id(media_item_1.id)
         self.assertIsNone(new_media_item_1.embedding_id)
 
+    def test_create_and_update_media_item_captions(self):
+        media_item_1 = self.repo.create_media_item(
+            CreateMediaItemRequest(
+                'dog.jpg',
+                MOCK_FILE_HASH,
+                None,
+                gphotos_client_id=ObjectId("5f50c31e8a7d4b1c9c9b0b1a"),
+                gphotos_media_item_id="gphotos_456",
+                album_id=MOCK_ALBUM_ID,
+                width=100,
+                height=200,
+                date_taken=MOCK_DATE_TAKEN,
+                embedding_id=None,
+                mime_type="image/jpeg",
+            )
+        )
+        media_item_2 = self.repo.create_media_item(
+            CreateMediaItemRequest(
+                'cat.jpg',
+                MOCK_FILE_HASH,
+                None,
+                gphotos_client_id=ObjectId("5f50c31e8a7d4b1c9c9b0b1a"),
+                gphotos_media_item_id="gphotos_457",
+                album_id=MOCK_ALBUM_ID,
+                width=100,
+                height=200,
+                date_taken=MOCK_DATE_TAKEN,
+                embedding_id=None,
+                mime_type="image/jpeg",
+                captions="a cat",
+            )
+        )
+        self.assertIsNone(self.repo.get_media_item_by_id(media_item_1.id).captions)
+        self.assertEqual(media_item_2.captions, "a cat")
+
+        self.repo.update_many_media_items(
+            [
+                UpdateMediaItemRequest(
+                    media_item_id=media_item_1.id, new_captions="a dog"
+                )
+            ]
+        )
+
+        new_media_item_1 = self.repo.get_media_item_by_id(media_item_1.id)
+        new_media_item_2 = self.repo.get_media_item_by_id(media_item_2.id)
+        self.assertEqual(new_media_item_1.captions, "a dog")
+        self.assertEqual(new_media_item_2.captions, "a cat")
+
     def test_update_many_media_items_on_unknown_media_item_id(self):
         media_item_1 = self.repo.create_media_item(
             CreateMediaItemRequest(
@@ -703,3 +896,20 @@ class TestMediaItemsRepositoryImpl(unittest.TestCase):
             ValueError, "Media item .* belongs to a different client"
         ):
             self.repo.delete_many_media_items([MediaItemId(ObjectId(), ObjectId())])
+
+    def __create_request(
+        self, file_name: str, album_id: AlbumId
+    ) -> CreateMediaItemRequest:
+        return CreateMediaItemRequest(
+            file_name=file_name,
+            file_hash=os.urandom(16),
+            location=None,
+            gphotos_client_id=ObjectId(),
+            gphotos_media_item_id=f"gphotos_{file_name}",
+            album_id=album_id,
+            width=100,
+            height=200,
+            date_taken=MOCK_DATE_TAKEN,
+            embedding_id=None,
+            mime_type="image/jpeg",
+        )
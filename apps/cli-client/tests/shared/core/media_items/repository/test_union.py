@@ -3,6 +3,7 @@ from unittest.mock import MagicMock
 
 from bson.objectid import ObjectId
 
+from photos_drive.shared.core.albums.album_id import AlbumId
 from photos_drive.shared.core.media_items.media_item import MediaItem
 from photos_drive.shared.core.media_items.media_item_id import MediaItemId
 from photos_drive.shared.core.media_items.repository.base import (
@@ -55,6 +56,32 @@ class TestUnionMediaItemsRepository(unittest.TestCase):
         with self.assertRaisesRegex(ValueError, "No repository found for client"):
             self.repo.get_media_item_by_id(media_item_id)
 
+    def test_get_media_items_by_ids_calls_repo_of_each_client(self):
+        media_item_id_1 = MediaItemId(self.client_id_1, ObjectId())
+        media_item_id_2 = MediaItemId(self.client_id_2, ObjectId())
+        item_1 = MagicMock(spec=MediaItem)
+        item_2 = MagicMock(spec=MediaItem)
+        self.mock_repo_1.get_media_items_by_ids.return_value = {media_item_id_1: item_1}
+        self.mock_repo_2.get_media_items_by_ids.return_value = {media_item_id_2: item_2}
+
+        media_items = self.repo.get_media_items_by_ids(
+            [media_item_id_1, media_item_id_2]
+        )
+
+        self.assertEqual(
+            media_items, {media_item_id_1: item_1, media_item_id_2: item_2}
+        )
+        self.mock_repo_1.get_media_items_by_ids.assert_called_once_with(
+            [media_item_id_1]
+        )
+        self.mock_repo_2.get_media_items_by_ids.assert_called_once_with(
+            [media_item_id_2]
+        )
+
+    def test_get_media_items_by_ids_unknown_client_raises_error(self):
+        with self.assertRaisesRegex(ValueError, "No repository found for client"):
+            self.repo.get_media_items_by_ids([MediaItemId(ObjectId(), ObjectId())])
+
     def test_get_all_media_items_aggregates_results(self):
         item_1 = MagicMock(spec=MediaItem)
         item_2 = MagicMock(spec=MediaItem)
@@ -78,6 +105,69 @@ class TestUnionMediaItemsRepository(unittest.TestCase):
         self.mock_repo_1.find_media_items.assert_called_once_with(request)
         self.mock_repo_2.find_media_items.assert_called_once_with(request)
 
+    def test_get_num_media_items_in_albums_sums_results(self):
+        album_id_1 = AlbumId(self.client_id_1, ObjectId())
+        album_id_2 = AlbumId(self.client_id_2, ObjectId())
+        self.mock_repo_1.get_num_media_items_in_albums.return_value = {
+            album_id_1: 2,
+            album_id_2: 1,
+        }
+        self.mock_repo_2.get_num_media_items_in_albums.return_value = {
+            album_id_1: 0,
+            album_id_2: 3,
+        }
+
+        counts = self.repo.get_num_media_items_in_albums([album_id_1, album_id_2])
+
+        self.assertEqual(counts, {album_id_1: 2, album_id_2: 4})
+
+    def test_find_media_items_by_album_and_file_names_merges_results(self):
+        album_id = AlbumId(self.client_id_1, ObjectId())
+        keys = [(album_id, "dog.jpg"), (album_id, "cat.jpg")]
+        item_1 = MagicMock(spec=MediaItem)
+        item_2 = MagicMock(spec=MediaItem)
+        self.mock_repo_1.find_media_items_by_album_and_file_names.return_value = {
+            album_id: [item_1]
+        }
+        self.mock_repo_2.find_media_items_by_album_and_file_names.return_value = {
+            album_id: [item_2]
+        }
+
+        media_items = self.repo.find_media_items_by_album_and_file_names(keys)
+
+        self.assertEqual(media_items, {album_id: [item_1, item_2]})
+        self.mock_repo_1.find_media_items_by_album_and_file_names.assert_called_with(
+            keys
+        )
+
+    def test_find_media_items_by_album_and_file_names_with_no_keys(self):
+        self.assertEqual(self.repo.find_media_items_by_album_and_file_names([]), {})
+        self.mock_repo_1.find_media_items_by_album_and_file_names.assert_not_called()
+
+    def test_find_media_items_by_file_hashes_merges_results(self):
+        file_hashes = [b'hash_1', b'hash_2']
+        item_1 = MagicMock(spec=MediaItem)
+        item_2 = MagicMock(spec=MediaItem)
+        item_3 = MagicMock(spec=MediaItem)
+        self.mock_repo_1.find_media_items_by_file_hashes.return_value = {
+            b'hash_1': [item_1]
+        }
+        self.mock_repo_2.find_media_items_by_file_hashes.return_value = {
+            b'hash_1': [item_2],
+            b'hash_2': [item_3],
+        }
+
+        media_items = self.repo.find_media_items_by_file_hashes(file_hashes)
+
+        self.assertEqual(
+            media_items, {b'hash_1': [item_1, item_2], b'hash_2': [item_3]}
+        )
+        self.mock_repo_1.find_media_items_by_file_hashes.assert_called_with(file_hashes)
+
+    def test_find_media_items_by_file_hashes_with_no_file_hashes(self):
+        self.assertEqual(self.repo.find_media_items_by_file_hashes([]), {})
+        self.mock_repo_1.find_media_items_by_file_hashes.assert_not_called()
+
     def test_create_media_item_uses_repo_with_most_space(self):
         request = MagicMock(spec=CreateMediaItemRequest)
         expected_item = MagicMock(spec=MediaItem)
@@ -89,6 +179,28 @@ class TestUnionMediaItemsRepository(unittest.TestCase):
         self.mock_repo_2.create_media_item.assert_called_once_with(request)
         self.mock_repo_1.create_media_item.assert_not_called()
 
+    def test_create_many_media_items_checks_space_once(self):
+        requests: list[CreateMediaItemRequest] = [
+            MagicMock(spec=CreateMediaItemRequest) for _ in range(3)
+        ]
+        expected_items = [MagicMock(spec=MediaItem) for _ in range(3)]
+        self.mock_repo_2.create_many_media_items.return_value = expected_items
+
+        items = self.repo.create_many_media_items(requests)
+
+        self.assertEqual(items, expected_items)
+        self.mock_repo_2.create_many_media_items.assert_called_once_with(requests)
+        self.mock_repo_1.create_many_media_items.assert_not_called()
+        self.mock_repo_1.get_available_free_space.assert_called_once()
+        self.mock_repo_2.get_available_free_space.assert_called_once()
+
+    def test_create_many_media_items_with_no_requests_returns_empty_list(self):
+        items = self.repo.create_many_media_items([])
+
+        self.assertEqual(items, [])
+        self.mock_repo_1.get_available_free_space.assert_not_called()
+        self.mock_repo_2.create_many_media_items.assert_not_called()
+
     def test_update_many_media_items_batches_by_client(self):
         id_1 = MediaItemId(self.client_id_1, ObjectId())
         id_2 = MediaItemId(self.client_id_2, ObjectId())
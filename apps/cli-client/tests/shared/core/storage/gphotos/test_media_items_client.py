@@ -1,5 +1,6 @@
 import json
 import tempfile
+from typing import Optional
 import unittest
 
 import dacite
@@ -18,6 +19,9 @@ from photos_drive.shared.core.storage.gphotos.media_items import (
     UploadedPhotosToGPhotosResult,
     VideoProcessingStatus,
 )
+from photos_drive.shared.core.storage.gphotos.media_items_client import (
+    UploadedPhotosPartiallyAddedError,
+)
 
 PHOTO_FILE_PATH = "./tests/shared/core/storage/gphotos/resources/small-image.jpg"
 
@@ -400,6 +404,90 @@ class GPhotosMediaItemClientTests(unittest.TestCase):
                 from_dict(UploadedPhotosToGPhotosResult, mock_response_2),
             )
 
+    @freeze_time("Jan 14th, 2020", auto_tick_seconds=59.99)
+    def test_add_uploaded_photos_to_gphotos__partial_retryable_codes__retries_failed(
+        self,
+    ):
+        mock_response_1 = {
+            "newMediaItemResults": [
+                self.__create_new_media_item_result("u1", "1"),
+                self.__create_new_media_item_result("u2", "2", code=13),
+            ]
+        }
+        mock_response_2 = {
+            "newMediaItemResults": [self.__create_new_media_item_result("u2", "2")]
+        }
+
+        with requests_mock.Mocker() as request_mocker:
+            client = GPhotosClientV2(
+                "bob@gmail.com", AuthorizedSession(MOCK_CREDENTIALS)
+            )
+            request_mocker.register_uri(
+                "POST",
+                "https://photoslibrary.googleapis.com/v1/mediaItems:batchCreate",
+                [
+                    {"text": json.dumps(mock_response_1), "status_code": 200},
+                    {"text": json.dumps(mock_response_2), "status_code": 200},
+                ],
+            )
+
+            response = client.media_items().add_uploaded_photos_to_gphotos(
+                ["u1", "u2"], "123"
+            )
+
+            self.assertEqual(
+                response,
+                from_dict(
+                    UploadedPhotosToGPhotosResult,
+                    {
+                        "newMediaItemResults": [
+                            mock_response_1["newMediaItemResults"][0],
+                            mock_response_2["newMediaItemResults"][0],
+                        ]
+                    },
+                ),
+            )
+            self.assertEqual(len(request_mocker.request_history), 2)
+            self.assertEqual(
+                [
+                    item["simpleMediaItem"]["uploadToken"]
+                    for item in request_mocker.request_history[1].json()[
+                        "newMediaItems"
+                    ]
+                ],
+                ["u2"],
+            )
+
+    @freeze_time("Jan 14th, 2020", auto_tick_seconds=59.99)
+    def test_add_uploaded_photos_to_gphotos__partial_unknown_codes__throws_error(self):
+        mock_response = {
+            "newMediaItemResults": [
+                self.__create_new_media_item_result("u1", "1"),
+                self.__create_new_media_item_result("u2", "2", code=101010),
+            ]
+        }
+
+        with requests_mock.Mocker() as request_mocker:
+            client = GPhotosClientV2(
+                "bob@gmail.com", AuthorizedSession(MOCK_CREDENTIALS)
+            )
+            request_mocker.post(
+                "https://photoslibrary.googleapis.com/v1/mediaItems:batchCreate",
+                json=mock_response,
+            )
+
+            with self.assertRaises(UploadedPhotosPartiallyAddedError) as context:
+                client.media_items().add_uploaded_photos_to_gphotos(["u1", "u2"], "123")
+
+            self.assertEqual(
+                context.exception.result,
+                from_dict(
+                    UploadedPhotosToGPhotosResult,
+                    {"newMediaItemResults": mock_response["newMediaItemResults"][:1]},
+                ),
+            )
+            self.assertEqual(len(request_mocker.request_history), 1)
+
     @freeze_time("Jan 14th, 2020", auto_tick_seconds=59.99)
     def test_add_uploaded_photos_to_gphotos__returns_2xx_with_unknown_codes(self):
         mock_response = {
@@ -1013,3 +1101,28 @@ class GPhotosMediaItemClientTests(unittest.TestCase):
                     photo_file_path=PHOTO_FILE_PATH,
                     file_name="small-image.jpg",
                 )
+
+    def __create_new_media_item_result(
+        self, upload_token: str, media_item_id: str, code: Optional[int] = None
+    ) -> dict:
+        return {
+            "uploadToken": upload_token,
+            "status": (
+                {"message": "Success"}
+                if code is None
+                else {"code": code, "message": "Failed to add media item"}
+            ),
+            "mediaItem": {
+                "id": media_item_id,
+                "description": "item-description",
+                "productUrl": "https://photos.google.com/photo/photo-path",
+                "mimeType": "mime-type",
+                "mediaMetadata": {
+                    "width": "media-width-in-px",
+                    "height": "media-height-in-px",
+                    "creationTime": "creation-time",
+                    "photo": {},
+                },
+                "filename": "filename",
+            },
+        }
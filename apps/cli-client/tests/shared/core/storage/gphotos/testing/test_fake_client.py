@@ -352,10 +352,10 @@ class FakeGPhotosClientTests(unittest.TestCase):
             client_1.media_items().upload_photo(
                 f"Photos/2011/dog_{i}.jpg", f"dog_{i}.jpg"
             )
-            for i in range(50)
+            for i in range(51)
         ]
 
-        with self.assertRaisesRegex(ValueError, "Must have less than 50 upload tokens"):
+        with self.assertRaisesRegex(ValueError, "Must have at most 50 upload tokens"):
             client_1.media_items().add_uploaded_photos_to_gphotos(upload_tokens)
 
     def test_add_uploaded_photos_to_gphotos__regular_album__adds_to_album(self):
@@ -0,0 +1,185 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from PIL import Image
+import numpy as np
+
+from photos_drive.shared.features.llm.models.cached_text_embeddings import (
+    CachedTextEmbeddings,
+    TextEmbeddingsCacheReport,
+    normalize_text,
+)
+from photos_drive.shared.features.llm.models.testing.fake_image_embedder import (
+    DIMENSION,
+    FakeImageEmbedder,
+)
+
+
+def create_model() -> Mock:
+    model = Mock(wraps=FakeImageEmbedder())
+    model.embed_texts.side_effect = lambda texts: np.array(
+        [np.full(DIMENSION, len(text), dtype=np.float32) for text in texts]
+    )
+    return model
+
+
+class TestNormalizeText(unittest.TestCase):
+    def test_normalize_text(self):
+        self.assertEqual(
+            normalize_text("  A Dog\n on   the BEACH "), "a dog on the beach"
+        )
+
+
+class TestCachedTextEmbeddings(unittest.TestCase):
+    def test_embed_texts_runs_model_once_per_text(self):
+        model = create_model()
+        embedder = CachedTextEmbeddings(model)
+
+        first_embeddings = embedder.embed_texts(["dog", "a cat"])
+        second_embeddings = embedder.embed_texts(["a cat", "dog"])
+
+        model.embed_texts.assert_called_once_with(["dog", "a cat"])
+        np.testing.assert_array_equal(first_embeddings[:, 0], [3, 5])
+        np.testing.assert_array_equal(second_embeddings[:, 0], [5, 3])
+        self.assertEqual(
+            embedder.get_report(),
+            TextEmbeddingsCacheReport(
+                num_hits=2, num_misses=2, num_disk_hits=0, num_evictions=0
+            ),
+        )
+        self.assertEqual(embedder.get_report().hit_rate, 0.5)
+
+    def test_embed_texts_deduplicates_texts_in_one_call(self):
+        model = create_model()
+        embedder = CachedTextEmbeddings(model)
+
+        embeddings = embedder.embed_texts(["dog", "Dog ", "cat", "dog"])
+
+        model.embed_texts.assert_called_once_with(["dog", "cat"])
+        np.testing.assert_array_equal(embeddings[:, 0], [3, 3, 3, 3])
+        self.assertEqual(embedder.get_report().num_misses, 2)
+        self.assertEqual(embedder.get_report().num_hits, 2)
+
+    def test_embed_texts_returns_read_only_embeddings(self):
+        embedder = CachedTextEmbeddings(create_model())
+
+        single_embedding = embedder.embed_texts(["dog"])
+        many_embeddings = embedder.embed_texts(["dog", "cat"])
+
+        self.assertEqual(single_embedding.shape, (1, DIMENSION))
+        self.assertFalse(single_embedding.flags.writeable)
+        self.assertFalse(many_embeddings.flags.writeable)
+        with self.assertRaises(ValueError):
+            single_embedding[0, 0] = 1
+
+    def test_embed_texts_evicts_least_recently_used_texts(self):
+        model = create_model()
+        embedder = CachedTextEmbeddings(model, max_size=2)
+
+        embedder.embed_texts(["a"])
+        embedder.embed_texts(["bb"])
+        embedder.embed_texts(["a"])
+        embedder.embed_texts(["ccc"])
+        embedder.embed_texts(["a"])
+        embedder.embed_texts(["bb"])
+
+        self.assertEqual(
+            [call.args[0] for call in model.embed_texts.call_args_list],
+            [["a"], ["bb"], ["ccc"], ["bb"]],
+        )
+        self.assertEqual(embedder.get_report().num_evictions, 2)
+
+    def test_embed_texts_with_no_texts_returns_empty_array(self):
+        model = create_model()
+        embedder = CachedTextEmbeddings(model)
+
+        embeddings = embedder.embed_texts([])
+
+        self.assertEqual(embeddings.shape, (0, DIMENSION))
+        model.embed_texts.assert_not_called()
+
+    def test_embed_texts_with_db_path_persists_embeddings(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, 'cache', 'text_embeddings.sqlite3')
+            embedder = CachedTextEmbeddings(
+                create_model(), db_path=db_path, model_name='model'
+            )
+            embedder.embed_texts(["dog", "cat"])
+            embedder.close()
+
+            model = create_model()
+            new_embedder = CachedTextEmbeddings(
+                model, db_path=db_path, model_name='model'
+            )
+            embeddings = new_embedder.embed_texts(["dog", "bird"])
+            new_embedder.embed_texts(["dog"])
+            new_embedder.close()
+
+            model.embed_texts.assert_called_once_with(["bird"])
+            np.testing.assert_array_equal(embeddings[:, 0], [3, 4])
+            self.assertEqual(
+                new_embedder.get_report(),
+                TextEmbeddingsCacheReport(
+                    num_hits=2, num_misses=1, num_disk_hits=1, num_evictions=0
+                ),
+            )
+
+    def test_embed_texts_does_not_share_persisted_embeddings_across_models(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, 'text_embeddings.sqlite3')
+            embedder = CachedTextEmbeddings(
+                create_model(), db_path=db_path, model_name='model-1'
+            )
+            embedder.embed_texts(["dog"])
+            embedder.close()
+
+            model = create_model()
+            new_embedder = CachedTextEmbeddings(
+                model, db_path=db_path, model_name='model-2'
+            )
+            new_embedder.embed_texts(["dog"])
+            new_embedder.close()
+
+            model.embed_texts.assert_called_once_with(["dog"])
+
+    def test_embed_texts_evicts_persisted_embeddings(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, 'text_embeddings.sqlite3')
+            embedder = CachedTextEmbeddings(
+                create_model(),
+                db_path=db_path,
+                model_name='model',
+                max_persisted_size=1,
+            )
+            embedder.embed_texts(["dog"])
+            embedder.embed_texts(["cat"])
+            embedder.close()
+
+            model = create_model()
+            new_embedder = CachedTextEmbeddings(
+                model, db_path=db_path, model_name='model'
+            )
+            new_embedder.embed_texts(["dog", "cat"])
+            new_embedder.close()
+
+            model.embed_texts.assert_called_once_with(["dog"])
+
+    def test_constructor_with_db_path_and_no_model_name_throws_error(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with self.assertRaises(ValueError):
+                CachedTextEmbeddings(
+                    create_model(),
+                    db_path=os.path.join(temp_dir, 'text_embeddings.sqlite3'),
+                )
+
+    def test_embed_images_and_dimension_use_model(self):
+        model = create_model()
+        embedder = CachedTextEmbeddings(model)
+
+        embeddings = embedder.embed_images([Image.new("RGB", (10, 10))])
+
+        self.assertEqual(embeddings.shape, (1, DIMENSION))
+        self.assertEqual(embedder.get_embedding_dimension(), DIMENSION)
+        model.embed_images.assert_called_once()
@@ -0,0 +1,14 @@
+import unittest
+
+from photos_drive.shared.features.llm.models.cpu_backend import (
+    CPUBackend,
+    parse_cpu_backend,
+)
+
+
+class TestParseCPUBackend(unittest.TestCase):
+    def test_parse_cpu_backend(self):
+        self.assertEqual(parse_cpu_backend('int8'), CPUBackend.INT8)
+        self.assertEqual(parse_cpu_backend('ONNX'), CPUBackend.ONNX)
+        with self.assertRaises(ValueError):
+            parse_cpu_backend('gpu')
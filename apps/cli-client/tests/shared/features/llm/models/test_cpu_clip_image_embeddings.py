@@ -0,0 +1,45 @@
+import os
+import unittest
+
+from PIL import Image
+import numpy as np
+
+from photos_drive.shared.features.llm.models.cpu_clip_image_embeddings import (
+    CPUBackend,
+    CPUOptimizedCLIPImageEmbeddings,
+)
+
+
+class TestCPUOptimizedCLIPImageEmbeddings(unittest.TestCase):
+    embedding_model: CPUOptimizedCLIPImageEmbeddings
+    images: list[Image.Image]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.embedding_model = CPUOptimizedCLIPImageEmbeddings(
+            CPUBackend.INT8, num_threads=2
+        )
+
+        folder = 'tests/shared/features/llm/models/test_files'
+        image_filenames = ["test_image_1.png", "test_image_2.png"]
+        cls.images = []
+        for fname in image_filenames:
+            path = os.path.join(folder, fname)
+            img = Image.open(path).convert("RGB")
+            cls.images.append(img)
+
+    def test_embed_texts(self):
+        texts = ["hello world", "test embedding"]
+        embeddings = self.embedding_model.embed_texts(texts)
+
+        self.assertEqual(embeddings.shape, (len(texts), 768))
+        norms = np.linalg.norm(embeddings, axis=1)
+        np.testing.assert_allclose(norms, 1.0, rtol=1e-3)
+
+    def test_embed_images(self):
+        embeddings = self.embedding_model.embed_images(self.images)
+
+        self.assertEqual(embeddings.shape, (len(self.images), 768))
+        self.assertEqual(embeddings.dtype, np.float32)
+        norms = np.linalg.norm(embeddings, axis=1)
+        np.testing.assert_allclose(norms, 1.0, rtol=1e-3)
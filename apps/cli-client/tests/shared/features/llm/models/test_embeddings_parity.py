@@ -0,0 +1,47 @@
+import unittest
+
+from PIL import Image
+import numpy as np
+
+from photos_drive.shared.features.llm.models.embeddings_parity import (
+    compare_image_embeddings,
+)
+from photos_drive.shared.features.llm.models.testing.fake_image_embedder import (
+    FakeImageEmbedder,
+)
+
+
+class ScaledImageEmbedder(FakeImageEmbedder):
+    def __init__(self, embedding: np.ndarray):
+        self.embedding = embedding
+
+    def embed_images(self, images: list[Image.Image]) -> np.ndarray:
+        return np.vstack([self.embedding for _ in images])
+
+
+class TestCompareImageEmbeddings(unittest.TestCase):
+    def test_compare_image_embeddings_with_same_direction(self):
+        images = [Image.new("RGB", (10, 10)) for _ in range(3)]
+        reference = ScaledImageEmbedder(np.array([1, 0], dtype=np.float32))
+        candidate = ScaledImageEmbedder(np.array([2, 0], dtype=np.float32))
+
+        report = compare_image_embeddings(reference, candidate, images, 2)
+
+        self.assertEqual(report.num_images, 3)
+        self.assertAlmostEqual(report.mean_cosine_deviation, 0, places=6)
+        self.assertAlmostEqual(report.max_cosine_deviation, 0, places=6)
+        self.assertGreater(report.reference_images_per_second, 0)
+        self.assertGreater(report.candidate_images_per_second, 0)
+
+    def test_compare_image_embeddings_with_orthogonal_embeddings(self):
+        images = [Image.new("RGB", (10, 10))]
+        reference = ScaledImageEmbedder(np.array([1, 0], dtype=np.float32))
+        candidate = ScaledImageEmbedder(np.array([0, 1], dtype=np.float32))
+
+        report = compare_image_embeddings(reference, candidate, images)
+
+        self.assertAlmostEqual(report.mean_cosine_deviation, 1, places=6)
+
+    def test_compare_image_embeddings_with_no_images_raises_error(self):
+        with self.assertRaises(ValueError):
+            compare_image_embeddings(FakeImageEmbedder(), FakeImageEmbedder(), [])
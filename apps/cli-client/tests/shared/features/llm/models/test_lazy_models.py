@@ -0,0 +1,94 @@
+import subprocess
+import sys
+import unittest
+from unittest.mock import Mock
+
+from PIL import Image
+
+from photos_drive.shared.features.llm.models.cpu_backend import CPUBackend
+from photos_drive.shared.features.llm.models.lazy_models import (
+    LazyImageCaptions,
+    LazyImageEmbeddings,
+    create_lazy_multi_process_image_embeddings,
+    get_image_embeddings_model_id,
+)
+from photos_drive.shared.features.llm.models.testing.fake_image_captions import (
+    FAKE_CAPTIONS,
+    FakeImageCaptions,
+)
+from photos_drive.shared.features.llm.models.testing.fake_image_embedder import (
+    FakeImageEmbedder,
+)
+
+
+class TestLazyImageEmbeddings(unittest.TestCase):
+    def test_model_is_not_created_until_first_use(self):
+        create_model = Mock(return_value=FakeImageEmbedder())
+        embedder = LazyImageEmbeddings(create_model)
+
+        self.assertFalse(embedder.is_loaded())
+        create_model.assert_not_called()
+
+        embedder.embed_images([Image.new("RGB", (10, 10))])
+        embedder.embed_texts(["dog"])
+
+        self.assertTrue(embedder.is_loaded())
+        self.assertEqual(embedder.get_embedding_dimension(), 100)
+        create_model.assert_called_once()
+
+
+class TestCreateLazyMultiProcessImageEmbeddings(unittest.TestCase):
+    def test_workers_are_not_started_until_first_use(self):
+        embedder = create_lazy_multi_process_image_embeddings(2, CPUBackend.INT8)
+
+        self.assertFalse(embedder.is_loaded())
+
+
+class TestGetImageEmbeddingsModelId(unittest.TestCase):
+    def test_model_ids_differ_by_cpu_backend(self):
+        model_ids = {
+            get_image_embeddings_model_id(),
+            get_image_embeddings_model_id(CPUBackend.INT8),
+            get_image_embeddings_model_id(CPUBackend.ONNX),
+        }
+
+        self.assertEqual(len(model_ids), 3)
+        self.assertEqual(
+            get_image_embeddings_model_id(), 'openai/clip-vit-large-patch14'
+        )
+
+
+class TestLazyImageCaptions(unittest.TestCase):
+    def test_model_is_not_created_until_first_use(self):
+        create_model = Mock(return_value=FakeImageCaptions())
+        captions = LazyImageCaptions(create_model)
+
+        self.assertFalse(captions.is_loaded())
+        create_model.assert_not_called()
+
+        self.assertEqual(
+            captions.generate_caption([Image.new("RGB", (10, 10))]), [FAKE_CAPTIONS]
+        )
+        self.assertTrue(captions.is_loaded())
+        create_model.assert_called_once()
+
+
+class TestCliStartup(unittest.TestCase):
+    def test_building_cli_does_not_import_torch(self):
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, time\n"
+                + "start_time = time.time()\n"
+                + "from photos_drive.cli.app import build_app\n"
+                + "build_app()\n"
+                + "print(f'Started in {time.time() - start_time:.2f} seconds')\n"
+                + "assert 'torch' not in sys.modules\n"
+                + "assert 'transformers' not in sys.modules\n",
+            ],
+            capture_output=True,
+            text=True,
+        )
+
+        self.assertEqual(result.returncode, 0, result.stderr)
@@ -0,0 +1,129 @@
+import os
+import unittest
+
+from PIL import Image
+import numpy as np
+from typing_extensions import override
+
+from photos_drive.shared.features.llm.models.image_embeddings import ImageEmbeddings
+from photos_drive.shared.features.llm.models.multi_process_embeddings import (
+    MultiProcessImageEmbeddings,
+)
+
+DIMENSION = 4
+
+
+class ColorImageEmbedder(ImageEmbeddings):
+    '''
+    Embeds each image by its top-left pixel, and each text by its length, and
+    records the process that embedded it.
+    '''
+
+    @override
+    def get_embedding_dimension(self) -> int:
+        return DIMENSION
+
+    @override
+    def embed_texts(self, texts: list[str]) -> np.ndarray:
+        return np.array(
+            [[len(text), 0, 0, os.getpid()] for text in texts], dtype=np.float32
+        )
+
+    @override
+    def embed_images(self, images: list[Image.Image]) -> np.ndarray:
+        if any(image.size == (1, 1) for image in images):
+            raise ValueError("Image is too small")
+
+        pixels = [image.getpixel((0, 0)) for image in images]
+        return np.array(
+            [[*pixel, os.getpid()] for pixel in pixels],  # type: ignore
+            dtype=np.float32,
+        )
+
+
+def create_broken_embedder() -> ImageEmbeddings:
+    raise ValueError("Failed to load model")
+
+
+class TestMultiProcessImageEmbeddings(unittest.TestCase):
+    def setUp(self):
+        self.embedder = MultiProcessImageEmbeddings(
+            ColorImageEmbedder, num_workers=2, num_threads_per_worker=1
+        )
+
+    def tearDown(self):
+        self.embedder.close()
+
+    def test_embed_images_returns_embeddings_in_order(self):
+        images = [Image.new("RGB", (10, 10), (i, i + 1, i + 2)) for i in range(7)]
+
+        embeddings = self.embedder.embed_images(images)
+
+        self.assertEqual(embeddings.shape, (7, DIMENSION))
+        self.assertEqual(embeddings.dtype, np.float32)
+        np.testing.assert_array_equal(
+            embeddings[:, :3], [[i, i + 1, i + 2] for i in range(7)]
+        )
+
+    def test_embed_images_spreads_images_over_workers(self):
+        images = [Image.new("RGB", (10, 10), (i, 0, 0)) for i in range(4)]
+
+        embeddings = self.embedder.embed_images(images)
+
+        worker_pids = set(embeddings[:, 3].tolist())
+        self.assertEqual(len(worker_pids), 2)
+        self.assertNotIn(os.getpid(), worker_pids)
+
+    def test_embed_images_with_single_images_rotates_workers(self):
+        worker_pids = set()
+        for i in range(4):
+            embeddings = self.embedder.embed_images(
+                [Image.new("RGB", (10, 10), (i, 0, 0))]
+            )
+            worker_pids.add(embeddings[0, 3])
+
+        self.assertEqual(len(worker_pids), 2)
+
+    def test_embed_images_with_growing_batches(self):
+        for num_images in [1, 3, 40, 200]:
+            images = [
+                Image.new("RGB", (10, 10), (i % 256, 0, 0)) for i in range(num_images)
+            ]
+
+            embeddings = self.embedder.embed_images(images)
+
+            np.testing.assert_array_equal(
+                embeddings[:, 0], [i % 256 for i in range(num_images)]
+            )
+
+    def test_embed_texts(self):
+        embeddings = self.embedder.embed_texts(["a", "bb", "ccc"])
+
+        np.testing.assert_array_equal(embeddings[:, 0], [1, 2, 3])
+
+    def test_embed_images_with_no_images_returns_empty_array(self):
+        embeddings = self.embedder.embed_images([])
+
+        self.assertEqual(embeddings.shape, (0, DIMENSION))
+
+    def test_get_embedding_dimension(self):
+        self.assertEqual(self.embedder.get_embedding_dimension(), DIMENSION)
+
+    def test_embed_images_with_failing_worker_raises_error_and_recovers(self):
+        with self.assertRaisesRegex(RuntimeError, "Image is too small"):
+            self.embedder.embed_images(
+                [Image.new("RGB", (10, 10)), Image.new("RGB", (1, 1))]
+            )
+
+        embeddings = self.embedder.embed_images([Image.new("RGB", (10, 10), (5, 0, 0))])
+        self.assertEqual(embeddings[0, 0], 5)
+
+
+class TestMultiProcessImageEmbeddingsStartup(unittest.TestCase):
+    def test_constructor_with_broken_model_raises_error(self):
+        with self.assertRaisesRegex(RuntimeError, "Failed to load model"):
+            MultiProcessImageEmbeddings(create_broken_embedder, num_workers=1)
+
+    def test_constructor_with_no_workers_raises_error(self):
+        with self.assertRaises(ValueError):
+            MultiProcessImageEmbeddings(ColorImageEmbedder, num_workers=0)
@@ -68,6 +68,41 @@ class TestMongoDBMapCellsRepository(unittest.TestCase):
             )
             self.assertIsNotNone(cell["cell_id"])
 
+    def test_add_many_media_items__inserts_cells_of_all_media_items(self):
+        media_item_2 = replace(
+            MEDIA_ITEM,
+            id=MediaItemId(MONGO_CLIENT_ID, ObjectId()),
+            location=GpsLocation(latitude=43.6532, longitude=-79.3832),
+        )
+
+        self.repo.add_many_media_items([MEDIA_ITEM, media_item_2])
+
+        map_cells_coll = self.mongo_client["photos_drive"]["map_cells"]
+        for media_item in [MEDIA_ITEM, media_item_2]:
+            self.assertEqual(
+                map_cells_coll.count_documents(
+                    {"media_item_id": media_item_id_to_string(media_item.id)}
+                ),
+                MAX_CELL_RESOLUTION + 1,
+            )
+
+    def test_add_many_media_items__raises_with_no_location_and_adds_nothing(self):
+        media_item_2 = replace(
+            MEDIA_ITEM, id=MediaItemId(MONGO_CLIENT_ID, ObjectId()), location=None
+        )
+
+        with self.assertRaises(ValueError):
+            self.repo.add_many_media_items([MEDIA_ITEM, media_item_2])
+
+        map_cells_coll = self.mongo_client["photos_drive"]["map_cells"]
+        self.assertEqual(map_cells_coll.count_documents({}), 0)
+
+    def test_add_many_media_items__with_no_media_items_does_nothing(self):
+        self.repo.add_many_media_items([])
+
+        map_cells_coll = self.mongo_client["photos_drive"]["map_cells"]
+        self.assertEqual(map_cells_coll.count_documents({}), 0)
+
     def test_add_media_item__raises_with_no_location(self):
         media_item = MediaItem(
             id=MEDIA_ITEM_ID,
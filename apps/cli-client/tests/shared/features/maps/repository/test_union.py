@@ -49,6 +49,38 @@ class TestUnionMapCellsRepository(unittest.TestCase):
         self.repo2.add_media_item.assert_called_once_with(media_item)
         self.repo1.add_media_item.assert_not_called()
 
+    def test_add_many_media_items__checks_space_once(self):
+        media_items = [
+            MediaItem(
+                id=MediaItemId(ObjectId(), ObjectId()),
+                file_name=f"photo_{i}.jpg",
+                location=GpsLocation(latitude=37.7749, longitude=-122.4194),
+                file_hash=b"h1",
+                gphotos_media_item_id="mid",
+                gphotos_client_id=ObjectId(),
+                album_id=AlbumId(ObjectId(), ObjectId()),
+                width=100,
+                height=100,
+                date_taken=datetime.now(),
+                embedding_id=None,
+                mime_type="image/jpeg",
+            )
+            for i in range(3)
+        ]
+
+        self.union_repo.add_many_media_items(media_items)
+
+        self.repo2.add_many_media_items.assert_called_once_with(media_items)
+        self.repo1.add_many_media_items.assert_not_called()
+        self.repo1.get_available_free_space.assert_called_once()
+        self.repo2.get_available_free_space.assert_called_once()
+
+    def test_add_many_media_items__with_no_media_items_does_nothing(self):
+        self.union_repo.add_many_media_items([])
+
+        self.repo1.get_available_free_space.assert_not_called()
+        self.repo2.add_many_media_items.assert_not_called()
+
     def test_remove_media_item__delegates_to_all_repos(self):
         mid = MediaItemId(ObjectId(), ObjectId())
         self.union_repo.remove_media_item(mid)
@@ -0,0 +1,101 @@
+from io import BytesIO
+import os
+import struct
+import tempfile
+import unittest
+
+from PIL import Image
+
+from photos_drive.shared.utils.dimensions.header_probe import (
+    ProbedMedia,
+    probe_media,
+    probe_media_from_buffer,
+)
+
+TEST_FILES_DIRECTORY = "./tests/shared/utils/dimensions/test_files"
+BACKUP_TEST_FILES_DIRECTORY = "./tests/backup/resources/test_processed_diffs_files"
+
+
+class HeaderProbeTests(unittest.TestCase):
+    def test_probe_media_of_jpeg(self):
+        file_path = os.path.join(TEST_FILES_DIRECTORY, "image.jpg")
+
+        self.assertEqual(probe_media(file_path), ProbedMedia('image/jpeg', 3264, 2448))
+
+    def test_probe_media_of_jpeg_with_exif_orientation(self):
+        file_path = os.path.join(TEST_FILES_DIRECTORY, "rotated-image.jpg")
+
+        self.assertEqual(probe_media(file_path), ProbedMedia('image/jpeg', 2448, 3264))
+
+    def test_probe_media_of_png_with_exif_orientation(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "image.png")
+            Image.new('RGB', (30, 20)).save(file_path, exif=exif)
+
+            self.assertEqual(probe_media(file_path), ProbedMedia('image/png', 20, 30))
+
+    def test_probe_media_of_heic(self):
+        file_path = os.path.join(BACKUP_TEST_FILES_DIRECTORY, "heic-image.heic")
+
+        self.assertEqual(probe_media(file_path), ProbedMedia('image/heic', 4032, 3024))
+
+    def test_probe_media_of_mp4(self):
+        file_path = os.path.join(TEST_FILES_DIRECTORY, "video.mp4")
+
+        self.assertEqual(probe_media(file_path), ProbedMedia('video/mp4', 120, 68))
+
+    def test_probe_media_of_rotated_mp4(self):
+        file_path = os.path.join(TEST_FILES_DIRECTORY, "rotated-video.mp4")
+
+        self.assertEqual(probe_media(file_path), ProbedMedia('video/mp4', 68, 120))
+
+    def test_probe_media_of_mov(self):
+        file_path = os.path.join(BACKUP_TEST_FILES_DIRECTORY, "video.mov")
+
+        self.assertEqual(
+            probe_media(file_path), ProbedMedia('video/quicktime', 1744, 1308)
+        )
+
+    def test_probe_media_from_buffer_of_avi(self):
+        main_avi_header = struct.pack('<10I', 100000, 0, 0, 0, 3, 0, 1, 0, 64, 48)
+        buffer = (
+            b'RIFF'
+            + struct.pack('<I', 100)
+            + b'AVI '
+            + b'LIST'
+            + struct.pack('<I', 100)
+            + b'hdrl'
+            + b'avih'
+            + struct.pack('<I', 56)
+            + main_avi_header
+            + bytes(16)
+        )
+
+        self.assertEqual(
+            probe_media_from_buffer(buffer), ProbedMedia('video/x-msvideo', 64, 48)
+        )
+
+    def test_probe_media_from_buffer_matches_probe_media(self):
+        for file_name in ["image.jpg", "rotated-image.jpg", "rotated-video.mp4"]:
+            file_path = os.path.join(TEST_FILES_DIRECTORY, file_name)
+            with open(file_path, 'rb') as f:
+                buffer = f.read()
+
+            self.assertEqual(probe_media_from_buffer(buffer), probe_media(file_path))
+
+    def test_probe_media_from_buffer_of_truncated_file_returns_none(self):
+        file_path = os.path.join(TEST_FILES_DIRECTORY, "video.mp4")
+        with open(file_path, 'rb') as f:
+            buffer = f.read(100)
+
+        self.assertIsNone(probe_media_from_buffer(buffer))
+
+    def test_probe_media_from_buffer_of_unknown_format_returns_none(self):
+        buffer = BytesIO()
+        Image.new('RGB', (30, 20)).save(buffer, format='GIF')
+
+        self.assertIsNone(probe_media_from_buffer(buffer.getvalue()))
+        self.assertIsNone(probe_media_from_buffer(b''))
@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+
+import xxhash
+
+from photos_drive.shared.utils.hashes.file_hasher import (
+    FileHasher,
+    HashAlgorithm,
+    IncrementalFileHasher,
+    get_hash_algorithm,
+    parse_hash_algorithm,
+)
+
+
+class TestFileHasher(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_hash_file_with_xxh64_returns_untagged_hash(self):
+        content = b"Hello, World!" * 1000
+        file_path = self.__create_file('file.jpg', content)
+
+        file_hash = FileHasher(buffer_size=1024).hash_file(file_path)
+
+        self.assertEqual(file_hash, xxhash.xxh64(content).digest())
+
+    def test_hash_file_with_xxh3_128_returns_tagged_hash(self):
+        content = b"Hello, World!"
+        file_path = self.__create_file('file.jpg', content)
+
+        file_hash = FileHasher(HashAlgorithm.XXH3_128).hash_file(file_path)
+
+        self.assertEqual(file_hash, b'\x01' + xxhash.xxh3_128(content).digest())
+
+    def test_hash_file_with_memory_map_returns_same_hash(self):
+        content = os.urandom(10000)
+        file_path = self.__create_file('file.mp4', content)
+
+        file_hash = FileHasher(mmap_threshold=1000).hash_file(file_path)
+
+        self.assertEqual(file_hash, xxhash.xxh64(content).digest())
+
+    def test_hash_file_with_empty_file(self):
+        file_path = self.__create_file('file.jpg', b'')
+
+        file_hash = FileHasher(mmap_threshold=0).hash_file(file_path)
+
+        self.assertEqual(file_hash, xxhash.xxh64().digest())
+
+    def test_hash_files_returns_hashes_in_order(self):
+        contents = [os.urandom(size) for size in [0, 10, 5000, 100, 20000]]
+        file_paths = [
+            self.__create_file(f'{i}.jpg', content)
+            for i, content in enumerate(contents)
+        ]
+
+        file_hashes = FileHasher(
+            buffer_size=1024, mmap_threshold=10000, max_io_depth=2
+        ).hash_files(file_paths)
+
+        self.assertEqual(
+            file_hashes, [xxhash.xxh64(content).digest() for content in contents]
+        )
+
+    def test_hash_files_with_missing_file_throws_error(self):
+        with self.assertRaises(FileNotFoundError):
+            FileHasher().hash_files(['missing-1.jpg', 'missing-2.jpg'])
+
+    def test_incremental_file_hasher_matches_hash_file(self):
+        content = b"Hello, World!"
+        file_path = self.__create_file('file.jpg', content)
+        hasher = IncrementalFileHasher(HashAlgorithm.XXH3_128)
+        hasher.update(content[:5])
+        hasher.update(content[5:])
+
+        self.assertEqual(
+            hasher.digest(),
+            FileHasher().hash_file(file_path, HashAlgorithm.XXH3_128),
+        )
+
+    def test_get_hash_algorithm(self):
+        file_path = self.__create_file('file.jpg', b'Hello, World!')
+        hasher = FileHasher()
+
+        self.assertEqual(
+            get_hash_algorithm(hasher.hash_file(file_path, HashAlgorithm.XXH64)),
+            HashAlgorithm.XXH64,
+        )
+        self.assertEqual(
+            get_hash_algorithm(hasher.hash_file(file_path, HashAlgorithm.XXH3_128)),
+            HashAlgorithm.XXH3_128,
+        )
+        self.assertEqual(get_hash_algorithm(b''), HashAlgorithm.XXH64)
+
+    def test_parse_hash_algorithm(self):
+        self.assertEqual(parse_hash_algorithm('xxh64'), HashAlgorithm.XXH64)
+        self.assertEqual(parse_hash_algorithm('XXH3_128'), HashAlgorithm.XXH3_128)
+        with self.assertRaisesRegex(ValueError, "Unknown hash algorithm md5"):
+            parse_hash_algorithm('md5')
+
+    def __create_file(self, file_name: str, content: bytes) -> str:
+        file_path = os.path.join(self.temp_dir.name, file_name)
+        with open(file_path, 'wb') as f:
+            f.write(content)
+        return file_path
@@ -0,0 +1,73 @@
+import threading
+import time
+import unittest
+
+from photos_drive.shared.utils.prefetch import prefetch
+
+
+class TestPrefetch(unittest.TestCase):
+    def test_prefetch_yields_items_in_order(self):
+        items = list(prefetch(range(10), max_prefetched=2))
+
+        self.assertEqual(items, list(range(10)))
+
+    def test_prefetch_empty_iterable(self):
+        self.assertEqual(list(prefetch([], max_prefetched=1)), [])
+
+    def test_prefetch_bounds_items_produced_ahead(self):
+        num_produced = 0
+        lock = threading.Lock()
+
+        def generate():
+            nonlocal num_produced
+            for i in range(10):
+                with lock:
+                    num_produced += 1
+                yield i
+
+        generator = prefetch(generate(), max_prefetched=2)
+        self.assertEqual(next(generator), 0)
+
+        # Wait until the producer gets blocked on the full buffer
+        time.sleep(0.5)
+
+        with lock:
+            # 1 consumed, 2 in the buffer, and 1 waiting to be put in the buffer
+            self.assertLessEqual(num_produced, 4)
+        generator.close()
+
+    def test_prefetch_close_waits_for_producer_to_stop(self):
+        num_in_progress = 0
+
+        def generate():
+            nonlocal num_in_progress
+            for i in range(10):
+                num_in_progress += 1
+                time.sleep(0.1)
+                num_in_progress -= 1
+                yield i
+
+        generator = prefetch(generate(), max_prefetched=1)
+        self.assertEqual(next(generator), 0)
+
+        generator.close()
+
+        self.assertEqual(num_in_progress, 0)
+        self.assertEqual(
+            [t for t in threading.enumerate() if t.name.endswith('(produce)')], []
+        )
+
+    def test_prefetch_reraises_exception_from_iterable(self):
+        def generate():
+            yield 1
+            raise ValueError("Failed to produce item")
+
+        generator = prefetch(generate(), max_prefetched=1)
+
+        self.assertEqual(next(generator), 1)
+        with self.assertRaisesRegex(ValueError, "Failed to produce item"):
+            next(generator)
+
+    def test_prefetch_invalid_max_prefetched(self):
+        with self.assertRaises(ValueError):
+            list(prefetch(range(10), max_prefetched=0))